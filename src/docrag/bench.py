@@ -0,0 +1,337 @@
+"""End-to-end benchmark for DocRAG Kit.
+
+Times every stage of an index build separately, then query latency:
+
+- ``scan``, ``load``, ``chunk``: the ``DocumentProcessor.process`` stages
+- ``embed``: time spent inside the embedding provider while indexing
+- ``write``: vector store writes (index build time minus embedding and
+  local index time)
+- ``local_indexes``: BM25, trigram and symbol index build
+- ``open``: opening the built database and answering the first query
+- ``search``: ``search_docs`` as the MCP server runs it, ``vector``:
+  ``VectorDBManager.search`` alone, ``answer``: ``answer_question``
+
+The benchmark runs either on the current project (the index is built in a
+temporary workspace, the project's own index is never touched) or on a
+generated corpus (``docrag.corpus``) with the offline ``fake`` providers. Results are plain
+JSON, and ``compare_results`` flags metrics that got slower than a saved
+baseline.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from . import __version__
+from .config_manager import ConfigManager, DocRAGConfig, IndexingConfig
+from .corpus import CorpusSpec, generate_corpus, corpus_indexing
+from .document_processor import DocumentProcessor
+from .instrumentation import add_phase_observer, track_call
+from .stats import latency_summary
+
+
+RESULTS_VERSION = 1
+
+# Relative slowdown flagged as a regression
+DEFAULT_THRESHOLD = 0.2
+
+# Absolute slowdown below which differences are treated as noise (seconds)
+NOISE_FLOOR_S = 0.002
+
+STAGES = ['scan', 'load', 'chunk', 'embed', 'write', 'local_indexes', 'open']
+QUERY_KINDS = ['search', 'vector', 'answer']
+
+
+def sample_queries(chunks: List[Document], count: int, seed: int) -> List[str]:
+    """
+    Sample benchmark queries: the leading words of random chunks, like a
+    question about that passage.
+
+    Args:
+        chunks: Indexed chunks.
+        count: Number of queries.
+        seed: Random seed.
+
+    Returns:
+        List of query strings.
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    for index in rng.integers(0, len(chunks), size=count):
+        words = chunks[int(index)].page_content.split()
+        queries.append(" ".join(words[:12]) or "documentation")
+    return queries
+
+
+def _corpus_config(fake_latency: float, fake_tokens_per_second: float) -> DocRAGConfig:
+    config = DocRAGConfig.from_template('general')
+    config.llm.provider = 'fake'
+    config.llm.embedding_provider = None
+    config.llm.embedding_model = 'fake-embedding'
+    config.llm.llm_model = 'fake-chat'
+    config.llm.fake_latency = fake_latency
+    config.llm.fake_tokens_per_second = fake_tokens_per_second
+    config.indexing = IndexingConfig(**corpus_indexing())
+    return config
+
+
+def prepare_workspace(
+    work_dir: Path,
+    project_root: Optional[Path] = None,
+    corpus_files: int = 200,
+    fake: bool = False,
+    fake_latency: float = 0.0,
+    fake_tokens_per_second: float = 0.0,
+    seed: int = 0
+) -> Tuple[Path, Path, DocRAGConfig]:
+    """
+    Set up a throwaway project workspace with its own configuration.
+
+    Args:
+        work_dir: Empty directory to set up.
+        project_root: Project whose configuration and files are used. None
+            generates a corpus in the workspace and uses the fake providers.
+        corpus_files: Files in the generated corpus.
+        fake: Use the fake providers for a project too.
+        fake_latency: Simulated provider latency for fake providers.
+        fake_tokens_per_second: Simulated answer throughput for fake providers.
+        seed: Corpus seed.
+
+    Returns:
+        Tuple of (workspace with ``.docrag/config.yaml``, root to index
+        files from, configuration). An index built in the workspace never
+        touches the project's own index.
+
+    Raises:
+        ValueError: If the project has no configuration.
+    """
+    work_dir = Path(work_dir)
+    if project_root is None:
+        generate_corpus(work_dir, CorpusSpec(num_files=corpus_files, seed=seed))
+        config = _corpus_config(fake_latency, fake_tokens_per_second)
+        workspace = source_root = work_dir
+    else:
+        source_root = Path(project_root)
+        project_config = ConfigManager(source_root).load_config()
+        if project_config is None:
+            raise ValueError(
+                "ERROR: Configuration not found.\n"
+                "   Run 'docrag init' to initialize DocRAG first"
+            )
+        config = project_config
+        if fake:
+            config.llm.provider = 'fake'
+            config.llm.embedding_provider = None
+            config.llm.fake_latency = fake_latency
+            config.llm.fake_tokens_per_second = fake_tokens_per_second
+        workspace = work_dir / "workspace"
+        workspace.mkdir(parents=True, exist_ok=True)
+    ConfigManager(workspace).save_config(config)
+    return workspace, source_root, config
+
+
+def run_benchmark(
+    project_root: Optional[Path] = None,
+    corpus_files: int = 200,
+    num_queries: int = 50,
+    num_answers: int = 10,
+    fake: bool = False,
+    fake_latency: float = 0.0,
+    fake_tokens_per_second: float = 0.0,
+    seed: int = 0,
+    work_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Benchmark indexing stages and query latency.
+
+    Args:
+        project_root: Project to benchmark. None generates a corpus and uses
+            the fake providers.
+        corpus_files: Files in the generated corpus.
+        num_queries: Timed ``search_docs`` and vector searches.
+        num_answers: Timed ``answer_question`` calls (0 skips them).
+        fake: Use the fake providers for a project too (no API calls).
+        fake_latency: Simulated provider latency for fake providers.
+        fake_tokens_per_second: Simulated answer throughput for fake providers.
+        seed: Seed for the corpus and query sample.
+        work_dir: Workspace for the temporary index. Defaults to a temp dir.
+
+    Returns:
+        Results dictionary: environment, configuration, counts, ``stages``
+        (seconds per stage) and ``queries`` (latency percentiles per kind).
+
+    Raises:
+        ValueError: If the project has no configuration or no files to index.
+    """
+    # Deferred: the MCP server pulls in the MCP SDK
+    from .mcp_server import MCPServer
+    from .vector_db import VectorDBManager
+
+    owns_work_dir = work_dir is None
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="docrag-bench-"))
+    try:
+        workspace, source_root, config = prepare_workspace(
+            work_dir, project_root, corpus_files, fake, fake_latency, fake_tokens_per_second, seed
+        )
+        config_dict = config.to_dict()
+
+        stages: Dict[str, float] = {}
+        processor = DocumentProcessor(config_dict)
+
+        start = time.perf_counter()
+        files = processor.scan_files(source_root)
+        stages['scan'] = time.perf_counter() - start
+        if not files:
+            raise ValueError("ERROR: No files found to index")
+
+        start = time.perf_counter()
+        documents = processor.load_documents(files)
+        processor.add_path_metadata(documents, source_root)
+        stages['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        chunks = processor.add_metadata(processor.chunk_documents(documents))
+        stages['chunk'] = time.perf_counter() - start
+
+        manager = VectorDBManager(config_dict, workspace)
+        embedded_texts = 0
+
+        def count_embedded_texts(name: str, event: str, attributes: Dict[str, Any]) -> None:
+            nonlocal embedded_texts
+            if name == 'embed' and event == 'start':
+                embedded_texts += attributes.get('texts', 0)
+
+        # create_database times its embed and local_indexes phases on the call record
+        with track_call('bench_index', {}) as build, add_phase_observer(count_embedded_texts):
+            manager.create_database(chunks, show_progress=False)
+        stages['embed'] = build.phases.get('embed', 0.0)
+        stages['local_indexes'] = build.phases.get('local_indexes', 0.0)
+        stages['write'] = max(0.0, build.duration - stages['embed'] - stages['local_indexes'])
+
+        queries = sample_queries(chunks, max(num_queries, num_answers, 1), seed)
+        latencies: Dict[str, List[float]] = {kind: [] for kind in QUERY_KINDS}
+
+        # The server logs to stderr on startup and per compressed answer
+        with contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            server = MCPServer(workspace)
+            server.vector_db.search(queries[0])
+            stages['open'] = time.perf_counter() - start
+
+            async def run_queries():
+                for query in queries[:num_queries]:
+                    query_start = time.perf_counter()
+                    await server.handle_search_docs(query)
+                    latencies['search'].append(time.perf_counter() - query_start)
+                for query in queries[:num_answers]:
+                    query_start = time.perf_counter()
+                    await server.handle_answer_question(query, include_sources=False)
+                    latencies['answer'].append(time.perf_counter() - query_start)
+
+            asyncio.run(run_queries())
+
+            for query in queries[:num_queries]:
+                query_start = time.perf_counter()
+                server.vector_db.search(query)
+                latencies['vector'].append(time.perf_counter() - query_start)
+
+        return {
+            'version': RESULTS_VERSION,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'docrag_version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'source': 'corpus' if project_root is None else 'project',
+            'config': {
+                'provider': config.llm.provider,
+                'embedding_provider': config.llm.embedding_provider or config.llm.provider,
+                'backend': config.vector_store.backend,
+                'sharding': config.vector_store.sharding,
+                'chunk_size': config.chunking.chunk_size,
+                'top_k': config.retrieval.top_k,
+                'search_mode': config.retrieval.search_mode
+            },
+            'counts': {
+                'files': len(files),
+                'documents': len(documents),
+                'chunks': len(chunks),
+                'characters': sum(len(chunk.page_content) for chunk in chunks),
+                'embedded_texts': embedded_texts
+            },
+            'stages': {stage: round(stages[stage], 6) for stage in STAGES},
+            'queries': {kind: latency_summary(latencies[kind]) for kind in QUERY_KINDS}
+        }
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """Write benchmark results as JSON."""
+    Path(path).write_text(json.dumps(results, indent=2) + "\n", encoding='utf-8')
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read benchmark results written by ``save_results``."""
+    results: Dict[str, Any] = json.loads(Path(path).read_text(encoding='utf-8'))
+    return results
+
+
+def _timings(results: Dict[str, Any]) -> Dict[str, float]:
+    # Flat metric name -> seconds
+    timings = {f"stage.{name}": value for name, value in results.get('stages', {}).items()}
+    for kind, summary in results.get('queries', {}).items():
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if key in summary:
+                timings[f"{kind}.{key[:-3]}"] = summary[key] / 1000
+    return timings
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline.
+
+    A metric regresses when it is more than ``threshold`` slower than the
+    baseline and the difference is above the noise floor.
+
+    Args:
+        baseline: Baseline results.
+        current: Current results.
+        threshold: Relative slowdown that counts as a regression (0.2 = 20%).
+
+    Returns:
+        One entry per metric in both results, with ``metric``,
+        ``baseline_s``, ``current_s``, ``change`` (relative) and
+        ``regression``.
+    """
+    before = _timings(baseline)
+    after = _timings(current)
+    rows = []
+    for metric in before:
+        if metric not in after:
+            continue
+        old, new = before[metric], after[metric]
+        change = (new - old) / old if old > 0 else 0.0
+        rows.append({
+            'metric': metric,
+            'baseline_s': old,
+            'current_s': new,
+            'change': change,
+            'regression': change > threshold and new - old > NOISE_FLOOR_S
+        })
+    return rows
@@ -1,5 +1,7 @@
 """Command-line interface for DocRAG Kit."""
 
+import functools
+
 import click
 from pathlib import Path
 from docrag import __version__
@@ -219,14 +221,42 @@ Answer:"""
         traceback.print_exc()
 
 
+def _instrumented(name):
+    """Trace a command (tracing.enabled) and add --profile, --profiler and --profile-memory."""
+    def decorate(func):
+        @click.option("--profile-memory", is_flag=True, help="Profile with tracemalloc snapshots per pipeline stage")
+        @click.option("--profiler", type=click.Choice(['sample', 'cprofile']), default='sample',
+                      help="Stack sampler (flamegraph output) or cProfile")
+        @click.option("--profile", is_flag=True, help="Profile this run (written to .docrag/profiles/)")
+        @functools.wraps(func)
+        def wrapper(*args, profile, profiler, profile_memory, **kwargs):
+            from .tracing import trace_run
+            
+            if not (profile or profile_memory):
+                with trace_run(Path.cwd(), name):
+                    return func(*args, **kwargs)
+            from .profiling import profile_run
+            
+            with profile_run(Path.cwd(), name, mode=profiler, memory=profile_memory) as run, trace_run(Path.cwd(), name):
+                result = func(*args, **kwargs)
+            click.echo(f"\nPROFILE: {name} took {run.elapsed:.1f}s ({profiler})")
+            for path in run.files:
+                click.echo(f"   {path}")
+            return result
+        return wrapper
+    return decorate
+
+
 @cli.command()
 @click.option("--force", is_flag=True, help="Overwrite existing database without confirmation")
+@_instrumented('index')
 def index(force):
     """Index project documents."""
     from pathlib import Path
     from .config_manager import ConfigManager
     from .document_processor import DocumentProcessor
     from .vector_db import VectorDBManager
+    from .tracing import set_attributes
     
     project_root = Path.cwd()
     
@@ -256,6 +286,8 @@ def index(force):
         click.echo("\n📁 Scanning documents...")
         doc_processor = DocumentProcessor(config_dict)
         chunks, stats = doc_processor.process(project_root)
+        set_attributes(files=stats['files_processed'], chunks=stats['chunks_created'],
+                       characters=stats['total_characters'])
         
         if stats['files_found'] == 0:
             click.echo("ERROR: No files found to index")
@@ -298,12 +330,15 @@ def index(force):
 
 @cli.command()
 @click.option("--force", is_flag=True, help="Skip confirmation prompt")
-def reindex(force):
+@click.option("--shard", default=None, help="Rebuild only this shard (vector_store.sharding)")
+@_instrumented('reindex')
+def reindex(force, shard):
     """Rebuild vector database from scratch."""
     from pathlib import Path
     from .config_manager import ConfigManager
     from .document_processor import DocumentProcessor
     from .vector_db import VectorDBManager
+    from .tracing import set_attributes
     
     project_root = Path.cwd()
     
@@ -319,6 +354,10 @@ def reindex(force):
     # Convert config to dictionary for processors
     config_dict = config.to_dict()
     
+    if shard:
+        _reindex_shard(config_dict, project_root, shard)
+        return
+    
     # Display info message
     click.echo("WARNING:  Rebuilding vector database from scratch...")
     click.echo("   All indexed data will be removed and rebuilt")
@@ -336,6 +375,8 @@ def reindex(force):
         click.echo("\n📁 Scanning documents...")
         doc_processor = DocumentProcessor(config_dict)
         chunks, stats = doc_processor.process(project_root)
+        set_attributes(files=stats['files_processed'], chunks=stats['chunks_created'],
+                       characters=stats['total_characters'])
         
         if stats['files_found'] == 0:
             click.echo("ERROR: No files found to index")
@@ -372,6 +413,51 @@ def reindex(force):
         return
 
 
+def _reindex_shard(config_dict, project_root, shard):
+    """Re-embed the files of a single shard, leaving the other shards untouched."""
+    from .document_processor import DocumentProcessor
+    from .vector_db import VectorDBManager
+    from .sharding import assign_shard, shard_name
+    
+    vector_store_config = config_dict.get('vector_store', {})
+    mode = vector_store_config.get('sharding', 'none')
+    if mode == 'none':
+        click.echo("ERROR: Sharding is not enabled")
+        click.echo("   Set vector_store.sharding in config.yaml and run 'docrag reindex'")
+        return
+    
+    directories = config_dict.get('indexing', {}).get('directories', [])
+    scan_config = config_dict
+    if mode == 'directory':
+        # Only scan the shard's own directory
+        matching = [d for d in directories if shard_name(d) == shard]
+        if matching:
+            scan_config = dict(config_dict, indexing=dict(config_dict['indexing'], directories=matching))
+    
+    click.echo(f"WARNING:  Rebuilding shard {shard}...")
+    
+    try:
+        vector_db = VectorDBManager(config_dict, project_root)
+        
+        click.echo("\n📁 Scanning documents...")
+        chunks, _ = DocumentProcessor(scan_config).process(project_root)
+        chunks = [
+            c for c in chunks
+            if assign_shard(c.metadata, project_root, directories, mode, vector_store_config.get('shards', 4)) == shard
+        ]
+        
+        click.echo(f"SUCCESS: Found {len(chunks)} chunks in shard {shard}")
+        vector_db.rebuild_shard(shard, chunks, show_progress=True)
+        
+        click.echo("\nSUCCESS: Shard reindexing complete!")
+        click.echo(f"   Chunks created: {len(chunks)}")
+    
+    except ValueError as e:
+        click.echo(f"\n{e}")
+    except Exception as e:
+        click.echo(f"\nERROR: Error during reindexing: {e}")
+
+
 @cli.command()
 @click.option("--edit", is_flag=True, help="Open configuration in editor")
 def config(edit):
@@ -1874,5 +1960,591 @@ def doctor():
             click.echo("   3. Run: docrag mcp-config")
 
 
+@cli.command("bench-backends")
+@click.option("--chunks", "num_chunks", default=10000, show_default=True, help="Number of synthetic chunks")
+@click.option("--dim", "dimensions", default=384, show_default=True, help="Embedding dimensions")
+@click.option("--queries", "num_queries", default=50, show_default=True, help="Number of timed queries")
+@click.option("--top-k", default=5, show_default=True, help="Results per query")
+@click.option("--dtype", type=click.Choice(['float32', 'float16']), default='float32', show_default=True,
+              help="Flat backend storage dtype")
+@click.option("--backend", "backends", multiple=True, type=click.Choice(['chroma', 'flat', 'ivfpq']),
+              help="Backend to benchmark (repeatable). Default: all")
+@click.option("--nprobe", default=8, show_default=True, help="IVF lists scanned per query (ivfpq)")
+@click.option("--pq-m", default=48, show_default=True, help="PQ subspaces / bytes per vector (ivfpq)")
+@click.option("--nlist", default=0, show_default=True, help="IVF lists, 0 = automatic (ivfpq)")
+def bench_backends(num_chunks, dimensions, num_queries, top_k, dtype, backends, nprobe, pq_m, nlist):
+    """Compare ChromaDB, flat and IVF-PQ vector backends on a synthetic corpus."""
+    from .vector_benchmark import benchmark_backends
+    
+    click.echo(f"BENCH: {num_chunks:,} chunks x {dimensions} dims, {num_queries} queries, top_k={top_k}\n")
+    
+    results = benchmark_backends(
+        num_chunks=num_chunks,
+        dimensions=dimensions,
+        num_queries=num_queries,
+        top_k=top_k,
+        backends=list(backends) or None,
+        dtype=dtype,
+        nprobe=nprobe,
+        pq_m=pq_m,
+        nlist=nlist
+    )
+    
+    click.echo(
+        f"{'Backend':<10}{'Build s':>10}{'Cold ms':>10}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'Recall':>10}{'Size MB':>10}"
+    )
+    for backend, r in results.items():
+        click.echo(
+            f"{backend:<10}{r['build_s']:>10.2f}{r['cold_open_ms']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['recall']:>10.2f}{r['size_mb']:>10.1f}"
+        )
+
+
+@cli.command("bench")
+@click.option("--corpus", "corpus_files", type=int, default=None,
+              help="Benchmark a generated corpus of this many files with fake providers instead of the project")
+@click.option("--fake", is_flag=True, help="Use the offline fake providers for the project too")
+@click.option("--fake-latency", default=0.0, show_default=True, help="Simulated provider latency in seconds (fake providers)")
+@click.option("--tokens-per-second", default=0.0, show_default=True, help="Simulated answer throughput (fake providers)")
+@click.option("--queries", "num_queries", default=50, show_default=True, help="Timed searches")
+@click.option("--answers", "num_answers", default=10, show_default=True, help="Timed answer_question calls (0 to skip)")
+@click.option("--seed", default=0, show_default=True, help="Seed for the corpus and query sample")
+@click.option("--output", type=click.Path(dir_okay=False), default="docrag-bench.json", show_default=True,
+              help="Results JSON file")
+@click.option("--compare", "baseline", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Baseline results JSON to compare against")
+@click.option("--threshold", default=0.2, show_default=True, help="Slowdown flagged as a regression (0.2 = 20%)")
+def bench(corpus_files, fake, fake_latency, tokens_per_second, num_queries, num_answers, seed, output, baseline, threshold):
+    """Time indexing stages and query latency; compare with a baseline."""
+    import sys
+    from pathlib import Path
+    from .bench import run_benchmark, save_results, load_results, compare_results
+    
+    if corpus_files is None:
+        from dotenv import load_dotenv
+        load_dotenv(Path.cwd() / ".env")
+        click.echo(f"BENCH: project {Path.cwd()} ({'fake providers' if fake else 'configured providers'})\n")
+    else:
+        click.echo(f"BENCH: generated corpus of {corpus_files:,} files, fake providers\n")
+    
+    try:
+        results = run_benchmark(
+            project_root=None if corpus_files is not None else Path.cwd(),
+            corpus_files=corpus_files or 0,
+            num_queries=num_queries,
+            num_answers=num_answers,
+            fake=fake,
+            fake_latency=fake_latency,
+            fake_tokens_per_second=tokens_per_second,
+            seed=seed
+        )
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+    
+    counts = results['counts']
+    click.echo(f"Files: {counts['files']:,}  Chunks: {counts['chunks']:,}  Characters: {counts['characters']:,}\n")
+    click.echo(f"{'Stage':<16}{'Seconds':>10}")
+    for stage, seconds in results['stages'].items():
+        click.echo(f"{stage:<16}{seconds:>10.3f}")
+    
+    click.echo(f"\n{'Query':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Count':>8}")
+    for kind, summary in results['queries'].items():
+        if summary:
+            click.echo(
+                f"{kind:<16}{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+                f"{summary['p99_ms']:>10.2f}{summary['count']:>8}"
+            )
+    
+    save_results(results, Path(output))
+    click.echo(f"\nSUCCESS: Results written to {output}")
+    
+    if baseline:
+        rows = compare_results(load_results(Path(baseline)), results, threshold)
+        click.echo(f"\nCompared with {baseline} (threshold {threshold:.0%}):")
+        click.echo(f"{'Metric':<24}{'Baseline':>12}{'Current':>12}{'Change':>10}")
+        for row in rows:
+            flag = "  REGRESSION" if row['regression'] else ""
+            click.echo(
+                f"{row['metric']:<24}{row['baseline_s'] * 1000:>10.1f}ms{row['current_s'] * 1000:>10.1f}ms"
+                f"{row['change']:>+10.0%}{flag}"
+            )
+        regressions = [row['metric'] for row in rows if row['regression']]
+        if regressions:
+            click.echo(f"\nERROR: {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        click.echo("\nSUCCESS: No regressions")
+
+
+@cli.command("eval")
+@click.option("--questions", "questions_file", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="JSONL file of questions with expected sources or chunk_ids")
+@click.option("--variant", "variants", multiple=True,
+              help="Configuration to compare as section.key=value overrides, comma separated (repeatable)")
+@click.option("--k", "k", default=5, show_default=True, help="Results per question (recall@k)")
+@click.option("--fake", is_flag=True, help="Use the offline fake providers (timings only, rankings are random)")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write results as JSON")
+def eval_retrieval(questions_file, variants, k, fake, output):
+    """Compare recall@k, MRR, latency and index size across configurations."""
+    import json
+    import sys
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from .evaluation import load_questions, evaluate_retrieval
+
+    load_dotenv(Path.cwd() / ".env")
+    try:
+        questions = load_questions(Path(questions_file))
+        click.echo(f"EVAL: {len(questions)} questions, {len(variants) + 1} configuration(s), k={k}\n")
+        results = evaluate_retrieval(Path.cwd(), questions, list(variants), k=k, fake=fake)
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+
+    width = max(len(r['variant']) for r in results) + 2
+    click.echo(
+        f"{'Configuration':<{width}}{f'Recall@{k}':>10}{'MRR':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'Size MB':>10}{'Chunks':>8}"
+    )
+    for r in results:
+        click.echo(
+            f"{r['variant']:<{width}}{r['recall_at_k']:>10.3f}{r['mrr']:>8.3f}{r['latency']['p50_ms']:>10.2f}"
+            f"{r['latency']['p95_ms']:>10.2f}{r['index_mb']:>10.2f}{r['chunks']:>8}"
+        )
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2) + "\n", encoding='utf-8')
+        click.echo(f"\nSUCCESS: Results written to {output}")
+
+
+@cli.command("generate-corpus")
+@click.argument("path", type=click.Path(file_okay=False))
+@click.option("--files", "num_files", default=1000, show_default=True, help="Number of files")
+@click.option("--seed", default=0, show_default=True, help="Random seed (same seed, same tree)")
+@click.option("--median-kb", default=4.0, show_default=True, help="Median file size in KB (log-normal)")
+@click.option("--size-sigma", default=1.0, show_default=True, help="Log-normal shape; larger = longer tail")
+@click.option("--mutate", default=None, type=float,
+              help="Instead of generating, edit this share (0-1) of an existing corpus made with the same options")
+@click.option("--mutate-seed", default=1, show_default=True, help="Seed choosing the edited files")
+def generate_corpus(path, num_files, seed, median_kb, size_sigma, mutate, mutate_seed):
+    """Write a synthetic project tree for scale testing."""
+    import time
+    from pathlib import Path
+    from .corpus import CorpusSpec, generate_corpus as write_corpus, mutate_corpus, corpus_indexing
+    
+    spec = CorpusSpec(num_files=num_files, seed=seed, median_bytes=int(median_kb * 1024), size_sigma=size_sigma)
+    root = Path(path)
+    
+    if mutate is not None:
+        edited = mutate_corpus(root, spec, mutate, seed=mutate_seed)
+        click.echo(f"SUCCESS: Edited {len(edited):,} files in {root}")
+        return
+    
+    start = time.perf_counter()
+    stats = write_corpus(root, spec)
+    click.echo(f"SUCCESS: Wrote {stats.files:,} files ({stats.bytes / 1024 / 1024:.1f} MB) "
+               f"to {root} in {time.perf_counter() - start:.1f}s")
+    for kind, count in sorted(stats.by_kind.items()):
+        click.echo(f"   {kind:<14}{count:>10,}")
+    indexing = corpus_indexing()
+    click.echo(f"\n   Files to index: {stats.indexed_files:,}")
+    click.echo(f"   indexing.directories: {indexing['directories']}")
+    click.echo(f"   indexing.extensions: {indexing['extensions']}")
+
+
+@cli.command("loadtest")
+@click.option("--transport", type=click.Choice(['stdio', 'http', 'sse']), default='stdio', show_default=True,
+              help="How to reach the MCP server")
+@click.option("--url", default=None, help="Server URL (http, sse)")
+@click.option("--server-cmd", default=None, help="Server command for stdio. Default: python -m docrag.mcp_server")
+@click.option("--pid", type=int, default=None, help="Server PID to sample memory of (found automatically for stdio)")
+@click.option("--corpus", "corpus_files", type=int, default=None,
+              help="Serve a generated corpus of this many files with fake providers instead of the project")
+@click.option("--fake", is_flag=True, help="Serve a copy of the project's index built with the offline fake providers")
+@click.option("--fake-latency", default=0.0, show_default=True, help="Simulated provider latency in seconds (fake providers)")
+@click.option("--tokens-per-second", default=0.0, show_default=True, help="Simulated answer throughput (fake providers)")
+@click.option("--mix", default="search_docs=70,answer_question=20,list_indexed_docs=8,reindex_docs=2",
+              show_default=True, help="Tool mix as tool=weight pairs")
+@click.option("--concurrency", default=4, show_default=True, help="Maximum calls in flight")
+@click.option("--rate", default=0.0, show_default=True, help="Target calls per second (0 = as fast as possible)")
+@click.option("--duration", default=30.0, show_default=True, help="Seconds to run")
+@click.option("--calls", "max_calls", default=0, show_default=True, help="Stop after this many calls (0 = no limit)")
+@click.option("--questions", "questions_file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="File with one question per line")
+@click.option("--reindex-force", is_flag=True, help="Let reindex_docs calls rebuild the index (default: check only)")
+@click.option("--seed", default=0, show_default=True, help="Seed for the call sequence")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the report as JSON")
+def loadtest(transport, url, server_cmd, pid, corpus_files, fake, fake_latency, tokens_per_second, mix,
+             concurrency, rate, duration, max_calls, questions_file, reindex_force, seed, output):
+    """Load-test the MCP server with a concurrent mix of tool calls."""
+    import asyncio
+    import json
+    import os
+    import shlex
+    import shutil
+    import sys
+    import tempfile
+    from pathlib import Path
+    from .loadgen import DEFAULT_QUESTIONS, load_test, parse_mix, prepare_indexed_workspace
+    
+    try:
+        tool_mix = parse_mix(mix)
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+    if transport != 'stdio' and not url:
+        click.echo("ERROR: --url is required for the http and sse transports")
+        sys.exit(1)
+    
+    questions = None
+    if questions_file:
+        questions = [line.strip() for line in Path(questions_file).read_text(encoding='utf-8').splitlines() if line.strip()]
+    
+    work_dir = None
+    cwd = Path.cwd()
+    try:
+        if transport == 'stdio' and (corpus_files is not None or fake):
+            work_dir = Path(tempfile.mkdtemp(prefix="docrag-load-"))
+            click.echo("📊 Building a throwaway index with fake providers...")
+            cwd, sampled = prepare_indexed_workspace(
+                work_dir,
+                project_root=None if corpus_files is not None else Path.cwd(),
+                corpus_files=corpus_files or 0,
+                fake_latency=fake_latency,
+                fake_tokens_per_second=tokens_per_second,
+                seed=seed
+            )
+            questions = questions or sampled
+        
+        click.echo(
+            f"LOAD: {transport} server, mix {mix}, concurrency {concurrency}, "
+            f"{f'{rate:g} calls/s' if rate else 'closed loop'}, {duration:g}s\n"
+        )
+        with open(os.devnull, 'w') as errlog:
+            report = asyncio.run(load_test(
+                transport=transport,
+                command=shlex.split(server_cmd) if server_cmd else None,
+                url=url,
+                cwd=cwd,
+                server_pid=pid,
+                errlog=errlog,
+                mix=tool_mix,
+                questions=questions or DEFAULT_QUESTIONS,
+                concurrency=concurrency,
+                rate=rate,
+                duration=duration,
+                max_calls=max_calls,
+                seed=seed,
+                reindex_force=reindex_force
+            ))
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    click.echo(
+        f"Calls: {report['calls']:,} in {report['elapsed_s']:.1f}s "
+        f"({report['throughput']:.1f}/s), errors: {report['errors']}\n"
+    )
+    click.echo(f"{'Tool':<20}{'Calls':>8}{'Err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max/s':>8}")
+    for tool, stats in report['tools'].items():
+        if not stats['calls']:
+            continue
+        click.echo(
+            f"{tool:<20}{stats['calls']:>8}{stats['error_rate'] * 100:>8.1f}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['throughput']:>8.1f}"
+        )
+    rss = report['rss']
+    if rss['peak_mb'] is not None:
+        click.echo(f"\nServer RSS: {rss['start_mb']:.0f} MB start, {rss['peak_mb']:.0f} MB peak, {rss['end_mb']:.0f} MB end")
+    for sample in report['error_samples']:
+        click.echo(f"WARNING:  {sample}")
+    
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2) + "\n", encoding='utf-8')
+        click.echo(f"\nSUCCESS: Report written to {output}")
+
+
+@cli.command("replay")
+@click.argument("log_file", required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option("--speed", default=1.0, show_default=True,
+              help="Pacing: 1 = original gaps between calls, 10 = ten times faster, 0 = one after another")
+@click.option("--tool", "tools", multiple=True, help="Only replay this tool (repeatable)")
+@click.option("--limit", type=int, default=None, help="Replay at most this many calls")
+@click.option("--include-reindex", is_flag=True, help="Replay reindex_docs calls as logged (default: check only)")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write per-call results as JSON")
+def replay(log_file, speed, tools, limit, include_reindex, output):
+    """Re-run a captured query log against the current index and diff latency."""
+    import json
+    import sys
+    from pathlib import Path
+    from .query_log import replay_log, latency_diff
+
+    click.echo(f"REPLAY: {log_file or '.docrag/query_log.jsonl'} at {'back-to-back' if speed <= 0 else f'{speed:g}x'} pacing\n")
+    try:
+        results = replay_log(
+            Path.cwd(),
+            Path(log_file) if log_file else None,
+            speed=speed,
+            include_reindex=include_reindex,
+            tools=list(tools) or None,
+            limit=limit
+        )
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+
+    if not results:
+        click.echo("WARNING:  No calls to replay")
+        return
+
+    rows = latency_diff(results)
+    click.echo(
+        f"{'Tool':<20}{'Calls':>7}{'Errors':>8}{'Was p50':>10}{'Now p50':>10}"
+        f"{'Was p95':>10}{'Now p95':>10}{'Change':>9}"
+    )
+    for row in rows:
+        click.echo(
+            f"{row['tool']:<20}{row['calls']:>7}{row['errors']:>8}{row['original_p50_ms']:>8.1f}ms"
+            f"{row['replay_p50_ms']:>8.1f}ms{row['original_p95_ms']:>8.1f}ms{row['replay_p95_ms']:>8.1f}ms"
+            f"{row['change']:>+9.0%}"
+        )
+    click.echo("\nMean phase time per call (was -> now):")
+    for row in rows:
+        phases = ", ".join(
+            f"{name} {times['original_ms']:.1f} -> {times['replay_ms']:.1f} ms"
+            for name, times in row['phases'].items()
+        )
+        click.echo(f"   {row['tool']}: {phases or 'no timed phases'}")
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2) + "\n", encoding='utf-8')
+        click.echo(f"\nSUCCESS: Results written to {output}")
+
+
+@cli.command("traces")
+@click.argument("trace_file", required=False, type=click.Path(exists=True))
+@click.option("--slow-ms", default=2000.0, show_default=True, help="List tool calls at least this slow")
+@click.option("--limit", default=10, show_default=True, help="Slow calls listed, slowest first")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the summary as JSON")
+def traces(trace_file, slow_ms, limit, output):
+    """Summarize recorded spans and match slow tool calls with index runs."""
+    import json
+    import sys
+    from pathlib import Path
+    from .tracing import read_traces, summarize_traces, format_trace_summary
+
+    path = Path(trace_file) if trace_file else Path.cwd() / ".docrag"
+    try:
+        spans = read_traces(path)
+    except ValueError as e:
+        click.echo(f"{e}")
+        sys.exit(1)
+
+    summary = summarize_traces(spans, slow_ms=slow_ms, limit=limit)
+    click.echo(format_trace_summary(summary, slow_ms))
+
+    if output:
+        Path(output).write_text(json.dumps(summary, indent=2) + "\n", encoding='utf-8')
+        click.echo(f"\nSUCCESS: Summary written to {output}")
+
+
+@cli.command("quantization-report")
+@click.option("--queries", "num_queries", default=200, show_default=True, help="Number of sampled queries")
+@click.option("--top-k", default=5, show_default=True, help="Results per query")
+@click.option("--rescore", "rescore_factors", multiple=True, type=int,
+              help="Rescoring multiplier to evaluate (repeatable). Default: 1, 4, 10")
+def quantization_report(num_queries, top_k, rescore_factors):
+    """Report recall of int8/binary quantized search against float32 on this project's index."""
+    from pathlib import Path
+    from .config_manager import ConfigManager
+    from .vector_db import VectorDBManager
+    from .quantization import recall_report
+    
+    project_root = Path.cwd()
+    config = ConfigManager(project_root).load_config()
+    
+    if config is None:
+        click.echo("ERROR: Error: Configuration not found")
+        click.echo("   Run 'docrag init' to initialize DocRAG first")
+        return
+    
+    try:
+        vector_db = VectorDBManager(config.to_dict(), project_root)
+        embeddings = vector_db.get_stored_embeddings()
+    except ValueError as e:
+        click.echo(f"\n{e}")
+        return
+    
+    click.echo(
+        f"REPORT: {len(embeddings):,} chunks x {embeddings.shape[1]} dims, "
+        f"{min(num_queries, len(embeddings))} queries, recall@{top_k} vs float32\n"
+    )
+    
+    rows = recall_report(
+        embeddings,
+        num_queries=num_queries,
+        k=top_k,
+        rescore_factors=list(rescore_factors) or None
+    )
+    
+    click.echo(f"{'Precision':<10}{'Rescore':>8}{'Recall':>8}{'B/vec':>8}{'Mem MB':>9}{'ms/q':>8}")
+    for row in rows:
+        rescore = f"{row['rescore_factor']}x" if row['rescore_factor'] else "-"
+        click.echo(
+            f"{row['kind']:<10}{rescore:>8}{row['recall']:>8.3f}{row['bytes_per_vector']:>8}"
+            f"{row['memory_mb']:>9.1f}{row['ms_per_query']:>8.2f}"
+        )
+    
+    click.echo("\nTIP: Set vector_store.backend: flat and vector_store.quantization in config.yaml,")
+    click.echo("   with vector_store.rerank_factor as the rescoring multiplier, then run 'docrag reindex'.")
+
+
+@cli.command("tune-hnsw")
+@click.option("--queries", "num_queries", default=100, show_default=True, help="Number of held-out queries")
+@click.option("--top-k", default=5, show_default=True, help="Results per query")
+@click.option("--m", "m_values", multiple=True, type=int, help="HNSW M to try (repeatable). Default: 8, 16, 32")
+@click.option("--construction-ef", "construction_ef_values", multiple=True, type=int,
+              help="construction_ef to try (repeatable). Default: 100, 200")
+@click.option("--search-ef", "search_ef_values", multiple=True, type=int,
+              help="search_ef to try (repeatable). Default: 10, 50, 100, 200")
+@click.option("--target-recall", default=0.95, show_default=True, help="Recall the recommendation must reach")
+def tune_hnsw(num_queries, top_k, m_values, construction_ef_values, search_ef_values, target_recall):
+    """Sweep ChromaDB HNSW parameters on this project's embeddings (recall vs latency)."""
+    from pathlib import Path
+    from .config_manager import ConfigManager
+    from .vector_db import VectorDBManager
+    from .vector_benchmark import hnsw_sweep
+    
+    project_root = Path.cwd()
+    config = ConfigManager(project_root).load_config()
+    
+    if config is None:
+        click.echo("ERROR: Error: Configuration not found")
+        click.echo("   Run 'docrag init' to initialize DocRAG first")
+        return
+    
+    try:
+        vector_db = VectorDBManager(config.to_dict(), project_root)
+        embeddings = vector_db.get_stored_embeddings()
+    except ValueError as e:
+        click.echo(f"\n{e}")
+        return
+    
+    if len(embeddings) < 2:
+        click.echo("ERROR: At least 2 indexed chunks are needed for a sweep")
+        return
+    
+    click.echo(
+        f"BENCH: {len(embeddings):,} chunks x {embeddings.shape[1]} dims, "
+        f"{min(num_queries, len(embeddings) // 2)} held-out queries, recall@{top_k} vs exact search\n"
+    )
+    
+    rows = hnsw_sweep(
+        embeddings,
+        num_queries=num_queries,
+        top_k=top_k,
+        m_values=list(m_values) or None,
+        construction_ef_values=list(construction_ef_values) or None,
+        search_ef_values=list(search_ef_values) or None
+    )
+    
+    click.echo(f"{'M':>4}{'constr_ef':>11}{'search_ef':>11}{'Build s':>9}{'Recall':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        click.echo(
+            f"{row['m']:>4}{row['construction_ef']:>11}{row['search_ef']:>11}{row['build_s']:>9.2f}"
+            f"{row['recall']:>8.3f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+    
+    candidates = [row for row in rows if row['recall'] >= target_recall]
+    if not candidates:
+        click.echo(f"\nWARNING: No setting reached recall {target_recall}; try larger --search-ef values")
+        return
+    
+    best = min(candidates, key=lambda row: (row['p50_ms'], row['build_s']))
+    click.echo(f"\nTIP: Fastest setting with recall >= {target_recall}:")
+    click.echo("   retrieval:")
+    click.echo(f"     hnsw_m: {best['m']}")
+    click.echo(f"     hnsw_construction_ef: {best['construction_ef']}")
+    click.echo(f"     hnsw_search_ef: {best['search_ef']}")
+    click.echo("   hnsw_m and hnsw_construction_ef take effect after 'docrag reindex'.")
+
+
+@cli.command("truncate-embeddings")
+@click.argument("dimensions", type=int)
+def truncate_embeddings(dimensions):
+    """Shrink stored embeddings to DIMENSIONS without re-embedding (flat backend).
+
+    Keeps the leading dimensions of each vector and re-normalizes them, which
+    suits Matryoshka-trained models such as OpenAI text-embedding-3. Sets
+    llm.embedding_dimensions so queries are embedded to match.
+    """
+    from pathlib import Path
+    from .config_manager import ConfigManager
+    from .vector_db import VectorDBManager
+    
+    project_root = Path.cwd()
+    config_manager = ConfigManager(project_root)
+    config = config_manager.load_config()
+    
+    if config is None:
+        click.echo("ERROR: Error: Configuration not found")
+        click.echo("   Run 'docrag init' to initialize DocRAG first")
+        return
+    
+    if config.vector_store.backend != 'flat':
+        click.echo("ERROR: Truncation of stored vectors requires vector_store.backend: flat")
+        click.echo("   Set llm.embedding_dimensions in config.yaml and run 'docrag reindex' instead.")
+        return
+    
+    config.llm.embedding_dimensions = dimensions
+    try:
+        vector_db = VectorDBManager(config.to_dict(), project_root)
+        before = vector_db.get_stored_dimensions()
+        if before is None:
+            raise ValueError("ERROR: Vector database not found.\n   Run 'docrag index' to create the database first.")
+        vector_db.truncate_stored_embeddings(dimensions)
+    except ValueError as e:
+        click.echo(f"\n{e}")
+        return
+    
+    config_manager.save_config(config)
+    click.echo(f"SUCCESS: Embeddings truncated from {before} to {dimensions} dimensions")
+    click.echo("   llm.embedding_dimensions updated in config.yaml")
+
+
+@cli.command("fake-openai")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind")
+@click.option("--port", default=8089, show_default=True, help="Port to listen on")
+@click.option("--dim", "dimensions", default=1536, show_default=True, help="Embedding dimensions")
+@click.option("--latency", default=0.0, show_default=True,
+              help="Seconds per embeddings request and before the first chat token")
+@click.option("--tokens-per-second", default=0.0, show_default=True, help="Chat throughput, 0 = instant")
+def fake_openai(host, port, dimensions, latency, tokens_per_second):
+    """Serve a local stub of the OpenAI embeddings and chat API for offline benchmarks."""
+    from .fake_providers import FakeOpenAIServer
+    
+    server = FakeOpenAIServer(
+        host=host,
+        port=port,
+        dimensions=dimensions,
+        latency=latency,
+        tokens_per_second=tokens_per_second
+    )
+    click.echo(f"SUCCESS: Fake OpenAI API listening on {server.url}")
+    click.echo(f"TIP: Set llm.base_url: {server.url} in .docrag/config.yaml (any OPENAI_API_KEY works)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        counts = ", ".join(f"{name}: {count}" for name, count in sorted(server.request_counts.items()))
+        click.echo(f"\nServed {counts or 'no requests'}")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,186 @@
+"""Query-aware context compression for DocRAG Kit.
+
+Retrieved chunks often hold only a sentence or two that matter for the
+question. Before the answer prompt is built, every sentence of the
+retrieved chunks is scored against the question and the lowest-scoring
+sentences are dropped until the context is down to the target share of
+its tokens.
+
+Scoring is local, CPU-only and deterministic:
+
+- lexical overlap: IDF-weighted query terms found in the sentence (IDF over
+  the retrieved sentences, so words shared by every sentence count little)
+- character trigrams: cosine similarity of hashed trigram vectors, which
+  matches inflected forms ("configure" / "configuration") the lexical
+  tokens miss
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Callable, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .lexical_index import tokenize
+
+
+# Hashed trigram vector size
+TRIGRAM_BUCKETS = 1024
+
+# Weight of the lexical score against the trigram score
+LEXICAL_WEIGHT = 0.7
+
+# Sentence ends (Latin and Cyrillic prose) or line breaks (lists, code)
+_SENTENCE_RE = re.compile(r'[^\n]*?(?:[.!?]+(?=\s)|\n|$)')
+
+ELISION = " ... "
+
+
+@dataclass
+class CompressionStats:
+    """Token counts of one compression call."""
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into sentences and lines.
+
+    Args:
+        text: Chunk text.
+
+    Returns:
+        (start, end) offsets of the non-empty, stripped sentences, in order.
+    """
+    spans = []
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group(0)
+        stripped = sentence.strip()
+        if stripped:
+            start = match.start() + len(sentence) - len(sentence.lstrip())
+            spans.append((start, start + len(stripped)))
+    return spans
+
+
+def _trigram_vector(text: str) -> np.ndarray:
+    vector = np.zeros(TRIGRAM_BUCKETS, dtype=np.float32)
+    text = f" {' '.join(text.lower().split())} "
+    for i in range(len(text) - 2):
+        vector[zlib.crc32(text[i:i + 3].encode('utf-8')) % TRIGRAM_BUCKETS] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def score_sentences(sentences: List[str], question: str) -> np.ndarray:
+    """
+    Score sentences by relevance to a question.
+
+    Args:
+        sentences: Candidate sentences.
+        question: User question.
+
+    Returns:
+        Scores in [0, 1], one per sentence (higher is more relevant).
+    """
+    if not sentences:
+        return np.empty(0, dtype=np.float32)
+
+    query_terms = set(tokenize(question))
+    sentence_terms = [set(tokenize(s)) for s in sentences]
+    document_frequency = Counter(term for terms in sentence_terms for term in terms & query_terms)
+    idf = {
+        term: math.log(1.0 + (len(sentences) + 1) / (document_frequency.get(term, 0) + 1))
+        for term in query_terms
+    }
+    total_idf = sum(idf.values()) or 1.0
+    lexical = np.array([sum(idf[t] for t in terms & query_terms) / total_idf for terms in sentence_terms])
+
+    query_vector = _trigram_vector(question)
+    trigram = np.stack([_trigram_vector(s) for s in sentences]) @ query_vector
+
+    scores: np.ndarray = (LEXICAL_WEIGHT * lexical + (1.0 - LEXICAL_WEIGHT) * trigram).astype(np.float32)
+    return scores
+
+
+def compress_documents(
+    documents: List[Document],
+    question: str,
+    ratio: float,
+    count_tokens: Callable[[str], int]
+) -> Tuple[List[Document], CompressionStats]:
+    """
+    Drop the sentences least related to the question.
+
+    Sentences are kept best first until ``ratio`` of the original tokens is
+    reached; kept sentences stay in their original order and gaps are
+    marked with an ellipsis. Chunks left without a sentence are dropped.
+    Ties are broken by position, so the result is deterministic. Merge
+    overlapping chunks first (``merge_chunks``): compressed chunks lose
+    their ``start_index``.
+
+    Args:
+        documents: Retrieved chunks, best first.
+        question: User question.
+        ratio: Share of tokens to keep (0-1]; 1.0 disables compression.
+        count_tokens: Token counting function.
+
+    Returns:
+        Tuple of (compressed chunks in input order, token counts).
+    """
+    tokens_before = sum(count_tokens(doc.page_content) for doc in documents)
+    if ratio >= 1.0 or not documents:
+        return documents, CompressionStats(tokens_before, tokens_before)
+
+    # (document index, start, end) for every sentence
+    spans = [
+        (d, start, end)
+        for d, doc in enumerate(documents)
+        for start, end in split_sentences(doc.page_content)
+    ]
+    texts = [documents[d].page_content[start:end] for d, start, end in spans]
+    scores = score_sentences(texts, question)
+    costs = [count_tokens(text) for text in texts]
+
+    target = ratio * tokens_before
+    kept: Set[int] = set()
+    used = 0
+    for index in np.argsort(-scores, kind='stable'):
+        if kept and used + costs[index] > target:
+            continue
+        kept.add(int(index))
+        used += costs[index]
+
+    compressed = []
+    for d, doc in enumerate(documents):
+        content = doc.page_content
+        parts = []
+        previous_end = None
+        skipped = False
+        for index, (doc_index, start, end) in enumerate(spans):
+            if doc_index != d:
+                continue
+            if index not in kept:
+                skipped = True
+                continue
+            if previous_end is not None:
+                # Keep the original whitespace between neighbours, mark gaps
+                parts.append(ELISION if skipped else content[previous_end:start])
+            parts.append(content[start:end])
+            previous_end = end
+            skipped = False
+        if parts:
+            # Offsets no longer match the source text
+            metadata = {k: v for k, v in doc.metadata.items() if k != 'start_index'}
+            compressed.append(Document(page_content="".join(parts), metadata=metadata, id=doc.id))
+
+    tokens_after = sum(count_tokens(doc.page_content) for doc in compressed)
+    return compressed, CompressionStats(tokens_before, tokens_after)
@@ -17,10 +17,15 @@ class ProjectConfig:
 @dataclass
 class LLMConfig:
     """LLM provider configuration."""
-    provider: str  # openai, gemini
+    provider: str  # openai, gemini, fake
     embedding_model: str
     llm_model: str
     temperature: float = 0.3
+    embedding_dimensions: Optional[int] = None  # Matryoshka truncation, None = model default
+    embedding_provider: Optional[str] = None  # openai, gemini, local, fake; None = same as provider
+    base_url: Optional[str] = None  # OpenAI-compatible API endpoint, None = api.openai.com
+    fake_latency: float = 0.0  # provider fake: seconds per embeddings request / before the first answer token
+    fake_tokens_per_second: float = 0.0  # provider fake: answer throughput, 0 = instant
 
 
 @dataclass
@@ -42,6 +47,57 @@ class ChunkingConfig:
 class RetrievalConfig:
     """Retrieval configuration."""
     top_k: int = 3  # Reduced from 5 for faster response
+    search_mode: str = 'hybrid'  # hybrid, vector, lexical
+    rrf_k: int = 60  # Reciprocal rank fusion damping constant
+    hnsw_m: Optional[int] = None  # HNSW graph degree (ChromaDB, applied on reindex)
+    hnsw_construction_ef: Optional[int] = None  # HNSW build candidate list (ChromaDB, applied on reindex)
+    hnsw_search_ef: Optional[int] = None  # HNSW query candidate list (ChromaDB)
+    search_type: str = 'similarity'  # similarity, mmr (diversify overlapping chunks)
+    lambda_mult: float = 0.5  # MMR: 1.0 = relevance only, 0.0 = diversity only
+    fetch_k: int = 0  # MMR candidates re-ranked, 0 = 4 * k
+    max_prompt_tokens: int = 4000  # answer_question prompt budget (template + question + context)
+    compression_ratio: float = 1.0  # answer_question: share of context tokens kept by sentence compression, 1.0 = off
+    adaptive_k: bool = False  # answer_question: cut candidates by score instead of fixed top_k
+    min_k: int = 1  # Adaptive k lower bound
+    max_k: int = 8  # Adaptive k upper bound (candidates fetched)
+    score_gap: float = 0.1  # Adaptive k: cut at the first relevance drop this large
+    relevance_mass: float = 0.8  # Adaptive k: keep chunks holding this share of relevance above the tail
+
+
+@dataclass
+class VectorStoreConfig:
+    """Vector store backend configuration."""
+    backend: str = 'chroma'  # chroma, flat
+    dtype: str = 'float32'  # float32, float16 (flat backend only)
+    ann: str = 'none'  # none, ivfpq (flat backend only)
+    quantization: str = 'none'  # none, int8, binary (flat backend only)
+    nlist: int = 0  # IVF lists, 0 = automatic (~4 * sqrt(chunks))
+    pq_m: int = 48  # PQ subspaces = bytes per vector
+    nprobe: int = 8  # IVF lists scanned per query
+    rerank_factor: int = 10  # Shortlist rescored exactly = k * rerank_factor (ivfpq, quantization)
+    sharding: str = 'none'  # none, directory (one shard per indexing directory), hash
+    shards: int = 4  # Hash buckets (sharding: hash)
+
+
+@dataclass
+class ServerConfig:
+    """MCP server runtime configuration."""
+    query_log: bool = False  # Append every tool call to .docrag/query_log.jsonl
+    query_log_max_mb: float = 10.0  # Rotate the query log at this size
+    query_log_backups: int = 3  # Rotated query logs kept (query_log.jsonl.1, ...), at least 1
+    slow_call_ms: float = 2000.0  # Tool calls at least this slow are flagged
+    metrics_textfile: Optional[str] = None  # Prometheus textfile (node-exporter), relative to the project root
+    metrics_interval_s: float = 15.0  # Minimum seconds between metrics_textfile writes
+
+
+@dataclass
+class TracingConfig:
+    """Span tracing of index runs and MCP tool calls."""
+    enabled: bool = False  # Record spans to .docrag/traces-<pid>.jsonl (or otlp_endpoint)
+    max_mb: float = 10.0  # Rotate each process's trace file at this size
+    backups: int = 3  # Rotated trace files kept per process (traces-<pid>.jsonl.1, ...), at least 1
+    otlp_endpoint: Optional[str] = None  # OTLP/HTTP collector, e.g. http://localhost:4318 (instead of the file)
+    service_name: str = "docrag"  # service.name of exported spans
 
 
 @dataclass
@@ -59,6 +115,9 @@ class DocRAGConfig:
     chunking: ChunkingConfig
     retrieval: RetrievalConfig
     prompt: PromptConfig
+    vector_store: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
+    tracing: TracingConfig = field(default_factory=TracingConfig)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary."""
@@ -68,7 +127,10 @@ class DocRAGConfig:
             'indexing': asdict(self.indexing),
             'chunking': asdict(self.chunking),
             'retrieval': asdict(self.retrieval),
-            'prompt': asdict(self.prompt)
+            'prompt': asdict(self.prompt),
+            'vector_store': asdict(self.vector_store),
+            'server': asdict(self.server),
+            'tracing': asdict(self.tracing)
         }
 
     @classmethod
@@ -80,7 +142,10 @@ class DocRAGConfig:
             indexing=IndexingConfig(**data['indexing']),
             chunking=ChunkingConfig(**data['chunking']),
             retrieval=RetrievalConfig(**data['retrieval']),
-            prompt=PromptConfig(**data['prompt'])
+            prompt=PromptConfig(**data['prompt']),
+            vector_store=VectorStoreConfig(**data.get('vector_store', {})),
+            server=ServerConfig(**data.get('server', {})),
+            tracing=TracingConfig(**data.get('tracing', {}))
         )
     
     @classmethod
@@ -230,10 +295,87 @@ class ConfigManager:
         if config.retrieval.top_k < 1:
             errors.append("top_k must be at least 1")
         
+        # Validate search mode
+        valid_search_modes = ['hybrid', 'vector', 'lexical']
+        if config.retrieval.search_mode not in valid_search_modes:
+            errors.append(f"search_mode must be one of: {', '.join(valid_search_modes)}")
+        if config.retrieval.rrf_k < 1:
+            errors.append("rrf_k must be at least 1")
+        for name in ['hnsw_m', 'hnsw_construction_ef', 'hnsw_search_ef']:
+            value = getattr(config.retrieval, name)
+            if value is not None and value < 1:
+                errors.append(f"{name} must be at least 1")
+        if config.retrieval.search_type not in ['similarity', 'mmr']:
+            errors.append("search_type must be one of: similarity, mmr")
+        if not 0 <= config.retrieval.lambda_mult <= 1:
+            errors.append("lambda_mult must be between 0 and 1")
+        if config.retrieval.fetch_k < 0:
+            errors.append("fetch_k must not be negative")
+        if config.retrieval.max_prompt_tokens < 1:
+            errors.append("max_prompt_tokens must be at least 1")
+        if not 0 < config.retrieval.compression_ratio <= 1:
+            errors.append("compression_ratio must be between 0 and 1")
+        if config.retrieval.min_k < 1:
+            errors.append("min_k must be at least 1")
+        if config.retrieval.max_k < config.retrieval.min_k:
+            errors.append("max_k must be at least min_k")
+        if config.retrieval.score_gap <= 0:
+            errors.append("score_gap must be positive")
+        if not 0 < config.retrieval.relevance_mass <= 1:
+            errors.append("relevance_mass must be between 0 and 1")
+        
+        # Validate vector store backend
+        valid_backends = ['chroma', 'flat']
+        if config.vector_store.backend not in valid_backends:
+            errors.append(f"vector_store.backend must be one of: {', '.join(valid_backends)}")
+        valid_dtypes = ['float32', 'float16']
+        if config.vector_store.dtype not in valid_dtypes:
+            errors.append(f"vector_store.dtype must be one of: {', '.join(valid_dtypes)}")
+        if config.vector_store.ann not in ['none', 'ivfpq']:
+            errors.append("vector_store.ann must be one of: none, ivfpq")
+        if config.vector_store.quantization not in ['none', 'int8', 'binary']:
+            errors.append("vector_store.quantization must be one of: none, int8, binary")
+        elif config.vector_store.quantization != 'none' and config.vector_store.ann != 'none':
+            errors.append("vector_store.quantization cannot be combined with vector_store.ann")
+        if config.vector_store.nlist < 0:
+            errors.append("vector_store.nlist must not be negative")
+        if config.vector_store.sharding not in ['none', 'directory', 'hash']:
+            errors.append("vector_store.sharding must be one of: none, directory, hash")
+        for name in ['pq_m', 'nprobe', 'rerank_factor', 'shards']:
+            if getattr(config.vector_store, name) < 1:
+                errors.append(f"vector_store.{name} must be at least 1")
+        
+        # Validate server settings
+        if config.server.query_log_max_mb <= 0:
+            errors.append("server.query_log_max_mb must be positive")
+        if config.server.query_log_backups < 1:
+            errors.append("server.query_log_backups must be at least 1")
+        if config.server.slow_call_ms < 0:
+            errors.append("server.slow_call_ms must not be negative")
+        if config.server.metrics_interval_s < 0:
+            errors.append("server.metrics_interval_s must not be negative")
+        
+        # Validate tracing settings
+        if config.tracing.max_mb <= 0:
+            errors.append("tracing.max_mb must be positive")
+        if config.tracing.backups < 1:
+            errors.append("tracing.backups must be at least 1")
+        endpoint = config.tracing.otlp_endpoint
+        if endpoint and not endpoint.startswith(('http://', 'https://')):
+            errors.append(f"tracing.otlp_endpoint must be an http:// or https:// URL, got {endpoint}")
+        
         # Validate provider
-        valid_providers = ['openai', 'gemini']
+        valid_providers = ['openai', 'gemini', 'fake']
         if config.llm.provider not in valid_providers:
             errors.append(f"provider must be one of: {', '.join(valid_providers)}")
+        if config.llm.embedding_provider is not None and config.llm.embedding_provider not in valid_providers + ['local']:
+            errors.append("embedding_provider must be one of: openai, gemini, local, fake")
+        if config.llm.fake_latency < 0:
+            errors.append("fake_latency must be non-negative")
+        if config.llm.fake_tokens_per_second < 0:
+            errors.append("fake_tokens_per_second must be non-negative")
+        if config.llm.embedding_dimensions is not None and config.llm.embedding_dimensions < 1:
+            errors.append("llm.embedding_dimensions must be at least 1")
         
         # Validate required fields are present
         if not config.project.name:
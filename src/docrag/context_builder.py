@@ -0,0 +1,201 @@
+"""Token-budgeted context packing for DocRAG Kit.
+
+Retrieved chunks are packed into the answer prompt under a token budget:
+the prompt template and question are measured first, chunks from the same
+file that overlap or touch (``chunk_overlap`` makes neighbours share text)
+are merged into one passage without the repeated text, and passages are
+added best first until the budget is used up.
+
+Tokens are counted with ``tiktoken``. If the encoding cannot be loaded
+(e.g. offline without a cached BPE file), a 4-characters-per-token
+estimate is used instead.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Callable, Tuple
+
+from langchain_core.documents import Document
+
+
+# Characters per token for the fallback estimate
+CHARS_PER_TOKEN = 4
+
+# Chunks this close together in the source are merged as adjacent
+# (splitters strip the whitespace that separated them)
+ADJACENT_GAP = 2
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=8)
+def get_token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    """
+    Get a token counting function for a model.
+
+    Args:
+        model: LLM model name. Models tiktoken does not know (e.g. Gemini)
+            are counted with the cl100k_base encoding as an approximation.
+
+    Returns:
+        Function returning the token count of a string.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        return lambda text: (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _span(doc: Document) -> Optional[Tuple[str, int, int]]:
+    start = doc.metadata.get('start_index')
+    source = doc.metadata.get('source')
+    if source is None or start is None or start < 0:
+        return None
+    return source, start, start + len(doc.page_content)
+
+
+@dataclass
+class _Passage:
+    """A run of text from one file, built from one or more chunks."""
+    priority: int
+    source: Optional[str]
+    start: int
+    end: int
+    text: str
+    metadata: Dict[str, Any]
+
+
+def merge_chunks(documents: List[Document]) -> List[Document]:
+    """
+    Merge overlapping or adjacent chunks of the same file.
+
+    Args:
+        documents: Chunks in priority order (best first).
+
+    Returns:
+        Passages in priority order; each merged passage takes the position
+        of its best chunk and the metadata of its first chunk in the file.
+    """
+    passages: List[_Passage] = []
+    for priority, doc in enumerate(documents):
+        span = _span(doc)
+        if span is None:
+            passages.append(_Passage(priority, None, 0, 0, doc.page_content, doc.metadata))
+        else:
+            passages.append(_Passage(priority, span[0], span[1], span[2], doc.page_content, doc.metadata))
+
+    passages.sort(key=lambda p: (p.source is None, p.source or '', p.start))
+    merged: List[_Passage] = []
+    for passage in passages:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None and passage.source is not None and previous.source == passage.source
+            and passage.start <= previous.end + ADJACENT_GAP
+        ):
+            if passage.end <= previous.end:
+                # Fully contained in the passage so far
+                previous.priority = min(previous.priority, passage.priority)
+                continue
+            overlap = previous.end - passage.start
+            if overlap > 0 and previous.text[-overlap:] == passage.text[:overlap]:
+                previous.text += passage.text[overlap:]
+            elif overlap <= 0:
+                previous.text += "\n" + passage.text
+            else:
+                # Offsets disagree with the text; keep both as they are
+                merged.append(passage)
+                continue
+            previous.priority = min(previous.priority, passage.priority)
+            previous.end = max(previous.end, passage.end)
+            continue
+        merged.append(passage)
+
+    merged.sort(key=lambda p: p.priority)
+    return [Document(page_content=p.text, metadata=dict(p.metadata)) for p in merged]
+
+
+class ContextPacker:
+    """Packs retrieved chunks into a prompt under a token budget."""
+
+    def __init__(
+        self,
+        template: str,
+        max_prompt_tokens: int = 4000,
+        model: Optional[str] = None,
+        separator: str = "\n\n"
+    ):
+        """
+        Initialize context packer.
+
+        Args:
+            template: Prompt template with ``{context}`` and ``{question}``.
+            max_prompt_tokens: Token budget for the whole prompt.
+            model: LLM model name used to choose the tokenizer.
+            separator: Text placed between passages.
+        """
+        self.template = template
+        self.max_prompt_tokens = max_prompt_tokens
+        self.separator = separator
+        self.count_tokens = get_token_counter(model)
+        self._template_tokens = self.count_tokens(
+            template.replace('{context}', '').replace('{question}', '')
+        )
+        self._separator_tokens = self.count_tokens(separator)
+
+    def context_budget(self, question: str) -> int:
+        """
+        Tokens left for context once the template and question are counted.
+
+        Args:
+            question: User question.
+
+        Returns:
+            Context token budget (never negative).
+        """
+        return max(0, self.max_prompt_tokens - self._template_tokens - self.count_tokens(question))
+
+    def pack(self, documents: List[Document], question: str) -> str:
+        """
+        Build the context string for a question.
+
+        Args:
+            documents: Retrieved chunks, best first.
+            question: User question.
+
+        Returns:
+            Merged passages, best first, within the budget. Passages that do
+            not fit are skipped in favour of smaller lower-ranked ones; if
+            not even the best passage fits, it is cut to the budget.
+        """
+        budget = self.context_budget(question)
+        parts: List[str] = []
+        used = 0
+        passages = merge_chunks(documents)
+
+        for passage in passages:
+            cost = self.count_tokens(passage.page_content) + (self._separator_tokens if parts else 0)
+            if used + cost <= budget:
+                parts.append(passage.page_content)
+                used += cost
+
+        if not parts and passages and budget > 0:
+            parts.append(self._truncate(passages[0].page_content, budget))
+
+        return self.separator.join(parts)
+
+    def _truncate(self, text: str, budget: int) -> str:
+        # Binary search on characters keeps this tokenizer-agnostic
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
@@ -0,0 +1,351 @@
+"""Synthetic project trees for DocRAG Kit scale testing.
+
+``generate_corpus`` writes a seeded, realistic documentation and source
+tree of any size (1k to 1M files) for benchmarking ``scan_files``,
+indexing, ``list_indexed_docs`` and the staleness walk:
+
+- markdown with headings, lists and code fences
+- source code in every ``CODE_EXTENSIONS`` language
+- plain text, and legacy-encoded text (cp1251, latin-1) that takes the
+  encoding-detection path of the loader
+- binary decoys: binary content behind an indexed extension, and images
+  and archives that are not indexed
+- deep trees under excluded directories (``node_modules``, ``vendor``,
+  ``.git``, ...) that scanning must skip
+- a shared license/header block repeated across files
+
+Words follow a Zipf distribution over a fixed vocabulary, so lexical
+statistics resemble real text. File sizes are log-normal. Paths and kinds
+depend only on the spec, so the same ``CorpusSpec`` always gives the same
+tree, and ``mutate_corpus`` edits a reproducible share of it for
+incremental-index benchmarks.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from .document_processor import CODE_EXTENSIONS
+
+
+KINDS = ['markdown', 'code', 'text', 'legacy', 'binary', 'excluded']
+
+# Kinds whose files are indexed with the corpus configuration
+INDEXED_KINDS = {'markdown', 'code', 'text', 'legacy'}
+
+EXCLUDED_DIRS = ['node_modules', 'vendor', '.git', '__pycache__', 'build']
+
+# Directories nest this many ways per level
+DIR_FANOUT = 10
+
+# Size of the shared word pool files are cut from
+POOL_WORDS = 200_000
+
+BOILERPLATE = (
+    "Copyright (c) Example Corp. All rights reserved.\n"
+    "Licensed under the Apache License, Version 2.0 (the \"License\"); you may not use\n"
+    "this file except in compliance with the License. Unless required by applicable\n"
+    "law or agreed to in writing, software distributed under the License is\n"
+    "distributed on an \"AS IS\" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND.\n"
+)
+
+_BASE_WORDS = (
+    "the a to of and in is for on with by this that be are as from it or can "
+    "cache config database deploy docker endpoint error handler index install "
+    "logging migration module password payload queue request response route "
+    "schema search server service session setting token upload user worker "
+    "build client default environment file function key list message option "
+    "path project query return run source status table test timeout type value"
+).split()
+
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "su", "dan", "tor", "ex", "al", "in"]
+
+_LEGACY_WORDS = {
+    'cp1251': "документ настройка сервер запрос ответ база данных пользователь ключ файл "
+              "индекс поиск конфигурация ошибка модуль проект".split(),
+    'latin-1': "données réglage serveur requête réponse utilisateur clé fichier "
+               "Übersicht Größe Schlüssel möglich índice búsqueda configuración".split()
+}
+
+_CODE_TEMPLATES = {
+    '.py': ("# {comment}\n", "def {name}(value):\n    \"\"\"{comment}\"\"\"\n    return {other}(value)\n\n"),
+    '.php': ("<?php\n// {comment}\n", "function {name}($value) {{\n    // {comment}\n    return {other}($value);\n}}\n\n"),
+    '.swift': ("// {comment}\n", "func {name}(_ value: Int) -> Int {{\n    // {comment}\n    return {other}(value)\n}}\n\n"),
+    '.js': ("// {comment}\n", "function {name}(value) {{\n  // {comment}\n  return {other}(value);\n}}\n\n"),
+    '.java': ("// {comment}\n", "    public int {name}(int value) {{\n        // {comment}\n        return {other}(value);\n    }}\n\n"),
+    '.cpp': ("// {comment}\n", "int {name}(int value) {{\n    // {comment}\n    return {other}(value);\n}}\n\n"),
+    '.c': ("/* {comment} */\n", "int {name}(int value) {{\n    /* {comment} */\n    return {other}(value);\n}}\n\n"),
+    '.go': ("package main\n\n// {comment}\n", "func {name}(value int) int {{\n\t// {comment}\n\treturn {other}(value)\n}}\n\n"),
+}
+
+_BINARY_EXTENSIONS = ['.png', '.pdf', '.zip', '.woff2']
+_BINARY_HEADERS = [b"\x89PNG\r\n\x1a\n", b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n", b"PK\x03\x04", b"wOF2"]
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+    num_files: int = 1000
+    seed: int = 0
+    # Share of files per kind (normalized)
+    mix: Dict[str, float] = field(default_factory=lambda: {
+        'markdown': 0.45, 'code': 0.30, 'text': 0.08, 'legacy': 0.04, 'binary': 0.05, 'excluded': 0.08
+    })
+    median_bytes: int = 4096  # Log-normal file size median
+    size_sigma: float = 1.0  # Log-normal shape; larger = longer tail
+    min_bytes: int = 64
+    max_bytes: int = 262_144
+    boilerplate_share: float = 0.3  # Text files starting with the shared license block
+    files_per_dir: int = 40
+    max_depth: int = 5  # Nesting of regular directories
+    excluded_depth: int = 9  # Nesting inside excluded directories
+
+
+@dataclass
+class CorpusStats:
+    """Summary of a generated corpus."""
+    files: int
+    bytes: int
+    by_kind: Dict[str, int]
+
+    @property
+    def indexed_files(self) -> int:
+        """Files the corpus configuration is expected to index."""
+        return sum(self.by_kind.get(kind, 0) for kind in INDEXED_KINDS) + self.by_kind.get('binary_decoy', 0)
+
+
+def corpus_indexing() -> Dict[str, List[str]]:
+    """
+    Indexing settings matching generated corpora.
+
+    Returns:
+        ``indexing`` configuration section (directories, extensions,
+        exclude_patterns).
+    """
+    return {
+        'directories': ['docs/', 'src/'],
+        'extensions': ['.md', '.txt'] + CODE_EXTENSIONS,
+        'exclude_patterns': [f"{name}/" for name in EXCLUDED_DIRS]
+    }
+
+
+class _Plan:
+    """Per-file kinds, sizes and content variants derived from a spec."""
+
+    def __init__(self, spec: CorpusSpec):
+        rng = np.random.default_rng(spec.seed)
+        weights = np.array([spec.mix.get(kind, 0.0) for kind in KINDS], dtype=np.float64)
+        self.kinds = rng.choice(len(KINDS), size=spec.num_files, p=weights / weights.sum())
+        sizes = rng.lognormal(np.log(spec.median_bytes), spec.size_sigma, size=spec.num_files)
+        self.sizes = np.clip(sizes, spec.min_bytes, spec.max_bytes).astype(np.int64)
+        self.variants = rng.integers(0, 1 << 30, size=spec.num_files)
+        self.boilerplate = rng.random(spec.num_files) < spec.boilerplate_share
+        self.spec = spec
+
+    def kind(self, i: int) -> str:
+        return KINDS[int(self.kinds[i])]
+
+    def path(self, i: int) -> str:
+        """Relative path of file ``i``."""
+        spec = self.spec
+        kind = self.kind(i)
+        variant = int(self.variants[i])
+
+        # Nested directory from the directory number, most significant level first
+        number = i // spec.files_per_dir
+        parts: List[str] = []
+        while len(parts) < spec.max_depth:
+            parts.append(f"{_BASE_WORDS[20 + number % 40]}{number % DIR_FANOUT}")
+            number //= DIR_FANOUT
+            if not number:
+                break
+        directory = "/".join(reversed(parts))
+
+        if kind == 'code':
+            extension = CODE_EXTENSIONS[variant % len(CODE_EXTENSIONS)]
+            return f"src/{directory}/{_BASE_WORDS[variant % len(_BASE_WORDS)]}_{i}{extension}"
+        if kind == 'excluded':
+            excluded = EXCLUDED_DIRS[variant % len(EXCLUDED_DIRS)]
+            deep = "/".join(f"pkg{(variant >> n) % 7}" for n in range(spec.excluded_depth))
+            extension = ['.md', '.js', '.txt'][variant % 3]
+            return f"src/{directory}/{excluded}/{deep}/file_{i}{extension}"
+        if kind == 'binary':
+            if variant % 2:
+                # Decoy: binary bytes behind an indexed extension
+                return f"docs/{directory}/diagram_{i}.md"
+            extension = _BINARY_EXTENSIONS[variant % len(_BINARY_EXTENSIONS)]
+            return f"docs/{directory}/asset_{i}{extension}"
+        extension = '.md' if kind == 'markdown' else '.txt'
+        return f"docs/{directory}/{_BASE_WORDS[variant % len(_BASE_WORDS)]}_{i}{extension}"
+
+
+class _Writer:
+    """Builds file contents from a shared Zipf-distributed word pool."""
+
+    def __init__(self, seed: int):
+        rng = np.random.default_rng(seed + 1)
+        invented = [
+            "".join(rng.choice(_SYLLABLES, int(rng.integers(2, 4))))
+            for _ in range(3000)
+        ]
+        vocabulary = _BASE_WORDS + invented
+        ranks = np.arange(1, len(vocabulary) + 1, dtype=np.float64)
+        probabilities = 1.0 / ranks ** 1.1
+        words = np.asarray(vocabulary)[rng.choice(
+            len(vocabulary), size=POOL_WORDS, p=probabilities / probabilities.sum()
+        )]
+        self.pool = " ".join(words)
+
+    def prose(self, variant: int, size: int) -> str:
+        """About ``size`` characters of text starting at a variant-chosen word boundary."""
+        start = variant % max(1, len(self.pool) - size - 1)
+        start = self.pool.find(" ", start) + 1
+        text = self.pool[start:start + size]
+        while len(text) < size:
+            text += " " + self.pool[:size - len(text)]
+        return text[:text.rfind(" ")] if " " in text else text
+
+    def sentences(self, text: str, words_per_sentence: int = 14) -> List[str]:
+        words = text.split()
+        return [
+            " ".join(words[n:n + words_per_sentence]).capitalize() + "."
+            for n in range(0, len(words), words_per_sentence)
+        ]
+
+    def markdown(self, variant: int, size: int) -> str:
+        lines = [f"# {' '.join(self.prose(variant, 40).split()[:4]).title()}", ""]
+        for n, sentence in enumerate(self.sentences(self.prose(variant + 7, size))):
+            if n % 8 == 7:
+                lines += ["", f"## {' '.join(sentence.split()[:3]).rstrip('.')}", ""]
+            if n % 13 == 5:
+                lines += ["```bash", f"docrag {sentence.split()[0].lower()} --verbose", "```", ""]
+            if n % 11 == 3:
+                lines.append(f"- {sentence}")
+            else:
+                lines.append(sentence)
+        return "\n".join(lines) + "\n"
+
+    def code(self, variant: int, size: int, extension: str) -> str:
+        header, block = _CODE_TEMPLATES[extension]
+        words = self.prose(variant, size).split()
+        parts = [header.format(comment=" ".join(words[:8]))]
+        length = len(parts[0])
+        n = 0
+        while length < size and n + 10 < len(words):
+            part = block.format(
+                name=f"{words[n]}_{words[n + 1]}_{n}",
+                other=f"{words[n + 2]}_{n}",
+                comment=" ".join(words[n + 3:n + 10])
+            )
+            parts.append(part)
+            length += len(part)
+            n += 10
+        return "".join(parts)
+
+    def legacy(self, variant: int, size: int) -> bytes:
+        encoding = 'cp1251' if variant % 2 else 'latin-1'
+        local = _LEGACY_WORDS[encoding]
+        words = self.prose(variant, size).split()
+        # Every third word from the legacy vocabulary
+        mixed = [local[(variant + n) % len(local)] if n % 3 == 0 else word for n, word in enumerate(words)]
+        return "\n".join(self.sentences(" ".join(mixed))).encode(encoding)
+
+    def binary(self, variant: int, size: int) -> bytes:
+        header = _BINARY_HEADERS[variant % len(_BINARY_HEADERS)]
+        body = np.random.default_rng(variant).integers(0, 256, size=size, dtype=np.uint8).tobytes()
+        return header + body
+
+
+def _content(plan: _Plan, writer: _Writer, i: int, path: str) -> bytes:
+    kind = plan.kind(i)
+    variant = int(plan.variants[i])
+    size = int(plan.sizes[i])
+
+    if kind == 'binary':
+        return writer.binary(variant, size)
+    if kind == 'legacy':
+        return writer.legacy(variant, size)
+    if kind == 'code':
+        text = writer.code(variant, size, Path(path).suffix)
+    elif kind == 'markdown' or path.endswith('.md'):
+        text = writer.markdown(variant, size)
+    else:
+        text = "\n".join(writer.sentences(writer.prose(variant, size))) + "\n"
+
+    if plan.boilerplate[i] and kind != 'code':
+        text = BOILERPLATE + "\n" + text
+    elif plan.boilerplate[i]:
+        comment = "# " if path.endswith('.py') else "// "
+        text = "".join(f"{comment}{line}\n" for line in BOILERPLATE.splitlines()) + text
+    return text.encode('utf-8')
+
+
+def generate_corpus(root: Path, spec: Optional[CorpusSpec] = None) -> CorpusStats:
+    """
+    Write a synthetic corpus.
+
+    Args:
+        root: Directory to write into (created if missing).
+        spec: Corpus shape. Defaults to ``CorpusSpec()``.
+
+    Returns:
+        Counts and total size of the written files.
+    """
+    spec = spec or CorpusSpec()
+    root = Path(root)
+    plan = _Plan(spec)
+    writer = _Writer(spec.seed)
+    created = set()
+    by_kind: Counter = Counter()
+    total = 0
+
+    for i in range(spec.num_files):
+        path = plan.path(i)
+        directory = path.rpartition("/")[0]
+        if directory not in created:
+            (root / directory).mkdir(parents=True, exist_ok=True)
+            created.add(directory)
+        content = _content(plan, writer, i, path)
+        (root / path).write_bytes(content)
+        kind = plan.kind(i)
+        by_kind['binary_decoy' if kind == 'binary' and path.endswith('.md') else kind] += 1
+        total += len(content)
+
+    return CorpusStats(files=spec.num_files, bytes=total, by_kind=dict(by_kind))
+
+
+def mutate_corpus(root: Path, spec: CorpusSpec, fraction: float, seed: int = 0) -> List[str]:
+    """
+    Edit a reproducible share of a generated corpus's indexed text files.
+
+    Each chosen file gets one paragraph appended (in the file's own
+    encoding), so its size, content hash and mtime all change.
+
+    Args:
+        root: Corpus root written by ``generate_corpus`` with ``spec``.
+        spec: The spec the corpus was generated with.
+        fraction: Share of indexed text files to edit (0-1).
+        seed: Mutation seed; the same seed edits the same files the same way.
+
+    Returns:
+        Relative paths of the edited files, sorted.
+    """
+    plan = _Plan(spec)
+    candidates = [i for i in range(spec.num_files) if plan.kind(i) in INDEXED_KINDS]
+    count = int(round(fraction * len(candidates)))
+    rng = np.random.default_rng([spec.seed, seed])
+    chosen = sorted(rng.choice(candidates, size=count, replace=False)) if count else []
+    writer = _Writer(spec.seed)
+
+    edited = []
+    for i in chosen:
+        path = plan.path(int(i))
+        paragraph = "\n\n" + " ".join(writer.sentences(writer.prose(int(rng.integers(0, 1 << 30)), 300))) + "\n"
+        encoding = ('cp1251' if plan.variants[i] % 2 else 'latin-1') if plan.kind(int(i)) == 'legacy' else 'utf-8'
+        with open(root / path, 'ab') as f:
+            f.write(paragraph.encode(encoding))
+        edited.append(path)
+    return sorted(edited)
@@ -3,6 +3,7 @@
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import fnmatch
+import posixpath
 import chardet
 from langchain_core.documents import Document
 from langchain_text_splitters import (
@@ -11,6 +12,13 @@ from langchain_text_splitters import (
     CharacterTextSplitter
 )
 
+from .instrumentation import phase
+from .tracing import set_attributes
+
+
+# File types split with the code splitter
+CODE_EXTENSIONS = ['.py', '.php', '.swift', '.js', '.java', '.cpp', '.c', '.go']
+
 
 class DocumentProcessor:
     """Processes documents for indexing."""
@@ -43,17 +51,20 @@ class DocumentProcessor:
         return {
             'markdown': MarkdownTextSplitter(
                 chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
+                chunk_overlap=chunk_overlap,
+                add_start_index=True
             ),
             'code': RecursiveCharacterTextSplitter(
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap,
-                separators=["\n\n", "\n", " ", ""]
+                separators=["\n\n", "\n", " ", ""],
+                add_start_index=True
             ),
             'text': CharacterTextSplitter(
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap,
-                separator="\n"
+                separator="\n",
+                add_start_index=True
             )
         }
 
@@ -197,6 +208,26 @@ class DocumentProcessor:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 return f.read()
 
+    def add_path_metadata(self, documents: List[Document], project_root: Path) -> None:
+        """
+        Record each document's path relative to the project root.
+        
+        ``rel_path`` and ``rel_dir`` (POSIX, '' for the root directory) let
+        searches filter by path inside the vector store.
+        
+        Args:
+            documents: Loaded documents (before chunking).
+            project_root: Root directory of the project.
+        """
+        for doc in documents:
+            source = Path(doc.metadata['source'])
+            try:
+                rel_path = source.relative_to(project_root).as_posix()
+            except ValueError:
+                rel_path = source.as_posix()
+            doc.metadata['rel_path'] = rel_path
+            doc.metadata['rel_dir'] = posixpath.dirname(rel_path)
+
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into chunks.
@@ -215,17 +246,42 @@ class DocumentProcessor:
             
             if file_type == '.md':
                 splitter = self.text_splitters['markdown']
-            elif file_type in ['.py', '.php', '.swift', '.js', '.java', '.cpp', '.c', '.go']:
+            elif file_type in CODE_EXTENSIONS:
                 splitter = self.text_splitters['code']
             else:
                 splitter = self.text_splitters['text']
             
             # Split document
             chunks = splitter.split_documents([doc])
+            self._add_line_numbers(doc, chunks)
             chunked_documents.extend(chunks)
         
         return chunked_documents
 
+    def _add_line_numbers(self, doc: Document, chunks: List[Document]) -> None:
+        """
+        Record the 1-based line on which each chunk starts in its source file.
+        
+        Args:
+            doc: Source document that was split.
+            chunks: Chunks produced from the document (with start_index metadata).
+        """
+        content = doc.page_content
+        position = 0
+        line = 1
+        
+        for chunk in chunks:
+            start_index = chunk.metadata.get('start_index', -1)
+            if start_index < 0:
+                continue
+            
+            # Chunks are produced in document order, so count incrementally
+            if start_index < position:
+                position, line = 0, 1
+            line += content.count('\n', position, start_index)
+            position = start_index
+            chunk.metadata['start_line'] = line
+
     def add_metadata(self, chunks: List[Document]) -> List[Document]:
         """
         Add metadata to chunks.
@@ -261,7 +317,9 @@ class DocumentProcessor:
             Tuple of (processed documents, statistics dictionary).
         """
         # Scan files
-        files = self.scan_files(project_root)
+        with phase('scan'):
+            files = self.scan_files(project_root)
+            set_attributes(files=len(files))
         
         if not files:
             return [], {
@@ -272,13 +330,18 @@ class DocumentProcessor:
             }
         
         # Load documents
-        documents = self.load_documents(files)
+        with phase('load', files=len(files)):
+            documents = self.load_documents(files)
+            self.add_path_metadata(documents, project_root)
+            set_attributes(documents=len(documents), failed=len(files) - len(documents))
         
         # Chunk documents
-        chunks = self.chunk_documents(documents)
-        
-        # Add metadata
-        chunks = self.add_metadata(chunks)
+        with phase('chunk', documents=len(documents)):
+            chunks = self.chunk_documents(documents)
+            
+            # Add metadata
+            chunks = self.add_metadata(chunks)
+            set_attributes(chunks=len(chunks))
         
         # Calculate statistics
         total_chars = sum(len(chunk.page_content) for chunk in chunks)
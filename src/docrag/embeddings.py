@@ -0,0 +1,283 @@
+"""Embedding helpers for DocRAG Kit.
+
+Besides dimension truncation for API models, this module provides the
+``local`` embedding provider, which needs no network access or API key:
+
+- ``HashingEmbeddings`` (default): a deterministic hashed n-gram embedder in
+  NumPy. Word unigrams, word bigrams and character trigrams are hashed into
+  a fixed number of signed buckets with sublinear term frequency. It knows
+  no synonyms, but is fast, reproducible across machines and good enough to
+  build and benchmark indexes offline.
+- ``OnnxEmbeddings``: a sentence-embedding model exported to ONNX and stored
+  locally (``model.onnx`` and ``tokenizer.json`` in one directory), run with
+  ``onnxruntime`` if it is installed.
+"""
+
+import contextvars
+import math
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Callable
+
+import numpy as np
+from numpy.typing import ArrayLike
+from langchain_core.embeddings import Embeddings
+
+from .lexical_index import tokenize
+from .tracing import span
+
+
+LOCAL_HASHING_MODEL = "hashing"
+DEFAULT_LOCAL_DIMENSIONS = 384
+EMBEDDING_BATCH_SIZE = 64
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+
+
+def supports_native_dimensions(provider: str, model: Optional[str]) -> bool:
+    """
+    Check whether a provider's API can return shortened embeddings itself.
+
+    OpenAI ``text-embedding-3-*`` models are trained with Matryoshka
+    representation learning and accept a ``dimensions`` parameter.
+
+    Args:
+        provider: LLM provider name.
+        model: Embedding model name.
+
+    Returns:
+        True if the ``dimensions`` parameter can be passed to the API.
+    """
+    return provider == 'openai' and model is not None and model.startswith('text-embedding-3')
+
+
+def truncate_embeddings(vectors: ArrayLike, dimensions: int) -> np.ndarray:
+    """
+    Keep the leading dimensions of embeddings and re-normalize them.
+
+    For Matryoshka-trained models this matches what the API returns when
+    asked for shortened embeddings.
+
+    Args:
+        vectors: Embeddings (array or nested lists), shape (n, d) or (d,).
+        dimensions: Number of leading dimensions to keep.
+
+    Returns:
+        L2-normalized float32 array with ``dimensions`` columns.
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))[:, :dimensions]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    truncated: np.ndarray = matrix / np.where(norms > 0, norms, 1.0)
+    return truncated
+
+
+class TruncatedEmbeddings(Embeddings):
+    """Wraps an embedding model and truncates its output locally."""
+
+    def __init__(self, base: Embeddings, dimensions: int):
+        """
+        Initialize truncating wrapper.
+
+        Args:
+            base: Embedding model returning full-size vectors.
+            dimensions: Number of leading dimensions to keep.
+        """
+        self.base = base
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = truncate_embeddings(
+            self.base.embed_documents(texts), self.dimensions
+        ).tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector: List[float] = truncate_embeddings(self.base.embed_query(text), self.dimensions)[0].tolist()
+        return vector
+
+
+def _batched(texts: List[str], embed_batch: Callable[[List[str]], np.ndarray], batch_size: int, max_workers: int) -> np.ndarray:
+    """Embed texts in batches, several batches at a time."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    def traced_batch(batch: List[str]) -> np.ndarray:
+        with span('embed_batch', texts=len(batch), characters=sum(len(text) for text in batch)):
+            return embed_batch(batch)
+
+    if max_workers > 1 and len(batches) > 1:
+        # Run each batch in a copy of the caller's context so its span nests under the caller's
+        contexts = [contextvars.copy_context() for _ in batches]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = list(executor.map(lambda context, batch: context.run(traced_batch, batch), contexts, batches))
+    else:
+        results = [traced_batch(batch) for batch in batches]
+    return np.concatenate(results) if results else np.empty((0, 0), dtype=np.float32)
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic hashed n-gram embeddings computed locally."""
+
+    def __init__(
+        self,
+        dimensions: int = DEFAULT_LOCAL_DIMENSIONS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_workers: int = 1
+    ):
+        """
+        Initialize hashing embedder.
+
+        Args:
+            dimensions: Number of hash buckets (embedding size).
+            batch_size: Texts embedded per batch.
+            max_workers: Batches embedded concurrently. Feature hashing
+                holds the GIL, so more workers only help on free-threaded
+                Python builds.
+        """
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def _features(self, text: str) -> Counter:
+        words = tokenize(text)
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in set(words):
+            padded = f"<{word}>"
+            if len(padded) > 4:
+                features.update(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode('utf-8')) for feature in features), dtype=np.int64, count=len(features)
+            )
+            weights = np.fromiter(
+                (1.0 + math.log(count) for count in features.values()), dtype=np.float32, count=len(features)
+            )
+            # A second hash bit picks the sign, so collisions cancel out on average
+            signs = np.where(hashes & (1 << 31), -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dimensions, signs * weights)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors: List[List[float]] = _batched(
+            list(texts), self._embed_batch, self.batch_size, self.max_workers
+        ).tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector: List[float] = self._embed_batch([text])[0].tolist()
+        return vector
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings from a locally stored ONNX model."""
+
+    def __init__(
+        self,
+        model_dir: Path,
+        batch_size: int = 32,
+        max_length: int = 256,
+        max_workers: int = 2
+    ):
+        """
+        Load an ONNX sentence-embedding model.
+
+        Args:
+            model_dir: Directory holding ``model.onnx`` and ``tokenizer.json``.
+            batch_size: Texts embedded per batch.
+            max_length: Token limit per text (longer texts are truncated).
+            max_workers: Batches embedded concurrently (onnxruntime releases
+                the GIL; each run also uses its own intra-op threads).
+
+        Raises:
+            ValueError: If onnxruntime/tokenizers are missing or the model
+                files are not found.
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError:
+            raise ValueError(
+                "ERROR: Local ONNX embeddings need onnxruntime and tokenizers.\n"
+                "   Install them with: pip install 'docrag-kit[onnx]'"
+            )
+
+        model_dir = Path(model_dir)
+        model_path = model_dir / ONNX_MODEL_FILE
+        tokenizer_path = model_dir / ONNX_TOKENIZER_FILE
+        if not model_path.exists() or not tokenizer_path.exists():
+            raise ValueError(
+                f"ERROR: ONNX model not found in {model_dir}\n"
+                f"   Expected {ONNX_MODEL_FILE} and {ONNX_TOKENIZER_FILE}."
+            )
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.session = onnxruntime.InferenceSession(str(model_path), providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            inputs['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        output = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+        if output.ndim == 3:
+            # Mean pooling over real (unpadded) tokens
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        embeddings: np.ndarray = output.astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized: np.ndarray = embeddings / np.where(norms > 0, norms, 1.0)
+        return normalized
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors: List[List[float]] = _batched(
+            list(texts), self._embed_batch, self.batch_size, self.max_workers
+        ).tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector: List[float] = self._embed_batch([text])[0].tolist()
+        return vector
+
+
+def local_embeddings(model: Optional[str], dimensions: Optional[int], project_root: Path) -> Embeddings:
+    """
+    Create the embedder for the ``local`` provider.
+
+    Args:
+        model: ``hashing`` (default) or a directory with an ONNX model,
+            absolute or relative to the project root.
+        dimensions: Hashing embedder size (ONNX models keep their own size).
+        project_root: Project root directory.
+
+    Returns:
+        Embeddings instance.
+    """
+    if not model or model == LOCAL_HASHING_MODEL:
+        return HashingEmbeddings(dimensions=dimensions or DEFAULT_LOCAL_DIMENSIONS)
+
+    model_dir = Path(model).expanduser()
+    if not model_dir.is_absolute():
+        model_dir = project_root / model_dir
+    return OnnxEmbeddings(model_dir)
@@ -0,0 +1,318 @@
+"""Retrieval quality versus speed evaluation for DocRAG Kit.
+
+Runs a set of questions with known answers through retrieval under several
+configurations and reports, per configuration:
+
+- ``recall@k``: share of the expected sources (files or chunk IDs) found in
+  the top ``k`` results, averaged over questions
+- ``mrr``: mean reciprocal rank of the first relevant result
+- query latency percentiles and the on-disk index size
+
+Questions are JSONL, one object per line::
+
+    {"question": "How do I log in?", "sources": ["API.md"]}
+    {"question": "...", "chunk_ids": [12, 13]}
+
+``sources`` are paths relative to the project root (a bare file name also
+matches). ``chunk_ids`` are the ``chunk_id`` values assigned at indexing
+time, so they only hold for the chunking settings they were taken from.
+
+A configuration is the project configuration with dotted overrides such as
+``retrieval.search_mode=vector`` or ``chunking.chunk_size=400``.
+Configurations that change how the index is built get their own index in a
+temporary workspace; the project's own index is never touched.
+"""
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import yaml
+from langchain_core.documents import Document
+
+from .bench import prepare_workspace
+from .config_manager import ConfigManager, DocRAGConfig
+from .document_processor import DocumentProcessor
+from .lexical_index import hybrid_scores
+from .stats import latency_summary, directory_size_mb
+
+
+DEFAULT_K = 5
+
+# Configuration sections that change the stored index
+INDEX_SECTIONS = ['llm', 'indexing', 'chunking', 'vector_store']
+INDEX_RETRIEVAL_KEYS = ['hnsw_m', 'hnsw_construction_ef']
+
+# LLM settings that only affect answers, not the index
+ANSWER_LLM_KEYS = ['llm_model', 'temperature', 'fake_tokens_per_second']
+
+
+def load_questions(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read evaluation questions from a JSONL file.
+
+    Args:
+        path: JSONL file, one question object per line. Blank lines and
+            lines starting with ``#`` are skipped.
+
+    Returns:
+        List of dictionaries with ``question``, ``sources`` and ``chunk_ids``.
+
+    Raises:
+        ValueError: If a line is not valid JSON, has no question or no
+            expected sources.
+    """
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"ERROR: {path}:{line_number}: invalid JSON: {e.msg}")
+            question = entry.get('question', '') if isinstance(entry, dict) else ''
+            if not isinstance(question, str) or not question.strip():
+                raise ValueError(f"ERROR: {path}:{line_number}: missing question")
+            sources = [str(source).replace('\\', '/') for source in entry.get('sources', [])]
+            chunk_ids = [int(chunk_id) for chunk_id in entry.get('chunk_ids', [])]
+            if not sources and not chunk_ids:
+                raise ValueError(f"ERROR: {path}:{line_number}: no expected sources or chunk_ids")
+            questions.append({'question': question, 'sources': sources, 'chunk_ids': chunk_ids})
+    if not questions:
+        raise ValueError(f"ERROR: No questions found in {path}")
+    return questions
+
+
+def parse_overrides(text: str) -> Dict[str, Any]:
+    """
+    Parse ``section.key=value`` overrides separated by commas.
+
+    Values are read as YAML, so ``400``, ``0.5``, ``true`` and ``null``
+    get their natural types.
+
+    Args:
+        text: Override string, e.g. ``retrieval.search_mode=vector,chunking.chunk_size=400``.
+            Empty means no overrides.
+
+    Returns:
+        Dictionary of dotted key to value.
+
+    Raises:
+        ValueError: If an override is not ``section.key=value``.
+    """
+    overrides = {}
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, value = item.partition('=')
+        key = key.strip()
+        if not sep or key.count('.') != 1:
+            raise ValueError(
+                f"ERROR: Invalid override: {item}\n"
+                f"   Expected section.key=value, e.g. retrieval.search_mode=vector"
+            )
+        overrides[key] = yaml.safe_load(value.strip()) if value.strip() else None
+    return overrides
+
+
+def apply_overrides(config: DocRAGConfig, overrides: Dict[str, Any]) -> DocRAGConfig:
+    """
+    Return a copy of the configuration with overrides applied and validated.
+
+    Raises:
+        ValueError: If an override names an unknown setting or the result
+            is not a valid configuration.
+    """
+    data = config.to_dict()
+    for key, value in overrides.items():
+        section, name = key.split('.')
+        if section not in data or name not in data[section]:
+            raise ValueError(f"ERROR: Unknown setting: {key}")
+        data[section][name] = value
+    updated = DocRAGConfig.from_dict(data)
+    errors = ConfigManager(Path.cwd()).validate_config(updated)
+    if errors:
+        raise ValueError("ERROR: Invalid configuration for " + ", ".join(overrides) + ":\n   " + "\n   ".join(errors))
+    return updated
+
+
+def _index_key(config: Dict[str, Any]) -> str:
+    # Settings that decide whether two configurations can share an index
+    key = {section: dict(config[section]) for section in INDEX_SECTIONS}
+    for name in ANSWER_LLM_KEYS:
+        key['llm'].pop(name, None)
+    key['retrieval'] = {name: config['retrieval'].get(name) for name in INDEX_RETRIEVAL_KEYS}
+    return json.dumps(key, sort_keys=True)
+
+
+def rank_chunks(manager, question: str, k: int) -> List[Document]:
+    """
+    Retrieve the top ``k`` chunks the way ``search_docs`` does.
+
+    Honours ``retrieval.search_mode`` (hybrid, vector, lexical) and
+    ``retrieval.search_type`` of the manager's configuration.
+
+    Args:
+        manager: VectorDBManager of a built index.
+        question: Query text.
+        k: Number of chunks.
+
+    Returns:
+        Chunks, best first.
+    """
+    retrieval_config = manager.config.get('retrieval', {})
+    mode = retrieval_config.get('search_mode', 'hybrid')
+    lexical_index = manager.get_lexical_index() if mode != 'vector' else None
+    if lexical_index is None:
+        return [doc for doc, _ in manager.search(question, k=k)]
+
+    if mode == 'lexical':
+        return [doc for doc, _ in lexical_index.search(question, k)]
+    fused = hybrid_scores(
+        manager.search(question, k=k),
+        lexical_index.search(question, k),
+        k=retrieval_config.get('rrf_k', 60),
+        limit=k
+    )
+    return [doc for doc, _ in fused]
+
+
+def _is_relevant(doc: Document, expected: Dict[str, Any]) -> List[str]:
+    # Expected items this chunk satisfies ("source:..." / "chunk:...")
+    metadata = doc.metadata
+    rel_path = str(metadata.get('rel_path') or metadata.get('source_file') or '')
+    matched = []
+    for source in expected['sources']:
+        if rel_path == source or ('/' not in source and rel_path.rsplit('/', 1)[-1] == source):
+            matched.append(f"source:{source}")
+    if metadata.get('chunk_id') in expected['chunk_ids']:
+        matched.append(f"chunk:{metadata['chunk_id']}")
+    return matched
+
+
+def score_ranking(ranked: List[Document], expected: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    Score one ranked result list.
+
+    Args:
+        ranked: Retrieved chunks, best first (already cut to ``k``).
+        expected: Question entry with ``sources`` and ``chunk_ids``.
+
+    Returns:
+        Tuple of (recall, reciprocal rank). Recall is the share of expected
+        items found; reciprocal rank is ``1 / rank`` of the first relevant
+        chunk, 0 when none is relevant.
+    """
+    wanted = len(expected['sources']) + len(expected['chunk_ids'])
+    found = set()
+    reciprocal_rank = 0.0
+    for rank, doc in enumerate(ranked, 1):
+        matched = _is_relevant(doc, expected)
+        if matched and not reciprocal_rank:
+            reciprocal_rank = 1.0 / rank
+        found.update(matched)
+    return len(found) / wanted, reciprocal_rank
+
+
+def evaluate_retrieval(
+    project_root: Path,
+    questions: List[Dict[str, Any]],
+    variants: Optional[List[str]] = None,
+    k: int = DEFAULT_K,
+    fake: bool = False,
+    work_dir: Optional[Path] = None
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate retrieval quality and speed under several configurations.
+
+    Args:
+        project_root: Project whose configuration and files are used.
+        questions: Entries from ``load_questions``.
+        variants: Override strings (see ``parse_overrides``), one per
+            configuration. The project configuration itself (``''``) is
+            always evaluated first.
+        k: Results per question.
+        fake: Use the fake providers (no API calls; rankings are not
+            meaningful, only the timings are).
+        work_dir: Workspace for the temporary indexes. Defaults to a temp dir.
+
+    Returns:
+        One dictionary per configuration: ``variant``, ``overrides``,
+        ``recall_at_k``, ``mrr``, ``k``, ``questions``, ``latency``
+        (percentiles of a single retrieval), ``index_mb``, ``chunks`` and
+        ``build_s``.
+
+    Raises:
+        ValueError: If the project has no configuration, an override is
+            invalid or there is nothing to index.
+    """
+    from .vector_db import VectorDBManager
+
+    parsed: List[Tuple[str, Dict[str, Any]]] = [('', {})] + [(variant, parse_overrides(variant)) for variant in (variants or []) if variant.strip()]
+
+    owns_work_dir = work_dir is None
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="docrag-eval-"))
+    try:
+        _, source_root, base_config = prepare_workspace(work_dir, project_root, fake=fake)
+        configs = [(variant, overrides, apply_overrides(base_config, overrides)) for variant, overrides in parsed]
+
+        # One index per distinct set of index settings
+        indexes: Dict[str, Dict[str, Any]] = {}
+        results = []
+        for variant, overrides, config in configs:
+            config_dict = config.to_dict()
+            key = _index_key(config_dict)
+            if key not in indexes:
+                workspace = work_dir / f"index-{len(indexes)}"
+                workspace.mkdir(parents=True, exist_ok=True)
+                start = time.perf_counter()
+                chunks, _ = DocumentProcessor(config_dict).process(source_root)
+                if not chunks:
+                    raise ValueError("ERROR: No files found to index")
+                VectorDBManager(config_dict, workspace).create_database(chunks, show_progress=False)
+                indexes[key] = {
+                    'workspace': workspace,
+                    'chunks': len(chunks),
+                    'build_s': time.perf_counter() - start,
+                    'index_mb': directory_size_mb(workspace / ".docrag" / "vectordb")
+                                + directory_size_mb(workspace / ".docrag" / "indexes")
+                }
+            index = indexes[key]
+            manager = VectorDBManager(config_dict, index['workspace'])
+
+            recalls, reciprocal_ranks, latencies = [], [], []
+            with contextlib.redirect_stderr(io.StringIO()):
+                # First query opens the store; keep it out of the latencies
+                rank_chunks(manager, questions[0]['question'], k)
+                for entry in questions:
+                    start = time.perf_counter()
+                    ranked = rank_chunks(manager, entry['question'], k)
+                    latencies.append(time.perf_counter() - start)
+                    recall, reciprocal_rank = score_ranking(ranked[:k], entry)
+                    recalls.append(recall)
+                    reciprocal_ranks.append(reciprocal_rank)
+
+            results.append({
+                'variant': variant or 'baseline',
+                'overrides': overrides,
+                'k': k,
+                'questions': len(questions),
+                'recall_at_k': sum(recalls) / len(recalls),
+                'mrr': sum(reciprocal_ranks) / len(reciprocal_ranks),
+                'latency': latency_summary(latencies),
+                'index_mb': index['index_mb'],
+                'chunks': index['chunks'],
+                'build_s': index['build_s']
+            })
+        return results
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,378 @@
+"""Deterministic fake providers for DocRAG Kit.
+
+Indexing, answering and the MCP handlers normally call the OpenAI or
+Gemini APIs. For tests and reproducible benchmarks on a machine with no
+network, the ``fake`` provider replaces both:
+
+- ``FakeEmbeddings``: hash-seeded clustered unit vectors (the same vectors
+  as the synthetic benchmark corpus), with an optional per-request latency
+  to mimic an embeddings API round trip.
+- ``FakeChatModel``: a LangChain chat model whose answer is derived from a
+  hash of the prompt, with a configurable time to first token and token
+  throughput.
+
+``FakeOpenAIServer`` serves the same fakes over HTTP with the OpenAI
+embeddings and chat completions wire format, so the real ``openai`` client
+path (serialization, HTTP, streaming) can be measured by pointing
+``llm.base_url`` at it.
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional, Union
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from .vector_benchmark import SeededEmbeddings
+
+
+DEFAULT_FAKE_DIMENSIONS = 384
+DEFAULT_ANSWER_TOKENS = 64
+FAKE_EMBEDDING_MODEL = "fake-embedding"
+FAKE_CHAT_MODEL = "fake-chat"
+
+
+class FakeEmbeddings(SeededEmbeddings):
+    """Hash-seeded embeddings with a simulated API latency."""
+
+    def __init__(
+        self,
+        dimensions: int = DEFAULT_FAKE_DIMENSIONS,
+        latency: float = 0.0,
+        batch_size: int = 1000
+    ):
+        """
+        Initialize fake embeddings.
+
+        Args:
+            dimensions: Embedding dimensionality.
+            latency: Seconds slept per request (one request per batch).
+            batch_size: Texts per simulated request.
+        """
+        super().__init__(dimensions=dimensions)
+        self.latency = latency
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            if self.latency:
+                time.sleep(self.latency)
+            vectors.extend(self._embed(text) for text in texts[start:start + self.batch_size])
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+def fake_answer(prompt: str, num_tokens: int = DEFAULT_ANSWER_TOKENS) -> List[str]:
+    """
+    Build a deterministic answer for a prompt.
+
+    Args:
+        prompt: Prompt text.
+        num_tokens: Answer length in tokens (words).
+
+    Returns:
+        Answer tokens; each but the first starts with a space, so joining
+        them gives the answer text.
+    """
+    words = prompt.split() or ["answer"]
+    rng = np.random.default_rng(zlib.crc32(prompt.encode('utf-8')))
+    picks = rng.integers(0, len(words), size=num_tokens)
+    return [words[i] if n == 0 else " " + words[i] for n, i in enumerate(picks)]
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, list):
+        # Content parts: [{"type": "text", "text": ...}, ...]
+        return "\n".join(part.get('text', '') for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(_message_text(message.content) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with a hash-derived answer and synthetic timing."""
+
+    latency: float = 0.0
+    """Seconds before the first token."""
+
+    tokens_per_second: float = 0.0
+    """Generation throughput; 0 returns all tokens at once."""
+
+    answer_tokens: int = DEFAULT_ANSWER_TOKENS
+    """Answer length in tokens."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "docrag-fake"
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _result(self, tokens: List[str]) -> ChatResult:
+        message = AIMessage(content="".join(tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = fake_answer(_prompt_text(messages), self.answer_tokens)
+        time.sleep(self.latency + self._token_delay() * len(tokens))
+        return self._result(tokens)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = fake_answer(_prompt_text(messages), self.answer_tokens)
+        await asyncio.sleep(self.latency + self._token_delay() * len(tokens))
+        return self._result(tokens)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        delay = self._token_delay()
+        time.sleep(self.latency)
+        for n, token in enumerate(fake_answer(_prompt_text(messages), self.answer_tokens)):
+            if delay and n:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        delay = self._token_delay()
+        await asyncio.sleep(self.latency)
+        for n, token in enumerate(fake_answer(_prompt_text(messages), self.answer_tokens)):
+            if delay and n:
+                await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler for ``FakeOpenAIServer``."""
+
+    protocol_version = "HTTP/1.1"
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self.server.request_counts['models'] += 1
+            models = [FAKE_EMBEDDING_MODEL, FAKE_CHAT_MODEL]
+            self._send_json(200, {"object": "list", "data": [
+                {"id": model, "object": "model", "created": 0, "owned_by": "docrag"} for model in models
+            ]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": {"message": f"Invalid JSON: {e}", "type": "invalid_request_error"}})
+            return
+
+        path = self.path.rstrip('/')
+        if path.endswith('/embeddings'):
+            self.server.request_counts['embeddings'] += 1
+            self._embeddings(request)
+        elif path.endswith('/chat/completions'):
+            self.server.request_counts['chat'] += 1
+            self._chat(request)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}", "type": "invalid_request_error"}})
+
+    def _embeddings(self, request: Dict[str, Any]) -> None:
+        inputs = request.get('input', [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        # Token id arrays are hashed through their text form
+        texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        dimensions = request.get('dimensions') or server.dimensions
+        embedder = server.embeddings_for(dimensions)
+
+        data = []
+        for index, text in enumerate(texts):
+            vector = embedder._embed(text)
+            embedding: Union[List[float], str] = vector
+            if request.get('encoding_format') == 'base64':
+                embedding = base64.b64encode(np.asarray(vector, dtype='<f4').tobytes()).decode('ascii')
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        tokens = sum(len(text.split()) for text in texts)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": request.get('model', FAKE_EMBEDDING_MODEL),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    def _chat(self, request: Dict[str, Any]) -> None:
+        server = self.server
+        prompt = "\n".join(_message_text(m.get('content')) for m in request.get('messages', []))
+        max_tokens = request.get('max_completion_tokens') or request.get('max_tokens') or server.answer_tokens
+        tokens = fake_answer(prompt, min(max_tokens, server.answer_tokens))
+        delay = 1.0 / server.tokens_per_second if server.tokens_per_second > 0 else 0.0
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(tokens),
+            "total_tokens": len(prompt.split()) + len(tokens)
+        }
+        completion_id = f"chatcmpl-fake-{next(server.completion_ids)}"
+        created = int(time.time())
+        model = request.get('model', FAKE_CHAT_MODEL)
+
+        if not request.get('stream'):
+            time.sleep(server.latency + delay * len(tokens))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(choices, **extra):
+            payload = {
+                "id": completion_id, "object": "chat.completion.chunk",
+                "created": created, "model": model, "choices": choices, **extra
+            }
+            self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+
+        time.sleep(server.latency)
+        for n, token in enumerate(tokens):
+            if delay and n:
+                time.sleep(delay)
+            delta = {"role": "assistant", "content": token} if n == 0 else {"content": token}
+            event([{"index": 0, "delta": delta, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get('stream_options') or {}).get('include_usage'):
+            event([], usage=usage)
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Local HTTP stub of the OpenAI embeddings and chat completions API.
+
+    Serves ``POST /v1/embeddings``, ``POST /v1/chat/completions`` (plain
+    and streamed) and ``GET /v1/models`` with the fake providers' outputs.
+    Use as a context manager to serve from a background thread::
+
+        with FakeOpenAIServer(latency=0.05) as server:
+            config['llm']['base_url'] = server.url
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimensions: int = 1536,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        answer_tokens: int = DEFAULT_ANSWER_TOKENS
+    ):
+        """
+        Initialize the server (port 0 picks a free port).
+
+        Args:
+            host: Interface to bind.
+            port: Port to bind.
+            dimensions: Embedding size when the request sets none.
+            latency: Seconds slept per embeddings request and before the
+                first chat token.
+            tokens_per_second: Chat throughput; 0 sends all tokens at once.
+            answer_tokens: Chat answer length in tokens.
+        """
+        super().__init__((host, port), _OpenAIHandler)
+        self.dimensions = dimensions
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.request_counts: Counter = Counter()
+        self.completion_ids = itertools.count(1)
+        self._embedders: Dict[int, SeededEmbeddings] = {}
+        self._embedders_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL for OpenAI clients (``.../v1``)."""
+        host, port = self.socket.getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    def embeddings_for(self, dimensions: int) -> SeededEmbeddings:
+        """Get the (cached) embedder for a vector size."""
+        with self._embedders_lock:
+            if dimensions not in self._embedders:
+                self._embedders[dimensions] = SeededEmbeddings(dimensions=dimensions)
+            return self._embedders[dimensions]
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
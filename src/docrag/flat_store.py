@@ -0,0 +1,703 @@
+"""In-process flat vector store for DocRAG Kit.
+
+An alternative to ChromaDB with no database engine and no file locks:
+embeddings are L2-normalized and stored in a single ``.npy`` matrix that is
+memory-mapped on load, chunk texts and metadata are stored as concatenated
+UTF-8 blobs addressed by offset arrays, and queries are answered by
+brute-force matrix-vector products with ``argpartition`` top-k.
+
+Larger corpora can add an IVF-PQ index (see ``ivfpq.py``) or int8/binary
+quantized codes (see ``quantization.py``) to each generation; queries then
+run a first pass over the compact codes and re-rank the shortlist against
+the memory-mapped full vectors.
+
+Each write produces a new generation directory; the ``CURRENT`` pointer file
+is then replaced atomically, so readers always see either the old or the new
+index in full and never need to be stopped during reindexing. The previous
+generation is kept until the next write so a reader that read ``CURRENT``
+just before a swap can still open it.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Callable, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from .ivfpq import IVFPQIndex
+from .quantization import QuantizedVectors, QUANTIZATION_KINDS
+from .search_filters import evaluate_where
+from .mmr import mmr_select
+
+
+CURRENT_FILE = "CURRENT"
+VECTORS_FILE = "vectors.npy"
+TEXTS_FILE = "texts.bin"
+TEXT_OFFSETS_FILE = "text_offsets.npy"
+METADATA_FILE = "metadata.bin"
+METADATA_OFFSETS_FILE = "metadata_offsets.npy"
+
+# Rows scored per matrix product; bounds the float32 working set for float16 stores
+BLOCK_ROWS = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows so dot products are cosine similarities.
+
+    Args:
+        vectors: 2-D float array.
+
+    Returns:
+        Normalized float32 array (zero rows are left as zeros).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = vectors / norms
+    return normalized
+
+
+def write_blob(directory: Path, blob_file: str, offsets_file: str, items: List[bytes]) -> None:
+    """
+    Write byte strings as one blob plus an offsets array.
+
+    Args:
+        directory: Target directory.
+        blob_file: Blob file name.
+        offsets_file: Offsets file name (``len(items) + 1`` int64 values).
+        items: Encoded items.
+    """
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    with open(directory / blob_file, 'wb') as f:
+        for i, item in enumerate(items):
+            f.write(item)
+            offsets[i + 1] = offsets[i] + len(item)
+    np.save(directory / offsets_file, offsets)
+
+
+def map_file(path: Path) -> Union[mmap.mmap, bytes]:
+    """
+    Memory-map a file read-only.
+
+    The map stays valid after the file is closed, and after it is replaced
+    or unlinked.
+
+    Args:
+        path: File to map.
+
+    Returns:
+        ``mmap`` of the file (``b''`` for an empty file, which cannot be mapped).
+    """
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Blob:
+    """Memory-mapped byte store addressed by an offsets array."""
+
+    def __init__(self, data: Union[mmap.mmap, bytes], offsets: np.ndarray):
+        """
+        Initialize blob over mapped data.
+
+        Args:
+            data: Mapped bytes (``mmap`` or ``bytes``).
+            offsets: ``len + 1`` positions in ``data``; item i spans
+                ``offsets[i]:offsets[i + 1]``.
+        """
+        self._data = data
+        self.offsets = offsets
+
+    @classmethod
+    def open(cls, directory: Path, blob_file: str, offsets_file: str) -> 'Blob':
+        """
+        Open a blob written by ``write_blob``.
+
+        Args:
+            directory: Directory holding the files.
+            blob_file: Blob file name.
+            offsets_file: Offsets file name.
+
+        Returns:
+            Blob instance.
+        """
+        return cls(map_file(directory / blob_file), np.load(directory / offsets_file, mmap_mode='r'))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, index: int) -> bytes:
+        return self._data[int(self.offsets[index]):int(self.offsets[index + 1])]
+
+
+class _Generation:
+    """One immutable, memory-mapped generation of the store."""
+
+    def __init__(self, directory: Path):
+        self.name = directory.name
+        self.vectors = np.load(directory / VECTORS_FILE, mmap_mode='r')
+        self.texts = Blob.open(directory, TEXTS_FILE, TEXT_OFFSETS_FILE)
+        self.metadata = Blob.open(directory, METADATA_FILE, METADATA_OFFSETS_FILE)
+        self.ann = IVFPQIndex.load(directory)
+        self.quantized = QuantizedVectors.load(directory)
+        # Metadata field -> values per row, built on first filtered search
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def get_id(self, index: int) -> str:
+        record_id: str = json.loads(self.metadata.get(index))[0]
+        return record_id
+
+    def get_document(self, index: int) -> Document:
+        record_id, metadata = json.loads(self.metadata.get(index))
+        return Document(page_content=self.texts.get(index).decode('utf-8'), metadata=metadata, id=record_id)
+
+    def get_metadata(self, index: int) -> Dict[str, Any]:
+        metadata: Dict[str, Any] = json.loads(self.metadata.get(index))[1]
+        return metadata
+
+    def column(self, field: str) -> np.ndarray:
+        """Values of one metadata field for every row (None where missing)."""
+        values = self._columns.get(field)
+        if values is None:
+            values = np.empty(len(self), dtype=object)
+            values[:] = [self.get_metadata(i).get(field) for i in range(len(self))]
+            self._columns[field] = values
+        return values
+
+    def matching_rows(self, where: Dict[str, Any]) -> np.ndarray:
+        """Row ids whose metadata satisfies a ``where`` clause."""
+        return np.flatnonzero(evaluate_where(where, self.column))
+
+
+class FlatVectorStore(VectorStore):
+    """Brute-force vector store over memory-mapped NumPy arrays."""
+
+    def __init__(
+        self,
+        path: Path,
+        embedding: Embeddings,
+        dtype: str = 'float32',
+        ann: str = 'none',
+        quantization: str = 'none',
+        nlist: int = 0,
+        pq_m: int = 48,
+        nprobe: int = 8,
+        rerank_factor: int = 10
+    ):
+        """
+        Initialize flat vector store.
+
+        Args:
+            path: Store directory (holds ``CURRENT`` and generation directories).
+            embedding: Embedding function for queries and new texts.
+            dtype: Storage dtype for embeddings (float32 or float16).
+            ann: Approximate index built on write: none or ivfpq.
+            quantization: Quantized codes built on write: none, int8 or binary.
+                Ignored when an ANN index is configured.
+            nlist: IVF list count (0 = automatic).
+            pq_m: Number of PQ subspaces (bytes per vector).
+            nprobe: Default number of IVF lists scanned per query.
+            rerank_factor: Shortlist size as a multiple of k for exact re-ranking
+                (IVF-PQ and quantized first passes).
+        """
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"ERROR: Unsupported flat store dtype: {dtype}")
+        if ann not in ('none', 'ivfpq'):
+            raise ValueError(f"ERROR: Unsupported flat store ANN index: {ann}")
+        if quantization != 'none' and quantization not in QUANTIZATION_KINDS:
+            raise ValueError(f"ERROR: Unsupported quantization: {quantization}")
+
+        self.path = Path(path)
+        self._embedding = embedding
+        self.dtype = dtype
+        self.ann = ann
+        self.quantization = quantization
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self._loaded: Optional[_Generation] = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Embedding function used by the store."""
+        return self._embedding
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        """
+        Check whether a flat store has been written at a path.
+
+        Args:
+            path: Store directory.
+
+        Returns:
+            True if the store has a current generation.
+        """
+        return (Path(path) / CURRENT_FILE).exists()
+
+    def _current_generation(self) -> Optional[str]:
+        try:
+            return (self.path / CURRENT_FILE).read_text(encoding='utf-8').strip() or None
+        except OSError:
+            return None
+
+    def _snapshot(self) -> Optional[_Generation]:
+        """
+        Get the current generation, opening it if it was swapped on disk.
+
+        Callers should use the returned snapshot for the whole operation so
+        a concurrent swap cannot mix rows from two generations.
+
+        Returns:
+            Loaded generation, or None if the store is empty.
+        """
+        generation = self._current_generation()
+        if generation is None:
+            return None
+
+        loaded = self._loaded
+        if loaded is None or loaded.name != generation:
+            # Previous maps are released when the last reader drops them
+            try:
+                loaded = _Generation(self.path / generation)
+            except FileNotFoundError:
+                # Another process swapped twice since CURRENT was read
+                generation = self._current_generation()
+                if generation is None:
+                    return None
+                loaded = _Generation(self.path / generation)
+            self._loaded = loaded
+        return loaded
+
+    def __len__(self) -> int:
+        snapshot = self._snapshot()
+        return len(snapshot) if snapshot is not None else 0
+
+    def get_metadatas(self) -> List[Dict[str, Any]]:
+        """
+        Get metadata of every stored chunk.
+
+        Returns:
+            List of metadata dictionaries in storage order.
+        """
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return []
+        return [snapshot.get_metadata(i) for i in range(len(snapshot))]
+
+    def write(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> None:
+        """
+        Write a complete new generation and atomically make it current.
+
+        Args:
+            texts: Chunk texts.
+            vectors: Embeddings, one row per text.
+            metadatas: Chunk metadata.
+            ids: Chunk ids.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        generation = f"gen-{time.time_ns()}"
+        staging = self.path / f".{generation}.tmp"
+        staging.mkdir()
+
+        try:
+            vectors = _normalize(vectors)
+            np.save(staging / VECTORS_FILE, vectors.astype(self.dtype))
+            if self.ann == 'ivfpq' and len(vectors):
+                IVFPQIndex.train(vectors, nlist=self.nlist, m=self.pq_m).save(staging)
+            elif self.quantization != 'none':
+                QuantizedVectors.encode(vectors, self.quantization).save(staging)
+            write_blob(staging, TEXTS_FILE, TEXT_OFFSETS_FILE, [t.encode('utf-8') for t in texts])
+            write_blob(
+                staging, METADATA_FILE, METADATA_OFFSETS_FILE,
+                [json.dumps([i, m], ensure_ascii=False).encode('utf-8') for i, m in zip(ids, metadatas)]
+            )
+            os.rename(staging, self.path / generation)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        previous = self._current_generation()
+        pointer = self.path / f".{CURRENT_FILE}.tmp"
+        pointer.write_text(generation, encoding='utf-8')
+        os.replace(pointer, self.path / CURRENT_FILE)
+
+        # The previous generation stays for readers in other processes that
+        # read CURRENT just before the swap; older ones are no longer reachable
+        for old in self.path.glob("gen-*"):
+            if old.name not in (generation, previous):
+                shutil.rmtree(old, ignore_errors=True)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed texts and add them to the store.
+
+        The store is write-once, so adding rewrites the full matrix into a
+        new generation.
+
+        Args:
+            texts: Texts to add.
+            metadatas: Optional metadata per text.
+            ids: Optional ids per text.
+
+        Returns:
+            Ids of the added texts.
+        """
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+
+        snapshot = self._snapshot()
+        if snapshot is not None and len(snapshot) > 0:
+            existing = [snapshot.get_document(i) for i in range(len(snapshot))]
+            texts = [d.page_content for d in existing] + texts
+            metadatas = [d.metadata for d in existing] + metadatas
+            all_ids = [snapshot.get_id(i) for i in range(len(snapshot))] + ids
+            vectors = np.vstack([np.asarray(snapshot.vectors, dtype=np.float32), vectors])
+        else:
+            all_ids = ids
+
+        self.write(texts, vectors, metadatas, all_ids)
+        return ids
+
+    def truncate(self, dimensions: int) -> None:
+        """
+        Keep the leading embedding dimensions and write them as a new generation.
+
+        Matryoshka-trained models (e.g. OpenAI ``text-embedding-3-*``) keep
+        most of their quality when shortened, so this shrinks the store and
+        speeds up search without re-embedding. Queries must then be embedded
+        with the same number of dimensions.
+
+        Args:
+            dimensions: Number of leading dimensions to keep.
+
+        Raises:
+            ValueError: If the store is empty or dimensions is out of range.
+        """
+        snapshot = self._snapshot()
+        if snapshot is None or len(snapshot) == 0:
+            raise ValueError("ERROR: Vector store is empty")
+        if not 1 <= dimensions <= snapshot.vectors.shape[1]:
+            raise ValueError(
+                f"ERROR: Dimensions must be between 1 and {snapshot.vectors.shape[1]}"
+            )
+
+        documents = [snapshot.get_document(i) for i in range(len(snapshot))]
+        self.write(
+            [d.page_content for d in documents],
+            np.asarray(snapshot.vectors[:, :dimensions], dtype=np.float32),
+            [d.metadata for d in documents],
+            [snapshot.get_id(i) for i in range(len(snapshot))]
+        )
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        path: Optional[Path] = None,
+        dtype: str = 'float32',
+        **kwargs: Any
+    ) -> 'FlatVectorStore':
+        """
+        Create a store from texts, replacing any existing generation.
+
+        Args:
+            texts: Texts to embed and store.
+            embedding: Embedding function.
+            metadatas: Optional metadata per text.
+            ids: Optional ids per text.
+            path: Store directory.
+            dtype: Storage dtype for embeddings.
+            **kwargs: ANN options passed to the constructor (ann, nlist, pq_m, ...).
+
+        Returns:
+            FlatVectorStore instance.
+        """
+        if path is None:
+            raise ValueError("ERROR: FlatVectorStore requires a path")
+
+        store = cls(path, embedding, dtype=dtype, **kwargs)
+        vectors = np.asarray(embedding.embed_documents(list(texts)), dtype=np.float32)
+        store.write(
+            list(texts), vectors,
+            metadatas or [{} for _ in texts],
+            ids or [str(uuid.uuid4()) for _ in texts]
+        )
+        return store
+
+    def search_vectors(
+        self,
+        queries: np.ndarray,
+        k: int,
+        snapshot: Optional[_Generation] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the top-k rows for a batch of query vectors.
+
+        Uses the generation's IVF-PQ index or quantized codes when present
+        (unless ``exact``), otherwise an exact brute-force scan. With a
+        filter, only the matching rows are scanned, exactly.
+
+        Args:
+            queries: Query vectors, shape (m, d) or (d,).
+            k: Number of results per query.
+            snapshot: Generation to search. Defaults to the current one.
+            nprobe: IVF lists to scan. Defaults to the store setting.
+            exact: Force an exact scan even if an ANN index exists.
+            filter: ChromaDB-style ``where`` clause over chunk metadata.
+
+        Returns:
+            Tuple of (indices, scores), each of shape (m, k'), sorted by
+            descending cosine similarity, where k' = min(k, store size).
+            With IVF-PQ, k' can be smaller when the probed lists hold fewer
+            than k vectors.
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        snapshot = snapshot or self._snapshot()
+        if snapshot is None or len(snapshot) == 0 or k < 1:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        if filter:
+            rows = snapshot.matching_rows(filter)
+            ids, scores = self._exact_search(queries, k, snapshot.vectors, rows)
+            return rows[ids], scores
+
+        ann, quantized = snapshot.ann, snapshot.quantized
+        if not exact and ann is not None:
+            nprobe = nprobe or self.nprobe
+            results = [
+                ann.search(query, snapshot.vectors, k, nprobe, self.rerank_factor)
+                for query in queries
+            ]
+        elif not exact and quantized is not None:
+            results = [
+                quantized.search(query, snapshot.vectors, k, self.rerank_factor)
+                for query in queries
+            ]
+        else:
+            return self._exact_search(queries, k, snapshot.vectors)
+        width = min(len(ids) for ids, _ in results)
+        return (
+            np.stack([ids[:width] for ids, _ in results]),
+            np.stack([scores[:width] for _, scores in results])
+        )
+
+    @staticmethod
+    def _exact_search(
+        queries: np.ndarray,
+        k: int,
+        matrix: np.ndarray,
+        rows: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k by blocked matrix products.
+
+        The matrix is scored in blocks of ``BLOCK_ROWS`` rows; each block is
+        reduced to its top-k with ``argpartition`` and merged with the
+        running best, so only the final k candidates are fully sorted.
+
+        Args:
+            queries: Normalized query vectors, shape (m, d).
+            k: Number of results per query.
+            matrix: Stored vectors, shape (n, d).
+            rows: Only score these rows (sorted). Returned indices are then
+                positions in ``rows``.
+
+        Returns:
+            Tuple of (indices, scores), each of shape (m, min(k, n)).
+        """
+        n = matrix.shape[0] if rows is None else len(rows)
+        k = min(k, n)
+        best_ids = np.empty((queries.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        if k < 1:
+            return best_ids, best_scores
+
+        for start in range(0, n, BLOCK_ROWS):
+            if rows is None:
+                block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+            else:
+                block = np.asarray(matrix[rows[start:start + BLOCK_ROWS]], dtype=np.float32)
+            scores = queries @ block.T
+
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+            best_ids = np.concatenate([best_ids, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return documents most similar to an embedding with cosine similarities.
+
+        Args:
+            embedding: Query embedding.
+            k: Number of results.
+            nprobe: IVF lists to scan (IVF-PQ stores only).
+            exact: Force an exact scan.
+            filter: ChromaDB-style ``where`` clause over chunk metadata.
+
+        Returns:
+            List of (Document, similarity) tuples, most similar first.
+        """
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return []
+        ids, scores = self.search_vectors(
+            np.asarray(embedding, dtype=np.float32), k, snapshot, nprobe=nprobe, exact=exact, filter=filter
+        )
+        return [(snapshot.get_document(int(i)), float(s)) for i, s in zip(ids[0], scores[0])]
+
+    def similarity_search_with_vectors_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Tuple[Document, float]], np.ndarray]:
+        """
+        Like ``similarity_search_with_score_by_vector``, also returning the stored vectors.
+
+        Returns:
+            Tuple of ((Document, similarity) list, vectors of shape (len, d)).
+        """
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return [], np.empty((0, 0), dtype=np.float32)
+        ids, scores = self.search_vectors(
+            np.asarray(embedding, dtype=np.float32), k, snapshot, nprobe=nprobe, exact=exact, filter=filter
+        )
+        hits = [(snapshot.get_document(int(i)), float(s)) for i, s in zip(ids[0], scores[0])]
+        return hits, np.asarray(snapshot.vectors[ids[0]], dtype=np.float32)
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        """
+        Return diverse documents by maximal marginal relevance.
+
+        Args:
+            embedding: Query embedding.
+            k: Number of results.
+            fetch_k: Candidates fetched before diversification.
+            lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only.
+            **kwargs: ``nprobe``, ``exact`` and ``filter`` search options.
+
+        Returns:
+            List of Documents in pick order.
+        """
+        hits, vectors = self.similarity_search_with_vectors_by_vector(
+            embedding, max(k, fetch_k), nprobe=kwargs.get('nprobe'), exact=kwargs.get('exact', False),
+            filter=kwargs.get('filter')
+        )
+        return [hits[i][0] for i in mmr_select(embedding, vectors, k, lambda_mult)]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        """Return diverse documents for a query by maximal marginal relevance."""
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return documents most similar to a query with cosine similarities.
+
+        Args:
+            query: Query text.
+            k: Number of results.
+            **kwargs: ``nprobe``, ``exact`` and ``filter`` search options.
+
+        Returns:
+            List of (Document, similarity) tuples, most similar first.
+        """
+        return self.similarity_search_with_score_by_vector(
+            self._embedding.embed_query(query), k,
+            nprobe=kwargs.get('nprobe'), exact=kwargs.get('exact', False), filter=kwargs.get('filter')
+        )
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return documents most similar to an embedding."""
+        return [
+            doc for doc, _ in self.similarity_search_with_score_by_vector(
+                embedding, k, nprobe=kwargs.get('nprobe'), exact=kwargs.get('exact', False),
+                filter=kwargs.get('filter')
+            )
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return documents most similar to a query."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities
+        return lambda score: score
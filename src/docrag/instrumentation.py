@@ -0,0 +1,156 @@
+"""Call and pipeline instrumentation for DocRAG Kit.
+
+``phase`` marks a named stage of work: MCP call phases (``staleness``,
+``embed``, ``search``, ``llm``) and indexing stages (``scan``, ``load``,
+``chunk``, ``write``, ``local_indexes``). Inside ``track_call`` the time
+spent in each phase is added to the current ``CallRecord`` (used by the
+query log and server metrics). Observers registered with
+``add_phase_observer`` are told when any phase starts and ends (used by the
+profiler for per-stage memory snapshots and by tracing for spans).
+
+The current call and the observers are context variables, so they follow
+work into ``asyncio.to_thread`` workers and LangChain runnables.
+"""
+
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+# Called with (phase name, 'start' | 'end' | 'error', attributes); 'error'
+# ends a phase that raised. Attributes are those given to ``phase``.
+PhaseObserver = Callable[[str, str, Dict[str, Any]], None]
+
+_current_call: ContextVar[Optional['CallRecord']] = ContextVar('docrag_current_call', default=None)
+_phase_observers: ContextVar[Tuple[PhaseObserver, ...]] = ContextVar('docrag_phase_observers', default=())
+
+
+class CallRecord:
+    """Timings, retrieved chunks and token counts of one tool call."""
+
+    def __init__(self, tool: str, arguments: Dict[str, Any]):
+        self.tool = tool
+        self.arguments = arguments
+        self.started = time.time()
+        self.duration = 0.0
+        self.phases: Dict[str, float] = {}
+        self.chunk_ids: List[Any] = []
+        self.tokens: Dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Add time spent in a phase (phases may run in worker threads)."""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_chunks(self, docs: List[Document]) -> None:
+        """Record the ``chunk_id`` of retrieved chunks, in result order."""
+        with self._lock:
+            for doc in docs:
+                chunk_id = doc.metadata.get('chunk_id')
+                if chunk_id is not None and chunk_id not in self.chunk_ids:
+                    self.chunk_ids.append(chunk_id)
+
+    def add_tokens(self, counts: Dict[str, int]) -> None:
+        """Add token counts (e.g. ``tokens_saved`` by context compression)."""
+        with self._lock:
+            for name, count in counts.items():
+                self.tokens[name] = self.tokens.get(name, 0) + count
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+
+@contextlib.contextmanager
+def track_call(tool: str, arguments: Dict[str, Any]) -> Iterator[CallRecord]:
+    """
+    Make a new ``CallRecord`` the current call while the block runs.
+
+    The record follows the call into ``asyncio.to_thread`` workers and
+    LangChain runnables, which copy the context.
+    """
+    record = CallRecord(tool, arguments)
+    token = _current_call.set(record)
+    try:
+        yield record
+    finally:
+        record.finish()
+        _current_call.reset(token)
+
+
+@contextlib.contextmanager
+def add_phase_observer(observer: PhaseObserver) -> Iterator[None]:
+    """Notify ``observer`` of every phase entered while the block runs."""
+    token = _phase_observers.set(_phase_observers.get() + (observer,))
+    try:
+        yield
+    finally:
+        _phase_observers.reset(token)
+
+
+def _notify(observers: Tuple[PhaseObserver, ...], name: str, event: str, attributes: Dict[str, Any]) -> None:
+    for observer in observers:
+        observer(name, event, attributes)
+
+
+@contextlib.contextmanager
+def phase(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Mark a phase of work.
+
+    Times the phase on the current call and notifies phase observers; does
+    nothing when there is neither. Keyword arguments are passed to the
+    observers (e.g. span attributes such as ``texts=32``).
+    """
+    record = _current_call.get()
+    observers = _phase_observers.get()
+    if record is None and not observers:
+        yield
+        return
+    _notify(observers, name, 'start', attributes)
+    start = time.perf_counter()
+    event = 'end'
+    try:
+        yield
+    except BaseException:
+        event = 'error'
+        raise
+    finally:
+        if record is not None:
+            record.add_phase(name, time.perf_counter() - start)
+        _notify(observers, name, event, attributes)
+
+
+def record_chunks(docs: List[Document]) -> None:
+    """Record retrieved chunks on the current call, if any."""
+    record = _current_call.get()
+    if record is not None:
+        record.add_chunks(docs)
+
+
+def record_tokens(**counts: int) -> None:
+    """Add token counts to the current call, if any."""
+    record = _current_call.get()
+    if record is not None:
+        record.add_tokens(counts)
+
+
+class PhaseTimedEmbeddings(Embeddings):
+    """Embeddings wrapper that times provider calls as the ``embed`` phase."""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with phase('embed', texts=len(texts), characters=sum(len(text) for text in texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with phase('embed', texts=1, characters=len(text)):
+            return self.embeddings.embed_query(text)
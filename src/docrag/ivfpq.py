@@ -0,0 +1,281 @@
+"""IVF-PQ approximate nearest neighbour index for the flat vector store.
+
+Vectors are partitioned into ``nlist`` inverted lists by a coarse k-means
+quantizer; the residual of each vector to its list centroid is compressed
+with product quantization into ``m`` one-byte codes. A query scans only the
+``nprobe`` closest lists using asymmetric distance tables, and the shortlist
+is re-ranked exactly against the memory-mapped full-precision vectors.
+
+Resident memory is the codes (``m`` bytes per vector) plus the codebooks,
+instead of the full float matrix.
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+CENTROIDS_FILE = "ivf_centroids.npy"
+OFFSETS_FILE = "ivf_offsets.npy"
+IDS_FILE = "ivf_ids.npy"
+CODEBOOKS_FILE = "pq_codebooks.npy"
+CODES_FILE = "pq_codes.npy"
+
+# k-means quality saturates at a few dozen training points per centroid
+TRAINING_POINTS_PER_CENTROID = 64
+ASSIGN_BLOCK_ROWS = 16384
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Assign each row to its nearest centroid (squared L2).
+
+    Args:
+        data: Points, shape (n, d).
+        centroids: Centroids, shape (k, d).
+
+    Returns:
+        Centroid index per point.
+    """
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), ASSIGN_BLOCK_ROWS):
+        block = np.ascontiguousarray(data[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        distances = centroid_norms[None, :] - 2 * (block @ centroids.T)
+        labels[start:start + len(block)] = distances.argmin(axis=1)
+    return labels
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means with random initialization.
+
+    Empty clusters are re-seeded from random points.
+
+    Args:
+        data: Points, shape (n, d).
+        k: Number of clusters (capped at n).
+        iterations: Number of Lloyd iterations.
+        seed: Random seed.
+
+    Returns:
+        Centroids, shape (min(k, n), d), float32.
+    """
+    data = np.asarray(data, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    k = min(k, len(data))
+    centroids: np.ndarray = data[rng.choice(len(data), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=k)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        centroids[present] = np.add.reduceat(data[order], starts, axis=0) / counts[present, None]
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+
+    return centroids
+
+
+def _subspace_count(dimensions: int, m: int) -> int:
+    """Largest number of subspaces <= m that divides the dimensionality."""
+    m = max(1, min(m, dimensions))
+    while dimensions % m:
+        m -= 1
+    return m
+
+
+class IVFPQIndex:
+    """Inverted-file index with product-quantized residuals."""
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        ids: np.ndarray,
+        codebooks: np.ndarray,
+        codes: np.ndarray
+    ):
+        """
+        Initialize IVF-PQ index.
+
+        Args:
+            centroids: Coarse centroids, shape (nlist, d).
+            offsets: List boundaries into ids/codes, shape (nlist + 1,).
+            ids: Row ids grouped by list.
+            codebooks: PQ codebooks, shape (m, ksub, d / m).
+            codes: PQ codes grouped by list, shape (n, m), uint8.
+        """
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.codebooks = codebooks
+        self.codes = codes
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int = 0,
+        m: int = 48,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> 'IVFPQIndex':
+        """
+        Train quantizers and encode all vectors.
+
+        Args:
+            vectors: L2-normalized vectors, shape (n, d).
+            nlist: Number of inverted lists (0 = about 4 * sqrt(n)).
+            m: Number of PQ subspaces (reduced to divide d if needed).
+            iterations: k-means iterations.
+            seed: Random seed.
+
+        Returns:
+            IVFPQIndex instance.
+        """
+        n, dimensions = vectors.shape
+        if nlist <= 0:
+            nlist = max(1, min(int(4 * np.sqrt(n)), n // 39))
+        m = _subspace_count(dimensions, m)
+        sub_dim = dimensions // m
+        ksub = min(256, n)
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, TRAINING_POINTS_PER_CENTROID * max(nlist, ksub))
+        sample_ids = np.sort(rng.choice(n, sample_size, replace=False))
+        sample = np.asarray(vectors[sample_ids], dtype=np.float32)
+
+        centroids = kmeans(sample, nlist, iterations, seed)
+        residuals = sample - centroids[_assign(sample, centroids)]
+        residuals = residuals[:TRAINING_POINTS_PER_CENTROID * ksub]
+        codebooks = np.stack([
+            kmeans(residuals[:, j * sub_dim:(j + 1) * sub_dim], ksub, iterations, seed + j + 1)
+            for j in range(m)
+        ])
+
+        labels = np.empty(n, dtype=np.int64)
+        codes = np.empty((n, m), dtype=np.uint8)
+        for start in range(0, n, ASSIGN_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+            block_labels = _assign(block, centroids)
+            block_residuals = block - centroids[block_labels]
+            labels[start:start + len(block)] = block_labels
+            for j in range(m):
+                sub = block_residuals[:, j * sub_dim:(j + 1) * sub_dim]
+                codes[start:start + len(block), j] = _assign(sub, codebooks[j])
+
+        order = np.argsort(labels, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))])
+
+        return cls(centroids, offsets.astype(np.int64), order.astype(np.int64), codebooks, codes[order])
+
+    def search(
+        self,
+        query: np.ndarray,
+        vectors: np.ndarray,
+        k: int,
+        nprobe: int = 8,
+        rerank_factor: int = 10
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k search with exact re-ranking.
+
+        Args:
+            query: L2-normalized query vector, shape (d,).
+            vectors: Full-precision (typically memory-mapped) vectors for re-ranking.
+            k: Number of results.
+            nprobe: Number of inverted lists to scan.
+            rerank_factor: Shortlist size as a multiple of k.
+
+        Returns:
+            Tuple of (row ids, cosine similarities), most similar first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        m, _, sub_dim = self.codebooks.shape
+
+        coarse = ((self.centroids - query) ** 2).sum(axis=1)
+        nprobe = max(1, min(nprobe, self.nlist))
+        probe = np.argpartition(coarse, nprobe - 1)[:nprobe] if nprobe < self.nlist else np.arange(self.nlist)
+
+        candidate_ids = []
+        candidate_distances = []
+        subspaces = np.arange(m)[None, :]
+        for list_id in probe:
+            start, end = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if start == end:
+                continue
+            residual = (query - self.centroids[list_id]).reshape(m, 1, sub_dim)
+            table = ((residual - self.codebooks) ** 2).sum(axis=2)  # (m, ksub)
+            candidate_distances.append(table[subspaces, self.codes[start:end]].sum(axis=1))
+            candidate_ids.append(self.ids[start:end])
+
+        if not candidate_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        distances = np.concatenate(candidate_distances)
+        ids = np.concatenate(candidate_ids)
+
+        shortlist_size = min(len(ids), max(k, k * rerank_factor))
+        if shortlist_size < len(ids):
+            ids = ids[np.argpartition(distances, shortlist_size - 1)[:shortlist_size]]
+
+        # Sorted ids keep reads from the memory-mapped matrix sequential
+        ids = np.sort(ids)
+        scores = np.asarray(vectors[ids], dtype=np.float32) @ query
+
+        top = np.argsort(-scores, kind='stable')[:k]
+        return ids[top], scores[top]
+
+    def save(self, directory: Path) -> None:
+        """
+        Save index files into a store generation directory.
+
+        Args:
+            directory: Target directory.
+        """
+        directory = Path(directory)
+        np.save(directory / CENTROIDS_FILE, self.centroids)
+        np.save(directory / OFFSETS_FILE, self.offsets)
+        np.save(directory / IDS_FILE, self.ids)
+        np.save(directory / CODEBOOKS_FILE, self.codebooks)
+        np.save(directory / CODES_FILE, self.codes)
+
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        """Check whether an index was saved in a directory."""
+        return (Path(directory) / CODES_FILE).exists()
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['IVFPQIndex']:
+        """
+        Load index from a store generation directory.
+
+        Codes and ids are memory-mapped; centroids and codebooks are small
+        and loaded into memory.
+
+        Args:
+            directory: Source directory.
+
+        Returns:
+            IVFPQIndex instance, or None if no index was saved.
+        """
+        directory = Path(directory)
+        if not cls.exists(directory):
+            return None
+        return cls(
+            np.load(directory / CENTROIDS_FILE),
+            np.load(directory / OFFSETS_FILE),
+            np.load(directory / IDS_FILE, mmap_mode='r'),
+            np.load(directory / CODEBOOKS_FILE),
+            np.load(directory / CODES_FILE, mmap_mode='r')
+        )
@@ -0,0 +1,463 @@
+"""Local lexical (BM25) index for DocRAG Kit.
+
+The lexical index lives next to the vector database in ``.docrag/indexes/``
+and is rebuilt by the same pipeline that creates the vector database. It
+answers identifier-heavy queries (class names, config keys, error codes)
+without an embedding call, and its rankings can be fused with vector search
+results using reciprocal rank fusion.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Sequence, Union, overload
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .flat_store import Blob, map_file
+from .search_filters import evaluate_where
+
+
+# Compound identifiers such as ``ProgressIndicator.show_spinner`` or ``retrieval.top_k``
+_COMPOUND_RE = re.compile(r"\w+(?:[.:\-/]\w+)*", re.UNICODE)
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+CHUNKS_FILE = "chunks.bin"
+# Chunk files of earlier versions, removed when the chunks are saved
+LEGACY_CHUNKS_FILES = ["chunks.json"]
+
+# Chunk file header: magic, then version and chunk count as uint64
+CHUNKS_MAGIC = b"DRCHUNKS"
+CHUNKS_VERSION = 1
+CHUNKS_HEADER_BYTES = len(CHUNKS_MAGIC) + 2 * 8
+BM25_FILE = "bm25.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase lexical tokens.
+
+    Compound identifiers are kept whole and additionally split into their
+    snake_case and camelCase parts, so ``ProgressIndicator.show_spinner``
+    matches queries for the full name as well as for ``spinner``.
+
+    Args:
+        text: Text to tokenize.
+
+    Returns:
+        List of tokens (with repetitions).
+    """
+    tokens = []
+    for match in _COMPOUND_RE.finditer(text):
+        compound = match.group(0)
+        parts = _WORD_RE.findall(compound)
+
+        if parts and (len(parts) > 1 or compound != parts[0]):
+            tokens.append(compound.lower())
+
+        for part in parts:
+            tokens.append(part.lower())
+            sub_parts = _CAMEL_RE.findall(part)
+            if len(sub_parts) > 1:
+                tokens.extend(sub.lower() for sub in sub_parts)
+
+    return tokens
+
+
+def document_key(doc: Document) -> Tuple[str, Any]:
+    """
+    Build a stable identity key for a chunk.
+
+    Args:
+        doc: Document chunk.
+
+    Returns:
+        Tuple identifying the chunk across vector and lexical results.
+    """
+    metadata = doc.metadata or {}
+    if 'chunk_id' in metadata:
+        return (metadata.get('source', ''), metadata['chunk_id'])
+    return ('', hash(doc.page_content))
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Iterable[List[Document]],
+    k: int = 60,
+    limit: Optional[int] = None
+) -> List[Document]:
+    """
+    Fuse several ranked result lists with reciprocal rank fusion.
+
+    Each document scores ``sum(1 / (k + rank))`` over the lists it appears
+    in, so documents ranked well by both retrievers rise to the top without
+    having to calibrate BM25 scores against vector distances.
+
+    Args:
+        ranked_lists: Result lists, each ordered best first.
+        k: Damping constant (60 is the value from the original paper).
+        limit: Maximum number of documents to return.
+
+    Returns:
+        Fused list of unique documents, best first.
+    """
+    return [doc for doc, _ in reciprocal_rank_scores(ranked_lists, k=k, limit=limit)]
+
+
+def reciprocal_rank_scores(
+    ranked_lists: Iterable[List[Document]],
+    k: int = 60,
+    limit: Optional[int] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Fuse ranked result lists like ``reciprocal_rank_fusion``, keeping scores.
+
+    Args:
+        ranked_lists: Result lists, each ordered best first.
+        k: Damping constant.
+        limit: Maximum number of documents to return.
+
+    Returns:
+        List of (Document, fused score) tuples, best first.
+    """
+    scores: Dict[Tuple[str, Any], float] = {}
+    documents: Dict[Tuple[str, Any], Document] = {}
+
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked, 1):
+            key = document_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, doc)
+
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+
+    return [(documents[key], scores[key]) for key in ordered]
+
+
+def hybrid_scores(
+    vector_hits: List[Tuple[Document, float]],
+    lexical_hits: List[Tuple[Document, float]],
+    k: int = 60,
+    limit: Optional[int] = None,
+    vector_only: bool = False
+) -> List[Tuple[Document, float]]:
+    """
+    Fuse vector and lexical hits the way hybrid ``search_docs`` ranks them.
+
+    Args:
+        vector_hits: (Document, similarity) tuples from vector search, best first.
+        lexical_hits: (Document, BM25 score) tuples, best first.
+        k: Reciprocal rank fusion damping constant (``retrieval.rrf_k``).
+        limit: Maximum number of documents to return.
+        vector_only: Keep only documents found by vector search. Fused
+            scores are ranks, not similarities, so this is how a
+            ``min_score`` threshold applied to vector search carries over.
+
+    Returns:
+        List of (Document, fused score) tuples, best first.
+    """
+    fused = reciprocal_rank_scores(
+        [[doc for doc, _ in vector_hits], [doc for doc, _ in lexical_hits]],
+        k=k,
+        limit=None if vector_only else limit
+    )
+    if vector_only:
+        found = {document_key(doc) for doc, _ in vector_hits}
+        fused = [(doc, score) for doc, score in fused if document_key(doc) in found][:limit]
+    return fused
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """
+    Write JSON to a temporary file and atomically move it into place.
+
+    Args:
+        path: Destination path.
+        data: JSON-serializable data.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def _offsets(items: List[bytes], start: int) -> np.ndarray:
+    """Positions of items written back to back from ``start`` (``len + 1`` values)."""
+    offsets = np.full(len(items) + 1, start, dtype=np.int64)
+    np.cumsum([len(item) for item in items], out=offsets[1:])
+    offsets[1:] += start
+    return offsets
+
+
+def save_chunks(index_dir: Path, chunks: List[Document]) -> None:
+    """
+    Save chunk texts and metadata shared by the local indexes.
+
+    Texts and JSON metadata are written as two blobs in one file, preceded
+    by their offset arrays, and the file is atomically moved into place.
+
+    Args:
+        index_dir: Directory holding the local indexes.
+        chunks: Document chunks in index order.
+    """
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    texts = [chunk.page_content.encode('utf-8') for chunk in chunks]
+    metadatas = [json.dumps(chunk.metadata, ensure_ascii=False).encode('utf-8') for chunk in chunks]
+    text_offsets = _offsets(texts, CHUNKS_HEADER_BYTES + 16 * (len(chunks) + 1))
+    metadata_offsets = _offsets(metadatas, int(text_offsets[-1]))
+
+    path = index_dir / CHUNKS_FILE
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(CHUNKS_MAGIC)
+        np.array([CHUNKS_VERSION, len(chunks)], dtype=np.uint64).tofile(f)
+        text_offsets.tofile(f)
+        metadata_offsets.tofile(f)
+        f.writelines(texts)
+        f.writelines(metadatas)
+    os.replace(tmp_path, path)
+
+    for legacy in LEGACY_CHUNKS_FILES:
+        (index_dir / legacy).unlink(missing_ok=True)
+
+
+def load_chunks(index_dir: Path) -> 'ChunkStore':
+    """
+    Load chunk texts and metadata shared by the local indexes.
+
+    Args:
+        index_dir: Directory holding the local indexes.
+
+    Returns:
+        Memory-mapped ChunkStore in index order.
+
+    Raises:
+        ValueError: If the file is not a chunk file of this version.
+    """
+    path = Path(index_dir) / CHUNKS_FILE
+    data = map_file(path)
+    if len(data) < CHUNKS_HEADER_BYTES or data[:len(CHUNKS_MAGIC)] != CHUNKS_MAGIC:
+        raise ValueError(f"ERROR: Unsupported chunk file: {path}")
+    header = np.frombuffer(data, dtype=np.uint64, count=2, offset=len(CHUNKS_MAGIC))
+    version, count = int(header[0]), int(header[1])
+    if version != CHUNKS_VERSION:
+        raise ValueError(f"ERROR: Unsupported chunk file: {path}")
+
+    offsets = np.frombuffer(data, dtype=np.int64, count=2 * (count + 1), offset=CHUNKS_HEADER_BYTES)
+    return ChunkStore(Blob(data, offsets[:count + 1]), Blob(data, offsets[count + 1:]))
+
+
+class ChunkStore(Sequence[Document]):
+    """Memory-mapped chunks; each chunk is decoded when it is accessed."""
+
+    def __init__(self, texts: Blob, metadata: Blob):
+        """
+        Initialize chunk store.
+
+        Args:
+            texts: UTF-8 chunk texts.
+            metadata: JSON chunk metadata.
+        """
+        self.texts = texts
+        self.metadata = metadata
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @overload
+    def __getitem__(self, index: int) -> Document: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Document]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Document, List[Document]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("chunk index out of range")
+        index %= len(self)
+        return Document(page_content=self.get_text(index), metadata=self.get_metadata(index))
+
+    def get_text(self, index: int) -> str:
+        return self.texts.get(index).decode('utf-8')
+
+    def get_metadata(self, index: int) -> Dict[str, Any]:
+        metadata: Dict[str, Any] = json.loads(self.metadata.get(index))
+        return metadata
+
+
+class BM25Index:
+    """Okapi BM25 inverted index over document chunks."""
+
+    def __init__(
+        self,
+        documents: Sequence[Document],
+        postings: Dict[str, List[List[int]]],
+        doc_lengths: List[int],
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        """
+        Initialize BM25 index from prebuilt postings.
+
+        Args:
+            documents: Document chunks (a list or ChunkStore), indexed by position.
+            postings: Mapping of term to list of ``[doc_id, term_frequency]`` pairs.
+            doc_lengths: Token count of each document.
+            k1: Term frequency saturation parameter.
+            b: Length normalization parameter.
+        """
+        self.documents = documents
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        # Metadata field -> values per document, built on first filtered search
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, chunks: List[Document], k1: float = 1.5, b: float = 0.75) -> 'BM25Index':
+        """
+        Build BM25 index from document chunks.
+
+        Args:
+            chunks: Document chunks to index.
+            k1: Term frequency saturation parameter.
+            b: Length normalization parameter.
+
+        Returns:
+            BM25Index instance.
+        """
+        postings: Dict[str, List[List[int]]] = {}
+        doc_lengths = []
+
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk.page_content)
+            doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append([doc_id, frequency])
+
+        return cls(list(chunks), postings, doc_lengths, k1=k1, b=b)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        candidate_ids: Optional[Iterable[int]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search the index.
+
+        Args:
+            query: Free-text query.
+            k: Maximum number of results.
+            candidate_ids: Optional set of document ids to restrict scoring to.
+
+        Returns:
+            List of (Document, score) tuples, best first.
+        """
+        if not self.documents or k < 1:
+            return []
+
+        allowed = set(candidate_ids) if candidate_ids is not None else None
+        total_docs = len(self.documents)
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+
+            doc_freq = len(term_postings)
+            idf = math.log(1.0 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+            for doc_id, frequency in term_postings:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                length_norm = 1.0 - self.b + self.b * (self.doc_lengths[doc_id] / (self.avg_doc_length or 1.0))
+                term_score = idf * frequency * (self.k1 + 1.0) / (frequency + self.k1 * length_norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + term_score
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.documents[doc_id], score) for doc_id, score in best]
+
+    def column(self, field: str) -> np.ndarray:
+        """Values of one metadata field for every document (None where missing)."""
+        values = self._columns.get(field)
+        if values is None:
+            documents = self.documents
+            if isinstance(documents, ChunkStore):
+                # Decode only the metadata, not the chunk texts
+                metadatas: Iterable[Dict[str, Any]] = map(documents.get_metadata, range(len(documents)))
+            else:
+                metadatas = (doc.metadata for doc in documents)
+            values = np.empty(len(documents), dtype=object)
+            values[:] = [metadata.get(field) for metadata in metadatas]
+            self._columns[field] = values
+        return values
+
+    def matching_ids(self, where: Dict[str, Any]) -> np.ndarray:
+        """
+        Get ids of documents whose metadata satisfies a ``where`` clause.
+
+        Args:
+            where: ChromaDB-style ``where`` clause.
+
+        Returns:
+            Sorted document ids.
+        """
+        if not self.documents:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(evaluate_where(where, self.column))
+
+    def save(self, index_dir: Path) -> None:
+        """
+        Save index to disk (chunks are saved separately via ``save_chunks``).
+
+        Args:
+            index_dir: Directory holding the local indexes.
+        """
+        atomic_write_json(Path(index_dir) / BM25_FILE, {
+            'version': 1,
+            'k1': self.k1,
+            'b': self.b,
+            'doc_lengths': self.doc_lengths,
+            'postings': self.postings
+        })
+
+    @classmethod
+    def load(cls, index_dir: Path, documents: Optional[Sequence[Document]] = None) -> 'BM25Index':
+        """
+        Load index from disk.
+
+        Args:
+            index_dir: Directory holding the local indexes.
+            documents: Already loaded chunks. Loaded from disk if None.
+
+        Returns:
+            BM25Index instance.
+        """
+        index_dir = Path(index_dir)
+        with open(index_dir / BM25_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if documents is None:
+            documents = load_chunks(index_dir)
+
+        return cls(
+            documents,
+            data['postings'],
+            data['doc_lengths'],
+            k1=data.get('k1', 1.5),
+            b=data.get('b', 0.75)
+        )
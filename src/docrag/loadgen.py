@@ -0,0 +1,410 @@
+"""MCP load generator for DocRAG Kit.
+
+Drives a running DocRAG MCP server the way several agent sessions sharing
+it would: a weighted mix of tool calls is issued over one MCP session at a
+target rate, with at most ``concurrency`` calls in flight, and the report
+gives throughput, per-tool latency percentiles, error rates and the
+server's resident memory over time.
+
+With a target rate the load is open-loop: calls are scheduled at fixed
+intervals and latency is measured from the scheduled start, so a server
+that falls behind shows it in the percentiles instead of silently slowing
+the generator down. Without a rate, ``concurrency`` workers call back to
+back (closed loop, maximum throughput).
+
+Transports: ``stdio`` launches the server as a subprocess (the default
+``python -m docrag.mcp_server``); ``http`` (streamable HTTP) and ``sse``
+connect to a server URL.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .bench import prepare_workspace, sample_queries
+from .stats import latency_summary
+
+
+DEFAULT_MIX: Dict[str, float] = {'search_docs': 70, 'answer_question': 20, 'list_indexed_docs': 8, 'reindex_docs': 2}
+
+DEFAULT_QUESTIONS = [
+    "How do I install the project?",
+    "How is authentication configured?",
+    "What API endpoints are available?",
+    "How do I deploy to production?",
+    "Where are environment variables documented?",
+    "How do I run the tests?",
+]
+
+# Seconds between server memory samples
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a tool mix such as ``search_docs=70,answer_question=30``.
+
+    Args:
+        text: Comma-separated ``tool=weight`` pairs.
+
+    Returns:
+        Mapping of tool name to weight.
+
+    Raises:
+        ValueError: If a pair is malformed or no weight is positive.
+    """
+    mix = {}
+    for pair in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = pair.partition('=')
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"ERROR: Invalid tool mix entry: {pair!r} (expected tool=weight)")
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("ERROR: Tool mix needs at least one positive weight")
+    return mix
+
+
+def tool_arguments(tool: str, question: str, reindex_force: bool = False) -> Dict[str, Any]:
+    """
+    Build arguments for one call.
+
+    Args:
+        tool: Tool name.
+        question: Question for the query tools.
+        reindex_force: Let ``reindex_docs`` rebuild; otherwise it only checks.
+
+    Returns:
+        Tool arguments.
+    """
+    if tool in ('search_docs', 'answer_question'):
+        return {'question': question}
+    if tool == 'grep_docs':
+        return {'pattern': question.split()[0] if question.split() else 'docs', 'ignore_case': True}
+    if tool == 'find_symbol':
+        return {'name': question.split()[-1].strip('?.') if question.split() else 'main', 'prefix': True}
+    if tool == 'reindex_docs':
+        return {'force': True} if reindex_force else {'check_only': True}
+    return {}
+
+
+@asynccontextmanager
+async def open_session(
+    transport: str = 'stdio',
+    command: Optional[List[str]] = None,
+    url: Optional[str] = None,
+    cwd: Optional[Path] = None,
+    errlog=None
+):
+    """
+    Connect and initialize an MCP client session.
+
+    Args:
+        transport: ``stdio``, ``http`` (streamable HTTP) or ``sse``.
+        command: Server command for stdio. Defaults to ``python -m docrag.mcp_server``.
+        url: Server URL for http and sse.
+        cwd: Working directory (project) of a stdio server.
+        errlog: File receiving a stdio server's stderr.
+
+    Yields:
+        Initialized ``mcp.ClientSession``.
+    """
+    from mcp import ClientSession
+
+    if transport == 'stdio':
+        from mcp.client.stdio import StdioServerParameters, stdio_client
+        command = command or [sys.executable, "-m", "docrag.mcp_server"]
+        params = StdioServerParameters(
+            command=command[0], args=command[1:], cwd=str(cwd) if cwd else None, env=dict(os.environ)
+        )
+        client = stdio_client(params, errlog=errlog or sys.stderr)
+    elif transport not in ('http', 'sse'):
+        raise ValueError(f"ERROR: Unsupported transport: {transport} (stdio, http, sse)")
+    elif not url:
+        raise ValueError(f"ERROR: A server URL is required for the {transport} transport")
+    elif transport == 'http':
+        from mcp.client import streamable_http
+        # streamablehttp_client was renamed in later mcp releases; use whichever is available
+        connect = getattr(streamable_http, 'streamable_http_client', None) or streamable_http.streamablehttp_client
+        client = connect(url)
+    else:
+        from mcp.client.sse import sse_client
+        client = sse_client(url)
+
+    async with client as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            yield session
+
+
+def prepare_indexed_workspace(
+    work_dir: Path,
+    project_root: Optional[Path] = None,
+    corpus_files: int = 200,
+    fake: bool = True,
+    fake_latency: float = 0.0,
+    fake_tokens_per_second: float = 0.0,
+    num_questions: int = 50,
+    seed: int = 0
+) -> Tuple[Path, List[str]]:
+    """
+    Index a throwaway workspace for a stdio server to run in.
+
+    Args:
+        work_dir: Empty directory to set up.
+        project_root: Project to copy the configuration from and index. None
+            generates a corpus and uses the fake providers.
+        corpus_files: Files in the generated corpus.
+        fake: Use the fake providers for a project too.
+        fake_latency: Simulated provider latency for fake providers.
+        fake_tokens_per_second: Simulated answer throughput for fake providers.
+        num_questions: Questions sampled from the indexed chunks.
+        seed: Corpus and question seed.
+
+    Returns:
+        Tuple of (workspace directory, sampled questions).
+
+    Raises:
+        ValueError: If there is no configuration or nothing to index.
+    """
+    from .document_processor import DocumentProcessor
+    from .vector_db import VectorDBManager
+
+    workspace, source_root, config = prepare_workspace(
+        work_dir, project_root, corpus_files, fake, fake_latency, fake_tokens_per_second, seed
+    )
+    config_dict = config.to_dict()
+    chunks, _ = DocumentProcessor(config_dict).process(source_root)
+    if not chunks:
+        raise ValueError("ERROR: No files found to index")
+    VectorDBManager(config_dict, workspace).create_database(chunks, show_progress=False)
+    return workspace, sample_queries(chunks, num_questions, seed)
+
+
+def find_server_process(command: Optional[List[str]] = None):
+    """
+    Find a stdio server started by this process.
+
+    Args:
+        command: Server command; matched against child command lines.
+
+    Returns:
+        ``psutil.Process`` of the newest matching child, or None.
+    """
+    import psutil
+    marker = (command or ["docrag.mcp_server"])[-1]
+    children = [
+        child for child in psutil.Process().children(recursive=True)
+        if any(marker in part for part in _cmdline(child))
+    ]
+    return max(children, key=lambda child: child.create_time()) if children else None
+
+
+def _cmdline(process) -> List[str]:
+    try:
+        cmdline: List[str] = process.cmdline()
+        return cmdline
+    except Exception:
+        return []
+
+
+def _rss_mb(process) -> Tuple[float, float]:
+    # (server RSS, server plus children such as reindex workers)
+    try:
+        rss = process.memory_info().rss
+        total = rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except Exception:
+                continue
+        return rss / 1024 / 1024, total / 1024 / 1024
+    except Exception:
+        return 0.0, 0.0
+
+
+async def run_load(
+    session,
+    mix: Optional[Dict[str, float]] = None,
+    questions: Optional[List[str]] = None,
+    concurrency: int = 4,
+    rate: float = 0.0,
+    duration: float = 30.0,
+    max_calls: int = 0,
+    seed: int = 0,
+    server_process=None,
+    reindex_force: bool = False
+) -> Dict[str, Any]:
+    """
+    Run a load test over an initialized session.
+
+    Args:
+        session: ``mcp.ClientSession``.
+        mix: Tool name to weight. Defaults to ``DEFAULT_MIX``.
+        questions: Questions cycled through by the query tools. Defaults to
+            ``DEFAULT_QUESTIONS``.
+        concurrency: Maximum calls in flight.
+        rate: Target calls per second; 0 runs ``concurrency`` closed-loop workers.
+        duration: Seconds to issue calls for.
+        max_calls: Stop after this many calls (0 = no limit).
+        seed: Seed for the tool and question sequence.
+        server_process: ``psutil.Process`` whose memory is sampled.
+        reindex_force: Let ``reindex_docs`` calls rebuild the index.
+
+    Returns:
+        Report with ``elapsed_s``, ``calls``, ``errors``, ``throughput``
+        (completed calls per second), ``tools`` (per-tool counts, error
+        rate and latency percentiles) and ``rss`` (samples and peak).
+    """
+    tool_weights = mix or DEFAULT_MIX
+    questions = questions or DEFAULT_QUESTIONS
+    tools = [tool for tool, weight in tool_weights.items() if weight > 0]
+    weights = np.array([tool_weights[tool] for tool in tools], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    total = max_calls or 1 << 62
+
+    def plan(n: int) -> Tuple[str, Dict[str, Any]]:
+        tool = tools[int(rng.choice(len(tools), p=weights / weights.sum()))]
+        return tool, tool_arguments(tool, questions[n % len(questions)], reindex_force)
+
+    latencies: Dict[str, List[float]] = {tool: [] for tool in tools}
+    errors: Dict[str, int] = {tool: 0 for tool in tools}
+    error_samples: List[str] = []
+    rss_samples: List[Dict[str, float]] = []
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def call(tool: str, arguments: Dict[str, Any], scheduled: float) -> None:
+        failed = False
+        try:
+            result = await session.call_tool(tool, arguments)
+            text = "".join(getattr(part, 'text', '') for part in result.content)
+            # The server reports failures as text starting with ERROR:
+            failed = result.isError or text.startswith("ERROR:")
+            if failed and len(error_samples) < 5:
+                error_samples.append(f"{tool}: {text.splitlines()[0] if text else 'error'}")
+        except Exception as e:
+            failed = True
+            if len(error_samples) < 5:
+                error_samples.append(f"{tool}: {e}")
+        latencies[tool].append(time.perf_counter() - scheduled)
+        if failed:
+            errors[tool] += 1
+
+    async def sample_memory() -> None:
+        while True:
+            rss, total_rss = _rss_mb(server_process)
+            rss_samples.append({
+                't': round(time.perf_counter() - start, 3),
+                'rss_mb': round(rss, 1),
+                'total_mb': round(total_rss, 1)
+            })
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    sampler = asyncio.create_task(sample_memory()) if server_process is not None else None
+    issued = 0
+
+    if rate > 0:
+        # Open loop: fixed schedule, bounded in-flight calls
+        limit = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        async def bounded(tool, arguments, scheduled):
+            async with limit:
+                await call(tool, arguments, scheduled)
+
+        while issued < total:
+            scheduled = start + issued / rate
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tool, arguments = plan(issued)
+            tasks.append(asyncio.create_task(bounded(tool, arguments, scheduled)))
+            issued += 1
+        await asyncio.gather(*tasks)
+    else:
+        async def worker():
+            nonlocal issued
+            while issued < total and time.perf_counter() < deadline:
+                tool, arguments = plan(issued)
+                issued += 1
+                await call(tool, arguments, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - start
+    if sampler is not None:
+        sampler.cancel()
+        rss, total_rss = _rss_mb(server_process)
+        rss_samples.append({'t': round(elapsed, 3), 'rss_mb': round(rss, 1), 'total_mb': round(total_rss, 1)})
+
+    calls = sum(len(values) for values in latencies.values())
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'calls': calls,
+        'errors': sum(errors.values()),
+        'throughput': calls / elapsed if elapsed else 0.0,
+        'concurrency': concurrency,
+        'rate': rate,
+        'tools': {
+            tool: {
+                **latency_summary(latencies[tool]),
+                'calls': len(latencies[tool]),
+                'errors': errors[tool],
+                'error_rate': errors[tool] / len(latencies[tool]) if latencies[tool] else 0.0,
+                'throughput': len(latencies[tool]) / elapsed if elapsed else 0.0
+            }
+            for tool in tools
+        },
+        'error_samples': error_samples,
+        'rss': {
+            'samples': rss_samples,
+            'start_mb': rss_samples[0]['rss_mb'] if rss_samples else None,
+            'peak_mb': max((s['rss_mb'] for s in rss_samples), default=None),
+            'end_mb': rss_samples[-1]['rss_mb'] if rss_samples else None
+        }
+    }
+
+
+async def load_test(
+    transport: str = 'stdio',
+    command: Optional[List[str]] = None,
+    url: Optional[str] = None,
+    cwd: Optional[Path] = None,
+    server_pid: Optional[int] = None,
+    errlog=None,
+    **options
+) -> Dict[str, Any]:
+    """
+    Connect to a server and run ``run_load``.
+
+    Args:
+        transport: ``stdio``, ``http`` or ``sse``.
+        command: Server command for stdio.
+        url: Server URL for http and sse.
+        cwd: Project directory of a stdio server.
+        server_pid: PID to sample memory of (found automatically for stdio).
+        errlog: File receiving a stdio server's stderr.
+        **options: ``run_load`` options (mix, questions, concurrency, ...).
+
+    Returns:
+        ``run_load`` report.
+    """
+    import psutil
+
+    async with open_session(transport, command, url, cwd, errlog) as session:
+        if server_pid:
+            process = psutil.Process(server_pid)
+        elif transport == 'stdio':
+            process = find_server_process(command)
+        else:
+            process = None
+        return await run_load(session, server_process=process, **options)
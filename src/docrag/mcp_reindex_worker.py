@@ -106,8 +106,19 @@ def main():
         # Parse configuration
         config_dict = json.loads(config_json)
         
-        # Perform reindexing
-        result = perform_isolated_reindex(project_root, config_dict, reason)
+        # Perform reindexing; spans join the calling tool's trace (TRACEPARENT)
+        from .tracing import Tracer, TRACEPARENT_ENV, activate, span
+        tracer = Tracer.from_config(Path(project_root), config_dict)
+        try:
+            with activate(tracer), span('reindex', traceparent=os.environ.get(TRACEPARENT_ENV), reason=reason) as run:
+                result = perform_isolated_reindex(project_root, config_dict, reason)
+                stats = result.get("stats", {})
+                run.set_attributes(files=stats.get('files_processed', 0), chunks=stats.get('chunks_created', 0))
+                if not result["success"]:
+                    run.mark_error(result.get("error", ""))
+        finally:
+            if tracer is not None:
+                tracer.shutdown()
         
         # Output result as JSON
         print(json.dumps(result))
@@ -9,7 +9,8 @@ The server provides three main tools:
 1. search_docs: Fast semantic search returning relevant document fragments
    - Best for agents that need to quickly find specific documentation
    - Returns raw document chunks with source files
-   - No LLM processing, just vector similarity search
+   - No LLM processing, hybrid BM25 + vector search fused with RRF
+   - Lexical mode answers from the local BM25 index without an embedding call
    
 2. answer_question: AI-generated comprehensive answers
    - Best for complex questions requiring synthesis and explanation
@@ -18,6 +19,16 @@ The server provides three main tools:
    
 3. list_indexed_docs: List all indexed documentation files
 
+4. grep_docs: Exact substring or regex search over indexed chunks
+   - Candidate chunks are narrowed with a trigram index before matching
+   - Returns file and line matches without touching the filesystem
+
+5. find_symbol: Locate class, function and method definitions in indexed code
+   - Binary search over a symbol table built at index time
+
+6. server_stats: Per-tool and per-phase latency, cache hit rates, calls in
+   flight and index generation (see metrics.py)
+
 Requirements covered:
 - 5.1-5.12: MCP server functionality
 - 10.1-10.6: Error handling and user feedback
@@ -29,23 +40,44 @@ Usage:
 """
 
 import asyncio
+import contextlib
+import json
 import os
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp import types
 
+from langchain_core.documents import Document
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from .config_manager import ConfigManager
 from .vector_db import VectorDBManager
+from .lexical_index import document_key, hybrid_scores
+from .sharding import FILTER_OVERFETCH, in_directories
+from .context_builder import ContextPacker, merge_chunks
+from .compression import compress_documents
+from .fake_providers import FakeChatModel
+from .instrumentation import PhaseTimedEmbeddings, CallRecord, track_call, phase, record_chunks, record_tokens
+from .query_log import QueryLog
+from .metrics import ServerMetrics, format_stats, prometheus_text, write_textfile
+from .profiling import ProfileRun, PROFILES_DIR, PROFILE_ENV, parse_profile_env, prune_profiles
+from .tracing import Tracer, TRACEPARENT_ENV, activate, span, set_attributes, current_span, is_recording
+
+
+# Tools handled by dispatch_tool (metrics record other names as "unknown")
+TOOL_NAMES = [
+    'search_docs', 'answer_question', 'list_indexed_docs', 'grep_docs',
+    'find_symbol', 'reindex_docs', 'server_stats'
+]
 
 
 class MCPServer:
@@ -89,6 +121,31 @@ class MCPServer:
         # Initialize vector database manager
         self.vector_db = VectorDBManager(self.config, self.project_root)
         
+        # Embedding calls are timed per tool call (see instrumentation)
+        self.vector_db.embeddings = PhaseTimedEmbeddings(self.vector_db.embeddings)
+        
+        # Optional log of every tool call (server.query_log)
+        self.query_log = QueryLog.from_config(self.project_root, self.config)
+        
+        # Per-tool and per-phase metrics (server_stats tool, server.metrics_textfile)
+        server_config = self.config.get('server', {})
+        self.metrics = ServerMetrics(slow_call_ms=server_config.get('slow_call_ms', 2000.0), tools=TOOL_NAMES)
+        textfile = server_config.get('metrics_textfile')
+        self.metrics_textfile = self.project_root / textfile if textfile else None
+        self._metrics_written = 0.0
+        
+        # Per-call profiling (DOCRAG_PROFILE); one profile runs at a time
+        try:
+            self.profile_settings = parse_profile_env(os.environ.get(PROFILE_ENV))
+        except ValueError as e:
+            print(f"WARNING: {e} (profiling disabled)", file=sys.stderr)
+            self.profile_settings = None
+        self._profiling = False
+        
+        # Spans of tool calls (tracing.enabled); reindex_docs calls in flight
+        self.tracer = Tracer.from_config(self.project_root, self.config)
+        self._reindexing = 0
+        
         # QA chain will be lazily loaded
         self._qa_chain = None
         
@@ -120,10 +177,47 @@ class MCPServer:
                             },
                             "max_results": {
                                 "type": "integer",
-                                "description": "Maximum number of results to return (1-10). Default: 3",
+                                "description": "Number of results to fetch from the index (1-10). Default: 3",
                                 "default": 3,
                                 "minimum": 1,
                                 "maximum": 10
+                            },
+                            "mode": {
+                                "type": "string",
+                                "enum": ["hybrid", "vector", "lexical"],
+                                "description": "Search mode: 'hybrid' fuses keyword (BM25) and semantic results, "
+                                              "'vector' is semantic only, 'lexical' is keyword only and needs no "
+                                              "embedding call (fastest, best for exact identifiers and error codes). "
+                                              "Default: retrieval.search_mode from config"
+                            },
+                            "directories": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Only search files in these directories, relative to the project root "
+                                              "(e.g. ['docs', 'src/api']). Faster on sharded indexes. Default: all"
+                            },
+                            "min_score": {
+                                "type": "number",
+                                "description": "Drop results with a cosine similarity below this value "
+                                              "(-1 to 1, 1.0 is an exact match, the same scale on every vector "
+                                              "backend). In hybrid mode only results that pass it on the vector "
+                                              "side are returned, and each reports its similarity next to the "
+                                              "fused score. Not allowed in lexical mode. Default: none"
+                            },
+                            "file_types": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Only search files with these extensions (e.g. ['md', 'py']). Default: all"
+                            },
+                            "path_prefix": {
+                                "type": "string",
+                                "description": "Only search files whose path relative to the project root starts with "
+                                              "this prefix (e.g. 'docs/api/'). Default: none"
+                            },
+                            "path_glob": {
+                                "type": "string",
+                                "description": "Only search files whose relative path matches this glob "
+                                              "(e.g. 'src/**/*.py'; '*' also matches '/'). Default: none"
                             }
                         },
                         "required": ["question"]
@@ -163,6 +257,85 @@ class MCPServer:
                         "required": []
                     }
                 ),
+                types.Tool(
+                    name="grep_docs",
+                    description="Exact substring or regular expression search across the indexed documentation. "
+                                "Returns matching lines with file and line numbers. Use instead of filesystem grep "
+                                "or repeated search_docs calls when you know the exact text. "
+                                "Поиск точной подстроки или регулярного выражения по проиндексированной документации.",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "pattern": {
+                                "type": "string",
+                                "description": "Python regular expression (or literal text with fixed_string=true)"
+                            },
+                            "ignore_case": {
+                                "type": "boolean",
+                                "description": "Case-insensitive matching. Default: false",
+                                "default": False
+                            },
+                            "fixed_string": {
+                                "type": "boolean",
+                                "description": "Treat pattern as literal text instead of a regex. Default: false",
+                                "default": False
+                            },
+                            "max_results": {
+                                "type": "integer",
+                                "description": "Maximum number of matching lines to return (1-200). Default: 50",
+                                "default": 50,
+                                "minimum": 1,
+                                "maximum": 200
+                            }
+                        },
+                        "required": ["pattern"]
+                    }
+                ),
+                types.Tool(
+                    name="find_symbol",
+                    description="Find where a class, function or method is defined in the indexed code. "
+                                "Accepts plain or qualified names (e.g. 'show_spinner' or 'ProgressIndicator.show_spinner'). "
+                                "Faster and more precise than search_docs for 'where is X defined' questions. "
+                                "Найти определение класса, функции или метода в проиндексированном коде.",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Symbol name, optionally qualified with its class (case-insensitive)"
+                            },
+                            "kind": {
+                                "type": "string",
+                                "description": "Only return symbols of this kind (class, function, method, interface, struct, ...)"
+                            },
+                            "prefix": {
+                                "type": "boolean",
+                                "description": "Match names starting with the given text. Default: false",
+                                "default": False
+                            }
+                        },
+                        "required": ["name"]
+                    }
+                ),
+                types.Tool(
+                    name="server_stats",
+                    description="Server performance statistics: calls, errors and latency per tool, "
+                                "time per phase (staleness check, embedding, search, LLM), cache hit rates, "
+                                "calls in flight and index generation. "
+                                "Статистика производительности сервера.",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "format": {
+                                "type": "string",
+                                "enum": ["text", "json", "prometheus"],
+                                "description": "Output format. Default: text",
+                                "default": "text"
+                            }
+                        },
+                        "required": []
+                    }
+                ),
                 types.Tool(
                     name="reindex_docs",
                     description="Reindex project documentation when documents have been updated. "
@@ -190,39 +363,111 @@ class MCPServer:
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> list[types.TextContent]:
             """Handle tool calls."""
-            try:
-                if name == "search_docs":
-                    result = await self.handle_search_docs(
-                        question=arguments.get("question", ""),
-                        max_results=arguments.get("max_results", 3)
-                    )
-                    return [types.TextContent(type="text", text=result)]
-                
-                elif name == "answer_question":
-                    result = await self.handle_answer_question(
-                        question=arguments.get("question", ""),
-                        include_sources=arguments.get("include_sources", True)
-                    )
-                    return [types.TextContent(type="text", text=result)]
-                
-                elif name == "list_indexed_docs":
-                    result = await self.handle_list_docs()
-                    return [types.TextContent(type="text", text=result)]
-                
-                elif name == "reindex_docs":
-                    result = await self.handle_reindex_docs(
-                        force=arguments.get("force", False),
-                        check_only=arguments.get("check_only", False)
-                    )
-                    return [types.TextContent(type="text", text=result)]
-                
-                else:
-                    error_msg = f"ERROR: Unknown tool: {name}"
-                    return [types.TextContent(type="text", text=error_msg)]
-            
-            except Exception as e:
-                error_msg = self._format_error(e)
-                return [types.TextContent(type="text", text=error_msg)]
+            result, _ = await self.run_tool(name, arguments)
+            return [types.TextContent(type="text", text=result)]
+
+    async def run_tool(self, name: str, arguments: Dict[str, Any]) -> Tuple[str, CallRecord]:
+        """
+        Run a tool call with per-phase timing and append it to the query log.
+        
+        Args:
+            name: Tool name.
+            arguments: Tool arguments.
+        
+        Returns:
+            Tuple of (result text, call record). Errors are returned as
+            ``ERROR:`` text, as the client sees them.
+        """
+        profile = self._start_profile(name)
+        # Note reindexing around the call, to tell slow calls slowed by a reindex
+        own_reindex = 1 if name == "reindex_docs" else 0
+        reindexing = self._reindexing > 0
+        built_at = self.vector_db.index_built_at() if self.tracer is not None else None
+        self._reindexing += own_reindex
+        try:
+            with activate(self.tracer), span(name, kind='server', concurrent_calls=self.metrics.in_flight) as call_span:
+                with self.metrics.track_in_flight(), track_call(name, arguments) as record:
+                    try:
+                        with profile or contextlib.nullcontext():
+                            result = await self.dispatch_tool(name, arguments or {})
+                    except Exception as e:
+                        result = self._format_error(e)
+                index_built_at = self.vector_db.index_built_at()
+                call_span.set_attributes(
+                    result_chars=len(result),
+                    chunks=len(record.chunk_ids),
+                    reindex_running=reindexing or self._reindexing > own_reindex,
+                    index_rebuilt=index_built_at != built_at
+                )
+                if result.startswith("ERROR:"):
+                    call_span.mark_error(result.splitlines()[0])
+        finally:
+            self._reindexing -= own_reindex
+            if profile is not None:
+                self._profiling = False
+        if profile is not None:
+            self._finish_profile(profile, record)
+        self.metrics.observe_call(record, result.startswith("ERROR:"))
+        self.metrics.observe_index(index_built_at)
+        if self.query_log is not None:
+            self.query_log.write(record, result)
+        self._write_metrics_textfile()
+        return result, record
+
+    async def dispatch_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        """
+        Call the handler of a tool.
+        
+        Raises:
+            ValueError: If the handler fails.
+        """
+        if name == "search_docs":
+            return await self.handle_search_docs(
+                question=arguments.get("question", ""),
+                max_results=arguments.get("max_results", 3),
+                mode=arguments.get("mode"),
+                directories=arguments.get("directories"),
+                min_score=arguments.get("min_score"),
+                file_types=arguments.get("file_types"),
+                path_prefix=arguments.get("path_prefix"),
+                path_glob=arguments.get("path_glob")
+            )
+        
+        elif name == "answer_question":
+            return await self.handle_answer_question(
+                question=arguments.get("question", ""),
+                include_sources=arguments.get("include_sources", True)
+            )
+        
+        elif name == "list_indexed_docs":
+            return await self.handle_list_docs()
+        
+        elif name == "grep_docs":
+            return await self.handle_grep_docs(
+                pattern=arguments.get("pattern", ""),
+                ignore_case=arguments.get("ignore_case", False),
+                fixed_string=arguments.get("fixed_string", False),
+                max_results=arguments.get("max_results", 50)
+            )
+        
+        elif name == "find_symbol":
+            return await self.handle_find_symbol(
+                name=arguments.get("name", ""),
+                kind=arguments.get("kind"),
+                prefix=arguments.get("prefix", False)
+            )
+        
+        elif name == "reindex_docs":
+            return await self.handle_reindex_docs(
+                force=arguments.get("force", False),
+                check_only=arguments.get("check_only", False)
+            )
+        
+        elif name == "server_stats":
+            return await self.handle_server_stats(output_format=arguments.get("format", "text"))
+        
+        else:
+            return f"ERROR: Unknown tool: {name}"
 
     def get_qa_chain(self):
         """
@@ -234,12 +479,16 @@ class MCPServer:
         Raises:
             ValueError: If database doesn't exist or API key is missing.
         """
+        self.metrics.count_cache('qa_chain', self._qa_chain is not None)
         if self._qa_chain is not None:
             return self._qa_chain
         
-        # Get retriever
+        # Get retriever (adaptive k sends less context for easy questions)
         try:
-            retriever = self.vector_db.get_retriever()
+            if self.config.get('retrieval', {}).get('adaptive_k', False):
+                retriever = self.vector_db.get_adaptive_retriever()
+            else:
+                retriever = self.vector_db.get_retriever()
         except ValueError as e:
             raise ValueError(str(e))
         
@@ -261,7 +510,8 @@ class MCPServer:
             llm = ChatOpenAI(
                 model=llm_model or 'gpt-4o-mini',
                 temperature=temperature,
-                openai_api_key=api_key
+                openai_api_key=api_key,
+                base_url=llm_config.get('base_url')
             )
         
         elif provider == 'gemini':
@@ -279,6 +529,13 @@ class MCPServer:
                 google_api_key=api_key
             )
         
+        elif provider == 'fake':
+            # Deterministic answers with synthetic timing, no network
+            llm = FakeChatModel(
+                latency=llm_config.get('fake_latency', 0.0),
+                tokens_per_second=llm_config.get('fake_tokens_per_second', 0.0)
+            )
+        
         else:
             raise ValueError(f"ERROR: Unsupported provider: {provider}")
         
@@ -292,16 +549,63 @@ class MCPServer:
             input_variables=["context", "question"]
         )
         
-        # Helper function to format documents
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        # Pack retrieved chunks into the prompt's token budget, merging
+        # overlapping chunks of the same file
+        packer = ContextPacker(
+            prompt_template_str,
+            max_prompt_tokens=self.config.get('retrieval', {}).get('max_prompt_tokens', 4000),
+            model=llm_model
+        )
+        
+        compression_ratio = self.config.get('retrieval', {}).get('compression_ratio', 1.0)
+        
+        def pack_context(inputs):
+            docs = inputs["docs"]
+            if compression_ratio < 1.0:
+                # Drop the sentences least related to the question
+                docs, stats = compress_documents(
+                    merge_chunks(docs), inputs["question"], compression_ratio, packer.count_tokens
+                )
+                counts = {
+                    'tokens_before': stats.tokens_before,
+                    'tokens_after': stats.tokens_after,
+                    'tokens_saved': stats.tokens_saved
+                }
+                # On the call (query log, server_stats) and the span (tracing)
+                record_tokens(**counts)
+                set_attributes(**counts)
+            return {"context": packer.pack(docs, inputs["question"]), "question": inputs["question"]}
+        
+        def build_prompt(inputs):
+            with span('prompt_build', chunks=len(inputs["docs"])) as prompt_span:
+                packed = pack_context(inputs)
+                if prompt_span.recording:
+                    prompt_span.set_attributes(context_tokens=packer.count_tokens(packed["context"]))
+                return packed
+        
+        def retrieve(question):
+            with phase('search'):
+                docs = retriever.invoke(question)
+                set_attributes(results=len(docs))
+            record_chunks(docs)
+            return docs
+        
+        def generate(prompt_value):
+            with phase('llm', provider=provider, model=llm_model or ''):
+                if is_recording():
+                    set_attributes(prompt_tokens=packer.count_tokens(prompt_value.to_string()))
+                response = llm.invoke(prompt_value)
+                if is_recording():
+                    set_attributes(completion_tokens=packer.count_tokens(str(response.content)))
+                return response
         
         # Create QA chain using LCEL (LangChain Expression Language)
         # This is the new LangChain 1.x pattern
         chain = (
-            {"context": retriever | format_docs, "question": RunnablePassthrough()}
+            {"docs": RunnableLambda(retrieve), "question": RunnablePassthrough()}
+            | RunnableLambda(build_prompt)
             | prompt
-            | llm
+            | RunnableLambda(generate)
             | StrOutputParser()
         )
         
@@ -310,16 +614,36 @@ class MCPServer:
         
         return self._qa_chain
 
-    async def handle_search_docs(self, question: str, max_results: int = 3) -> str:
+    async def handle_search_docs(
+        self,
+        question: str,
+        max_results: int = 3,
+        mode: Optional[str] = None,
+        directories: Optional[List[str]] = None,
+        min_score: Optional[float] = None,
+        file_types: Optional[List[str]] = None,
+        path_prefix: Optional[str] = None,
+        path_glob: Optional[str] = None
+    ) -> str:
         """
         Handle search_docs tool call - returns relevant document fragments.
         
         Args:
             question: Question to search for.
             max_results: Maximum number of results to return (1-10).
+            mode: Search mode (hybrid, vector, lexical). Defaults to retrieval.search_mode.
+            directories: Only return fragments from files in these directories.
+            min_score: Drop results with a cosine similarity below this value.
+                Hybrid search keeps only results that passed it on the vector
+                side; lexical search rejects it.
+            file_types: Only return fragments from files with these extensions.
+            path_prefix: Only return fragments from files whose relative path
+                starts with this prefix.
+            path_glob: Only return fragments from files whose relative path
+                matches this glob.
         
         Returns:
-            Formatted search results with document fragments and metadata.
+            Formatted search results with document fragments, metadata and scores.
         
         Raises:
             ValueError: If question is empty or database errors occur.
@@ -330,31 +654,105 @@ class MCPServer:
         # Validate max_results
         max_results = max(1, min(10, max_results))
         
+        retrieval_config = self.config.get('retrieval', {})
+        mode = mode or retrieval_config.get('search_mode', 'hybrid')
+        if mode not in ('hybrid', 'vector', 'lexical'):
+            raise ValueError(f"ERROR: Unknown search mode: {mode}")
+        if min_score is not None and mode == 'lexical':
+            raise ValueError(
+                "ERROR: min_score is a cosine similarity and BM25 scores have no such scale.\n"
+                "   Use mode 'vector' or 'hybrid' with min_score."
+            )
+        
         # Check if reindexing might be needed (non-blocking)
         staleness_warning = await self._check_database_staleness()
         
-        # Get retriever
-        try:
-            _, retriever = self.get_qa_chain()
-        except ValueError as e:
-            raise ValueError(str(e))
+        # Metadata filters are applied inside the search, not to its results
+        where = self.vector_db.build_search_filter(
+            file_types=file_types, path_prefix=path_prefix, path_glob=path_glob
+        )
+        
+        # Lexical index is optional for hybrid search (older databases lack it)
+        lexical_index = None
+        if mode != 'vector':
+            lexical_index = self.vector_db.get_lexical_index()
+            if lexical_index is None:
+                if mode == 'lexical':
+                    raise ValueError(
+                        "ERROR: Lexical index not found.\n"
+                        "   Run 'docrag reindex' to build it."
+                    )
+                mode = 'vector'
+        
+        # Vector search needs the database (not the lexical fast path)
+        if mode != 'lexical' and not self.vector_db.db_path.exists():
+            raise ValueError(
+                "ERROR: Vector database not found.\n"
+                "   Run 'docrag index' to create the database first."
+            )
+        
+        def vector_search(limit: int) -> List[Tuple[Document, float]]:
+            # k goes to the vector store, so exactly max_results chunks are fetched
+            return self.vector_db.search(
+                question, k=limit, min_score=min_score, directories=directories, where=where
+            )
+        
+        def lexical_search(limit: int) -> List[Tuple[Document, float]]:
+            if lexical_index is None:
+                return []
+            candidate_ids = None
+            if where:
+                # Only score chunks that pass the metadata filter (columns are cached)
+                candidate_ids = lexical_index.matching_ids(where).tolist()
+            if not directories:
+                return lexical_index.search(question, limit, candidate_ids=candidate_ids)
+            # Over-fetch, then keep hits inside the requested directories
+            hits = lexical_index.search(question, limit * FILTER_OVERFETCH, candidate_ids=candidate_ids)
+            return [
+                hit for hit in hits
+                if in_directories(hit[0].metadata, self.project_root, directories)
+            ][:limit]
+        
+        # Vector similarity of hybrid results, shown next to the fused score
+        similarities: Dict[Tuple[str, Any], float] = {}
         
         # Execute search
         try:
-            # Get relevant documents with scores
-            source_docs = retriever.invoke(question)
+            with phase('search'):
+                if mode == 'lexical':
+                    source_docs = await asyncio.to_thread(lexical_search, max_results)
+                    score_label = "bm25"
+                
+                elif mode == 'hybrid':
+                    # Run lexical and vector search in parallel and fuse rankings
+                    vector_hits, lexical_hits = await asyncio.gather(
+                        asyncio.to_thread(vector_search, max_results),
+                        asyncio.to_thread(lexical_search, max_results)
+                    )
+                    # With min_score, keep only the results that passed it in vector search
+                    source_docs = hybrid_scores(
+                        vector_hits, lexical_hits,
+                        k=retrieval_config.get('rrf_k', 60),
+                        limit=max_results,
+                        vector_only=min_score is not None
+                    )
+                    similarities = {document_key(doc): score for doc, score in vector_hits}
+                    score_label = "rrf"
+                
+                else:
+                    source_docs = await asyncio.to_thread(vector_search, max_results)
+                    score_label = "relevance"
+                set_attributes(mode=mode, results=len(source_docs))
+            record_chunks([doc for doc, _ in source_docs])
             
             if not source_docs:
                 return "SEARCH: No relevant documents found for your query."
             
-            # Limit results
-            source_docs = source_docs[:max_results]
-            
             # Format results
             results = []
             results.append(f"SEARCH: Found {len(source_docs)} relevant document(s):\n")
             
-            for idx, doc in enumerate(source_docs, 1):
+            for idx, (doc, score) in enumerate(source_docs, 1):
                 metadata = doc.metadata
                 content = doc.page_content
                 
@@ -374,6 +772,11 @@ class MCPServer:
                 # Format result
                 results.append(f"--- Result {idx} ---")
                 results.append(f"SOURCE: {source_file}")
+                similarity = similarities.get(document_key(doc))
+                if similarity is not None:
+                    results.append(f"SCORE: {score:.3f} ({score_label}, similarity {similarity:.3f})")
+                else:
+                    results.append(f"SCORE: {score:.3f} ({score_label})")
                 results.append(f"\n{content}\n")
             
             # Add staleness warning if needed
@@ -417,7 +820,8 @@ class MCPServer:
             # Append sources if requested
             if include_sources:
                 # Get source documents from retriever
-                source_docs = retriever.invoke(question)
+                with phase('search'):
+                    source_docs = retriever.invoke(question)
                 if source_docs:
                     # Extract unique source files
                     source_files = set()
@@ -469,6 +873,207 @@ class MCPServer:
         except ValueError as e:
             raise ValueError(str(e))
 
+    async def handle_grep_docs(
+        self,
+        pattern: str,
+        ignore_case: bool = False,
+        fixed_string: bool = False,
+        max_results: int = 50
+    ) -> str:
+        """
+        Handle grep_docs tool call - exact substring or regex search.
+        
+        Args:
+            pattern: Regular expression or literal text to search for.
+            ignore_case: Case-insensitive matching.
+            fixed_string: Treat pattern as literal text.
+            max_results: Maximum number of matching lines to return (1-200).
+        
+        Returns:
+            Formatted list of matching lines with file and line numbers.
+        
+        Raises:
+            ValueError: If pattern is empty or invalid, or the index is missing.
+        """
+        import re
+        
+        if not pattern:
+            raise ValueError("ERROR: Pattern cannot be empty")
+        
+        max_results = max(1, min(200, max_results))
+        
+        trigram_index = self.vector_db.get_trigram_index()
+        documents = self.vector_db.get_indexed_chunks()
+        if trigram_index is None or documents is None:
+            raise ValueError(
+                "ERROR: Trigram index not found.\n"
+                "   Run 'docrag reindex' to build it."
+            )
+        
+        staleness_warning = await self._check_database_staleness()
+        
+        try:
+            with phase('search'):
+                matches, scanned = await asyncio.to_thread(
+                    trigram_index.grep, documents, pattern,
+                    ignore_case, fixed_string, max_results
+                )
+        except re.error as e:
+            raise ValueError(f"ERROR: Invalid regular expression: {e}")
+        
+        if not matches:
+            result = f"GREP: No matches for '{pattern}' (scanned {scanned} of {len(documents)} chunks)."
+        else:
+            lines = [
+                f"GREP: Found {len(matches)} match(es) for '{pattern}' "
+                f"(scanned {scanned} of {len(documents)} chunks):\n"
+            ]
+            for match in matches:
+                source = match['source']
+                try:
+                    source = str(Path(source).relative_to(self.project_root))
+                except ValueError:
+                    pass
+                
+                text = match['text'].strip()
+                if len(text) > 200:
+                    text = text[:200] + "..."
+                
+                location = f"{source}:{match['line']}" if match['line'] else f"{source} (chunk {match['chunk_id']})"
+                lines.append(f"{location}: {text}")
+            
+            if len(matches) >= max_results:
+                lines.append(f"\n(Results limited to {max_results} lines)")
+            result = "\n".join(lines)
+        
+        if staleness_warning:
+            result += staleness_warning
+        
+        return result
+
+    async def handle_find_symbol(
+        self,
+        name: str,
+        kind: Optional[str] = None,
+        prefix: bool = False
+    ) -> str:
+        """
+        Handle find_symbol tool call - look up code definitions by name.
+        
+        Args:
+            name: Symbol name, optionally qualified (Class.method).
+            kind: Optional kind filter.
+            prefix: Match names starting with the given text.
+        
+        Returns:
+            Formatted list of definitions with file and line numbers.
+        
+        Raises:
+            ValueError: If name is empty or the index is missing.
+        """
+        if not name or not name.strip():
+            raise ValueError("ERROR: Symbol name cannot be empty")
+        
+        symbol_index = self.vector_db.get_symbol_index()
+        if symbol_index is None:
+            raise ValueError(
+                "ERROR: Symbol index not found.\n"
+                "   Run 'docrag reindex' to build it."
+            )
+        
+        staleness_warning = await self._check_database_staleness()
+        
+        with phase('search'):
+            symbols = symbol_index.lookup(name, kind=kind, prefix=prefix)
+        
+        if not symbols:
+            result = f"SYMBOL: No definitions found for '{name}'."
+        else:
+            lines = [f"SYMBOL: Found {len(symbols)} definition(s) for '{name}':\n"]
+            for symbol in symbols:
+                qualified = (
+                    f"{symbol['container']}.{symbol['name']}" if symbol['container'] else symbol['name']
+                )
+                lines.append(f"{symbol['kind']} {qualified}  {symbol['path']}:{symbol['line']}")
+            result = "\n".join(lines)
+        
+        if staleness_warning:
+            result += staleness_warning
+        
+        return result
+
+    async def handle_server_stats(self, output_format: str = "text") -> str:
+        """
+        Handle server_stats tool call - metrics of this server process.
+        
+        Args:
+            output_format: text, json or prometheus.
+        
+        Returns:
+            Formatted statistics.
+        
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        snapshot = self.metrics.snapshot(caches=self.vector_db.get_cache_stats())
+        if output_format == "json":
+            return json.dumps(snapshot, indent=2, default=str)
+        if output_format == "prometheus":
+            return prometheus_text(snapshot)
+        if output_format != "text":
+            raise ValueError(f"ERROR: Unknown format: {output_format}")
+        return format_stats(snapshot)
+
+    def _start_profile(self, name: str) -> Optional[ProfileRun]:
+        """
+        Return a profile for this call, or None.
+        
+        Only one call is profiled at a time. The sampler sees every thread,
+        so calls overlapping a profiled one show up in its stacks.
+        """
+        if self.profile_settings is None or self._profiling:
+            return None
+        self._profiling = True
+        return ProfileRun(
+            self.project_root / ".docrag" / PROFILES_DIR,
+            name,
+            memory=self.profile_settings['memory'],
+            interval_ms=self.profile_settings['interval_ms']
+        )
+
+    def _finish_profile(self, profile: ProfileRun, record: CallRecord) -> None:
+        """Write the profile if the call took at least min_ms (errors go to stderr)."""
+        import sys
+        settings = self.profile_settings
+        duration_ms = record.duration * 1000
+        if settings is None or duration_ms < settings['min_ms']:
+            return
+        try:
+            files = profile.write()
+            prune_profiles(profile.profiles_dir, settings['keep'], settings['max_mb'])
+        except OSError as e:
+            print(f"WARNING: Could not write profile to {profile.profiles_dir}: {e}", file=sys.stderr)
+            return
+        print(f"PROFILE: {record.tool} took {duration_ms:.0f} ms, wrote {files[0].parent / profile.run_id}.*", file=sys.stderr)
+
+    def _write_metrics_textfile(self) -> None:
+        """Write server.metrics_textfile if it is set and due (errors go to stderr)."""
+        if self.metrics_textfile is None:
+            return
+        interval = self.config.get('server', {}).get('metrics_interval_s', 15.0)
+        now = time.monotonic()
+        if self._metrics_written and now - self._metrics_written < interval:
+            return
+        self._metrics_written = now
+        try:
+            write_textfile(
+                self.metrics_textfile,
+                prometheus_text(self.metrics.snapshot(caches=self.vector_db.get_cache_stats()))
+            )
+        except OSError as e:
+            import sys
+            print(f"WARNING: Could not write metrics to {self.metrics_textfile}: {e}", file=sys.stderr)
+
     async def handle_reindex_docs(self, force: bool = False, check_only: bool = False) -> str:
         """
         Handle reindex_docs tool call - smart reindexing with change detection.
@@ -613,13 +1218,19 @@ class MCPServer:
                 project_root_str, config_json, reason
             ]
             
+            # The worker's spans join this call's trace
+            env = None
+            if current_span().traceparent:
+                env = dict(os.environ, **{TRACEPARENT_ENV: current_span().traceparent})
+            
             # Execute with timeout
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
                 timeout=300,  # 5 minute timeout
-                cwd=self.project_root
+                cwd=self.project_root,
+                env=env
             )
             
             if result.returncode == 0:
@@ -728,47 +1339,53 @@ class MCPServer:
         Returns:
             Warning message if database might be stale, empty string otherwise.
         """
-        try:
-            import os
-            
-            # Check if database exists
-            db_path = self.project_root / ".docrag" / "vectordb"
-            if not db_path.exists():
+        with phase('staleness'):
+            try:
+                import os
+                
+                # Check if database exists
+                db_path = self.project_root / ".docrag" / "vectordb"
+                if not db_path.exists():
+                    return ""
+                
+                # Embedding settings changed since indexing (provider, model, dimensions)
+                reindex_warning = self.vector_db.check_reindex_required()
+                if reindex_warning:
+                    return f"\n{reindex_warning}"
+                
+                # Get database creation time
+                try:
+                    db_created_time = os.path.getctime(db_path)
+                except:
+                    return ""
+                
+                # Quick check for any recently modified files
+                recent_files = 0
+                for directory in self.config.get('indexing', {}).get('directories', ['.']):
+                    dir_path = self.project_root / directory
+                    if dir_path.exists():
+                        extensions = self.config.get('indexing', {}).get('extensions', ['.md', '.txt'])
+                        for ext in extensions:
+                            for file_path in dir_path.rglob(f"*{ext}"):
+                                try:
+                                    if os.path.getmtime(file_path) > db_created_time:
+                                        recent_files += 1
+                                        if recent_files >= 3:  # Stop early for performance
+                                            break
+                                except:
+                                    continue
+                            if recent_files >= 3:
+                                break
+                    if recent_files >= 3:
+                        break
+                
+                if recent_files > 0:
+                    return f"\nNOTE: {recent_files}+ files may have been updated since last indexing. Consider using 'reindex_docs' tool for latest content."
+                
                 return ""
             
-            # Get database creation time
-            try:
-                db_created_time = os.path.getctime(db_path)
             except:
                 return ""
-            
-            # Quick check for any recently modified files
-            recent_files = 0
-            for directory in self.config.get('indexing', {}).get('directories', ['.']):
-                dir_path = self.project_root / directory
-                if dir_path.exists():
-                    extensions = self.config.get('indexing', {}).get('extensions', ['.md', '.txt'])
-                    for ext in extensions:
-                        for file_path in dir_path.rglob(f"*{ext}"):
-                            try:
-                                if os.path.getmtime(file_path) > db_created_time:
-                                    recent_files += 1
-                                    if recent_files >= 3:  # Stop early for performance
-                                        break
-                            except:
-                                continue
-                        if recent_files >= 3:
-                            break
-                if recent_files >= 3:
-                    break
-            
-            if recent_files > 0:
-                return f"\nNOTE: {recent_files}+ files may have been updated since last indexing. Consider using 'reindex_docs' tool for latest content."
-            
-            return ""
-        
-        except:
-            return ""
 
     def _format_error(self, error: Exception) -> str:
         """
@@ -791,12 +1408,16 @@ class MCPServer:
 
     async def run(self):
         """Run the MCP server with stdio transport."""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options()
+                )
+        finally:
+            if self.tracer is not None:
+                self.tracer.shutdown()
 
 
 async def main():
@@ -0,0 +1,373 @@
+"""In-process metrics for the DocRAG MCP server.
+
+Every tool call updates, per tool:
+
+- call, error and slow-call counters
+- a latency histogram of the whole call and one per phase (``staleness``,
+  ``embed``, ``search``, ``llm``; see ``query_log``)
+
+plus the number of calls in flight, cache hit/miss counts (local indexes,
+vector store, QA chain) and the index generation (how many index builds the
+server has seen since it started). Recording is a few dictionary updates
+under a lock; nothing is sampled or exported in the background.
+
+``ServerMetrics.snapshot`` feeds the ``server_stats`` tool, and
+``prometheus_text`` renders the Prometheus text exposition format for
+node-exporter's textfile collector (``server.metrics_textfile``).
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from .instrumentation import CallRecord
+
+
+# Histogram bucket upper bounds in seconds (Prometheus client defaults, extended)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# Label of calls to tools the server does not have
+UNKNOWN_TOOL = "unknown"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above the largest bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (inf above the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize as JSON-safe values.
+
+        Percentiles are bucket upper bounds in ms, None above the largest
+        bucket; ``buckets`` pairs each ``le`` label with its own count.
+        """
+        def upper_ms(q: float) -> Optional[float]:
+            bound = self.quantile(q)
+            return None if bound == float('inf') else bound * 1000
+
+        return {
+            'count': self.count,
+            'sum_s': self.sum,
+            'mean_ms': self.sum / self.count * 1000 if self.count else 0.0,
+            'p50_ms': upper_ms(0.5),
+            'p95_ms': upper_ms(0.95),
+            'p99_ms': upper_ms(0.99),
+            'buckets': [[repr(bound), count] for bound, count in zip(self.buckets, self.counts)]
+                       + [["+Inf", self.counts[-1]]]
+        }
+
+
+class ServerMetrics:
+    """Counters, histograms and gauges of one MCP server process."""
+
+    def __init__(self, slow_call_ms: float = 2000.0, tools: Optional[List[str]] = None):
+        """
+        Initialize metrics.
+
+        Args:
+            slow_call_ms: Calls at least this slow count as slow.
+            tools: Known tool names. Calls of other tools (any name a client
+                sends) are recorded as ``unknown`` to bound the label count.
+                If None, every name is recorded as is.
+        """
+        self.slow_call_ms = slow_call_ms
+        self.tools = set(tools) if tools is not None else None
+        self.started = time.time()
+        self.in_flight = 0
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.slow_calls: Dict[str, int] = {}
+        self.durations: Dict[str, Histogram] = {}
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.tokens: Dict[Tuple[str, str], int] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.index_generation = 0
+        self.index_built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def track_in_flight(self) -> Iterator[None]:
+        """Count a call as in flight while the block runs."""
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def observe_call(self, record: CallRecord, error: bool) -> None:
+        """Record a finished tool call."""
+        tool = record.tool
+        if self.tools is not None and tool not in self.tools:
+            tool = UNKNOWN_TOOL
+        with self._lock:
+            self.calls[tool] = self.calls.get(tool, 0) + 1
+            if error:
+                self.errors[tool] = self.errors.get(tool, 0) + 1
+            if record.duration * 1000 >= self.slow_call_ms:
+                self.slow_calls[tool] = self.slow_calls.get(tool, 0) + 1
+            self.durations.setdefault(tool, Histogram()).observe(record.duration)
+            for name, seconds in record.phases.items():
+                self.phases.setdefault((tool, name), Histogram()).observe(seconds)
+            for name, count in record.tokens.items():
+                self.tokens[(tool, name)] = self.tokens.get((tool, name), 0) + count
+
+    def count_cache(self, name: str, hit: bool) -> None:
+        """Record a cache lookup."""
+        with self._lock:
+            stats = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def observe_index(self, built_at: Optional[float]) -> None:
+        """
+        Record the build time of the current index.
+
+        The generation goes up each time a different build is seen, so it
+        changes when a reindex (by this server or another process) lands.
+        """
+        with self._lock:
+            if built_at is not None and built_at != self.index_built_at:
+                self.index_built_at = built_at
+                self.index_generation += 1
+
+    def snapshot(self, caches: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Any]:
+        """
+        Copy the current metrics.
+
+        Args:
+            caches: Extra cache counters to merge (e.g. ``VectorDBManager.get_cache_stats()``).
+
+        Returns:
+            Dictionary with ``uptime_s``, ``in_flight``, ``index``, ``tools``
+            (per-tool counters, latency, per-phase latency and token counts) and ``caches``
+            (hits, misses and hit rate).
+        """
+        with self._lock:
+            all_caches: Dict[str, Dict[str, float]] = {
+                name: dict(stats) for name, stats in self.caches.items()
+            }
+            for name, counts in (caches or {}).items():
+                merged = all_caches.setdefault(name, {'hits': 0, 'misses': 0})
+                merged['hits'] += counts.get('hits', 0)
+                merged['misses'] += counts.get('misses', 0)
+            for stats in all_caches.values():
+                lookups = stats['hits'] + stats['misses']
+                stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+
+            tools = {}
+            for tool in sorted(self.calls):
+                tools[tool] = {
+                    'calls': self.calls[tool],
+                    'errors': self.errors.get(tool, 0),
+                    'slow': self.slow_calls.get(tool, 0),
+                    'latency': self.durations[tool].to_dict(),
+                    'phases': {
+                        name: histogram.to_dict()
+                        for (phase_tool, name), histogram in sorted(self.phases.items())
+                        if phase_tool == tool
+                    },
+                    'tokens': {
+                        name: count
+                        for (token_tool, name), count in sorted(self.tokens.items())
+                        if token_tool == tool
+                    }
+                }
+            return {
+                'uptime_s': time.time() - self.started,
+                'in_flight': self.in_flight,
+                'index': {'generation': self.index_generation, 'built_at': self.index_built_at},
+                'tools': tools,
+                'caches': all_caches
+            }
+
+
+def _label_value(value: Any) -> str:
+    # Exposition format escapes: backslash, double quote and line feed
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Dict[str, Any], **labels: Any) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in histogram['buckets']:
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram['sum_s']:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram['count']}")
+    return lines
+
+
+def prometheus_text(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Result of ``ServerMetrics.snapshot``.
+
+    Returns:
+        Metrics text ending with a newline.
+    """
+    tools = snapshot['tools']
+    lines = [
+        "# HELP docrag_tool_calls_total MCP tool calls.",
+        "# TYPE docrag_tool_calls_total counter",
+        *(f"docrag_tool_calls_total{_labels(tool=tool)} {stats['calls']}" for tool, stats in tools.items()),
+        "# HELP docrag_tool_errors_total MCP tool calls that returned an error.",
+        "# TYPE docrag_tool_errors_total counter",
+        *(f"docrag_tool_errors_total{_labels(tool=tool)} {stats['errors']}" for tool, stats in tools.items()),
+        "# HELP docrag_tool_slow_calls_total MCP tool calls at least server.slow_call_ms long.",
+        "# TYPE docrag_tool_slow_calls_total counter",
+        *(f"docrag_tool_slow_calls_total{_labels(tool=tool)} {stats['slow']}" for tool, stats in tools.items()),
+        "# HELP docrag_tool_duration_seconds MCP tool call latency.",
+        "# TYPE docrag_tool_duration_seconds histogram",
+    ]
+    for tool, stats in tools.items():
+        lines += _histogram_lines("docrag_tool_duration_seconds", stats['latency'], tool=tool)
+    lines += [
+        "# HELP docrag_phase_duration_seconds Time per phase of an MCP tool call.",
+        "# TYPE docrag_phase_duration_seconds histogram",
+    ]
+    for tool, stats in tools.items():
+        for phase_name, histogram in stats['phases'].items():
+            lines += _histogram_lines("docrag_phase_duration_seconds", histogram, tool=tool, phase=phase_name)
+    lines += [
+        "# HELP docrag_context_tokens_total Answer context tokens before and after compression, and saved.",
+        "# TYPE docrag_context_tokens_total counter",
+    ]
+    for tool, stats in tools.items():
+        for kind, count in stats['tokens'].items():
+            lines.append(f"docrag_context_tokens_total{_labels(tool=tool, kind=kind.replace('tokens_', ''))} {count}")
+    lines += [
+        "# HELP docrag_cache_requests_total Cache lookups by result.",
+        "# TYPE docrag_cache_requests_total counter",
+    ]
+    for cache, stats in sorted(snapshot['caches'].items()):
+        lines.append(f"docrag_cache_requests_total{_labels(cache=cache, result='hit')} {stats['hits']}")
+        lines.append(f"docrag_cache_requests_total{_labels(cache=cache, result='miss')} {stats['misses']}")
+    lines += [
+        "# HELP docrag_in_flight_requests MCP tool calls in progress.",
+        "# TYPE docrag_in_flight_requests gauge",
+        f"docrag_in_flight_requests {snapshot['in_flight']}",
+        "# HELP docrag_index_generation Index builds seen since the server started.",
+        "# TYPE docrag_index_generation gauge",
+        f"docrag_index_generation {snapshot['index']['generation']}",
+    ]
+    if snapshot['index']['built_at'] is not None:
+        lines += [
+            "# HELP docrag_index_built_timestamp_seconds Build time of the current index.",
+            "# TYPE docrag_index_built_timestamp_seconds gauge",
+            f"docrag_index_built_timestamp_seconds {snapshot['index']['built_at']:.3f}",
+        ]
+    lines += [
+        "# HELP docrag_uptime_seconds Seconds since the server started.",
+        "# TYPE docrag_uptime_seconds gauge",
+        f"docrag_uptime_seconds {snapshot['uptime_s']:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """
+    Atomically replace a textfile collector file.
+
+    The collector may read at any moment, so the text is written to a
+    temporary file in the same directory and renamed into place.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+def _upper(ms: Optional[float]) -> str:
+    # Histogram percentiles are bucket upper bounds
+    return f">{DURATION_BUCKETS[-1] * 1000:g}" if ms is None else f"<={ms:g}"
+
+
+def format_stats(snapshot: Dict[str, Any]) -> str:
+    """Format a snapshot for the ``server_stats`` tool."""
+    index = snapshot['index']
+    lines = [
+        f"STATS: Uptime {snapshot['uptime_s']:.0f}s, {snapshot['in_flight']} call(s) in flight, "
+        f"index generation {index['generation']}"
+    ]
+    if index['built_at'] is not None:
+        built = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(index['built_at']))
+        lines[0] += f" (built {built})"
+
+    if snapshot['tools']:
+        lines.append(f"\n{'Tool':<20}{'Calls':>7}{'Errors':>8}{'Slow':>6}{'Mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}")
+        for tool, stats in snapshot['tools'].items():
+            latency = stats['latency']
+            lines.append(
+                f"{tool:<20}{stats['calls']:>7}{stats['errors']:>8}{stats['slow']:>6}"
+                f"{latency['mean_ms']:>10.1f}{_upper(latency['p50_ms']):>9}{_upper(latency['p95_ms']):>9}"
+            )
+        lines.append("\nMean phase time per call:")
+        for tool, stats in snapshot['tools'].items():
+            if stats['phases']:
+                phases = ", ".join(
+                    f"{name} {histogram['sum_s'] * 1000 / stats['calls']:.1f} ms"
+                    for name, histogram in stats['phases'].items()
+                )
+                lines.append(f"  {tool}: {phases}")
+        compressed = {tool: stats['tokens'] for tool, stats in snapshot['tools'].items() if stats['tokens']}
+        if compressed:
+            lines.append("\nContext compression:")
+            for tool, tokens in compressed.items():
+                lines.append(
+                    f"  {tool}: {tokens.get('tokens_saved', 0)} of {tokens.get('tokens_before', 0)} tokens saved"
+                )
+    else:
+        lines.append("\nNo tool calls yet.")
+
+    if snapshot['caches']:
+        lines.append("\nCaches:")
+        for cache, stats in sorted(snapshot['caches'].items()):
+            lines.append(
+                f"  {cache}: {stats['hit_rate']:.0%} hits ({stats['hits']} hits, {stats['misses']} misses)"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,70 @@
+"""Maximal marginal relevance (MMR) diversification for DocRAG Kit.
+
+Overlapping chunks from the same file tend to fill the top-k with
+near-duplicates. MMR re-ranks an over-fetched candidate list so each pick
+balances relevance to the query against similarity to what was already
+picked. Candidate vectors come from the store, so nothing is re-embedded;
+the pairwise similarities are one matrix product and each pick is a
+vectorized update of the running maximum similarity.
+"""
+
+from typing import List
+
+import numpy as np
+
+
+# Candidates at least this similar to a pick are copies of it
+DUPLICATE_SIMILARITY = 0.999999
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(
+    query: List[float],
+    vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Pick a diverse subset of candidates by maximal marginal relevance.
+
+    Args:
+        query: Query embedding.
+        vectors: Candidate embeddings, shape (n, d).
+        k: Number of candidates to pick.
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only.
+
+    Returns:
+        Indices into ``vectors`` in pick order.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(vectors))
+    if k < 1:
+        return []
+
+    vectors = _normalize(vectors)
+    relevance = vectors @ _normalize(np.asarray(query, dtype=np.float32))
+    similarity = vectors @ vectors.T
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity = similarity[first].copy()
+    available = np.ones(len(vectors), dtype=bool)
+    available[first] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        if lambda_mult < 1.0:
+            # Scores lie in [-1, 1]; a copy of a pick can tie with real candidates
+            # when the query matches that pick, so copies always rank last
+            scores[max_similarity >= DUPLICATE_SIMILARITY] -= 2.0
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+
+    return selected
@@ -0,0 +1,400 @@
+"""Built-in profiling for DocRAG Kit.
+
+``docrag index --profile`` and ``docrag reindex --profile`` profile the whole
+run; ``DOCRAG_PROFILE`` profiles MCP tool calls. Profiles are written to
+``.docrag/profiles/``, one group of files per run named
+``<YYYYmmdd-HHMMSS-ffffff>-<name>``:
+
+- ``sample`` mode (default): a wall-clock stack sampler that reads every
+  thread's stack every few milliseconds. Writes ``<run>.collapsed``, one
+  ``thread:<name>;module:function;... <samples>`` line per distinct stack
+  (input for flamegraph.pl, speedscope or inferno), and ``<run>.txt`` with
+  the top functions. Threads waiting on a lock, queue or socket are skipped.
+- ``cprofile`` mode: deterministic cProfile of the thread that started the
+  run. Writes ``<run>.pstats`` (for ``python -m pstats`` or snakeviz) and
+  ``<run>.txt``. Not available per tool call, as tool work runs in worker
+  threads cProfile does not follow.
+- ``memory`` (either mode): tracemalloc snapshots around each pipeline stage
+  (``scan``, ``load``, ``chunk``, ``write``, ``local_indexes`` when
+  indexing; ``staleness``, ``search``, ``llm`` in tool calls), written to
+  ``<run>.memory.txt`` with current and peak traced memory and the top
+  allocation sites per stage. Nested stages count towards the enclosing one.
+
+Only the newest ``keep`` runs (and at most ``max_mb`` of files) are kept.
+"""
+
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import List, Dict, Any, Optional, Iterator, Tuple, ContextManager
+
+from .instrumentation import add_phase_observer
+
+
+PROFILES_DIR = "profiles"
+PROFILE_MODES = ['sample', 'cprofile']
+PROFILE_ENV = "DOCRAG_PROFILE"
+
+DEFAULT_INTERVAL_MS = 5.0
+DEFAULT_KEEP = 20
+DEFAULT_MAX_MB = 100.0
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+# Leaf frames of threads that are waiting, not working (module, function)
+IDLE_FRAMES = {
+    ('threading', 'wait'),
+    ('threading', '_wait_for_tstate_lock'),
+    ('selectors', 'select'),
+    ('queue', 'get'),
+    ('concurrent.futures.thread', '_worker'),
+}
+
+# The profiler's own allocations are left out of memory reports
+_OWN_FILES = {__file__, tracemalloc.__file__}
+
+
+def _frame_label(frame) -> Tuple[str, str]:
+    module = frame.f_globals.get('__name__') or os.path.basename(frame.f_code.co_filename)
+    return module, frame.f_code.co_name
+
+
+class StackSampler:
+    """Wall-clock sampler of all thread stacks, aggregated as collapsed stacks."""
+
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS, include_idle: bool = False):
+        self.interval = interval_ms / 1000.0
+        self.include_idle = include_idle
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docrag-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the current stack of every thread except the sampler."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        self.samples += 1
+        for ident, top in sys._current_frames().items():
+            if ident == own:
+                continue
+            if not self.include_idle and _frame_label(top) in IDLE_FRAMES:
+                continue
+            labels = []
+            frame: Optional[FrameType] = top
+            while frame is not None:
+                labels.append("%s:%s" % _frame_label(frame))
+                frame = frame.f_back
+            labels.append(f"thread:{names.get(ident, ident)}")
+            self.counts[';'.join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one ``frame;frame;... count`` line each."""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> Dict[str, List[Tuple[str, int]]]:
+        """Most sampled functions: ``self`` (leaf frame) and ``inclusive`` (anywhere on the stack)."""
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.counts.items():
+            frames = stack.split(';')[1:]
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        return {'self': own.most_common(limit), 'inclusive': inclusive.most_common(limit)}
+
+
+class MemoryStages:
+    """
+    tracemalloc current/peak memory and top allocations per pipeline stage.
+
+    Tracing starts with the first stage, so memory allocated before it
+    (mostly imports) is not counted. Allocation sites are compared with the
+    end of the previous stage, one snapshot per stage.
+    """
+
+    def __init__(self) -> None:
+        self.stages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._stage: Optional[str] = None
+        self._previous: Dict[Any, Tuple[int, int]] = {}
+        self._started = False
+
+    def stop(self) -> None:
+        # Leave tracing alone if it was already on (e.g. PYTHONTRACEMALLOC)
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def on_phase(self, name: str, event: str, attributes: Dict[str, Any]) -> None:
+        """Phase observer: measure outermost stages."""
+        with self._lock:
+            if event == 'start':
+                self._depth += 1
+                if self._depth == 1:
+                    if not tracemalloc.is_tracing():
+                        tracemalloc.start()
+                        self._started = True
+                    tracemalloc.reset_peak()
+                    self._stage = name
+                return
+            self._depth -= 1
+            if self._depth or self._stage is None:
+                return
+            current, peak = tracemalloc.get_traced_memory()
+            sites = {
+                stat.traceback: (stat.size, stat.count)
+                for stat in tracemalloc.take_snapshot().statistics('lineno')
+                if stat.traceback[0].filename not in _OWN_FILES
+            }
+            diff = [
+                (str(traceback[0]), size - self._previous.get(traceback, (0, 0))[0],
+                 count - self._previous.get(traceback, (0, 0))[1])
+                for traceback, (size, count) in sites.items()
+            ]
+            diff.sort(key=lambda item: abs(item[1]), reverse=True)
+            self.stages.append({
+                'stage': self._stage,
+                'current_mb': current / (1024 * 1024),
+                'peak_mb': peak / (1024 * 1024),
+                'top': [(location, size / (1024 * 1024), count) for location, size, count in diff[:TOP_ALLOCATIONS]]
+            })
+            self._previous = sites
+            self._stage = None
+
+    def format(self, title: str) -> str:
+        lines = [f"MEMORY: {title} (tracemalloc)", ""]
+        if not self.stages:
+            lines.append("No pipeline stages ran.")
+            return '\n'.join(lines) + '\n'
+        lines.append(f"{'stage':<16} {'current MB':>11} {'peak MB':>9}")
+        for stage in self.stages:
+            lines.append(f"{stage['stage']:<16} {stage['current_mb']:>11.1f} {stage['peak_mb']:>9.1f}")
+        for stage in self.stages:
+            lines.append("")
+            lines.append(f"Top allocations in {stage['stage']}:")
+            for location, size_mb, blocks in stage['top']:
+                lines.append(f"   {size_mb:>+8.2f} MB  {blocks:>+8} blocks  {location}")
+        return '\n'.join(lines) + '\n'
+
+
+def _run_id(name: str) -> str:
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '-', name).strip('-') or 'run'
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}"
+
+
+class ProfileRun:
+    """One profiled run; use as a context manager around the profiled work."""
+
+    def __init__(
+        self,
+        profiles_dir: Path,
+        name: str,
+        mode: str = 'sample',
+        memory: bool = False,
+        interval_ms: float = DEFAULT_INTERVAL_MS
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"ERROR: Unknown profiler: {mode}\n   Valid profilers: {', '.join(PROFILE_MODES)}")
+        self.profiles_dir = Path(profiles_dir)
+        self.name = name
+        self.mode = mode
+        self.run_id = _run_id(name)
+        self.elapsed = 0.0
+        self.files: List[Path] = []
+        self.sampler = StackSampler(interval_ms) if mode == 'sample' else None
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else None
+        self.memory = MemoryStages() if memory else None
+        self._observer: Optional[ContextManager[None]] = None
+        self._start = 0.0
+
+    def __enter__(self) -> 'ProfileRun':
+        self._start = time.perf_counter()
+        if self.memory is not None:
+            observer = add_phase_observer(self.memory.on_phase)
+            observer.__enter__()
+            self._observer = observer
+        if self.sampler is not None:
+            self.sampler.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self._observer is not None:
+            self._observer.__exit__(None, None, None)
+            self._observer = None
+        if self.memory is not None:
+            self.memory.stop()
+        self.elapsed = time.perf_counter() - self._start
+
+    def _summary(self) -> str:
+        lines = [f"PROFILE: {self.name} ({self.mode})", f"Wall time: {self.elapsed:.3f} s"]
+        if self.sampler is not None:
+            interval_ms = self.sampler.interval * 1000
+            lines.append(f"Samples: {self.sampler.samples} every {interval_ms:g} ms (busy threads only)")
+            top = self.sampler.top_functions()
+            for title, key in (("Top functions (self)", 'self'), ("Top functions (inclusive)", 'inclusive')):
+                lines.append("")
+                lines.append(f"{title}:")
+                for function, count in top[key]:
+                    share = 100.0 * count / max(self.sampler.samples, 1)
+                    lines.append(f"   {count:>7} {share:>6.1f}%  {function}")
+            return '\n'.join(lines) + '\n'
+        out = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        return '\n'.join(lines) + '\n' + out.getvalue()
+
+    def write(self) -> List[Path]:
+        """Write the profile files and return their paths."""
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        base = self.profiles_dir / self.run_id
+        if self.sampler is not None:
+            Path(f"{base}.collapsed").write_text(self.sampler.collapsed(), encoding='utf-8')
+            self.files.append(Path(f"{base}.collapsed"))
+        if self.profiler is not None:
+            self.profiler.dump_stats(f"{base}.pstats")
+            self.files.append(Path(f"{base}.pstats"))
+        Path(f"{base}.txt").write_text(self._summary(), encoding='utf-8')
+        self.files.append(Path(f"{base}.txt"))
+        if self.memory is not None:
+            Path(f"{base}.memory.txt").write_text(self.memory.format(self.name), encoding='utf-8')
+            self.files.append(Path(f"{base}.memory.txt"))
+        return self.files
+
+
+def prune_profiles(profiles_dir: Path, keep: int = DEFAULT_KEEP, max_mb: float = DEFAULT_MAX_MB) -> List[str]:
+    """
+    Delete the oldest profile runs beyond ``keep`` runs or ``max_mb`` in total.
+
+    The newest run is always kept.
+
+    Returns:
+        Run IDs that were deleted.
+    """
+    profiles_dir = Path(profiles_dir)
+    if not profiles_dir.is_dir():
+        return []
+    runs: Dict[str, List[Path]] = {}
+    for path in profiles_dir.iterdir():
+        if path.is_file():
+            runs.setdefault(path.name.split('.', 1)[0], []).append(path)
+    sizes = {run_id: sum(path.stat().st_size for path in paths) for run_id, paths in runs.items()}
+    total = sum(sizes.values())
+
+    deleted = []
+    ordered = sorted(runs)
+    for index, run_id in enumerate(ordered[:-1]):
+        remaining = len(ordered) - index
+        if remaining <= keep and total <= max_mb * 1024 * 1024:
+            break
+        for path in runs[run_id]:
+            path.unlink(missing_ok=True)
+        total -= sizes[run_id]
+        deleted.append(run_id)
+    return deleted
+
+
+@contextlib.contextmanager
+def profile_run(
+    project_root: Path,
+    name: str,
+    mode: str = 'sample',
+    memory: bool = False,
+    interval_ms: float = DEFAULT_INTERVAL_MS,
+    keep: int = DEFAULT_KEEP,
+    max_mb: float = DEFAULT_MAX_MB
+) -> Iterator[ProfileRun]:
+    """
+    Profile the block and write the run to ``.docrag/profiles/``.
+
+    The profile is written (and older runs pruned) even if the block raises.
+    """
+    run = ProfileRun(Path(project_root) / ".docrag" / PROFILES_DIR, name, mode, memory, interval_ms)
+    try:
+        with run:
+            yield run
+    finally:
+        run.write()
+        prune_profiles(run.profiles_dir, keep, max_mb)
+
+
+def parse_profile_env(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parse ``DOCRAG_PROFILE`` for per-call profiling of MCP tool calls.
+
+    Comma-separated tokens: ``1``/``on``/``sample`` (enable), ``memory``
+    (add tracemalloc stages), ``min_ms=N`` (keep only calls taking at least
+    N ms), ``interval_ms=N`` (sampling interval), ``keep=N`` and
+    ``max_mb=N`` (retention). Empty, ``0`` or ``off`` disables profiling.
+
+    Returns:
+        Settings dictionary, or None when profiling is off.
+
+    Raises:
+        ValueError: If a token is not recognised.
+    """
+    tokens = [token.strip().lower() for token in (value or '').split(',') if token.strip()]
+    if not tokens or tokens == ['0'] or tokens == ['off']:
+        return None
+    settings = {
+        'memory': False,
+        'min_ms': 0.0,
+        'interval_ms': DEFAULT_INTERVAL_MS,
+        'keep': DEFAULT_KEEP,
+        'max_mb': DEFAULT_MAX_MB
+    }
+    for token in tokens:
+        key, sep, number = token.partition('=')
+        if not sep and key in ('1', 'on', 'true', 'sample'):
+            continue
+        if not sep and key == 'memory':
+            settings['memory'] = True
+            continue
+        if not sep and key == 'cprofile':
+            raise ValueError(
+                f"ERROR: {PROFILE_ENV}=cprofile is not supported for tool calls\n"
+                f"   Tool work runs in worker threads; use the sampler ({PROFILE_ENV}=1)"
+            )
+        if sep and key in ('min_ms', 'interval_ms', 'keep', 'max_mb'):
+            try:
+                settings[key] = int(number) if key == 'keep' else float(number)
+            except ValueError:
+                pass
+            else:
+                if settings[key] >= 0 if key == 'min_ms' else settings[key] > 0:
+                    continue
+        raise ValueError(f"ERROR: Invalid {PROFILE_ENV} setting: {token}")
+    return settings
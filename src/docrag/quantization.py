@@ -0,0 +1,260 @@
+"""Quantized embedding storage for the flat vector store.
+
+Two compact encodings of L2-normalized embeddings are supported:
+
+- ``int8``: per-dimension symmetric scalar quantization (1 byte/dimension,
+  4x smaller than float32); first-pass scores are dot products of the float
+  query with the int8 codes.
+- ``binary``: sign bits packed 8 per byte (32x smaller); first-pass scores
+  are Hamming distances computed with XOR and popcount.
+
+The first pass keeps ``k * rescore_factor`` candidates, which are then
+rescored exactly against the full-precision vectors memory-mapped from disk.
+"""
+
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+CODES_FILE = "quantized_codes.npy"
+SCALES_FILE = "quantized_scales.npy"
+
+QUANTIZATION_KINDS = ['int8', 'binary']
+
+# Rows scored per first-pass block. int8 blocks are widened to float32 for
+# the BLAS matrix product, so they are kept small enough to stay in cache.
+BLOCK_ROWS = 65536
+INT8_BLOCK_ROWS = 2048
+
+# Bits set per byte value, for Hamming distance on NumPy < 2.0
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Count set bits per byte."""
+    counts: np.ndarray = np.bitwise_count(values) if hasattr(np, 'bitwise_count') else _POPCOUNT_TABLE[values]
+    return counts
+
+
+class QuantizedVectors:
+    """Quantized codes for first-pass search with full-precision rescoring."""
+
+    def __init__(self, kind: str, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        """
+        Initialize quantized vectors.
+
+        Args:
+            kind: Quantization kind (int8 or binary).
+            codes: int8 codes (n, d) or packed sign bits (n, ceil(d / 8)).
+            scales: Per-dimension dequantization scales (int8 only).
+        """
+        if kind not in QUANTIZATION_KINDS:
+            raise ValueError(f"ERROR: Unsupported quantization: {kind}")
+        self.kind = kind
+        self.codes = codes
+        self.scales = scales
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return int(self.codes.shape[1])
+
+    @classmethod
+    def encode(cls, vectors: np.ndarray, kind: str) -> 'QuantizedVectors':
+        """
+        Quantize vectors.
+
+        Args:
+            vectors: L2-normalized vectors, shape (n, d).
+            kind: Quantization kind (int8 or binary).
+
+        Returns:
+            QuantizedVectors instance.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if kind == 'binary':
+            return cls(kind, np.packbits(vectors > 0, axis=1))
+
+        if kind != 'int8':
+            raise ValueError(f"ERROR: Unsupported quantization: {kind}")
+
+        scales = np.abs(vectors).max(axis=0) / 127.0 if len(vectors) else np.ones(vectors.shape[1])
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+        return cls(kind, codes, scales)
+
+    def first_pass(self, query: np.ndarray, count: int) -> np.ndarray:
+        """
+        Select candidate rows using only the quantized codes.
+
+        Args:
+            query: L2-normalized query vector, shape (d,).
+            count: Number of candidates to keep.
+
+        Returns:
+            Candidate row ids (unordered).
+        """
+        n = self.codes.shape[0]
+        count = min(count, n)
+
+        if self.kind == 'binary':
+            packed_query = np.packbits(query > 0)
+        else:
+            weights = query * self.scales
+
+        block_rows = BLOCK_ROWS if self.kind == 'binary' else INT8_BLOCK_ROWS
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, n, block_rows):
+            block = self.codes[start:start + block_rows]
+            if self.kind == 'binary':
+                # Negated Hamming distance, so larger is better as with dot products
+                scores = -_popcount(np.bitwise_xor(block, packed_query)).sum(axis=1, dtype=np.int32)
+            else:
+                scores = np.asarray(block, dtype=np.float32) @ weights
+
+            if len(scores) > count:
+                top = np.argpartition(-scores, count - 1)[:count]
+            else:
+                top = np.arange(len(scores))
+
+            best_ids = np.concatenate([best_ids, top + start])
+            best_scores = np.concatenate([best_scores, scores[top].astype(np.float32)])
+            if len(best_scores) > count:
+                keep = np.argpartition(-best_scores, count - 1)[:count]
+                best_ids, best_scores = best_ids[keep], best_scores[keep]
+
+        return best_ids
+
+    def search(
+        self,
+        query: np.ndarray,
+        vectors: np.ndarray,
+        k: int,
+        rescore_factor: int = 10
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k search: quantized first pass, then exact rescoring.
+
+        Args:
+            query: L2-normalized query vector, shape (d,).
+            vectors: Full-precision (typically memory-mapped) vectors.
+            k: Number of results.
+            rescore_factor: Candidates rescored as a multiple of k.
+
+        Returns:
+            Tuple of (row ids, cosine similarities), most similar first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        candidates = np.sort(self.first_pass(query, max(k, k * rescore_factor)))
+        scores = np.asarray(vectors[candidates], dtype=np.float32) @ query
+        top = np.argsort(-scores, kind='stable')[:k]
+        return candidates[top], scores[top]
+
+    def save(self, directory: Path) -> None:
+        """
+        Save codes into a store generation directory.
+
+        Args:
+            directory: Target directory.
+        """
+        directory = Path(directory)
+        np.save(directory / CODES_FILE, self.codes)
+        if self.scales is not None:
+            np.save(directory / SCALES_FILE, self.scales)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['QuantizedVectors']:
+        """
+        Load codes from a store generation directory.
+
+        Args:
+            directory: Source directory.
+
+        Returns:
+            QuantizedVectors instance, or None if none were saved.
+        """
+        directory = Path(directory)
+        if not (directory / CODES_FILE).exists():
+            return None
+        codes = np.load(directory / CODES_FILE, mmap_mode='r')
+        if codes.dtype == np.int8:
+            return cls('int8', codes, np.load(directory / SCALES_FILE))
+        return cls('binary', codes)
+
+
+def recall_report(
+    vectors: np.ndarray,
+    num_queries: int = 200,
+    k: int = 5,
+    kinds: Optional[List[str]] = None,
+    rescore_factors: Optional[List[int]] = None,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k of quantized search against exact float32 search.
+
+    Queries are stored vectors sampled from the corpus; each query's own row
+    is excluded from both the exact and the quantized results.
+
+    Args:
+        vectors: Stored embeddings, shape (n, d).
+        num_queries: Number of sampled queries.
+        k: Results per query.
+        kinds: Quantization kinds to evaluate. Defaults to all.
+        rescore_factors: Rescoring multipliers to evaluate. Defaults to 1, 4, 10.
+        seed: Random seed for query sampling.
+
+    Returns:
+        List of rows with ``kind``, ``rescore_factor``, ``recall``,
+        ``bytes_per_vector``, ``memory_mb`` and ``ms_per_query``. The first
+        row is the float32 baseline.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1.0)
+    n, dimensions = vectors.shape
+
+    kinds = kinds or QUANTIZATION_KINDS
+    rescore_factors = rescore_factors or [1, 4, 10]
+    k = min(k, n - 1)
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(n, min(num_queries, n), replace=False)
+
+    start = time.perf_counter()
+    truth = []
+    for query_id in query_ids:
+        scores = vectors @ vectors[query_id]
+        scores[query_id] = -np.inf
+        truth.append(set(np.argpartition(-scores, k - 1)[:k].tolist()))
+    exact_ms = (time.perf_counter() - start) * 1000 / len(query_ids)
+
+    rows = [{
+        'kind': 'float32',
+        'rescore_factor': None,
+        'recall': 1.0,
+        'bytes_per_vector': dimensions * 4,
+        'memory_mb': n * dimensions * 4 / 1024 / 1024,
+        'ms_per_query': exact_ms
+    }]
+
+    for kind in kinds:
+        quantized = QuantizedVectors.encode(vectors, kind)
+        for factor in rescore_factors:
+            hits = 0
+            start = time.perf_counter()
+            for query_id, expected in zip(query_ids, truth):
+                ids, _ = quantized.search(vectors[query_id], vectors, k + 1, factor)
+                hits += len(expected & (set(ids.tolist()) - {int(query_id)}))
+            rows.append({
+                'kind': kind,
+                'rescore_factor': factor,
+                'recall': hits / (len(query_ids) * k),
+                'bytes_per_vector': quantized.bytes_per_vector,
+                'memory_mb': n * quantized.bytes_per_vector / 1024 / 1024,
+                'ms_per_query': (time.perf_counter() - start) * 1000 / len(query_ids)
+            })
+
+    return rows
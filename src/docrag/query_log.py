@@ -0,0 +1,295 @@
+"""Query log capture and replay for the DocRAG MCP server.
+
+With ``server.query_log: true`` the MCP server appends one JSON line per
+tool call to ``.docrag/query_log.jsonl``::
+
+    {"ts": "2026-01-05T10:00:00.123Z", "t": 1767607200.123, "tool": "search_docs",
+     "arguments": {"question": "..."}, "duration_ms": 41.2,
+     "phases_ms": {"staleness": 3.1, "embed": 30.5, "search": 36.0},
+     "chunk_ids": [12, 40, 7], "result_chars": 2150, "error": false, "slow": false}
+
+Phases are ``staleness`` (the changed-files check), ``embed`` (embedding
+provider calls), ``search`` (retrieval, including its ``embed`` time) and
+``llm`` (answer generation). A phase entered several times in one call is
+added up. Phases nest, so they need not sum to ``duration_ms``. Calls taking at
+least ``server.slow_call_ms`` are marked ``slow`` and reported on stderr.
+The log rotates at ``server.query_log_max_mb``, keeping
+``server.query_log_backups`` older files (``query_log.jsonl.1``, ...).
+
+``replay_log`` re-runs a captured log against the current index, at the
+original pacing or faster, and ``latency_diff`` compares the timings.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .instrumentation import CallRecord
+from .stats import percentile
+
+
+QUERY_LOG_FILE = "query_log.jsonl"
+
+PHASES = ['staleness', 'embed', 'search', 'llm']
+
+
+class QueryLog:
+    """Rotating JSONL log of MCP tool calls."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_mb: float = 10.0,
+        backups: int = 3,
+        slow_call_ms: float = 2000.0
+    ):
+        """
+        Initialize the query log.
+
+        Args:
+            path: Log file. Rotated files get ``.1``, ``.2``, ... suffixes.
+            max_mb: Rotate when the file reaches this size.
+            backups: Rotated files kept (at least one).
+            slow_call_ms: Calls at least this slow are flagged.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.slow_call_ms = slow_call_ms
+        # RotatingFileHandler serializes writes from concurrent calls
+        self._handler = RotatingFileHandler(
+            self.path,
+            maxBytes=int(max_mb * 1024 * 1024),
+            backupCount=backups,
+            encoding='utf-8'
+        )
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    @classmethod
+    def from_config(cls, project_root: Path, config: Dict[str, Any]) -> Optional['QueryLog']:
+        """Create the log from ``server`` settings, or None if disabled."""
+        server_config = config.get('server', {})
+        if not server_config.get('query_log', False):
+            return None
+        return cls(
+            Path(project_root) / ".docrag" / QUERY_LOG_FILE,
+            max_mb=server_config.get('query_log_max_mb', 10.0),
+            backups=server_config.get('query_log_backups', 3),
+            slow_call_ms=server_config.get('slow_call_ms', 2000.0)
+        )
+
+    def write(self, record: CallRecord, result: str) -> Dict[str, Any]:
+        """
+        Append a finished call.
+
+        Args:
+            record: Finished call record.
+            result: Text returned to the client.
+
+        Returns:
+            The logged entry.
+        """
+        duration_ms = record.duration * 1000
+        entry: Dict[str, Any] = {
+            'ts': datetime.fromtimestamp(record.started, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            't': round(record.started, 3),
+            'tool': record.tool,
+            'arguments': record.arguments,
+            'duration_ms': round(duration_ms, 3),
+            'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in record.phases.items()},
+            'chunk_ids': list(record.chunk_ids),
+            'tokens': dict(record.tokens),
+            'result_chars': len(result),
+            'error': result.startswith("ERROR:"),
+            'slow': duration_ms >= self.slow_call_ms
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        self._handler.emit(logging.LogRecord('docrag.query_log', logging.INFO, '', 0, line, None, None))
+        if entry['slow']:
+            phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in entry['phases_ms'].items())
+            print(f"SLOW: {record.tool} took {duration_ms:.0f} ms ({phases or 'no phases'})", file=sys.stderr)
+        return entry
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+def read_query_log(path: Path, include_rotated: bool = True) -> List[Dict[str, Any]]:
+    """
+    Read logged calls, oldest first.
+
+    Args:
+        path: Log file (``.docrag/query_log.jsonl``).
+        include_rotated: Also read rotated files (``.1``, ``.2``, ...).
+
+    Returns:
+        Log entries sorted by start time. Lines that are not valid JSON
+        (e.g. cut short by a crash) are skipped.
+
+    Raises:
+        ValueError: If the log does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise ValueError(
+            f"ERROR: Query log not found: {path}\n"
+            "   Set server.query_log: true in .docrag/config.yaml and restart the MCP server."
+        )
+    files = [path]
+    if include_rotated:
+        files += sorted(path.parent.glob(path.name + ".*"), key=lambda p: p.suffix)
+    entries = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and 'tool' in entry:
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry.get('t', 0))
+    return entries
+
+
+async def replay_entries(
+    server,
+    entries: List[Dict[str, Any]],
+    speed: float = 1.0,
+    include_reindex: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Re-run logged calls against a server.
+
+    Args:
+        server: ``MCPServer`` to call (its own query log should be off).
+        entries: Logged calls, oldest first.
+        speed: Pacing factor: 1 keeps the original gaps between calls,
+            10 replays ten times faster, 0 runs the calls one after another.
+        include_reindex: Replay ``reindex_docs`` calls as logged. By default
+            they only check for changes, so a replay never rebuilds the index.
+
+    Returns:
+        One dictionary per call: ``tool``, ``original_ms``, ``replay_ms``,
+        ``original_phases_ms``, ``replay_phases_ms``, ``error``.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+
+    async def run(index: int, entry: Dict[str, Any]) -> None:
+        arguments = dict(entry.get('arguments') or {})
+        if entry['tool'] == 'reindex_docs' and not include_reindex:
+            arguments = {'check_only': True}
+        result, record = await server.run_tool(entry['tool'], arguments)
+        results[index] = {
+            'tool': entry['tool'],
+            'original_ms': entry.get('duration_ms', 0.0),
+            'replay_ms': record.duration * 1000,
+            'original_phases_ms': entry.get('phases_ms', {}),
+            'replay_phases_ms': {name: seconds * 1000 for name, seconds in record.phases.items()},
+            'error': result.startswith("ERROR:")
+        }
+
+    if speed <= 0 or not entries:
+        for index, entry in enumerate(entries):
+            await run(index, entry)
+    else:
+        first = entries[0].get('t', 0)
+        start = time.perf_counter()
+        tasks = []
+        for index, entry in enumerate(entries):
+            delay = (entry.get('t', first) - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(run(index, entry)))
+        await asyncio.gather(*tasks)
+    return [result for result in results if result is not None]
+
+
+def replay_log(
+    project_root: Path,
+    log_path: Optional[Path] = None,
+    speed: float = 1.0,
+    include_reindex: bool = False,
+    tools: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Replay a captured query log against the project's current index.
+
+    Args:
+        project_root: Project to serve.
+        log_path: Log to replay. Defaults to ``.docrag/query_log.jsonl``.
+        speed: Pacing factor (see ``replay_entries``).
+        include_reindex: Replay ``reindex_docs`` calls as logged.
+        tools: Only replay these tools.
+        limit: Replay at most this many calls (the oldest ones).
+
+    Returns:
+        Per-call results from ``replay_entries``.
+
+    Raises:
+        ValueError: If the log or the configuration is missing.
+    """
+    # Deferred: the MCP server pulls in the MCP SDK
+    from .mcp_server import MCPServer
+
+    project_root = Path(project_root)
+    entries = read_query_log(log_path or project_root / ".docrag" / QUERY_LOG_FILE)
+    if tools:
+        entries = [entry for entry in entries if entry['tool'] in tools]
+    if limit is not None:
+        entries = entries[:limit]
+
+    # The server logs to stderr on startup
+    with contextlib.redirect_stderr(io.StringIO()):
+        server = MCPServer(project_root)
+    if server.query_log is not None:
+        server.query_log.close()
+        server.query_log = None
+    return asyncio.run(replay_entries(server, entries, speed, include_reindex))
+
+
+def latency_diff(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Summarize original versus replayed latency per tool.
+
+    Args:
+        results: Per-call results from ``replay_entries``.
+
+    Returns:
+        One row per tool: ``tool``, ``calls``, ``errors``, original and
+        replay ``p50``/``p95`` in ms, ``change`` (relative p50 change) and
+        mean per-phase ms before and after (``phases``).
+    """
+    rows = []
+    for tool in sorted({result['tool'] for result in results}):
+        calls = [result for result in results if result['tool'] == tool]
+        original = [call['original_ms'] for call in calls]
+        replay = [call['replay_ms'] for call in calls]
+        phases = {}
+        for name in PHASES:
+            before = [call['original_phases_ms'].get(name, 0.0) for call in calls]
+            after = [call['replay_phases_ms'].get(name, 0.0) for call in calls]
+            if any(before) or any(after):
+                phases[name] = {'original_ms': sum(before) / len(calls), 'replay_ms': sum(after) / len(calls)}
+        original_p50 = percentile(original, 50)
+        replay_p50 = percentile(replay, 50)
+        rows.append({
+            'tool': tool,
+            'calls': len(calls),
+            'errors': sum(1 for call in calls if call['error']),
+            'original_p50_ms': original_p50,
+            'original_p95_ms': percentile(original, 95),
+            'replay_p50_ms': replay_p50,
+            'replay_p95_ms': percentile(replay, 95),
+            'change': (replay_p50 - original_p50) / original_p50 if original_p50 > 0 else 0.0,
+            'phases': phases
+        })
+    return rows
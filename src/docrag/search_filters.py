@@ -0,0 +1,169 @@
+"""Metadata filters for vector search.
+
+Search filters are expressed as ChromaDB ``where`` clauses over chunk
+metadata, so ChromaDB applies them inside the search. The flat store
+evaluates the same clauses against cached metadata columns and scans only
+the matching rows.
+
+ChromaDB has no prefix or glob operators for metadata, so path prefixes and
+globs are resolved against the paths known to the local indexes and sent as
+``$in`` lists over the ``rel_dir`` and ``rel_path`` metadata.
+"""
+
+import fnmatch
+import posixpath
+from typing import List, Dict, Any, Optional, Iterable, Callable
+
+import numpy as np
+
+
+def _normalize_path(path: str) -> str:
+    path = path.replace('\\', '/').strip()
+    while path.startswith('./'):
+        path = path[2:]
+    return path.lstrip('/')
+
+
+def normalize_file_types(file_types: Iterable[str]) -> List[str]:
+    """
+    Normalize file types to the ``file_type`` metadata form (".md").
+
+    Args:
+        file_types: Extensions with or without the leading dot.
+
+    Returns:
+        Lowercase extensions with a leading dot.
+    """
+    return sorted({'.' + t.strip().lstrip('.').lower() for t in file_types if t.strip().lstrip('.')})
+
+
+def _in(field: str, values: Iterable[str]) -> Dict[str, Any]:
+    values = sorted(set(values))
+    if not values:
+        # Nothing indexed matches; ChromaDB rejects empty $in lists and no
+        # file has an empty relative path
+        return {'rel_path': {'$eq': ''}}
+    if len(values) == 1:
+        return {field: values[0]}
+    return {field: {'$in': values}}
+
+
+def build_where(
+    known_paths: Iterable[str],
+    file_types: Optional[List[str]] = None,
+    path_prefix: Optional[str] = None,
+    path_glob: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build a ``where`` clause for search filters.
+
+    Args:
+        known_paths: Relative paths of all indexed files.
+        file_types: Only files with these extensions (e.g. ["md", ".py"]).
+        path_prefix: Only files whose relative path starts with this prefix
+            (e.g. "docs/api/").
+        path_glob: Only files whose relative path matches this shell-style
+            pattern (e.g. "docs/**/*.md", "*.py"; ``*`` also matches "/").
+
+    Returns:
+        ChromaDB ``where`` clause, or None if no filter was given.
+    """
+    conditions = []
+
+    if file_types:
+        conditions.append(_in('file_type', normalize_file_types(file_types)))
+
+    if path_prefix or path_glob:
+        paths = sorted(set(known_paths))
+
+        prefix = _normalize_path(path_prefix or '')
+        if prefix:
+            matching = [p for p in paths if p.startswith(prefix)]
+            # Whole directories under the prefix are matched by rel_dir, which
+            # keeps the $in list short; the rest are listed by rel_path
+            dirs = {posixpath.dirname(p) for p in matching}
+            full_dirs = {d for d in dirs if (d + '/').startswith(prefix) and d}
+            partial = [p for p in matching if posixpath.dirname(p) not in full_dirs]
+            if full_dirs and partial:
+                conditions.append({'$or': [_in('rel_dir', full_dirs), _in('rel_path', partial)]})
+            elif full_dirs:
+                conditions.append(_in('rel_dir', full_dirs))
+            else:
+                conditions.append(_in('rel_path', partial))
+
+        if path_glob:
+            pattern = _normalize_path(path_glob)
+            conditions.append(_in('rel_path', [p for p in paths if fnmatch.fnmatchcase(p, pattern)]))
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {'$and': conditions}
+
+
+def evaluate_where(where: Dict[str, Any], column: Callable[[str], np.ndarray]) -> np.ndarray:
+    """
+    Evaluate a ``where`` clause against metadata columns.
+
+    Supports ``$and``, ``$or`` and the ``$eq``, ``$ne``, ``$in`` and ``$nin``
+    operators (a bare value means ``$eq``).
+
+    Args:
+        where: ChromaDB-style ``where`` clause.
+        column: Returns the values of a metadata field for every row
+            (None where the field is missing).
+
+    Returns:
+        Boolean mask over rows.
+    """
+    masks = []
+    for key, condition in where.items():
+        if key in ('$and', '$or'):
+            parts = [evaluate_where(part, column) for part in condition]
+            masks.append(np.logical_and.reduce(parts) if key == '$and' else np.logical_or.reduce(parts))
+            continue
+
+        values = column(key)
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        for operator, operand in condition.items():
+            if operator == '$eq':
+                masks.append(values == operand)
+            elif operator == '$ne':
+                masks.append(values != operand)
+            elif operator in ('$in', '$nin'):
+                # Set lookups avoid sorting columns that mix strings and None
+                members = set(operand)
+                mask = np.fromiter(map(members.__contains__, values), dtype=bool, count=len(values))
+                masks.append(mask if operator == '$in' else ~mask)
+            else:
+                raise ValueError(f"ERROR: Unsupported filter operator: {operator}")
+
+    combined: np.ndarray = np.logical_and.reduce(masks)
+    return combined
+
+
+def matching_indices(metadatas: List[Dict[str, Any]], where: Dict[str, Any]) -> np.ndarray:
+    """
+    Find the positions of metadata dicts that match a ``where`` clause.
+
+    Args:
+        metadatas: Metadata of each chunk.
+        where: ChromaDB-style ``where`` clause.
+
+    Returns:
+        Indices of matching chunks.
+    """
+    columns: Dict[str, np.ndarray] = {}
+
+    def column(field: str) -> np.ndarray:
+        if field not in columns:
+            values = np.empty(len(metadatas), dtype=object)
+            values[:] = [metadata.get(field) for metadata in metadatas]
+            columns[field] = values
+        return columns[field]
+
+    if not metadatas:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(evaluate_where(where, column))
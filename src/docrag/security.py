@@ -149,8 +149,18 @@ def create_docrag_gitignore(docrag_dir: Path) -> bool:
     """
     gitignore_path = docrag_dir / ".gitignore"
     
-    gitignore_content = """# Vector database (can be regenerated)
+    gitignore_content = """# Vector database and local indexes (can be regenerated)
 vectordb/
+indexes/
+
+# Query log (questions and tool arguments, word for word)
+query_log.jsonl*
+
+# Profiles (stacks and memory reports with local paths)
+profiles/
+
+# Traces (one file per process)
+traces*.jsonl*
 
 # Python cache
 *.pyc
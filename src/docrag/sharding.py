@@ -0,0 +1,461 @@
+"""Sharded vector storage for DocRAG Kit.
+
+Chunks can be split into shards, one per configured indexing directory or
+one per hash bucket of the file path. Each shard is a separate ChromaDB
+collection or flat store, so a single directory can be re-embedded without
+touching the others. Queries are embedded once, fanned out across shards in
+a thread pool and the per-shard top-k lists are merged by relevance score.
+
+A ``directories`` filter skips shards that cannot contain matching files
+and drops results outside the requested directories.
+"""
+
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Callable, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_chroma import Chroma
+
+from .flat_store import FlatVectorStore
+from .mmr import mmr_select
+
+
+SHARDS_FILE = "shards.json"
+SHARDING_MODES = ['none', 'directory', 'hash']
+
+# Shard for files outside every configured directory
+ROOT_SHARD = "root"
+
+# Per-shard over-fetch when results must be filtered by directory
+FILTER_OVERFETCH = 4
+MAX_SEARCH_WORKERS = 8
+
+# Store behind one shard (or an unsharded index)
+ShardStore = Union[Chroma, FlatVectorStore]
+
+
+def _normalize_directory(directory: str) -> str:
+    """Normalize a configured directory to a relative POSIX path ('' = project root)."""
+    directory = directory.replace('\\', '/').strip().strip('/')
+    while directory.startswith('./'):
+        directory = directory[2:]
+    return '' if directory == '.' else directory
+
+
+def _is_within(path: str, directory: str) -> bool:
+    """Check whether a relative path is the directory itself or inside it."""
+    return directory == '' or path == directory or path.startswith(directory + '/')
+
+
+def relative_source(metadata: Dict[str, Any], project_root: Path) -> str:
+    """
+    Get a chunk's source file path relative to the project root.
+
+    Args:
+        metadata: Chunk metadata.
+        project_root: Project root directory.
+
+    Returns:
+        Relative POSIX path, or the stored path if it is outside the project.
+    """
+    if 'rel_path' in metadata:
+        return str(metadata['rel_path'])
+    source = Path(metadata.get('source', ''))
+    try:
+        return source.relative_to(project_root).as_posix()
+    except ValueError:
+        return source.as_posix()
+
+
+def shard_name(directory: str) -> str:
+    """
+    Turn a configured directory into a shard name.
+
+    Names only use characters allowed in ChromaDB collection names.
+
+    Args:
+        directory: Configured indexing directory.
+
+    Returns:
+        Shard name.
+    """
+    name = re.sub(r'[^A-Za-z0-9._-]+', '-', _normalize_directory(directory)).strip('-._')
+    return name or ROOT_SHARD
+
+
+def assign_shard(
+    metadata: Dict[str, Any],
+    project_root: Path,
+    directories: List[str],
+    mode: str,
+    shards: int = 4
+) -> str:
+    """
+    Choose the shard for a chunk.
+
+    Args:
+        metadata: Chunk metadata (uses ``source``).
+        project_root: Project root directory.
+        directories: Configured indexing directories.
+        mode: Sharding mode (directory or hash).
+        shards: Number of hash buckets.
+
+    Returns:
+        Shard name.
+    """
+    path = relative_source(metadata, project_root)
+    if mode == 'hash':
+        return f"hash-{zlib.crc32(path.encode('utf-8')) % max(1, shards):02d}"
+
+    # Most specific configured directory wins (e.g. docs/api over docs)
+    matches = [d for d in directories if _is_within(path, _normalize_directory(d))]
+    if not matches:
+        return ROOT_SHARD
+    return shard_name(max(matches, key=lambda d: len(_normalize_directory(d))))
+
+
+def group_by_shard(
+    chunks: List[Document],
+    project_root: Path,
+    directories: List[str],
+    mode: str,
+    shards: int = 4
+) -> Dict[str, List[Document]]:
+    """
+    Split chunks into shards.
+
+    Args:
+        chunks: Document chunks.
+        project_root: Project root directory.
+        directories: Configured indexing directories.
+        mode: Sharding mode (directory or hash).
+        shards: Number of hash buckets.
+
+    Returns:
+        Mapping of shard name to its chunks, in input order.
+    """
+    groups: Dict[str, List[Document]] = {}
+    for chunk in chunks:
+        groups.setdefault(assign_shard(chunk.metadata, project_root, directories, mode, shards), []).append(chunk)
+    return groups
+
+
+def shard_directories(directories: List[str], mode: str, names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Map shard names to the directory each one covers.
+
+    Args:
+        directories: Configured indexing directories.
+        mode: Sharding mode (directory or hash).
+        names: Shard names that were built.
+
+    Returns:
+        Mapping of shard name to normalized directory, or None when the
+        shard may hold files from anywhere (hash buckets, root shard).
+    """
+    by_name = {shard_name(d): _normalize_directory(d) for d in directories} if mode == 'directory' else {}
+    return {name: by_name.get(name) if name != ROOT_SHARD else None for name in names}
+
+
+def in_directories(metadata: Dict[str, Any], project_root: Path, directories: List[str]) -> bool:
+    """
+    Check whether a chunk's source file lies in one of the given directories.
+
+    Args:
+        metadata: Chunk metadata.
+        project_root: Project root directory.
+        directories: Directories relative to the project root.
+
+    Returns:
+        True if the source is inside any of the directories.
+    """
+    path = relative_source(metadata, project_root)
+    return any(_is_within(path, _normalize_directory(d)) for d in directories)
+
+
+def relevance_score_fn(store: Union[ShardStore, 'ShardedVectorStore']) -> Callable[[float], float]:
+    """
+    Get the function converting a store's search scores to cosine similarity.
+
+    Flat and sharded stores already return cosine similarity. ChromaDB
+    returns distances in the collection's space: ``1 - d`` for ``cosine``
+    (and ``ip`` on unit-length embeddings), and ``1 - d/2`` for squared
+    ``l2`` distances of unit-length embeddings, the default space of
+    collections created before ``hnsw:space: cosine`` was set. LangChain's
+    own ``1 - d/sqrt(2)`` for ``l2`` is not on the cosine scale.
+
+    Args:
+        store: Flat, ChromaDB or sharded vector store.
+
+    Returns:
+        Function mapping a raw score to a similarity in [-1, 1].
+    """
+    if isinstance(store, (FlatVectorStore, ShardedVectorStore)):
+        return lambda score: score
+
+    configuration = getattr(store._collection, 'configuration', None) or {}
+    space = (configuration.get('hnsw') or {}).get('space') or (store._collection.metadata or {}).get('hnsw:space', 'l2')
+    if space == 'l2':
+        return lambda distance: 1.0 - distance / 2.0
+    return lambda distance: 1.0 - distance
+
+
+def _search_shard(store: ShardStore, embedding: List[float], k: int, **kwargs: Any) -> List[Tuple[Document, float]]:
+    """
+    Search one shard by vector and return relevance scores (higher is better).
+
+    Args:
+        store: Shard vector store.
+        embedding: Query embedding.
+        k: Number of results.
+
+    Returns:
+        List of (document, relevance score) tuples.
+    """
+    if isinstance(store, FlatVectorStore):
+        return store.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    # Chroma returns distances; convert them so scores are comparable across shards
+    relevance = relevance_score_fn(store)
+    hits = store.similarity_search_by_vector_with_relevance_scores(embedding, k, **kwargs)
+    return [(doc, relevance(distance)) for doc, distance in hits]
+
+
+def search_with_vectors(
+    store: Union[ShardStore, 'ShardedVectorStore'],
+    embedding: List[float],
+    k: int,
+    **kwargs: Any
+) -> List[Tuple[Document, float, np.ndarray]]:
+    """
+    Search a store by vector, returning relevance scores and stored vectors.
+
+    Stored vectors come back with the hits, so candidates can be compared
+    with each other (e.g. for MMR) without embedding them again.
+
+    Args:
+        store: Flat, ChromaDB or sharded vector store.
+        embedding: Query embedding.
+        k: Number of results.
+        **kwargs: Search options (``filter``, ``directories``, ``nprobe``).
+
+    Returns:
+        List of (document, relevance score, vector) tuples, best first.
+    """
+    if isinstance(store, ShardedVectorStore):
+        return store.similarity_search_with_vectors_by_vector(embedding, k, **kwargs)
+
+    if isinstance(store, FlatVectorStore):
+        hits, vectors = store.similarity_search_with_vectors_by_vector(
+            embedding, k, nprobe=kwargs.get('nprobe'), exact=kwargs.get('exact', False), filter=kwargs.get('filter')
+        )
+        return [(doc, score, vector) for (doc, score), vector in zip(hits, vectors)]
+
+    results = store._collection.query(
+        query_embeddings=np.asarray([embedding], dtype=np.float32),
+        n_results=k,
+        where=kwargs.get('filter'),
+        include=['documents', 'metadatas', 'distances', 'embeddings']
+    )
+    texts, metadatas = results['documents'], results['metadatas']
+    distances, embeddings = results['distances'], results['embeddings']
+    if texts is None or metadatas is None or distances is None or embeddings is None:
+        # Every field was requested, so Chroma returns all of them
+        return []
+    relevance = relevance_score_fn(store)
+    return [
+        (Document(page_content=text or '', metadata=dict(metadata or {}), id=record_id), relevance(distance),
+         np.asarray(vector, dtype=np.float32))
+        for record_id, text, metadata, distance, vector in zip(
+            results['ids'][0], texts[0], metadatas[0], distances[0], embeddings[0]
+        )
+    ]
+
+
+class ShardedVectorStore(VectorStore):
+    """Read-only view over several shard stores with parallel fan-out search."""
+
+    def __init__(
+        self,
+        shards: Dict[str, ShardStore],
+        embedding: Embeddings,
+        directories: Optional[Dict[str, Optional[str]]] = None,
+        project_root: Optional[Path] = None,
+        max_workers: int = MAX_SEARCH_WORKERS
+    ):
+        """
+        Initialize sharded store.
+
+        Args:
+            shards: Mapping of shard name to vector store.
+            embedding: Embedding model used for queries.
+            directories: Mapping of shard name to the directory it covers
+                (None = any directory). Defaults to None for every shard.
+            project_root: Project root for directory filtering.
+            max_workers: Maximum threads searching shards concurrently.
+        """
+        self.shards = shards
+        self._embedding = embedding
+        self.directories = directories or {name: None for name in shards}
+        self.project_root = Path(project_root) if project_root else Path.cwd()
+        workers = min(max_workers, len(shards))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docrag-shard") if workers > 1 else None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def select_shards(self, directories: Optional[List[str]] = None) -> Tuple[List[str], bool]:
+        """
+        Choose the shards a query must search.
+
+        Args:
+            directories: Requested directories, or None for all.
+
+        Returns:
+            Tuple of (shard names, whether results need directory filtering).
+        """
+        if not directories:
+            return list(self.shards), False
+
+        requested = [_normalize_directory(d) for d in directories]
+        selected = []
+        needs_filter = False
+        for name in self.shards:
+            covered = self.directories.get(name)
+            if covered is None:
+                selected.append(name)
+                needs_filter = needs_filter or '' not in requested
+            elif any(_is_within(covered, r) for r in requested):
+                selected.append(name)
+            elif any(_is_within(r, covered) for r in requested):
+                # Only part of this shard was requested
+                selected.append(name)
+                needs_filter = True
+        return selected, needs_filter
+
+    def _fan_out(
+        self,
+        search: Callable[[ShardStore, int], List[tuple]],
+        k: int,
+        directories: Optional[List[str]]
+    ) -> List[tuple]:
+        """Run a per-shard search on the relevant shards and merge hits by score."""
+        names, needs_filter = self.select_shards(directories)
+        if not names:
+            return []
+
+        fetch_k = k * FILTER_OVERFETCH if needs_filter else k
+
+        def search_shard(name: str) -> List[tuple]:
+            return search(self.shards[name], fetch_k)
+
+        if self._executor is not None and len(names) > 1:
+            shard_hits = list(self._executor.map(search_shard, names))
+        else:
+            shard_hits = [search_shard(name) for name in names]
+
+        hits = [hit for hits in shard_hits for hit in hits]
+        if needs_filter and directories:
+            hits = [hit for hit in hits if in_directories(hit[0].metadata, self.project_root, directories)]
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:k]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        directories: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search the relevant shards in parallel and merge their top-k lists.
+
+        Args:
+            embedding: Query embedding.
+            k: Number of results.
+            directories: Only return chunks from files in these directories.
+            **kwargs: Passed to each shard's search (e.g. nprobe for flat shards).
+
+        Returns:
+            List of (document, relevance score) tuples, best first.
+        """
+        return self._fan_out(
+            lambda store, fetch_k: _search_shard(store, embedding, fetch_k, **kwargs), k, directories
+        )
+
+    def similarity_search_with_vectors_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        directories: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float, np.ndarray]]:
+        """Like ``similarity_search_with_score_by_vector``, with each hit's stored vector."""
+        return self._fan_out(
+            lambda store, fetch_k: search_with_vectors(store, embedding, fetch_k, **kwargs), k, directories
+        )
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        """Return diverse documents by maximal marginal relevance over all shards."""
+        hits = self.similarity_search_with_vectors_by_vector(embedding, max(k, fetch_k), **kwargs)
+        if not hits:
+            return []
+        picks = mmr_select(embedding, np.stack([vector for _, _, vector in hits]), k, lambda_mult)
+        return [hits[i][0] for i in picks]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Shard scores are already converted to relevance
+        return lambda score: score
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        raise NotImplementedError("Sharded stores are built per shard by VectorDBManager")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any
+    ) -> 'ShardedVectorStore':
+        raise NotImplementedError("Sharded stores are built per shard by VectorDBManager")
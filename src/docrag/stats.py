@@ -0,0 +1,56 @@
+"""Latency and size statistics shared by the benchmarks, load generator, replay and traces."""
+
+from pathlib import Path
+from typing import List, Dict
+
+
+def percentile(values: List[float], percentile: float) -> float:
+    """
+    Get a percentile by the nearest-rank method.
+
+    Args:
+        values: Non-empty list of values.
+        percentile: Percentile between 0 and 100.
+
+    Returns:
+        The value at that rank.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        seconds: Latencies in seconds.
+
+    Returns:
+        Dictionary with ``p50_ms``, ``p95_ms``, ``p99_ms``, ``mean_ms`` and
+        ``count``, or an empty dictionary if there are no latencies.
+    """
+    if not seconds:
+        return {}
+    ms = [s * 1000 for s in seconds]
+    return {
+        'p50_ms': percentile(ms, 50),
+        'p95_ms': percentile(ms, 95),
+        'p99_ms': percentile(ms, 99),
+        'mean_ms': sum(ms) / len(ms),
+        'count': len(ms)
+    }
+
+
+def directory_size_mb(path: Path) -> float:
+    """
+    Get the total size of the files under a directory.
+
+    Args:
+        path: Directory to measure.
+
+    Returns:
+        Size in MiB (0 if the directory does not exist).
+    """
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file()) / 1024 / 1024
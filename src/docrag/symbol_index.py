@@ -0,0 +1,396 @@
+"""Code symbol index for DocRAG Kit.
+
+Definitions (classes, functions, methods) are extracted from indexed code
+files at index time - with ``ast`` for Python and lightweight line-based
+parsers for other languages - and stored in a compact table sorted by
+lowercase name, so "where is X defined" is a binary search with no
+embedding call or vector search.
+"""
+
+import ast
+import bisect
+import json
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .document_processor import CODE_EXTENSIONS
+from .lexical_index import atomic_write_json
+
+
+SYMBOL_FILE = "symbols.json"
+
+
+# Brace-delimited languages handled by the line-based parser (the
+# CODE_EXTENSIONS that SymbolIndex.build scans, other than Python)
+_BRACE_LANGUAGES = {
+    '.php': 'php', '.swift': 'swift', '.java': 'java', '.go': 'go',
+    '.js': 'js', '.c': 'c', '.cpp': 'c',
+}
+
+_CONTROL_KEYWORDS = {
+    'if', 'for', 'while', 'switch', 'catch', 'return', 'else', 'do', 'try',
+    'sizeof', 'new', 'delete', 'function', 'elif', 'with', 'guard', 'defer',
+    'throw', 'case',
+}
+
+_TYPE_PATTERNS = {
+    'php': re.compile(r'^\s*(?:(?:abstract|final|readonly)\s+)*(class|interface|trait|enum)\s+(\w+)'),
+    'swift': re.compile(
+        r'^\s*(?:(?:public|private|internal|fileprivate|open|final)\s+)*'
+        r'(class|struct|enum|protocol|extension|actor)\s+(\w+)'
+    ),
+    'java': re.compile(
+        r'^\s*(?:(?:public|protected|private|static|final|abstract|sealed)\s+)*'
+        r'(class|interface|enum|record|@interface)\s+(\w+)'
+    ),
+    'js': re.compile(
+        r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(class|interface|enum)\s+(\w+)'
+    ),
+    'c': re.compile(r'^\s*(?:template\s*<[^>]*>\s*)?(class|struct|namespace)\s+(\w+)\s*[:{]?[^;]*$'),
+    'go': re.compile(r'^type\s+(\w+)\s+(struct|interface)\b'),
+}
+
+_FUNCTION_PATTERNS = {
+    'php': re.compile(
+        r'^\s*(?:(?:public|protected|private|static|abstract|final)\s+)*function\s+&?(\w+)\s*\('
+    ),
+    'swift': re.compile(
+        r'^\s*(?:(?:public|private|internal|fileprivate|open|static|class|override|final|'
+        r'mutating|@\w+)\s+)*(?:func\s+(\w+)|(init)\s*[(<])'
+    ),
+    'java': re.compile(
+        r'^\s*(?:(?:public|protected|private|static|final|abstract|synchronized|native|default)\s+)*'
+        r'(?:<[^>]+>\s+)?[\w<>\[\],.? ]+\s+(\w+)\s*\('
+    ),
+    'js': re.compile(
+        r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)\s*\('
+        r'|^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?'
+        r'(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)'
+    ),
+    'c': re.compile(r'^(?!\s)(?:[\w*&:<>,]+\s+)+\**&?([\w:~]+)\s*\([^;]*$'),
+    'go': re.compile(r'^func\s+(?:\(\s*\w*\s*\*?(\w+)[^)]*\)\s*)?(\w+)\s*[(\[]'),
+}
+
+# Methods declared inside a class body without a keyword (JS/TS classes)
+_JS_METHOD_RE = re.compile(r'^\s+(?:static\s+)?(?:async\s+)?(?:get\s+|set\s+)?\*?(\w+)\s*\([^)]*\)\s*\{')
+
+
+def _python_symbols(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract definitions from Python source using ``ast``.
+
+    Args:
+        text: Python source code.
+
+    Returns:
+        List of symbol dictionaries.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    symbols = []
+
+    def visit(node, container: Optional[str], in_class: bool):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                symbols.append({
+                    'name': child.name, 'kind': 'class',
+                    'line': child.lineno, 'container': container
+                })
+                qualified = f"{container}.{child.name}" if container else child.name
+                visit(child, qualified, True)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append({
+                    'name': child.name, 'kind': 'method' if in_class else 'function',
+                    'line': child.lineno, 'container': container
+                })
+                qualified = f"{container}.{child.name}" if container else child.name
+                visit(child, qualified, False)
+            else:
+                visit(child, container, in_class)
+
+    visit(ast.parse(text), None, False)
+    return symbols
+
+
+def _python_symbols_fallback(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract Python definitions line by line (for files ``ast`` cannot parse).
+
+    Args:
+        text: Python source code.
+
+    Returns:
+        List of symbol dictionaries.
+    """
+    symbols = []
+    classes: List[Tuple[int, str]] = []  # (indent, name) stack
+    pattern = re.compile(r'^(\s*)(?:async\s+)?(class|def)\s+(\w+)')
+
+    for line_no, line in enumerate(text.splitlines(), 1):
+        match = pattern.match(line)
+        if not match:
+            continue
+        indent = len(match.group(1).expandtabs())
+        while classes and classes[-1][0] >= indent:
+            classes.pop()
+        container = classes[-1][1] if classes else None
+        if match.group(2) == 'class':
+            symbols.append({'name': match.group(3), 'kind': 'class', 'line': line_no, 'container': container})
+            classes.append((indent, match.group(3)))
+        else:
+            kind = 'method' if container else 'function'
+            symbols.append({'name': match.group(3), 'kind': kind, 'line': line_no, 'container': container})
+    return symbols
+
+
+def _brace_symbols(text: str, language: str) -> List[Dict[str, Any]]:
+    """
+    Extract definitions from brace-delimited languages line by line.
+
+    Tracks brace depth to attribute functions declared inside a type body
+    to that type. Braces inside strings and comments are not special-cased;
+    this is a lightweight heuristic, not a parser.
+
+    Args:
+        text: Source code.
+        language: Key into the pattern tables.
+
+    Returns:
+        List of symbol dictionaries.
+    """
+    symbols = []
+    type_pattern = _TYPE_PATTERNS[language]
+    function_pattern = _FUNCTION_PATTERNS[language]
+    types: List[Tuple[int, str]] = []  # (brace depth of body, name) stack
+    depth = 0
+
+    for line_no, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if stripped.startswith(('//', '/*', '*', '#')) and language != 'php':
+            continue
+
+        while types and depth < types[-1][0]:
+            types.pop()
+        container = types[-1][1] if types else None
+
+        type_match = type_pattern.match(line)
+        if type_match:
+            if language == 'go':
+                name, kind = type_match.group(1), type_match.group(2)
+            else:
+                kind, name = type_match.group(1), type_match.group(2)
+            kind = 'class' if kind in ('class', 'record', 'actor') else kind.lstrip('@')
+            symbols.append({'name': name, 'kind': kind, 'line': line_no, 'container': container})
+            if language != 'go':
+                types.append((depth + 1, name))
+        else:
+            function_match = function_pattern.match(line)
+            name = None
+            func_container = container
+            if function_match:
+                groups = [g for g in function_match.groups() if g]
+                if language == 'go' and function_match.group(1):
+                    func_container, name = function_match.group(1), function_match.group(2)
+                elif groups:
+                    name = groups[-1]
+                # Java modifiers are optional, so statements such as
+                # ``return helper(x);`` match too; reject them by their first words
+                if language == 'java':
+                    if _CONTROL_KEYWORDS.intersection(line[:function_match.start(1)].split()):
+                        name = None
+            elif language == 'js' and container:
+                method_match = _JS_METHOD_RE.match(line)
+                if method_match:
+                    name = method_match.group(1)
+
+            if name and name not in _CONTROL_KEYWORDS:
+                if language == 'c' and '::' in name:
+                    func_container, name = name.rsplit('::', 1)
+                kind = 'method' if func_container else 'function'
+                symbols.append({'name': name, 'kind': kind, 'line': line_no, 'container': func_container})
+
+        depth += line.count('{') - line.count('}')
+        depth = max(depth, 0)
+
+    return symbols
+
+
+def extract_symbols(text: str, file_type: str) -> List[Dict[str, Any]]:
+    """
+    Extract class, function and method definitions from source code.
+
+    Args:
+        text: Source code.
+        file_type: File extension including the dot (e.g. ``.py``).
+
+    Returns:
+        List of dictionaries with ``name``, ``kind``, ``line`` and ``container``.
+    """
+    if file_type == '.py':
+        try:
+            return _python_symbols(text)
+        except (SyntaxError, ValueError, RecursionError):
+            return _python_symbols_fallback(text)
+
+    language = _BRACE_LANGUAGES.get(file_type)
+    if language is None:
+        return []
+    return _brace_symbols(text, language)
+
+
+class SymbolIndex:
+    """Sorted symbol table supporting O(log n) name lookup."""
+
+    def __init__(self, records: List[List[Any]], keys: List[str], key_records: List[int]):
+        """
+        Initialize symbol index.
+
+        Args:
+            records: Symbol records ``[name, kind, path, line, container]``.
+            keys: Sorted lowercase lookup keys (plain and qualified names).
+            key_records: Record index for each key.
+        """
+        self.records = records
+        self.keys = keys
+        self.key_records = key_records
+
+    @classmethod
+    def build(cls, chunks: List[Document], project_root: Path) -> 'SymbolIndex':
+        """
+        Build symbol index from the code files behind a set of chunks.
+
+        Each source file is read once in full, since definitions (and Python
+        syntax trees) do not respect chunk boundaries.
+
+        Args:
+            chunks: Indexed document chunks.
+            project_root: Project root used to store relative paths.
+
+        Returns:
+            SymbolIndex instance.
+        """
+        sources: Dict[str, str] = {}
+        for chunk in chunks:
+            file_type = chunk.metadata.get('file_type', '')
+            source = chunk.metadata.get('source')
+            if source and file_type in CODE_EXTENSIONS:
+                sources.setdefault(source, file_type)
+
+        records = []
+        for source, file_type in sorted(sources.items()):
+            try:
+                text = Path(source).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                continue
+
+            try:
+                path = str(Path(source).relative_to(project_root))
+            except ValueError:
+                path = source
+
+            for symbol in extract_symbols(text, file_type):
+                records.append([
+                    symbol['name'], symbol['kind'], path, symbol['line'], symbol['container']
+                ])
+
+        return cls.from_records(records)
+
+    @classmethod
+    def from_records(cls, records: List[List[Any]]) -> 'SymbolIndex':
+        """
+        Create index from symbol records, building the sorted key table.
+
+        Args:
+            records: Symbol records ``[name, kind, path, line, container]``.
+
+        Returns:
+            SymbolIndex instance.
+        """
+        entries = []
+        for idx, (name, _, _, _, container) in enumerate(records):
+            entries.append((name.lower(), idx))
+            if container:
+                entries.append((f"{container}.{name}".lower(), idx))
+        entries.sort()
+
+        return cls(records, [key for key, _ in entries], [idx for _, idx in entries])
+
+    def lookup(
+        self,
+        name: str,
+        kind: Optional[str] = None,
+        prefix: bool = False,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Find definitions by name.
+
+        Args:
+            name: Symbol name, optionally qualified (``Class.method``). Case-insensitive.
+            kind: Optional kind filter (class, function, method, ...).
+            prefix: Match names starting with ``name`` instead of exact matches.
+            limit: Maximum number of results.
+
+        Returns:
+            List of symbol dictionaries with ``name``, ``kind``, ``path``,
+            ``line`` and ``container``.
+        """
+        key = name.strip().lower()
+        if not key:
+            return []
+
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + '\uffff') if prefix else bisect.bisect_right(self.keys, key)
+
+        results = []
+        seen = set()
+        for position in range(start, end):
+            idx = self.key_records[position]
+            if idx in seen:
+                continue
+            seen.add(idx)
+
+            record_name, record_kind, path, line, container = self.records[idx]
+            if kind and record_kind != kind:
+                continue
+            results.append({
+                'name': record_name, 'kind': record_kind,
+                'path': path, 'line': line, 'container': container
+            })
+            if len(results) >= limit:
+                break
+
+        return results
+
+    def save(self, index_dir: Path) -> None:
+        """
+        Save index to disk.
+
+        Args:
+            index_dir: Directory holding the local indexes.
+        """
+        atomic_write_json(Path(index_dir) / SYMBOL_FILE, {
+            'version': 1,
+            'records': self.records,
+            'keys': self.keys,
+            'key_records': self.key_records
+        })
+
+    @classmethod
+    def load(cls, index_dir: Path) -> 'SymbolIndex':
+        """
+        Load index from disk.
+
+        Args:
+            index_dir: Directory holding the local indexes.
+
+        Returns:
+            SymbolIndex instance.
+        """
+        with open(Path(index_dir) / SYMBOL_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['records'], data['keys'], data['key_records'])
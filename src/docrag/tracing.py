@@ -0,0 +1,614 @@
+"""Span tracing for DocRAG Kit.
+
+With ``tracing.enabled: true``, index runs (``docrag index``/``reindex`` and
+the MCP reindex worker) and MCP tool calls record spans with parent/child
+relationships. Every ``phase`` becomes a span (``scan``, ``load``,
+``chunk``, ``write``, ``embed``, ``local_indexes``, ``staleness``,
+``search``, ``llm``), plus ``embed_batch`` for local embedding batches and
+``prompt_build`` for context packing. Spans carry attributes such as file,
+chunk, text and token counts.
+
+Each process appends spans to its own ``.docrag/traces-<pid>.jsonl``, one
+per line::
+
+    {"trace_id": "4bf9...", "span_id": "00f0...", "parent_id": "a3ce...",
+     "name": "search", "kind": "internal", "start": 1767607200.123,
+     "duration_ms": 36.0, "status": "ok", "attributes": {"results": 3},
+     "service": "docrag", "pid": 4242}
+
+or, with ``tracing.otlp_endpoint`` (or ``OTEL_EXPORTER_OTLP_ENDPOINT``),
+posted in batches to an OpenTelemetry collector as OTLP/HTTP JSON.
+
+Tool call spans note how many other calls were in flight and whether a
+reindex ran or the index was rebuilt during the call. ``read_traces`` reads
+the files of every process (the CLI, the MCP server and its reindex
+worker), so ``summarize_traces`` can also match slow calls with index runs
+of other processes.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar, Token
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+
+from .instrumentation import add_phase_observer
+from .stats import percentile
+
+
+TRACE_FILE = "traces-{pid}.jsonl"
+TRACE_GLOB = "traces-*.jsonl*"
+OTLP_TRACES_PATH = "/v1/traces"
+OTLP_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+TRACEPARENT_ENV = "TRACEPARENT"
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL_S = 2.0
+EXPORT_TIMEOUT_S = 5.0
+
+# Root spans of index builds, for matching with slow calls
+INDEX_SPANS = ['index', 'reindex']
+
+_OTLP_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+_tracer: ContextVar[Optional['Tracer']] = ContextVar('docrag_tracer', default=None)
+_current_span: ContextVar[Optional['Span']] = ContextVar('docrag_current_span', default=None)
+
+
+class Span:
+    """A timed operation with attributes, part of a trace."""
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        kind: str = 'internal',
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = 'ok'
+        self.error: Optional[str] = None
+        self._token: Optional[Token[Optional['Span']]] = None
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value for child processes."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def mark_error(self, message: str) -> None:
+        """Mark the span failed without an exception (e.g. an ``ERROR:`` tool result)."""
+        self.status = 'error'
+        self.error = message
+
+    def end(self, error: Optional[BaseException] = None, failed: bool = False) -> None:
+        """End the span (once) and hand it to the exporter."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.mark_error(f"{type(error).__name__}: {error}")
+        elif failed:
+            self.status = 'error'
+        self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONL entry of an ended span."""
+        assert self.end_ns is not None, f"span {self.name} has not ended"
+        entry = {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start': round(self.start_ns / 1e9, 6),
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+            'service': self.tracer.service_name,
+            'pid': self.tracer.pid
+        }
+        if self.error:
+            entry['error'] = self.error
+        return entry
+
+
+class _NoopSpan:
+    """Stand-in yielded by ``span`` when tracing is off."""
+
+    recording = False
+    traceparent = None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def mark_error(self, message: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def prune_trace_files(directory: Path, max_bytes: int, keep: Optional[Path] = None) -> List[str]:
+    """
+    Delete the least recently written trace files beyond ``max_bytes`` in total.
+
+    Args:
+        directory: Directory holding ``traces-<pid>.jsonl`` files.
+        max_bytes: Total size to stay under.
+        keep: File never deleted (the caller's own).
+
+    Returns:
+        Names of deleted files.
+    """
+    files = sorted(Path(directory).glob(TRACE_GLOB), key=lambda p: p.stat().st_mtime, reverse=True)
+    total = 0
+    deleted = []
+    for file in files:
+        total += file.stat().st_size
+        if total > max_bytes and file != keep:
+            file.unlink(missing_ok=True)
+            deleted.append(file.name)
+    return deleted
+
+
+class JsonlSpanExporter:
+    """
+    Rotating JSONL file of spans, one per process.
+
+    Rotating a file that other processes also append to would rename it
+    under them, so each process writes ``traces-<pid>.jsonl`` and older
+    files of finished processes are pruned to ``max_mb * (backups + 1)``.
+    """
+
+    def __init__(self, directory: Path, max_mb: float = 10.0, backups: int = 3):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / TRACE_FILE.format(pid=os.getpid())
+        prune_trace_files(directory, int(max_mb * 1024 * 1024) * (backups + 1), keep=self.path)
+        self._handler = RotatingFileHandler(
+            self.path,
+            maxBytes=int(max_mb * 1024 * 1024),
+            backupCount=backups,
+            encoding='utf-8'
+        )
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+            # handle() takes the handler lock; spans end in worker threads too
+            self._handler.handle(logging.LogRecord('docrag.tracing', logging.INFO, '', 0, line, None, None))
+
+    def shutdown(self) -> None:
+        self._handler.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """
+    Build an OTLP/HTTP JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        spans: Ended spans.
+        service_name: ``service.name`` resource attribute.
+
+    Returns:
+        Request body as a dictionary.
+    """
+    from docrag import __version__
+
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': _OTLP_KINDS.get(span.kind, 1),
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': _otlp_attributes(span.attributes),
+            'status': {'code': 2, 'message': span.error or ''} if span.status == 'error' else {'code': 1}
+        }
+        if span.parent_id:
+            otlp_span['parentSpanId'] = span.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({
+                'service.name': service_name,
+                'service.version': __version__,
+                'process.pid': os.getpid()
+            })},
+            'scopeSpans': [{
+                'scope': {'name': 'docrag', 'version': __version__},
+                'spans': otlp_spans
+            }]
+        }]
+    }
+
+
+class OtlpSpanExporter:
+    """Batches spans and posts them to an OTLP/HTTP collector in the background."""
+
+    def __init__(self, endpoint: str, timeout: float = EXPORT_TIMEOUT_S):
+        """
+        Initialize the exporter.
+
+        Args:
+            endpoint: Collector base URL (``/v1/traces`` is appended unless present).
+            timeout: Seconds to wait for the collector per request.
+        """
+        endpoint = endpoint.rstrip('/')
+        self.url = endpoint if endpoint.endswith(OTLP_TRACES_PATH) else endpoint + OTLP_TRACES_PATH
+        self.timeout = timeout
+        self.failures = 0
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="docrag-otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._pending.extend(spans)
+            if len(self._pending) >= EXPORT_BATCH_SIZE:
+                self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(EXPORT_INTERVAL_S)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Post pending spans now (failures are reported on stderr and dropped)."""
+        with self._send_lock:
+            with self._lock:
+                spans, self._pending = self._pending, []
+            for start in range(0, len(spans), EXPORT_BATCH_SIZE):
+                self._post(spans[start:start + EXPORT_BATCH_SIZE])
+
+    def _post(self, spans: List[Span]) -> None:
+        body = json.dumps(otlp_payload(spans, spans[0].tracer.service_name), default=str).encode('utf-8')
+        request = urllib.request.Request(
+            self.url, data=body, method='POST', headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            # Report the first failure of a run of failures only
+            if not self.failures:
+                print(f"WARNING: Could not export {len(spans)} spans to {self.url}: {e}", file=sys.stderr)
+            self.failures += 1
+        else:
+            self.failures = 0
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+class Tracer:
+    """Creates spans and hands ended ones to an exporter."""
+
+    def __init__(self, exporter, service_name: str = "docrag"):
+        self.exporter = exporter
+        self.service_name = service_name
+        self.pid = os.getpid()
+
+    @classmethod
+    def from_config(cls, project_root: Path, config: Dict[str, Any]) -> Optional['Tracer']:
+        """Create a tracer from ``tracing`` settings, or None if disabled."""
+        tracing_config = config.get('tracing', {})
+        if not tracing_config.get('enabled', False):
+            return None
+        service_name = tracing_config.get('service_name', 'docrag')
+        endpoint = tracing_config.get('otlp_endpoint') or os.environ.get(OTLP_ENDPOINT_ENV)
+        if endpoint:
+            return cls(OtlpSpanExporter(endpoint), service_name)
+        exporter = JsonlSpanExporter(
+            Path(project_root) / ".docrag",
+            max_mb=tracing_config.get('max_mb', 10.0),
+            backups=tracing_config.get('backups', 3)
+        )
+        return cls(exporter, service_name)
+
+    def start_span(self, name: str, kind: str = 'internal', traceparent: Optional[str] = None, **attributes: Any) -> Span:
+        """
+        Start a child of the current span, or a root span.
+
+        Args:
+            name: Span name.
+            kind: ``internal``, ``server`` or ``client``.
+            traceparent: W3C ``traceparent`` of a parent in another process;
+                used when there is no current span.
+            **attributes: Initial attributes.
+        """
+        parent = _current_span.get()
+        trace_id = parent_id = None
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif traceparent:
+            parts = traceparent.split('-')
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                trace_id, parent_id = parts[1], parts[2]
+        return Span(self, name, trace_id, parent_id, kind, attributes)
+
+    def export(self, span: Span) -> None:
+        try:
+            self.exporter.export([span])
+        except OSError as e:
+            print(f"WARNING: Could not write span {span.name}: {e}", file=sys.stderr)
+
+    def shutdown(self) -> None:
+        """Flush and close the exporter."""
+        self.exporter.shutdown()
+
+    def _on_phase(self, name: str, event: str, attributes: Dict[str, Any]) -> None:
+        # Phases nest within a context, so the current span is the phase's own
+        if event == 'start':
+            started = self.start_span(name, **attributes)
+            started._token = _current_span.set(started)
+            return
+        span = _current_span.get()
+        if span is None or span.name != name or span._token is None:
+            return
+        span.end(failed=event == 'error')
+        _current_span.reset(span._token)
+
+
+@contextlib.contextmanager
+def activate(tracer: Optional['Tracer']) -> Iterator[None]:
+    """Record spans (and turn phases into spans) with ``tracer`` while the block runs."""
+    if tracer is None:
+        yield
+        return
+    token = _tracer.set(tracer)
+    try:
+        with add_phase_observer(tracer._on_phase):
+            yield
+    finally:
+        _tracer.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = 'internal', traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Record a span around the block (a no-op span when tracing is off).
+
+    Yields:
+        The span, for ``set_attributes``.
+    """
+    tracer = _tracer.get()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    current = tracer.start_span(name, kind, traceparent, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+@contextlib.contextmanager
+def trace_run(project_root: Path, name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Trace a CLI run as a root span if the project enables tracing.
+
+    Yields:
+        The root span (the no-op span when tracing is off).
+    """
+    from .config_manager import ConfigManager
+
+    try:
+        config = ConfigManager(Path(project_root)).load_config()
+    except Exception:
+        # The command reports configuration problems itself
+        config = None
+    tracer = Tracer.from_config(project_root, config.to_dict()) if config else None
+    try:
+        with activate(tracer), span(name, **attributes) as root:
+            yield root
+    finally:
+        if tracer is not None:
+            tracer.shutdown()
+
+
+def current_span() -> Any:
+    """The current span, or the no-op span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(**attributes)
+
+
+def is_recording() -> bool:
+    """Whether spans are being recorded here (to skip costly attributes)."""
+    return _tracer.get() is not None
+
+
+def read_traces(path: Path, include_rotated: bool = True) -> List[Dict[str, Any]]:
+    """
+    Read spans from JSONL trace files, oldest first.
+
+    Args:
+        path: A trace file, or a directory (``.docrag``) to read the
+            ``traces-<pid>.jsonl`` files of every process from.
+        include_rotated: Also read rotated files (``.1``, ``.2``, ...).
+
+    Returns:
+        Spans sorted by start time. Lines that are not valid JSON are skipped.
+
+    Raises:
+        ValueError: If there are no trace files.
+    """
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(path.glob(TRACE_GLOB if include_rotated else TRACE_FILE.format(pid='*')))
+    else:
+        files = [path] if path.exists() else []
+        if files and include_rotated:
+            files += sorted(path.parent.glob(f"{path.name}.*"), key=lambda p: p.suffix)
+    if not files:
+        raise ValueError(
+            f"ERROR: No trace files found in {path}\n"
+            f"   Set tracing.enabled: true in .docrag/config.yaml to record spans"
+        )
+    spans = []
+    for file in files:
+        with open(file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return sorted(spans, key=lambda entry: entry.get('start', 0))
+
+
+def summarize_traces(spans: List[Dict[str, Any]], slow_ms: float = 2000.0, limit: int = 10) -> Dict[str, Any]:
+    """
+    Summarize spans: time per span name and the slowest tool calls.
+
+    Args:
+        spans: Entries from ``read_traces``.
+        slow_ms: Tool calls at least this slow are listed.
+        limit: Maximum slow calls listed (slowest first).
+
+    Returns:
+        Dictionary with ``spans`` (per name: ``count``, ``p50_ms``,
+        ``p95_ms``, ``total_s``) and ``slow_calls`` (per call: ``name``,
+        ``start``, ``duration_ms``, ``trace_id``, ``children`` (ms per child
+        span name), ``attributes`` and ``overlapping_index_runs``: index runs
+        of any process that overlapped the call).
+    """
+    by_name: Dict[str, List[float]] = {}
+    children: Dict[str, Dict[str, float]] = {}
+    for entry in spans:
+        by_name.setdefault(entry['name'], []).append(entry['duration_ms'])
+        if entry.get('parent_id'):
+            totals = children.setdefault(entry['parent_id'], {})
+            totals[entry['name']] = totals.get(entry['name'], 0.0) + entry['duration_ms']
+
+    summary = {}
+    for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+        durations = sorted(durations)
+        summary[name] = {
+            'count': len(durations),
+            'p50_ms': percentile(durations, 50),
+            'p95_ms': percentile(durations, 95),
+            'total_s': sum(durations) / 1000
+        }
+
+    index_runs = [entry for entry in spans if entry['name'] in INDEX_SPANS]
+    calls = [
+        entry for entry in spans
+        if entry.get('kind') == 'server' and entry['duration_ms'] >= slow_ms
+    ]
+    calls.sort(key=lambda entry: -entry['duration_ms'])
+    slow_calls = []
+    for call in calls[:limit]:
+        end = call['start'] + call['duration_ms'] / 1000
+        overlapping = [
+            {
+                'name': run['name'],
+                'pid': run.get('pid'),
+                'start': run['start'],
+                'duration_ms': run['duration_ms'],
+                'same_trace': run['trace_id'] == call['trace_id']
+            }
+            for run in index_runs
+            if run['start'] < end and call['start'] < run['start'] + run['duration_ms'] / 1000
+        ]
+        slow_calls.append({
+            'name': call['name'],
+            'start': call['start'],
+            'duration_ms': call['duration_ms'],
+            'trace_id': call['trace_id'],
+            'children': children.get(call['span_id'], {}),
+            'attributes': call.get('attributes', {}),
+            'overlapping_index_runs': overlapping
+        })
+    return {'spans': summary, 'slow_calls': slow_calls}
+
+
+def format_trace_summary(summary: Dict[str, Any], slow_ms: float) -> str:
+    """Render ``summarize_traces`` output as text."""
+    from datetime import datetime
+
+    lines = [f"TRACES: {sum(stats['count'] for stats in summary['spans'].values())} spans", ""]
+    lines.append(f"{'span':<20} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+    for name, stats in summary['spans'].items():
+        lines.append(
+            f"{name:<20} {stats['count']:>7} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['total_s']:>9.2f}"
+        )
+    lines.append("")
+    if not summary['slow_calls']:
+        lines.append(f"No tool calls took {slow_ms:.0f} ms or more.")
+        return '\n'.join(lines)
+    lines.append(f"Tool calls taking {slow_ms:.0f} ms or more:")
+    for call in summary['slow_calls']:
+        started = datetime.fromtimestamp(call['start']).strftime('%Y-%m-%d %H:%M:%S')
+        breakdown = ", ".join(f"{name} {ms:.0f} ms" for name, ms in call['children'].items())
+        lines.append(f"   {started}  {call['name']} {call['duration_ms']:.0f} ms ({breakdown or 'no child spans'})")
+        attributes = call['attributes']
+        if attributes.get('concurrent_calls'):
+            lines.append(f"      {attributes['concurrent_calls']} other call(s) in flight")
+        for run in call['overlapping_index_runs']:
+            where = "same trace" if run['same_trace'] else f"pid {run['pid']}"
+            lines.append(f"      overlapped {run['name']} ({where}, {run['duration_ms'] / 1000:.1f}s)")
+        if attributes.get('index_rebuilt') and not call['overlapping_index_runs']:
+            lines.append("      index was rebuilt during the call")
+    return '\n'.join(lines)
@@ -0,0 +1,382 @@
+"""Trigram index for fast substring and regex search over indexed chunks.
+
+The index maps every lowercase 3-character sequence to the sorted list of
+chunks containing it. A regex query is first reduced to the literal strings
+any match must contain; intersecting the posting lists of their trigrams
+leaves a small candidate set, and only those chunks are scanned with the
+real regular expression.
+
+Trigrams are packed into 64-bit keys (three 21-bit code points). The index
+is one binary file holding the sorted keys, an offsets array and a single
+``uint32`` postings array, all memory-mapped on load, so opening the index
+costs milliseconds regardless of corpus size and only the posting lists a
+query touches are read from disk.
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+else:  # pragma: no cover - Python 3.10
+    import sre_parse
+    import sre_constants
+
+
+TRIGRAM_FILE = "trigrams.bin"
+# Index files of earlier versions, removed when the index is rebuilt
+LEGACY_TRIGRAM_FILES = ["trigrams.json"]
+
+# File header: magic, then version, num_docs, num_trigrams, num_postings as uint64
+MAGIC = b"DRTRIGRM"
+VERSION = 2
+HEADER_BYTES = len(MAGIC) + 4 * 8
+
+# Characters of chunk text converted to trigram keys at once during build
+BUILD_BATCH_CHARS = 1 << 22
+
+
+def _first_of_runs(values: np.ndarray) -> np.ndarray:
+    """Mask of elements that differ from their predecessor in a sorted array."""
+    mask = np.ones(len(values), dtype=bool)
+    mask[1:] = values[1:] != values[:-1]
+    return mask
+
+
+def _trigram_keys(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the distinct lowercase trigrams of each text as packed keys.
+
+    Args:
+        texts: Texts to split.
+
+    Returns:
+        Tuple of (keys, text indexes), sorted by key and then text index,
+        with one entry per distinct trigram of each text.
+    """
+    lowered = [text.lower() for text in texts]
+    codes = np.frombuffer(''.join(lowered).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    lengths = np.fromiter((len(text) for text in lowered), dtype=np.int64, count=len(lowered))
+    if len(codes) < 3:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    owner = np.repeat(np.arange(len(lowered)), lengths)
+    # Drop trigrams spanning two texts
+    inside = owner[:-2] == owner[2:]
+    owner = owner[:-2][inside].astype(np.uint64)
+
+    # Replace code points by their rank among the characters present, so a
+    # trigram and its text position usually fit one uint64 and a single
+    # sort orders and de-duplicates them
+    alphabet = np.sort(codes)
+    alphabet = alphabet[_first_of_runs(alphabet)]
+    ranks = np.searchsorted(alphabet, codes).astype(np.uint64)
+    alphabet = alphabet.astype(np.uint64)
+    char_bits = max(1, (len(alphabet) - 1).bit_length())
+    owner_bits = max(1, (len(lowered) - 1).bit_length())
+
+    if 3 * char_bits + owner_bits <= 64:
+        char_mask = np.uint64((1 << char_bits) - 1)
+        shift = [np.uint64(owner_bits + char_bits * i) for i in (2, 1, 0)]
+        combined = np.sort(
+            (ranks[:-2][inside] << shift[0]) | (ranks[1:-1][inside] << shift[1])
+            | (ranks[2:][inside] << shift[2]) | owner
+        )
+        combined = combined[_first_of_runs(combined)]
+        keys = (
+            (alphabet[(combined >> shift[0]) & char_mask] << np.uint64(42))
+            | (alphabet[(combined >> shift[1]) & char_mask] << np.uint64(21))
+            | alphabet[(combined >> shift[2]) & char_mask]
+        )
+        return keys, (combined & np.uint64((1 << owner_bits) - 1)).astype(np.int64)
+
+    codes = codes.astype(np.uint64)
+    keys = ((codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:])[inside]
+    order = np.lexsort((owner, keys))
+    keys, owner = keys[order], owner[order]
+    distinct = _first_of_runs(keys) | _first_of_runs(owner)
+    return keys[distinct], owner[distinct].astype(np.int64)
+
+
+def required_literals(pattern: str, fixed_string: bool = False) -> List[str]:
+    """
+    Extract literal strings that every match of a regex must contain.
+
+    Only unconditional literal runs are extracted (alternations, character
+    classes and optional repeats end a run), so the result is always safe
+    to use for candidate filtering, if sometimes less selective than ideal.
+
+    Args:
+        pattern: Regular expression (or plain string if fixed_string).
+        fixed_string: Treat pattern as a literal string.
+
+    Returns:
+        List of required literal strings.
+    """
+    if fixed_string:
+        return [pattern]
+
+    literals: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            literals.append(''.join(current))
+            current.clear()
+
+    def walk(parsed):
+        for op, av in parsed:
+            if op == sre_constants.LITERAL:
+                current.append(chr(av))
+            elif op == sre_constants.SUBPATTERN:
+                # Groups are transparent: their content is inline
+                walk(av[-1])
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                min_count, _, item = av
+                flush()
+                if min_count >= 1:
+                    walk(item)
+                    flush()
+            else:
+                flush()
+
+    try:
+        walk(sre_parse.parse(pattern))
+    except (re.error, RecursionError):
+        return []
+
+    flush()
+    return literals
+
+
+class TrigramIndex:
+    """Inverted trigram index over document chunks."""
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, postings: np.ndarray, num_docs: int):
+        """
+        Initialize trigram index.
+
+        Args:
+            keys: Sorted packed trigram keys.
+            offsets: Start of each key's posting list in ``postings`` (plus the end).
+            postings: Sorted chunk ids of every posting list, concatenated.
+            num_docs: Total number of indexed chunks.
+        """
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.num_docs = num_docs
+
+    @classmethod
+    def build(cls, chunks: List[Document]) -> 'TrigramIndex':
+        """
+        Build trigram index from document chunks.
+
+        Args:
+            chunks: Document chunks to index.
+
+        Returns:
+            TrigramIndex instance.
+        """
+        # Split the chunks into batches of about BUILD_BATCH_CHARS characters
+        bounds = [0]
+        chars = 0
+        for i, chunk in enumerate(chunks):
+            chars += len(chunk.page_content)
+            if chars >= BUILD_BATCH_CHARS:
+                bounds.append(i + 1)
+                chars = 0
+        if bounds[-1] < len(chunks):
+            bounds.append(len(chunks))
+
+        all_keys, all_ids = [], []
+        for start, end in zip(bounds, bounds[1:]):
+            keys, ids = _trigram_keys([chunk.page_content for chunk in chunks[start:end]])
+            all_keys.append(keys)
+            all_ids.append(ids + start)
+
+        keys = np.concatenate(all_keys) if all_keys else np.empty(0, dtype=np.uint64)
+        ids = np.concatenate(all_ids) if all_ids else np.empty(0, dtype=np.int64)
+        # Batches are in chunk order, so a stable sort keeps each posting list sorted
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(_first_of_runs(keys))
+        offsets = np.append(starts, len(keys)).astype(np.uint64)
+        return cls(keys[starts], offsets, ids[order].astype(np.uint32), len(chunks))
+
+    def candidates(self, literals: List[str]) -> Optional[List[int]]:
+        """
+        Get chunk ids that may contain all given literals.
+
+        Args:
+            literals: Literal strings every match must contain.
+
+        Returns:
+            Sorted list of candidate chunk ids, or None if the literals are
+            too short to narrow the search (every chunk is a candidate).
+        """
+        wanted = np.sort(_trigram_keys(literals)[0])
+        wanted = wanted[_first_of_runs(wanted)]
+        if not len(wanted):
+            return None
+
+        if not len(self.keys):
+            return []
+        positions = np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)
+        if np.any(self.keys[positions] != wanted):
+            return []
+
+        # Intersect the rarest posting lists first
+        lists = sorted(
+            (self.postings[int(self.offsets[p]):int(self.offsets[p + 1])] for p in positions),
+            key=len
+        )
+        result = np.asarray(lists[0])
+        for ids in lists[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+            if not len(result):
+                return []
+
+        candidate_ids: List[int] = result.tolist()
+        return candidate_ids
+
+    def grep(
+        self,
+        documents: Sequence[Document],
+        pattern: str,
+        ignore_case: bool = False,
+        fixed_string: bool = False,
+        max_results: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find lines matching a pattern.
+
+        Args:
+            documents: Chunks the index was built from, in index order.
+            pattern: Regular expression or literal string.
+            ignore_case: Case-insensitive matching.
+            fixed_string: Treat pattern as a literal string.
+            max_results: Maximum number of matching lines to return.
+
+        Returns:
+            Tuple of (matches, number of chunks scanned). Each match is a dict
+            with ``source``, ``line``, ``text``, ``chunk_id`` and ``metadata``.
+
+        Raises:
+            re.error: If the pattern is not a valid regular expression.
+        """
+        regex_source = re.escape(pattern) if fixed_string else pattern
+        regex = re.compile(regex_source, re.IGNORECASE if ignore_case else 0)
+
+        candidates = self.candidates(required_literals(pattern, fixed_string))
+        candidate_ids: Sequence[int] = range(len(documents)) if candidates is None else candidates
+
+        matches: List[Dict[str, Any]] = []
+        seen: Set[Tuple[str, int]] = set()
+        scanned = 0
+
+        for doc_id in candidate_ids:
+            doc = documents[doc_id]
+            text = doc.page_content
+            scanned += 1
+
+            for match in regex.finditer(text):
+                line_start = text.rfind('\n', 0, match.start()) + 1
+                line_end = text.find('\n', match.end())
+                if line_end == -1:
+                    line_end = len(text)
+
+                relative_line = text.count('\n', 0, line_start)
+                start_line = doc.metadata.get('start_line')
+                line = (start_line + relative_line) if start_line else relative_line + 1
+
+                # Overlapping chunks repeat lines; report each line once
+                source = doc.metadata.get('source', '')
+                if start_line and (source, line) in seen:
+                    continue
+                seen.add((source, line))
+
+                matches.append({
+                    'source': source,
+                    'line': line if start_line else None,
+                    'text': text[line_start:line_end],
+                    'chunk_id': doc.metadata.get('chunk_id', doc_id),
+                    'metadata': doc.metadata
+                })
+                if len(matches) >= max_results:
+                    return matches, scanned
+
+        return matches, scanned
+
+    def save(self, index_dir: Path) -> None:
+        """
+        Save index to disk.
+
+        The file is written to a temporary path and atomically moved into
+        place, so readers holding the previous file keep their maps.
+
+        Args:
+            index_dir: Directory holding the local indexes.
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        path = index_dir / TRIGRAM_FILE
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            np.array(
+                [VERSION, self.num_docs, len(self.keys), len(self.postings)], dtype=np.uint64
+            ).tofile(f)
+            np.asarray(self.keys, dtype=np.uint64).tofile(f)
+            np.asarray(self.offsets, dtype=np.uint64).tofile(f)
+            np.asarray(self.postings, dtype=np.uint32).tofile(f)
+        os.replace(tmp_path, path)
+
+        for legacy in LEGACY_TRIGRAM_FILES:
+            (index_dir / legacy).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, index_dir: Path) -> 'TrigramIndex':
+        """
+        Load index from disk.
+
+        Keys, offsets and postings are memory-mapped.
+
+        Args:
+            index_dir: Directory holding the local indexes.
+
+        Returns:
+            TrigramIndex instance.
+
+        Raises:
+            ValueError: If the file is not a trigram index of this version.
+        """
+        path = Path(index_dir) / TRIGRAM_FILE
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            header = np.fromfile(f, dtype=np.uint64, count=4)
+        if magic != MAGIC or len(header) != 4 or int(header[0]) != VERSION:
+            raise ValueError(f"ERROR: Unsupported trigram index: {path}")
+        num_docs, num_keys, num_postings = (int(value) for value in header[1:])
+
+        def mapped(dtype, offset: int, count: int) -> np.ndarray:
+            if count == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+        keys_at = HEADER_BYTES
+        offsets_at = keys_at + 8 * num_keys
+        postings_at = offsets_at + 8 * (num_keys + 1)
+        return cls(
+            mapped(np.uint64, keys_at, num_keys),
+            mapped(np.uint64, offsets_at, num_keys + 1),
+            mapped(np.uint32, postings_at, num_postings),
+            num_docs
+        )
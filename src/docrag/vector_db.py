@@ -1,18 +1,150 @@
 """Vector database management for DocRAG Kit."""
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Callable, TypeVar
+import contextlib
+import json
 import os
+import numpy as np
 import shutil
+import threading
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 from dotenv import load_dotenv
 
+from .lexical_index import (
+    BM25Index, BM25_FILE, CHUNKS_FILE, ChunkStore, save_chunks, load_chunks, atomic_write_json
+)
+from .trigram_index import TrigramIndex, TRIGRAM_FILE
+from .symbol_index import SymbolIndex, SYMBOL_FILE
+from .flat_store import FlatVectorStore
+from .embeddings import TruncatedEmbeddings, HashingEmbeddings, local_embeddings, supports_native_dimensions
+from .sharding import (
+    ShardedVectorStore, SHARDS_FILE, group_by_shard, assign_shard, shard_directories, search_with_vectors,
+    relevance_score_fn
+)
+from .mmr import mmr_select
+from .fake_providers import FakeEmbeddings, DEFAULT_FAKE_DIMENSIONS
+from .search_filters import build_where
+from .instrumentation import phase, PhaseTimedEmbeddings
+
+
+MANIFEST_FILE = "manifest.json"
+# Sorted relative paths of the indexed files, for path filters
+PATHS_FILE = "paths.json"
+
+T = TypeVar('T')
+
+
+def hnsw_metadata(retrieval_config: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Build ChromaDB collection metadata for the configured HNSW parameters.
+    
+    Args:
+        retrieval_config: Retrieval section of the configuration.
+    
+    Returns:
+        ``hnsw:*`` metadata for the parameters that are set (unset ones keep
+        Chroma's defaults).
+    """
+    params = {
+        'hnsw:M': retrieval_config.get('hnsw_m'),
+        'hnsw:construction_ef': retrieval_config.get('hnsw_construction_ef'),
+        'hnsw:search_ef': retrieval_config.get('hnsw_search_ef')
+    }
+    return {key: value for key, value in params.items() if value}
+
+
+def set_hnsw_search_ef(collection, search_ef: int) -> bool:
+    """
+    Persist a new HNSW search_ef on an existing ChromaDB collection.
+    
+    Chroma reads search_ef when it loads the index, so the value applies to
+    the first query in a process and to every process started afterwards.
+    
+    Args:
+        collection: ChromaDB collection.
+        search_ef: Size of the dynamic candidate list during search.
+    
+    Returns:
+        True if the stored value was changed.
+    """
+    configuration = getattr(collection, 'configuration', None)
+    if isinstance(configuration, dict) and configuration.get('hnsw'):
+        # Chroma >= 1.0 keeps HNSW settings in the collection configuration
+        if configuration['hnsw'].get('ef_search') == search_ef:
+            return False
+        collection.modify(configuration={'hnsw': {'ef_search': search_ef}})
+        return True
+    
+    metadata = dict(collection.metadata or {})
+    if metadata.get('hnsw:search_ef') == search_ef:
+        return False
+    metadata['hnsw:search_ef'] = search_ef
+    collection.modify(metadata=metadata)
+    return True
+
+
+def adaptive_cutoff(
+    scores: List[float],
+    min_k: int = 1,
+    max_k: int = 8,
+    score_gap: float = 0.1,
+    relevance_mass: float = 0.8
+) -> int:
+    """
+    Choose how many results to keep from a best-first list of relevance scores.
+    
+    Results are cut at the first drop of at least ``score_gap`` between
+    neighbours, or once the kept results hold ``relevance_mass`` of the
+    relevance above the weakest candidate, whichever comes first. A question
+    with one clearly matching chunk keeps few results; a question whose
+    candidates all score alike keeps up to ``max_k``.
+    
+    Args:
+        scores: Relevance scores, best first (higher is better).
+        min_k: Never keep fewer results (if available).
+        max_k: Never keep more results.
+        score_gap: Score drop that ends the relevant results.
+        relevance_mass: Share of relevance above the tail to keep (0-1].
+    
+    Returns:
+        Number of results to keep.
+    """
+    values = np.asarray(scores[:max_k], dtype=np.float64)
+    if len(values) <= min_k:
+        return len(values)
+    
+    cut = len(values)
+    
+    gaps = np.flatnonzero(values[:-1] - values[1:] >= score_gap) + 1
+    gaps = gaps[gaps >= min_k]
+    if len(gaps):
+        cut = int(gaps[0])
+    
+    # Relevance above the weakest candidate; no spread means no signal
+    excess = np.clip(values - values[-1], 0.0, None)
+    total = excess.sum()
+    if total > 0:
+        cut = min(cut, int(np.searchsorted(np.cumsum(excess), relevance_mass * total - 1e-12)) + 1)
+    
+    return max(min_k, cut)
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """Retriever that returns a score-dependent number of chunks."""
+    
+    manager: Any
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: Any = None) -> List[Document]:
+        return [doc for doc, _ in self.manager.adaptive_search(query)]
+
 
 class VectorDBManager:
-    """Manages ChromaDB vector database operations."""
+    """Manages vector database operations (ChromaDB or flat NumPy backend)."""
 
     def __init__(self, config: Dict[str, Any], project_root: Optional[Path] = None):
         """
@@ -25,6 +157,39 @@ class VectorDBManager:
         self.config = config
         self.project_root = Path(project_root) if project_root else Path.cwd()
         self.db_path = self.project_root / ".docrag" / "vectordb"
+        self.index_dir = self.project_root / ".docrag" / "indexes"
+        
+        # Vector store backend: chroma (default) or flat (memory-mapped NumPy)
+        vector_store_config = config.get('vector_store', {})
+        self.backend = vector_store_config.get('backend', 'chroma')
+        self.vector_dtype = vector_store_config.get('dtype', 'float32')
+        self.flat_store_options = {
+            'dtype': self.vector_dtype,
+            'ann': vector_store_config.get('ann', 'none'),
+            'quantization': vector_store_config.get('quantization', 'none'),
+            'nlist': vector_store_config.get('nlist', 0),
+            'pq_m': vector_store_config.get('pq_m', 48),
+            'nprobe': vector_store_config.get('nprobe', 8),
+            'rerank_factor': vector_store_config.get('rerank_factor', 10)
+        }
+        self._flat_store: Optional[FlatVectorStore] = None
+        
+        # Optional sharding: one store per indexing directory or hash bucket
+        self.sharding = vector_store_config.get('sharding', 'none')
+        self.hash_shards = vector_store_config.get('shards', 4)
+        self.shards_file = self.db_path / SHARDS_FILE
+        # (mtime of the shards file, store opened from it)
+        self._sharded_store: Optional[Tuple[float, ShardedVectorStore]] = None
+        
+        # HNSW parameters for the ChromaDB backend (unset = Chroma defaults)
+        self.hnsw_metadata = hnsw_metadata(config.get('retrieval', {}))
+        # Cosine distances keep scores on one scale across backends (see relevance_score_fn)
+        self.collection_metadata = {'hnsw:space': 'cosine', **self.hnsw_metadata}
+        self._search_ef_checked = False
+        
+        # Concurrent MCP calls open stores from worker threads; Chroma's
+        # client cache is not safe against simultaneous first opens
+        self._open_lock = threading.RLock()
         
         # Load environment variables
         load_dotenv(self.project_root / ".env")
@@ -34,22 +199,44 @@ class VectorDBManager:
         
         # Store previous provider for change detection
         self._previous_provider = None
+        
+        # Local index cache: file name -> (mtime of index file, loaded object)
+        self._local_index_cache: Dict[str, Tuple[float, Any]] = {}
+        
+        # Cache lookups: cache name -> {'hits': n, 'misses': n}
+        self._cache_stats: Dict[str, Dict[str, int]] = {}
+        self._cache_stats_lock = threading.Lock()
 
     def _init_embeddings(self):
         """
         Initialize embeddings based on configured provider.
         
         Returns:
-            Embeddings instance (OpenAIEmbeddings or GoogleGenerativeAIEmbeddings).
+            Embeddings instance (OpenAI, Gemini, local or fake). ``llm.embedding_provider``
+            overrides ``llm.provider`` for embeddings.
         
         Raises:
             ValueError: If provider is not supported or API key is missing.
         """
         llm_config = self.config.get('llm', {})
-        provider = llm_config.get('provider', 'openai')
+        provider = llm_config.get('embedding_provider') or llm_config.get('provider', 'openai')
         embedding_model = llm_config.get('embedding_model')
+        dimensions = llm_config.get('embedding_dimensions')
+        
+        if provider == 'local':
+            embeddings = local_embeddings(embedding_model, dimensions, self.project_root)
+            if isinstance(embeddings, HashingEmbeddings):
+                # The hashing embedder is built with the requested size
+                return embeddings
         
-        if provider == 'openai':
+        elif provider == 'fake':
+            # Deterministic, offline; for tests and benchmarks
+            return FakeEmbeddings(
+                dimensions=dimensions or DEFAULT_FAKE_DIMENSIONS,
+                latency=llm_config.get('fake_latency', 0.0)
+            )
+        
+        elif provider == 'openai':
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
                 raise ValueError(
@@ -58,10 +245,17 @@ class VectorDBManager:
                     "   Get your API key from: https://platform.openai.com/api-keys"
                 )
             
-            return OpenAIEmbeddings(
-                model=embedding_model or 'text-embedding-3-small',
-                openai_api_key=api_key
-            )
+            model = embedding_model or 'text-embedding-3-small'
+            options = {}
+            base_url = llm_config.get('base_url')
+            if base_url:
+                # OpenAI-compatible servers take text, not tiktoken token ids
+                options = {'base_url': base_url, 'check_embedding_ctx_length': False}
+            if dimensions and supports_native_dimensions(provider, model):
+                # text-embedding-3 models shorten embeddings server-side
+                return OpenAIEmbeddings(model=model, openai_api_key=api_key, dimensions=dimensions, **options)
+            
+            embeddings = OpenAIEmbeddings(model=model, openai_api_key=api_key, **options)
         
         elif provider == 'gemini':
             api_key = os.getenv('GOOGLE_API_KEY')
@@ -72,7 +266,7 @@ class VectorDBManager:
                     "   Get your API key from: https://makersuite.google.com/app/apikey"
                 )
             
-            return GoogleGenerativeAIEmbeddings(
+            embeddings = GoogleGenerativeAIEmbeddings(
                 model=embedding_model or 'models/embedding-001',
                 google_api_key=api_key
             )
@@ -80,8 +274,12 @@ class VectorDBManager:
         else:
             raise ValueError(
                 f"ERROR: Unsupported provider: {provider}\n"
-                f"   Supported providers: openai, gemini"
+                f"   Supported embedding providers: openai, gemini, local, fake"
             )
+        
+        if dimensions:
+            return TruncatedEmbeddings(embeddings, dimensions)
+        return embeddings
 
     def create_database(self, chunks: List[Document], show_progress: bool = True) -> None:
         """
@@ -100,23 +298,49 @@ class VectorDBManager:
         # Ensure .docrag directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Delete existing database if it exists (with MCP-safe deletion)
-        if self.db_path.exists():
+        # Delete existing database if it exists (with MCP-safe deletion).
+        # A flat store is replaced by an atomic generation swap instead, so
+        # running readers keep serving the old index until the new one is ready.
+        if self.db_path.exists() and not (self.backend == 'flat' and self._is_flat_layout(self.sharding != 'none')):
             self.delete_database()
         
         if show_progress:
             print(f"Creating embeddings for {len(chunks)} chunks...")
         
         try:
-            # Create ChromaDB vector store with MCP-safe settings
-            vectorstore = self._create_vectorstore_safe(chunks, show_progress)
+            with phase('write', chunks=len(chunks), backend=self.backend, sharding=self.sharding), self._timed_embeddings():
+                if self.sharding != 'none':
+                    self._create_sharded_store(chunks, show_progress)
+                elif self.backend == 'flat':
+                    self._create_flat_store(chunks)
+                else:
+                    # Create ChromaDB vector store with MCP-safe settings
+                    self._create_vectorstore_safe(chunks, show_progress)
             
             if show_progress:
                 print(f"SUCCESS: Vector database created successfully at {self.db_path}")
+            
+            # Build local indexes next to the vector store
+            with phase('local_indexes', chunks=len(chunks)):
+                self._build_local_indexes(chunks)
+            
+            if show_progress:
+                print(f"SUCCESS: Lexical and trigram indexes created at {self.index_dir}")
         
         except Exception as e:
             raise Exception(f"Database error: {e}")
 
+    @contextlib.contextmanager
+    def _timed_embeddings(self) -> Iterator[None]:
+        """Mark embedding calls as ``embed`` phases while the block builds stores."""
+        embeddings = self.embeddings
+        if not isinstance(embeddings, PhaseTimedEmbeddings):
+            self.embeddings = PhaseTimedEmbeddings(embeddings)
+        try:
+            yield
+        finally:
+            self.embeddings = embeddings
+
     def _create_vectorstore_safe(self, chunks: List[Document], show_progress: bool = True):
         """
         Create ChromaDB vectorstore with MCP-safe configuration.
@@ -142,7 +366,8 @@ class VectorDBManager:
                 vectorstore = Chroma.from_documents(
                     documents=chunks,
                     embedding=self.embeddings,
-                    persist_directory=str(self.db_path)
+                    persist_directory=str(self.db_path),
+                    collection_metadata=self.collection_metadata
                 )
                 
                 # Store reference for cleanup
@@ -164,13 +389,441 @@ class VectorDBManager:
                 else:
                     raise Exception(f"unable to open database file: {e}")
 
+    def _create_flat_store(self, chunks: List[Document]) -> FlatVectorStore:
+        """
+        Create flat vector store, atomically replacing any previous generation.
+        
+        Args:
+            chunks: Document chunks to index.
+        
+        Returns:
+            FlatVectorStore instance.
+        """
+        vectorstore = FlatVectorStore.from_documents(
+            documents=chunks,
+            embedding=self.embeddings,
+            path=self.db_path,
+            **self.flat_store_options
+        )
+        self._flat_store = vectorstore
+        return vectorstore
+
+    def _is_flat_layout(self, sharded: bool) -> bool:
+        """Check whether the database on disk is a flat store with the given layout."""
+        if sharded:
+            return self.shards_file.exists() and (self.db_path / "shards").is_dir()
+        return FlatVectorStore.exists(self.db_path)
+
+    def _shard_directories(self) -> List[str]:
+        directories: List[str] = self.config.get('indexing', {}).get('directories', [])
+        return directories
+
+    def _open_shard(self, name: str):
+        """
+        Open one shard store.
+        
+        Args:
+            name: Shard name.
+        
+        Returns:
+            Chroma collection wrapper or FlatVectorStore for the shard.
+        """
+        if self.backend == 'flat':
+            return FlatVectorStore(self.db_path / "shards" / name, self.embeddings, **self.flat_store_options)
+        vectorstore = Chroma(
+            collection_name=f"docrag-{name}",
+            persist_directory=str(self.db_path),
+            embedding_function=self.embeddings
+        )
+        self._apply_search_ef(vectorstore)
+        return vectorstore
+
+    def _build_shard(self, name: str, chunks: List[Document]) -> None:
+        """
+        Embed and store one shard, replacing its previous contents.
+        
+        Args:
+            name: Shard name.
+            chunks: Chunks belonging to the shard.
+        """
+        if self.backend == 'flat':
+            FlatVectorStore.from_documents(
+                documents=chunks,
+                embedding=self.embeddings,
+                path=self.db_path / "shards" / name,
+                **self.flat_store_options
+            )
+            return
+        
+        if self.shards_file.exists():
+            # Chroma collections are replaced by deleting and recreating them
+            self._open_shard(name).delete_collection()
+        Chroma.from_documents(
+            documents=chunks,
+            embedding=self.embeddings,
+            collection_name=f"docrag-{name}",
+            persist_directory=str(self.db_path),
+            collection_metadata=self.collection_metadata
+        )
+
+    def _write_shards_file(self, names: List[str]) -> None:
+        atomic_write_json(self.shards_file, {
+            'mode': self.sharding,
+            'shards': shard_directories(self._shard_directories(), self.sharding, sorted(names))
+        })
+        self._sharded_store = None
+
+    def _read_shards_file(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.shards_file, 'r', encoding='utf-8') as f:
+                shards: Dict[str, Any] = json.load(f)
+            return shards
+        except (OSError, ValueError):
+            return None
+
+    def _create_sharded_store(self, chunks: List[Document], show_progress: bool = True) -> ShardedVectorStore:
+        """
+        Create one store per shard.
+        
+        Args:
+            chunks: Document chunks to index.
+            show_progress: Whether to display progress information.
+        
+        Returns:
+            ShardedVectorStore over the new shards.
+        """
+        groups = group_by_shard(
+            chunks, self.project_root, self._shard_directories(), self.sharding, self.hash_shards
+        )
+        
+        previous = self._read_shards_file() or {}
+        for name, shard_chunks in groups.items():
+            if show_progress:
+                print(f"   Shard {name}: {len(shard_chunks)} chunks")
+            self._build_shard(name, shard_chunks)
+        
+        self._write_shards_file(list(groups))
+        
+        # Drop shards that no longer have any files (flat stores are rebuilt in place)
+        for name in set(previous.get('shards', {})) - set(groups):
+            if self.backend == 'flat':
+                shutil.rmtree(self.db_path / "shards" / name, ignore_errors=True)
+            else:
+                self._open_shard(name).delete_collection()
+        
+        store: ShardedVectorStore = self.get_vectorstore()
+        return store
+
+    def rebuild_shard(self, name: str, chunks: List[Document], show_progress: bool = True) -> None:
+        """
+        Re-embed a single shard and refresh the local indexes.
+        
+        Other shards are left untouched, so only this shard's files are sent
+        to the embedding API.
+        
+        Args:
+            name: Shard name.
+            chunks: Current chunks of the shard's files.
+        
+        Raises:
+            ValueError: If the database is not sharded or the chunks belong to another shard.
+        """
+        if not self.shards_file.exists():
+            raise ValueError(
+                "ERROR: Vector database is not sharded.\n"
+                "   Set vector_store.sharding in config.yaml and run 'docrag reindex'."
+            )
+        
+        directories = self._shard_directories()
+        if any(
+            assign_shard(c.metadata, self.project_root, directories, self.sharding, self.hash_shards) != name
+            for c in chunks
+        ):
+            raise ValueError(f"ERROR: Chunks do not belong to shard '{name}'")
+        
+        if show_progress:
+            print(f"Creating embeddings for {len(chunks)} chunks in shard {name}...")
+        
+        names = set((self._read_shards_file() or {}).get('shards', {}))
+        with phase('write', chunks=len(chunks), shard=name), self._timed_embeddings():
+            if chunks:
+                self._build_shard(name, chunks)
+                names.add(name)
+            elif name in names:
+                if self.backend == 'flat':
+                    shutil.rmtree(self.db_path / "shards" / name, ignore_errors=True)
+                else:
+                    self._open_shard(name).delete_collection()
+                names.discard(name)
+            self._write_shards_file(list(names))
+        
+        # Local indexes cover every shard: keep other shards' chunks, swap this one's
+        with phase('local_indexes'):
+            kept = [
+                c for c in (self.get_indexed_chunks() or [])
+                if assign_shard(c.metadata, self.project_root, directories, self.sharding, self.hash_shards) != name
+            ]
+            self._build_local_indexes(kept + chunks)
+        
+        if show_progress:
+            print(f"SUCCESS: Shard {name} rebuilt")
+
+    def _build_local_indexes(self, chunks: List[Document]) -> None:
+        """
+        Build local (non-vector) indexes from chunks.
+        
+        Each file is written to a temporary path and atomically moved into
+        place, so a running MCP server never reads a half-written index.
+        
+        Args:
+            chunks: Document chunks that were written to the vector store.
+        """
+        save_chunks(self.index_dir, chunks)
+        atomic_write_json(
+            self.index_dir / PATHS_FILE,
+            sorted({c.metadata['rel_path'] for c in chunks if 'rel_path' in c.metadata})
+        )
+        BM25Index.build(chunks).save(self.index_dir)
+        TrigramIndex.build(chunks).save(self.index_dir)
+        SymbolIndex.build(chunks, self.project_root).save(self.index_dir)
+        self.save_manifest()
+        self._local_index_cache = {}
+
+    def _index_settings(self) -> Dict[str, Any]:
+        """Settings that determine the stored vectors and their layout."""
+        llm_config = self.config.get('llm', {})
+        return {
+            'provider': llm_config.get('embedding_provider') or llm_config.get('provider', 'openai'),
+            'embedding_model': llm_config.get('embedding_model'),
+            'embedding_dimensions': llm_config.get('embedding_dimensions'),
+            'backend': self.backend,
+            'sharding': self.sharding
+        }
+
+    def save_manifest(self) -> None:
+        """
+        Record the settings the current index was built with.
+        
+        The stored vector dimension is read back from the index, so the
+        manifest also reflects truncation applied after indexing.
+        """
+        manifest = self._index_settings()
+        manifest['stored_dimensions'] = self.get_stored_dimensions()
+        atomic_write_json(self.index_dir / MANIFEST_FILE, manifest)
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the index manifest.
+        
+        Returns:
+            Manifest dictionary, or None if the index predates manifests.
+        """
+        try:
+            with open(self.index_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                manifest: Dict[str, Any] = json.load(f)
+            return manifest
+        except (OSError, ValueError):
+            return None
+
+    def get_stored_dimensions(self) -> Optional[int]:
+        """
+        Get the dimension of the stored embeddings.
+        
+        Returns:
+            Vector dimension, or None if the database is empty or missing.
+        """
+        if not self.db_path.exists():
+            return None
+        
+        for vectorstore in self._base_stores(self.get_vectorstore()):
+            if isinstance(vectorstore, FlatVectorStore):
+                snapshot = vectorstore._snapshot()
+                if snapshot is not None and len(snapshot):
+                    return int(snapshot.vectors.shape[1])
+                continue
+            
+            results = vectorstore._collection.get(limit=1, include=['embeddings'])
+            embeddings = results.get('embeddings')
+            if embeddings is not None and len(embeddings) > 0:
+                return len(embeddings[0])
+        
+        return None
+
+    def truncate_stored_embeddings(self, dimensions: int) -> None:
+        """
+        Truncate stored flat-store embeddings to their leading dimensions.
+        
+        Args:
+            dimensions: Number of leading dimensions to keep.
+        
+        Raises:
+            ValueError: If the backend is not flat or the store is empty.
+        """
+        if self.backend != 'flat':
+            raise ValueError("ERROR: Truncation of stored vectors requires vector_store.backend: flat")
+        for vectorstore in self._base_stores(self.get_vectorstore()):
+            vectorstore.truncate(dimensions)
+        self.save_manifest()
+
+    @staticmethod
+    def _base_stores(vectorstore) -> List[Any]:
+        """Get the Chroma or flat stores behind a possibly sharded store."""
+        if isinstance(vectorstore, ShardedVectorStore):
+            return list(vectorstore.shards.values())
+        return [vectorstore]
+
+    def _load_local_index(self, file_name: str, loader: Callable[[], T]) -> Optional[T]:
+        """
+        Load a local index file, reusing the cached copy until it is rebuilt.
+        
+        Args:
+            file_name: Index file name inside .docrag/indexes/.
+            loader: Callable returning the loaded object.
+        
+        Returns:
+            Loaded object, or None if the file does not exist.
+        """
+        try:
+            mtime = (self.index_dir / file_name).stat().st_mtime
+        except OSError:
+            return None
+        
+        cached = self._local_index_cache.get(file_name)
+        if cached is not None and cached[0] == mtime:
+            self._count_cache('local_index', True)
+            loaded: T = cached[1]
+            return loaded
+        
+        self._count_cache('local_index', False)
+        loaded = loader()
+        self._local_index_cache[file_name] = (mtime, loaded)
+        return loaded
+
+    def _count_cache(self, name: str, hit: bool) -> None:
+        """Count a cache lookup (see ``get_cache_stats``)."""
+        with self._cache_stats_lock:
+            stats = self._cache_stats.setdefault(name, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get cache lookup counts.
+        
+        Returns:
+            Cache name (``local_index``, ``vectorstore``) -> ``{'hits': n, 'misses': n}``.
+        """
+        with self._cache_stats_lock:
+            return {name: dict(stats) for name, stats in self._cache_stats.items()}
+
+    def index_built_at(self) -> Optional[float]:
+        """
+        Get the time the current index was built.
+        
+        Returns:
+            Modification time of the index manifest, or None if there is no
+            index (or it predates manifests).
+        """
+        try:
+            return (self.index_dir / MANIFEST_FILE).stat().st_mtime
+        except OSError:
+            return None
+
+    def get_indexed_chunks(self) -> Optional[ChunkStore]:
+        """
+        Get chunk texts and metadata stored with the local indexes.
+        
+        Chunks are memory-mapped and decoded only when accessed.
+        
+        Returns:
+            ChunkStore in index order, or None if not built yet.
+        """
+        return self._load_local_index(CHUNKS_FILE, lambda: load_chunks(self.index_dir))
+
+    def build_search_filter(
+        self,
+        file_types: Optional[List[str]] = None,
+        path_prefix: Optional[str] = None,
+        path_glob: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build a metadata ``where`` clause for search filters.
+        
+        Args:
+            file_types: Only files with these extensions (e.g. ["md", "py"]).
+            path_prefix: Only files whose relative path starts with this prefix.
+            path_glob: Only files whose relative path matches this pattern.
+        
+        Returns:
+            ``where`` clause for the vector store, or None if no filter was given.
+        
+        Raises:
+            ValueError: If path filters are used on an index without path metadata.
+        """
+        known_paths: List[str] = []
+        if path_prefix or path_glob:
+            paths = self._load_local_index(PATHS_FILE, self._read_paths_file)
+            # Indexes built before paths.json existed cannot resolve paths
+            if paths is None:
+                raise ValueError(
+                    "ERROR: Index has no file path metadata for path filters.\n"
+                    "   Run 'docrag reindex' to rebuild the database."
+                )
+            known_paths = paths
+        
+        return build_where(known_paths, file_types=file_types, path_prefix=path_prefix, path_glob=path_glob)
+
+    def _read_paths_file(self) -> List[str]:
+        with open(self.index_dir / PATHS_FILE, 'r', encoding='utf-8') as f:
+            paths: List[str] = json.load(f)
+        return paths
+
+    def get_lexical_index(self) -> Optional[BM25Index]:
+        """
+        Get the BM25 lexical index, reloading it if it was rebuilt on disk.
+        
+        Returns:
+            BM25Index instance, or None if the index has not been built yet.
+        """
+        documents = self.get_indexed_chunks()
+        if documents is None:
+            return None
+        return self._load_local_index(
+            BM25_FILE, lambda: BM25Index.load(self.index_dir, documents=documents)
+        )
+
+    def get_trigram_index(self) -> Optional[TrigramIndex]:
+        """
+        Get the trigram index, reloading it if it was rebuilt on disk.
+        
+        Returns:
+            TrigramIndex instance, or None if the index has not been built yet.
+        """
+        return self._load_local_index(TRIGRAM_FILE, lambda: TrigramIndex.load(self.index_dir))
+
+    def get_symbol_index(self) -> Optional[SymbolIndex]:
+        """
+        Get the code symbol index, reloading it if it was rebuilt on disk.
+        
+        Returns:
+            SymbolIndex instance, or None if the index has not been built yet.
+        """
+        return self._load_local_index(SYMBOL_FILE, lambda: SymbolIndex.load(self.index_dir))
+
     def delete_database(self) -> None:
         """
         Delete existing vector database.
         
-        This removes the .docrag/vectordb/ directory and all its contents.
+        This removes the .docrag/vectordb/ directory and all its contents,
+        together with the local indexes in .docrag/indexes/.
         Uses safe deletion with retry mechanism for MCP compatibility.
         """
+        if self.index_dir.exists():
+            shutil.rmtree(self.index_dir, ignore_errors=True)
+            self._local_index_cache = {}
+        
+        self._flat_store = None
+        self._sharded_store = None
+        
         if self.db_path.exists():
             try:
                 # Try graceful deletion first
@@ -373,12 +1026,126 @@ class VectorDBManager:
             # Ignore errors during cleanup - this is best effort
             pass
 
-    def get_retriever(self, top_k: Optional[int] = None):
+    def get_vectorstore(self):
+        """
+        Open the configured vector store.
+        
+        The flat store instance is kept for the lifetime of the manager so
+        its memory maps are reused across queries; it reopens itself when a
+        reindex swaps in a new generation. A sharded store is reopened when
+        its shard list is rewritten (full reindex or a single shard rebuild).
+        
+        Returns:
+            Chroma, FlatVectorStore or ShardedVectorStore instance.
+        """
+        with self._open_lock:
+            return self._open_vectorstore()
+
+    def _open_vectorstore(self):
+        if self.shards_file.exists():
+            mtime = self.shards_file.stat().st_mtime
+            reuse = self._sharded_store is not None and self._sharded_store[0] == mtime
+            self._count_cache('vectorstore', reuse)
+            if not reuse:
+                shards = (self._read_shards_file() or {}).get('shards', {})
+                self._sharded_store = (mtime, ShardedVectorStore(
+                    {name: self._open_shard(name) for name in shards},
+                    self.embeddings,
+                    directories=shards,
+                    project_root=self.project_root
+                ))
+            return self._sharded_store[1]
+        
+        if self.backend == 'flat':
+            self._count_cache('vectorstore', self._flat_store is not None)
+            if self._flat_store is None:
+                self._flat_store = FlatVectorStore(self.db_path, self.embeddings, **self.flat_store_options)
+            return self._flat_store
+        
+        # Chroma shares one client per path, so only the first open is cold
+        self._count_cache('vectorstore', self._search_ef_checked)
+        vectorstore = Chroma(
+            persist_directory=str(self.db_path),
+            embedding_function=self.embeddings
+        )
+        
+        if not self._search_ef_checked:
+            self._search_ef_checked = True
+            self._apply_search_ef(vectorstore)
+        
+        return vectorstore
+
+    def _apply_search_ef(self, vectorstore) -> None:
+        """Persist the configured HNSW search_ef on a Chroma collection (best effort)."""
+        search_ef = self.hnsw_metadata.get('hnsw:search_ef')
+        if not search_ef:
+            return
+        # search_ef is a query-time setting, so apply config changes without a reindex
+        try:
+            set_hnsw_search_ef(vectorstore._collection, search_ef)
+        except Exception:
+            pass
+
+    def get_stored_embeddings(self):
+        """
+        Load all stored embeddings from the vector database.
+        
+        Returns:
+            NumPy array of shape (chunks, dimensions). For the flat backend
+            this is a read-only memory map of the stored vectors.
+        
+        Raises:
+            ValueError: If database doesn't exist or holds no embeddings.
+        """
+        import numpy as np
+        
+        if not self.db_path.exists():
+            raise ValueError(
+                "ERROR: Vector database not found.\n"
+                "   Run 'docrag index' to create the database first."
+            )
+        
+        parts = []
+        for vectorstore in self._base_stores(self.get_vectorstore()):
+            if isinstance(vectorstore, FlatVectorStore):
+                snapshot = vectorstore._snapshot()
+                if snapshot is not None and len(snapshot):
+                    parts.append(snapshot.vectors)
+            else:
+                results = vectorstore._collection.get(include=['embeddings'])
+                part = np.asarray(results.get('embeddings'), dtype=np.float32)
+                if part.ndim == 2 and len(part):
+                    parts.append(part)
+        
+        if len(parts) == 1:
+            embeddings = parts[0]
+        else:
+            embeddings = np.vstack(parts) if parts else np.empty((0, 0))
+        
+        if embeddings.ndim != 2 or len(embeddings) == 0:
+            raise ValueError("ERROR: Vector database contains no embeddings")
+        
+        return embeddings
+
+    def get_retriever(
+        self,
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        directories: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None
+    ):
         """
         Get retriever for querying the vector database.
         
         Args:
             top_k: Number of top results to retrieve. If None, uses config value.
+            nprobe: IVF lists to scan per query (flat backend with IVF-PQ only).
+                If None, uses config value. Higher = better recall, slower.
+            directories: Only return chunks from files in these directories
+                (relative to the project root). Sharded databases skip shards
+                outside them.
+            where: Metadata filter applied inside the search (see
+                ``build_search_filter``).
         
         Returns:
             VectorStoreRetriever instance.
@@ -397,16 +1164,163 @@ class VectorDBManager:
             retrieval_config = self.config.get('retrieval', {})
             top_k = retrieval_config.get('top_k', 5)
         
-        # Load existing vector store
-        vectorstore = Chroma(
-            persist_directory=str(self.db_path),
-            embedding_function=self.embeddings
-        )
+        vectorstore, search_kwargs = self._search_target(nprobe, directories, where)
+        search_kwargs["k"] = top_k
+        
+        # MMR re-ranks over-fetched candidates using their stored vectors
+        search_type = self.config.get('retrieval', {}).get('search_type', 'similarity')
+        if search_type == 'mmr':
+            search_kwargs.update(self._mmr_options(top_k))
+            if not isinstance(vectorstore, (ShardedVectorStore, FlatVectorStore)):
+                # Use the same vectorized MMR for ChromaDB as for the other stores
+                vectorstore = ShardedVectorStore({'all': vectorstore}, self.embeddings, project_root=self.project_root)
         
         # Create and return retriever
         return vectorstore.as_retriever(
-            search_kwargs={"k": top_k}
+            search_type=search_type,
+            search_kwargs=search_kwargs
+        )
+
+    def _mmr_options(self, k: int) -> Dict[str, Any]:
+        """MMR candidate count and relevance/diversity balance from config."""
+        retrieval_config = self.config.get('retrieval', {})
+        return {
+            'fetch_k': max(k, retrieval_config.get('fetch_k', 0) or 4 * k),
+            'lambda_mult': retrieval_config.get('lambda_mult', 0.5)
+        }
+
+    def _search_target(
+        self,
+        nprobe: Optional[int] = None,
+        directories: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Get the store to search and the search options for it."""
+        vectorstore = self.get_vectorstore()
+        
+        search_kwargs: Dict[str, Any] = {}
+        if nprobe is not None and self.backend == 'flat':
+            search_kwargs["nprobe"] = nprobe
+        if directories:
+            if not isinstance(vectorstore, ShardedVectorStore):
+                # A single unsharded store is filtered like one catch-all shard
+                vectorstore = ShardedVectorStore({'all': vectorstore}, self.embeddings, project_root=self.project_root)
+            search_kwargs["directories"] = directories
+        if where:
+            search_kwargs["filter"] = where
+        return vectorstore, search_kwargs
+
+    def search(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        directories: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        search_type: Optional[str] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search the vector database for exactly ``k`` chunks with relevance scores.
+        
+        Args:
+            query: Query text.
+            k: Number of results. If None, uses retrieval.top_k.
+            min_score: Drop results with a cosine similarity below this value.
+            nprobe: IVF lists to scan per query (flat backend with IVF-PQ only).
+            directories: Only return chunks from files in these directories.
+            where: Metadata filter applied inside the search.
+            search_type: similarity or mmr. If None, uses retrieval.search_type.
+        
+        Returns:
+            List of (Document, cosine similarity) tuples, best first (in pick
+            order for mmr). Scores are on the same scale for every backend;
+            1.0 is an exact match.
+        
+        Raises:
+            ValueError: If database doesn't exist.
+        """
+        if not self.db_path.exists():
+            raise ValueError(
+                "ERROR: Vector database not found.\n"
+                "   Run 'docrag index' to create the database first."
+            )
+        
+        if k is None:
+            k = self.config.get('retrieval', {}).get('top_k', 5)
+        if k < 1:
+            return []
+        
+        vectorstore, search_kwargs = self._search_target(nprobe, directories, where)
+        
+        if search_type is None:
+            search_type = self.config.get('retrieval', {}).get('search_type', 'similarity')
+        if search_type == 'mmr':
+            options = self._mmr_options(k)
+            embedding = vectorstore.embeddings.embed_query(query)
+            candidates = search_with_vectors(vectorstore, embedding, options['fetch_k'], **search_kwargs)
+            if min_score is not None:
+                candidates = [hit for hit in candidates if hit[1] >= min_score]
+            if not candidates:
+                return []
+            picks = mmr_select(
+                embedding, np.stack([vector for _, _, vector in candidates]), k, options['lambda_mult']
+            )
+            return [(candidates[i][0], float(candidates[i][1])) for i in picks]
+        
+        hits = vectorstore.similarity_search_with_score(query, k=k, **search_kwargs)
+        
+        # ChromaDB returns distances; flat and sharded stores return cosine similarity
+        relevance = relevance_score_fn(vectorstore)
+        results = [(doc, float(relevance(score))) for doc, score in hits]
+        if min_score is not None:
+            results = [(doc, score) for doc, score in results if score >= min_score]
+        return results
+
+    def adaptive_search(self, query: str) -> List[Tuple[Document, float]]:
+        """
+        Search with a number of results chosen from the score distribution.
+        
+        Fetches ``retrieval.max_k`` candidates and keeps between ``min_k`` and
+        ``max_k`` of them (see ``adaptive_cutoff``).
+        
+        Args:
+            query: Query text.
+        
+        Returns:
+            List of (Document, relevance score) tuples, best first.
+        """
+        retrieval_config = self.config.get('retrieval', {})
+        min_k = retrieval_config.get('min_k', 1)
+        max_k = max(min_k, retrieval_config.get('max_k', 8))
+        
+        # The cutoff needs scores in descending order, so no MMR re-ranking
+        hits = self.search(query, k=max_k, search_type='similarity')
+        keep = adaptive_cutoff(
+            [score for _, score in hits],
+            min_k=min_k,
+            max_k=max_k,
+            score_gap=retrieval_config.get('score_gap', 0.1),
+            relevance_mass=retrieval_config.get('relevance_mass', 0.8)
         )
+        return hits[:keep]
+
+    def get_adaptive_retriever(self) -> AdaptiveRetriever:
+        """
+        Get a retriever that uses ``adaptive_search``.
+        
+        Returns:
+            AdaptiveRetriever instance.
+        
+        Raises:
+            ValueError: If database doesn't exist.
+        """
+        if not self.db_path.exists():
+            raise ValueError(
+                "ERROR: Vector database not found.\n"
+                "   Run 'docrag index' to create the database first."
+            )
+        return AdaptiveRetriever(manager=self)
 
     def list_documents(self) -> List[str]:
         """
@@ -424,22 +1338,21 @@ class VectorDBManager:
                 "   Run 'docrag index' to create the database first."
             )
         
-        # Load existing vector store
-        vectorstore = Chroma(
-            persist_directory=str(self.db_path),
-            embedding_function=self.embeddings
-        )
-        
-        # Get all documents
-        # We need to query with a dummy search to get all documents
-        # ChromaDB doesn't have a direct "get all" method, so we use get()
-        collection = vectorstore._collection
-        results = collection.get()
+        metadatas = []
+        for vectorstore in self._base_stores(self.get_vectorstore()):
+            if isinstance(vectorstore, FlatVectorStore):
+                metadatas.extend(vectorstore.get_metadatas())
+            else:
+                # Get all documents
+                # ChromaDB doesn't have a direct "get all" method, so we use get()
+                collection = vectorstore._collection
+                results = collection.get()
+                metadatas.extend((results or {}).get('metadatas') or [])
         
         # Extract unique source files from metadata
         source_files = set()
-        if results and 'metadatas' in results:
-            for metadata in results['metadatas']:
+        if metadatas:
+            for metadata in metadatas:
                 if metadata and 'source_file' in metadata:
                     source_files.add(metadata['source_file'])
                 elif metadata and 'source' in metadata:
@@ -497,4 +1410,27 @@ class VectorDBManager:
                 "   You must run 'docrag reindex' to rebuild the vector database."
             )
         
+        manifest = self.load_manifest()
+        if manifest is None:
+            return None
+        
+        manifest.setdefault('sharding', 'none')  # manifests written before sharding
+        current = self._index_settings()
+        changed = [
+            key for key in ['provider', 'embedding_model', 'backend', 'sharding']
+            if manifest.get(key) != current[key]
+        ]
+        dimensions = current['embedding_dimensions']
+        if dimensions and self.get_stored_dimensions() not in (None, dimensions):
+            changed.append('embedding_dimensions')
+        elif not dimensions and manifest.get('embedding_dimensions'):
+            changed.append('embedding_dimensions')
+        
+        if changed:
+            return (
+                f"WARNING:  WARNING: Index was built with different settings ({', '.join(changed)})!\n"
+                "   The stored index no longer matches config.yaml.\n"
+                "   You must run 'docrag reindex' to rebuild the vector database."
+            )
+        
         return None
@@ -102,6 +102,74 @@ def mock_google_key(monkeypatch):
     monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
 
 
+@pytest.fixture
+def fake_llm_config():
+    """LLM configuration using the offline fake providers."""
+    return {
+        "provider": "fake",
+        "embedding_model": "fake-embedding",
+        "llm_model": "fake-chat",
+        "embedding_dimensions": 16
+    }
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Local server speaking the OpenAI embeddings and chat wire format."""
+    from docrag.fake_providers import FakeOpenAIServer
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key-for-testing")
+    with FakeOpenAIServer(dimensions=16) as server:
+        yield server
+
+
+@pytest.fixture
+def synthetic_corpus(tmp_path):
+    """Generated mixed project tree (500 files) and its spec."""
+    from docrag.corpus import CorpusSpec, generate_corpus
+    spec = CorpusSpec(num_files=500, seed=7)
+    generate_corpus(tmp_path, spec)
+    return tmp_path, spec
+
+
+@pytest.fixture
+def fake_indexed_project(tmp_path, fake_llm_config):
+    """Build a 10-chunk index with the fake providers; call with server settings.
+
+    ``files`` (relative path to text) adds project files, one chunk each.
+    """
+    from langchain_core.documents import Document
+    from docrag.config_manager import ConfigManager, DocRAGConfig
+    from docrag.document_processor import DocumentProcessor
+    from docrag.vector_db import VectorDBManager
+
+    def build(files=None, **server):
+        config = DocRAGConfig.from_template('general')
+        for key, value in fake_llm_config.items():
+            setattr(config.llm, key, value)
+        for key, value in server.items():
+            setattr(config.server, key, value)
+        ConfigManager(tmp_path).save_config(config)
+        chunks = [
+            Document(
+                page_content=f"Section {i} explains setting {i}.",
+                metadata={'source': str(tmp_path / f"doc{i}.md"), 'chunk_id': i}
+            )
+            for i in range(10)
+        ]
+        for rel_path, text in sorted((files or {}).items()):
+            path = tmp_path / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+            chunks.append(Document(page_content=text, metadata={'source': str(path), 'chunk_id': len(chunks)}))
+        for chunk in chunks:
+            chunk.metadata['file_type'] = Path(chunk.metadata['source']).suffix
+        DocumentProcessor({}).add_path_metadata(chunks, tmp_path)
+        VectorDBManager(config.to_dict(), tmp_path).create_database(chunks, show_progress=False)
+        return tmp_path
+
+    return build
+
+
 @pytest.fixture
 def clean_env(monkeypatch):
     """Clean environment variables for testing."""
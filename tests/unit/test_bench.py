@@ -0,0 +1,34 @@
+"""Unit tests for the end-to-end benchmark."""
+
+from docrag.bench import STAGES, compare_results, run_benchmark
+
+
+def _results(scan, search_p95):
+    return {
+        'stages': {'scan': scan},
+        'queries': {'search': {'p50_ms': 10.0, 'p95_ms': search_p95, 'p99_ms': 30.0}, 'answer': {}}
+    }
+
+
+def test_compare_flags_slowdowns_above_threshold_and_noise():
+    """Test regressions need both the relative threshold and the noise floor."""
+    rows = {row['metric']: row for row in compare_results(_results(1.0, 20.0), _results(1.5, 20.0005), 0.2)}
+    assert rows['stage.scan']['regression']
+    assert rows['stage.scan']['change'] == 0.5
+    assert not rows['search.p50']['regression']
+
+    # +100% but only 1 ms slower
+    rows = {row['metric']: row for row in compare_results(_results(0.001, 20.0), _results(0.002, 20.0))}
+    assert not rows['stage.scan']['regression']
+
+
+def test_corpus_benchmark(tmp_path):
+    """Test a generated-corpus run reports every stage and query kind."""
+    results = run_benchmark(corpus_files=12, num_queries=3, num_answers=2, work_dir=tmp_path)
+    assert results['source'] == 'corpus'
+    assert 0 < results['counts']['files'] <= 12
+    assert results['counts']['embedded_texts'] == results['counts']['chunks']
+    assert list(results['stages']) == STAGES
+    assert results['queries']['search']['count'] == 3
+    assert results['queries']['answer']['count'] == 2
+    assert not any(row['regression'] for row in compare_results(results, results))
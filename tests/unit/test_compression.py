@@ -0,0 +1,57 @@
+"""Unit tests for query-aware context compression."""
+
+from langchain_core.documents import Document
+from docrag.compression import compress_documents, score_sentences, split_sentences
+from docrag.context_builder import get_token_counter
+
+
+TEXT = (
+    "The project started in 2019. Configure the database URL in config.yaml.\n"
+    "Our logo is blue. The database pool size defaults to ten connections.\n"
+    "- item one\n"
+    "    return value"
+)
+
+
+def test_split_sentences():
+    """Test sentence ends and line breaks split, dots inside names do not."""
+    spans = split_sentences(TEXT)
+    assert [TEXT[start:end] for start, end in spans] == [
+        "The project started in 2019.",
+        "Configure the database URL in config.yaml.",
+        "Our logo is blue.",
+        "The database pool size defaults to ten connections.",
+        "- item one",
+        "return value"
+    ]
+
+
+def test_scores_prefer_matching_sentences():
+    """Test related sentences outscore unrelated ones, including inflections."""
+    scores = score_sentences(["Configuring the database.", "Our logo is blue."], "how do I configure the database")
+    assert scores[0] > scores[1]
+
+
+def test_compress_keeps_relevant_sentences():
+    """Test compression keeps the question's sentences within the ratio."""
+    count = get_token_counter(None)
+    documents = [
+        Document(page_content=TEXT, metadata={'source': 'a.md', 'start_index': 0}),
+        Document(page_content="Cats are unrelated. Dogs too.", metadata={'source': 'b.md'})
+    ]
+    compressed, stats = compress_documents(documents, "database configuration", 0.4, count)
+
+    assert stats.tokens_after <= 0.4 * stats.tokens_before
+    assert stats.tokens_saved == stats.tokens_before - stats.tokens_after
+    assert "Configure the database URL in config.yaml." in compressed[0].page_content
+    assert "logo" not in compressed[0].page_content
+    assert 'start_index' not in compressed[0].metadata
+    assert compress_documents(documents, "database configuration", 0.4, count)[0] == compressed
+
+
+def test_ratio_one_is_noop():
+    """Test a ratio of 1.0 leaves chunks untouched."""
+    documents = [Document(page_content=TEXT, metadata={})]
+    compressed, stats = compress_documents(documents, "database", 1.0, get_token_counter(None))
+    assert compressed == documents
+    assert stats.tokens_saved == 0
@@ -102,6 +102,8 @@ class TestRetrievalConfig:
         """Test default retrieval configuration."""
         config = RetrievalConfig()
         assert config.top_k == 3
+        assert config.adaptive_k is False
+        assert config.min_k <= config.max_k
 
 
 class TestPromptConfig:
@@ -195,6 +197,41 @@ class TestDocRAGConfig:
         assert config.project.name == "Test"
         assert config.llm.provider == "openai"
         assert config.chunking.chunk_size == 800
+        assert config.vector_store.backend == "chroma"
+    
+    def test_config_from_dict_vector_store(self):
+        """Test optional vector_store section roundtrips."""
+        config = DocRAGConfig.from_template('general')
+        config_dict = config.to_dict()
+        config_dict["vector_store"] = {"backend": "flat", "dtype": "float16"}
+        
+        config = DocRAGConfig.from_dict(config_dict)
+        assert config.vector_store.backend == "flat"
+        assert config.to_dict()["vector_store"]["dtype"] == "float16"
+    
+    def test_config_from_dict_server(self, tmp_path):
+        """Test optional server section defaults, roundtrips and validates."""
+        config_dict = DocRAGConfig.from_template('general').to_dict()
+        del config_dict["server"]
+        assert DocRAGConfig.from_dict(config_dict).server.query_log is False
+        
+        config_dict["server"] = {"query_log": True, "query_log_backups": 0}
+        config = DocRAGConfig.from_dict(config_dict)
+        assert config.to_dict()["server"]["query_log"] is True
+        assert ConfigManager(tmp_path).validate_config(config) == ["server.query_log_backups must be at least 1"]
+    
+    def test_config_from_dict_tracing(self, tmp_path):
+        """Test optional tracing section defaults, roundtrips and validates."""
+        config_dict = DocRAGConfig.from_template('general').to_dict()
+        del config_dict["tracing"]
+        assert DocRAGConfig.from_dict(config_dict).tracing.enabled is False
+        
+        config_dict["tracing"] = {"enabled": True, "otlp_endpoint": "localhost:4318"}
+        config = DocRAGConfig.from_dict(config_dict)
+        assert config.to_dict()["tracing"]["enabled"] is True
+        assert ConfigManager(tmp_path).validate_config(config) == [
+            "tracing.otlp_endpoint must be an http:// or https:// URL, got localhost:4318"
+        ]
     
     def test_config_from_template_general(self):
         """Test creating configuration from general template."""
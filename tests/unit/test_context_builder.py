@@ -0,0 +1,71 @@
+"""Unit tests for token-budgeted context packing."""
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from docrag.context_builder import ContextPacker, get_token_counter, merge_chunks
+
+
+TEXT = " ".join(f"sentence{i} explains part {i} of the setup." for i in range(60))
+
+
+def _chunks(source="a.md", text=TEXT):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=50, add_start_index=True)
+    return splitter.split_documents([Document(page_content=text, metadata={'source': source})])
+
+
+class TestMergeChunks:
+    """Test overlap removal between neighbouring chunks."""
+
+    def test_overlapping_chunks_rebuild_source_text(self):
+        """Test consecutive overlapping chunks merge without repeated text."""
+        chunks = _chunks()
+        merged = merge_chunks(chunks[2:5])
+        assert len(merged) == 1
+        start = chunks[2].metadata['start_index']
+        end = chunks[4].metadata['start_index'] + len(chunks[4].page_content)
+        assert merged[0].page_content == TEXT[start:end]
+
+    def test_priority_order_and_separate_files(self):
+        """Test passages keep their best chunk's rank; other files stay apart."""
+        chunks = _chunks()
+        other = _chunks(source="b.md")
+        merged = merge_chunks([other[0], chunks[5], chunks[0], chunks[4]])
+        assert [doc.metadata['source'] for doc in merged] == ["b.md", "a.md", "a.md"]
+        assert merged[1].page_content.startswith(chunks[4].page_content)
+        assert merged[2].page_content == chunks[0].page_content
+
+    def test_chunks_without_offsets_are_kept(self):
+        """Test chunks from old indexes without start_index pass through."""
+        docs = [Document(page_content="x", metadata={}), Document(page_content="y", metadata={})]
+        assert [doc.page_content for doc in merge_chunks(docs)] == ["x", "y"]
+
+
+class TestContextPacker:
+    """Test filling the prompt budget."""
+
+    TEMPLATE = "Answer from the context.\n\nContext:\n{context}\n\nQuestion: {question}\nAnswer:"
+
+    def test_budget_accounts_for_template_and_question(self):
+        """Test template and question tokens are subtracted from the budget."""
+        count = get_token_counter(None)
+        packer = ContextPacker(self.TEMPLATE, max_prompt_tokens=500)
+        expected = 500 - count("Answer from the context.\n\nContext:\n\n\nQuestion: \nAnswer:") - count("why?")
+        assert packer.context_budget("why?") == expected
+
+    def test_fills_in_order_within_budget(self):
+        """Test passages are added best first and the budget is never exceeded."""
+        chunks = _chunks()
+        docs = [chunks[10], chunks[0], chunks[5]]
+        packer = ContextPacker(self.TEMPLATE, max_prompt_tokens=10_000)
+        assert packer.pack(docs, "q") == "\n\n".join(doc.page_content for doc in docs)
+
+        count = get_token_counter(None)
+        budget_for_two = count(docs[0].page_content) + count("\n\n") + count(docs[1].page_content)
+        packer = ContextPacker(self.TEMPLATE, max_prompt_tokens=packer._template_tokens + count("q") + budget_for_two)
+        assert packer.pack(docs, "q") == docs[0].page_content + "\n\n" + docs[1].page_content
+
+    def test_truncates_when_nothing_fits(self):
+        """Test the best passage is cut to the budget rather than sending nothing."""
+        packer = ContextPacker("{context}{question}", max_prompt_tokens=10)
+        context = packer.pack(_chunks()[:1], "")
+        assert context and packer.count_tokens(context) <= 10
@@ -0,0 +1,58 @@
+"""Unit tests for the synthetic corpus generator."""
+
+from docrag.corpus import CorpusSpec, corpus_indexing, generate_corpus, mutate_corpus
+from docrag.document_processor import DocumentProcessor
+
+
+def _snapshot(root):
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob('*')) if p.is_file()}
+
+
+def test_generation_is_reproducible(tmp_path):
+    """Test the same spec writes the same tree and another seed does not."""
+    spec = CorpusSpec(num_files=60, seed=3)
+    generate_corpus(tmp_path / "a", spec)
+    generate_corpus(tmp_path / "b", spec)
+    generate_corpus(tmp_path / "c", CorpusSpec(num_files=60, seed=4))
+    assert _snapshot(tmp_path / "a") == _snapshot(tmp_path / "b")
+    assert _snapshot(tmp_path / "a") != _snapshot(tmp_path / "c")
+
+
+def test_scan_matches_indexed_kinds(synthetic_corpus):
+    """Test scanning skips excluded trees and non-indexed binaries."""
+    root, spec = synthetic_corpus
+    stats = generate_corpus(root, spec)
+    assert set(stats.by_kind) >= {'markdown', 'code', 'text', 'legacy', 'binary', 'excluded'}
+
+    processor = DocumentProcessor({'indexing': corpus_indexing(), 'chunking': {}})
+    files = processor.scan_files(root)
+    assert len(files) == stats.indexed_files
+    assert not any('node_modules' in str(f) for f in files)
+    assert {f.suffix for f in files} >= {'.md', '.txt', '.py', '.go'}
+
+    # Legacy-encoded files are not UTF-8 but still load through encoding detection
+    def is_utf8(path):
+        try:
+            path.read_bytes().decode('utf-8')
+            return True
+        except UnicodeDecodeError:
+            return False
+
+    legacy = [f for f in files if f.suffix == '.txt' and not is_utf8(f)]
+    assert len(legacy) == stats.by_kind['legacy']
+    assert len(processor.load_documents(legacy)) == len(legacy)
+
+
+def test_mutation_is_reproducible(synthetic_corpus, tmp_path_factory):
+    """Test mutation edits the same share of files the same way."""
+    root, spec = synthetic_corpus
+    other = tmp_path_factory.mktemp("other")
+    generate_corpus(other, spec)
+
+    edited = mutate_corpus(root, spec, 0.1, seed=5)
+    assert edited == mutate_corpus(other, spec, 0.1, seed=5)
+    assert _snapshot(root) == _snapshot(other)
+
+    # Text files only: binary decoys are never edited
+    stats = generate_corpus(tmp_path_factory.mktemp("count"), spec)
+    assert len(edited) == round(0.1 * (stats.indexed_files - stats.by_kind.get('binary_decoy', 0)))
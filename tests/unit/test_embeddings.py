@@ -0,0 +1,140 @@
+"""Unit tests for embedding truncation and local embeddings."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.embeddings import (
+    HashingEmbeddings, TruncatedEmbeddings, local_embeddings, supports_native_dimensions, truncate_embeddings
+)
+from docrag.flat_store import FlatVectorStore
+from docrag.vector_benchmark import SeededEmbeddings
+from docrag.vector_db import VectorDBManager
+
+
+def test_truncate_embeddings_renormalizes():
+    """Test truncated vectors keep leading dimensions at unit length."""
+    vectors = np.array([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]])
+    truncated = truncate_embeddings(vectors, 2)
+    assert truncated.shape == (2, 2)
+    assert truncated[0].tolist() == pytest.approx([0.6, 0.8])
+    assert truncated[1].tolist() == [0.0, 0.0]
+
+
+def test_truncated_embeddings_wrapper():
+    """Test wrapper shortens both document and query embeddings."""
+    embedding = TruncatedEmbeddings(SeededEmbeddings(dimensions=32), 8)
+    assert len(embedding.embed_query("hello")) == 8
+    assert [len(v) for v in embedding.embed_documents(["a", "b"])] == [8, 8]
+    assert np.linalg.norm(embedding.embed_query("hello")) == pytest.approx(1.0)
+
+
+def test_supports_native_dimensions():
+    """Test only OpenAI text-embedding-3 models shorten server-side."""
+    assert supports_native_dimensions('openai', 'text-embedding-3-large')
+    assert not supports_native_dimensions('openai', 'text-embedding-ada-002')
+    assert not supports_native_dimensions('gemini', 'models/embedding-001')
+
+
+def test_flat_store_truncate(tmp_path):
+    """Test truncating a flat store matches embedding with fewer dimensions."""
+    base = SeededEmbeddings(dimensions=32)
+    documents = [Document(page_content=f"chunk {i}", metadata={'chunk_id': i}) for i in range(50)]
+    store = FlatVectorStore.from_documents(documents, base, path=tmp_path / "db")
+    store.truncate(8)
+
+    snapshot = store._snapshot()
+    assert snapshot.vectors.shape == (50, 8)
+    assert snapshot.get_document(3).metadata['chunk_id'] == 3
+
+    store._embedding = TruncatedEmbeddings(base, 8)
+    assert store.similarity_search("chunk 21", k=1)[0].metadata['chunk_id'] == 21
+
+    with pytest.raises(ValueError):
+        store.truncate(64)
+
+
+class TestReindexCheck:
+    """Test index manifest comparison."""
+
+    @pytest.fixture
+    def config(self):
+        return {
+            'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+            'vector_store': {'backend': 'flat'}
+        }
+
+    def _manager(self, config, project_root):
+        manager = VectorDBManager(config, project_root)
+        manager.embeddings = SeededEmbeddings(dimensions=16)
+        return manager
+
+    def test_dimension_change_requires_reindex(self, tmp_path, monkeypatch, config):
+        """Test changing embedding_dimensions after indexing is reported."""
+        monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+        chunks = [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(5)]
+        self._manager(config, tmp_path).create_database(chunks, show_progress=False)
+
+        assert self._manager(config, tmp_path).check_reindex_required() is None
+
+        config['llm']['embedding_dimensions'] = 8
+        warning = self._manager(config, tmp_path).check_reindex_required()
+        assert 'embedding_dimensions' in warning
+        assert "docrag reindex" in warning
+
+    def test_truncated_store_matches_config(self, tmp_path, monkeypatch, config):
+        """Test a store truncated to the configured size needs no reindex."""
+        monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+        chunks = [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(5)]
+        manager = self._manager(config, tmp_path)
+        manager.create_database(chunks, show_progress=False)
+        manager.get_vectorstore().truncate(8)
+
+        config['llm']['embedding_dimensions'] = 8
+        assert self._manager(config, tmp_path).check_reindex_required() is None
+
+
+class TestLocalEmbeddings:
+    """Test the offline local embedding provider."""
+
+    def test_hashing_is_deterministic_and_normalized(self):
+        """Test equal texts embed identically across instances and batches."""
+        texts = [f"configure database connection {i}" for i in range(200)]
+        batched = HashingEmbeddings(dimensions=64, batch_size=16, max_workers=4).embed_documents(texts)
+        single = HashingEmbeddings(dimensions=64, max_workers=1).embed_documents(texts)
+        assert np.allclose(batched, single)
+        assert len(batched[0]) == 64
+        assert np.linalg.norm(batched[0]) == pytest.approx(1.0)
+        assert HashingEmbeddings(dimensions=64).embed_query("") == [0.0] * 64
+
+    def test_hashing_ranks_related_text_higher(self):
+        """Test shared words and word pieces raise similarity."""
+        embedding = HashingEmbeddings()
+        query = np.array(embedding.embed_query("database configuration"))
+        related, unrelated = np.array(embedding.embed_documents(
+            ["How to configure the database", "The logo colour is blue"]
+        ))
+        assert query @ related > query @ unrelated
+
+    def test_onnx_model_must_exist(self, tmp_path):
+        """Test a missing ONNX model or runtime is reported clearly."""
+        with pytest.raises(ValueError, match="ERROR"):
+            local_embeddings(str(tmp_path / "model"), None, tmp_path)
+
+    def test_manager_indexes_without_api_key(self, tmp_path, monkeypatch):
+        """Test the local provider builds and searches an index offline."""
+        monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+        config = {
+            'llm': {'provider': 'openai', 'embedding_provider': 'local', 'embedding_model': 'hashing',
+                    'embedding_dimensions': 128},
+            'vector_store': {'backend': 'flat'}
+        }
+        manager = VectorDBManager(config, tmp_path)
+        assert isinstance(manager.embeddings, HashingEmbeddings)
+        manager.create_database(
+            [Document(page_content=text, metadata={'source': 'a.md'})
+             for text in ["install with pip", "configure the database", "deploy to production"]],
+            show_progress=False
+        )
+        assert manager.search("database configuration", k=1)[0][0].page_content == "configure the database"
+        assert manager.get_stored_dimensions() == 128
+        assert manager.load_manifest()['provider'] == 'local'
@@ -0,0 +1,53 @@
+"""Unit tests for the retrieval evaluation harness."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+from langchain_core.documents import Document
+
+from docrag.evaluation import evaluate_retrieval, load_questions, parse_overrides, score_ranking
+
+
+GOLDEN_QUESTIONS = Path(__file__).parent.parent / "fixtures" / "golden_questions.jsonl"
+
+
+def test_parse_overrides_and_scoring():
+    """Test override values get YAML types and recall/MRR count expected items."""
+    assert parse_overrides("retrieval.search_mode=vector, chunking.chunk_size=400,llm.embedding_dimensions=null") == {
+        'retrieval.search_mode': 'vector', 'chunking.chunk_size': 400, 'llm.embedding_dimensions': None
+    }
+    with pytest.raises(ValueError):
+        parse_overrides("top_k=3")
+
+    ranked = [
+        Document(page_content="a", metadata={'rel_path': 'docs/setup.md', 'chunk_id': 0}),
+        Document(page_content="b", metadata={'rel_path': 'docs/api.md', 'chunk_id': 7})
+    ]
+    assert score_ranking(ranked, {'sources': ['api.md', 'README.md'], 'chunk_ids': []}) == (0.5, 0.5)
+    assert score_ranking(ranked, {'sources': ['docs/setup.md'], 'chunk_ids': [7]}) == (1.0, 1.0)
+    assert score_ranking(ranked, {'sources': ['other/api.md'], 'chunk_ids': []}) == (0.0, 0.0)
+
+
+def test_golden_set_on_sample_project(sample_project, tmp_path):
+    """Test the built-in golden set runs offline and variants share indexes."""
+    config_path = sample_project['config']
+    config = yaml.safe_load(config_path.read_text())
+    config['llm'].update({'embedding_provider': 'local', 'embedding_model': 'hashing'})
+    config_path.write_text(yaml.safe_dump(config))
+
+    questions = load_questions(GOLDEN_QUESTIONS)
+    results = evaluate_retrieval(
+        sample_project['readme'].parent,
+        questions,
+        ['retrieval.search_mode=lexical', 'vector_store.backend=flat'],
+        k=1,
+        work_dir=tmp_path / "eval"
+    )
+    baseline, lexical, flat = results
+    assert baseline['variant'] == 'baseline' and baseline['questions'] == len(questions)
+    assert baseline['recall_at_k'] >= 0.7 and baseline['mrr'] >= 0.7
+    assert lexical['index_mb'] == baseline['index_mb']
+    assert flat['index_mb'] != baseline['index_mb']
+    assert flat['latency']['count'] == len(questions)
+    assert sorted(p.name for p in (tmp_path / "eval").glob("index-*")) == ['index-0', 'index-1']
@@ -0,0 +1,85 @@
+"""Unit tests for the offline fake providers and OpenAI stub server."""
+
+import asyncio
+import time
+
+from langchain_core.documents import Document
+from docrag.config_manager import ConfigManager, DocRAGConfig
+from docrag.fake_providers import FakeChatModel, FakeEmbeddings
+from docrag.mcp_server import MCPServer
+from docrag.vector_db import VectorDBManager
+
+
+def _chunks(root):
+    return [
+        Document(page_content=f"Section {i} explains setting {i}.", metadata={'source': str(root / f"doc{i}.md")})
+        for i in range(10)
+    ]
+
+
+def test_fake_embeddings_are_deterministic():
+    """Test vectors depend only on the text and latency is paid per batch."""
+    embeddings = FakeEmbeddings(dimensions=8, latency=0.01, batch_size=2)
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(["a", "b", "c"])
+    assert time.perf_counter() - start >= 0.02
+    assert vectors[0] == FakeEmbeddings(dimensions=8).embed_query("a")
+    assert len(vectors[2]) == 8
+
+
+def test_fake_chat_model_timing_and_streaming():
+    """Test answers repeat per prompt and streaming follows the throughput."""
+    model = FakeChatModel(answer_tokens=10, tokens_per_second=200, latency=0.02)
+    start = time.perf_counter()
+    answer = model.invoke("What is the setting?").content
+    assert time.perf_counter() - start >= 0.02 + 10 / 200
+    assert answer == model.invoke("What is the setting?").content
+    assert len(answer.split()) == 10
+
+    chunks = list(model.stream("What is the setting?"))
+    assert len([chunk for chunk in chunks if chunk.content]) == 10
+    assert "".join(chunk.content for chunk in chunks) == answer
+    assert asyncio.run(model.ainvoke("What is the setting?")).content == answer
+
+
+def test_fake_provider_pipeline(tmp_path, clean_env, fake_llm_config):
+    """Test indexing and answering run from config with no API key."""
+    config = DocRAGConfig.from_template('general')
+    for key, value in fake_llm_config.items():
+        setattr(config.llm, key, value)
+    config.llm.fake_latency = 0.01
+    assert ConfigManager(tmp_path).validate_config(config) == []
+    ConfigManager(tmp_path).save_config(config)
+
+    manager = VectorDBManager(config.to_dict(), tmp_path)
+    manager.create_database(_chunks(tmp_path), show_progress=False)
+    doc, score = manager.search("Section 3 explains setting 3.", k=1)[0]
+    assert doc.page_content == "Section 3 explains setting 3."
+
+    server = MCPServer(tmp_path)
+    answer = asyncio.run(server.handle_answer_question("Section 3 explains setting 3.", include_sources=False))
+    assert answer == asyncio.run(server.handle_answer_question("Section 3 explains setting 3.", include_sources=False))
+    assert len(answer.split()) == 64
+
+
+def test_openai_stub_serves_real_clients(tmp_path, openai_stub, fake_llm_config):
+    """Test the OpenAI client path (embeddings, chat, streaming) against the stub."""
+    config = {'llm': {
+        **fake_llm_config,
+        'provider': 'openai',
+        'embedding_model': 'text-embedding-3-small',
+        'llm_model': 'gpt-4o-mini',
+        'base_url': openai_stub.url
+    }}
+    manager = VectorDBManager(config, tmp_path)
+    vectors = manager.embeddings.embed_documents(["alpha", "beta"])
+    assert len(vectors) == 2 and len(vectors[0]) == 16
+    assert manager.embeddings.embed_query("alpha") == vectors[0]
+
+    from langchain_openai import ChatOpenAI
+    chat = ChatOpenAI(model='gpt-4o-mini', base_url=openai_stub.url, api_key='sk-test')
+    answer = chat.invoke("What is alpha?").content
+    assert len(answer.split()) == 64
+    assert "".join(chunk.content for chunk in chat.stream("What is alpha?")) == answer
+    assert openai_stub.request_counts['embeddings'] == 2
+    assert openai_stub.request_counts['chat'] == 2
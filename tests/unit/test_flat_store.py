@@ -0,0 +1,96 @@
+"""Unit tests for the flat NumPy vector store."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.flat_store import FlatVectorStore
+from docrag.vector_benchmark import SeededEmbeddings
+
+
+@pytest.fixture
+def embedding():
+    """Deterministic embeddings without API calls."""
+    return SeededEmbeddings(dimensions=16)
+
+
+@pytest.fixture
+def documents():
+    """Sample chunks."""
+    return [
+        Document(page_content=f"chunk {i}", metadata={'source_file': f'doc{i % 3}.md', 'chunk_id': i})
+        for i in range(20)
+    ]
+
+
+class TestFlatVectorStore:
+    """Test flat store persistence and search."""
+
+    def test_exact_match_ranks_first(self, tmp_path, embedding, documents):
+        """Test a query identical to a stored text returns that chunk first."""
+        store = FlatVectorStore.from_documents(documents, embedding, path=tmp_path / "db")
+        results = store.similarity_search_with_score("chunk 7", k=3)
+        assert results[0][0].page_content == "chunk 7"
+        assert results[0][0].metadata['chunk_id'] == 7
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert results[0][1] >= results[1][1] >= results[2][1]
+
+    def test_matches_numpy_brute_force(self, tmp_path, embedding, documents, monkeypatch):
+        """Test blocked argpartition top-k equals a full sort."""
+        monkeypatch.setattr("docrag.flat_store.BLOCK_ROWS", 7)
+        store = FlatVectorStore.from_documents(documents, embedding, path=tmp_path / "db")
+
+        matrix = np.array(embedding.embed_documents([d.page_content for d in documents]))
+        queries = np.array(embedding.embed_documents(["q1", "q2"]))
+        expected = np.argsort(-(queries @ matrix.T), axis=1)[:, :5]
+
+        ids, scores = store.search_vectors(queries, k=5)
+        assert ids.tolist() == expected.tolist()
+        assert scores.shape == (2, 5)
+
+    def test_reopen_and_metadata(self, tmp_path, embedding, documents):
+        """Test a fresh instance reads the persisted store."""
+        FlatVectorStore.from_documents(documents, embedding, path=tmp_path / "db", dtype='float16')
+        store = FlatVectorStore(tmp_path / "db", embedding, dtype='float16')
+        assert FlatVectorStore.exists(tmp_path / "db")
+        assert len(store) == 20
+        assert {m['source_file'] for m in store.get_metadatas()} == {'doc0.md', 'doc1.md', 'doc2.md'}
+        assert store.similarity_search("chunk 3", k=1)[0].page_content == "chunk 3"
+
+    def test_rewrite_swaps_generation(self, tmp_path, embedding, documents):
+        """Test an open reader picks up a rewritten store."""
+        reader = FlatVectorStore.from_documents(documents, embedding, path=tmp_path / "db")
+        assert len(reader) == 20
+
+        FlatVectorStore.from_documents(documents[:5], embedding, path=tmp_path / "db")
+        assert len(reader) == 5
+        assert len(list((tmp_path / "db").glob("gen-*"))) == 2
+
+    def test_reader_survives_concurrent_swaps(self, tmp_path, embedding, documents, monkeypatch):
+        """Test the previous generation is kept and a stale CURRENT read is retried."""
+        path = tmp_path / "db"
+        FlatVectorStore.from_documents(documents, embedding, path=path)
+        first = (path / "CURRENT").read_text()
+        FlatVectorStore.from_documents(documents[:10], embedding, path=path)
+        second = (path / "CURRENT").read_text()
+        FlatVectorStore.from_documents(documents[:5], embedding, path=path)
+        assert sorted(p.name for p in path.glob("gen-*")) == sorted([second, (path / "CURRENT").read_text()])
+
+        # CURRENT was read before two swaps removed that generation
+        reader = FlatVectorStore(path, embedding)
+        reads = iter([first])
+        current = reader._current_generation
+        monkeypatch.setattr(reader, "_current_generation", lambda: next(reads, None) or current())
+        assert len(reader) == 5
+
+    def test_add_texts_appends(self, tmp_path, embedding, documents):
+        """Test adding texts keeps existing rows."""
+        store = FlatVectorStore.from_documents(documents[:2], embedding, path=tmp_path / "db")
+        store.add_texts(["extra"], metadatas=[{'chunk_id': 99}])
+        assert len(store) == 3
+        assert store.similarity_search("extra", k=1)[0].metadata['chunk_id'] == 99
+
+    def test_empty_store(self, tmp_path, embedding):
+        """Test searching a store that was never written."""
+        store = FlatVectorStore(tmp_path / "db", embedding)
+        assert len(store) == 0
+        assert store.similarity_search("anything") == []
@@ -0,0 +1,48 @@
+"""Unit tests for ChromaDB HNSW parameter handling."""
+
+import numpy as np
+from langchain_core.documents import Document
+from docrag.vector_db import VectorDBManager, hnsw_metadata, set_hnsw_search_ef
+from docrag.vector_benchmark import SeededEmbeddings, hnsw_sweep
+
+
+def test_hnsw_metadata_skips_unset():
+    """Test only configured parameters are passed to Chroma."""
+    assert hnsw_metadata({}) == {}
+    assert hnsw_metadata({'hnsw_m': 32, 'hnsw_search_ef': 64}) == {'hnsw:M': 32, 'hnsw:search_ef': 64}
+
+
+def test_collection_created_with_hnsw_params(tmp_path, monkeypatch):
+    """Test HNSW parameters are applied at creation and search_ef on open."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'retrieval': {'hnsw_m': 8, 'hnsw_construction_ef': 50, 'hnsw_search_ef': 20}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+    manager.create_database(
+        [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(10)],
+        show_progress=False
+    )
+
+    collection = manager.get_vectorstore()._collection
+    assert collection.metadata['hnsw:M'] == 8
+    assert collection.metadata['hnsw:construction_ef'] == 50
+
+    assert set_hnsw_search_ef(collection, 40)
+    assert not set_hnsw_search_ef(collection, 40)
+
+
+def test_hnsw_sweep_rows():
+    """Test the sweep reports every combination and exact-enough recall."""
+    embedding = SeededEmbeddings(dimensions=16, topics=4)
+    vectors = np.array(embedding.embed_documents([f"v{i}" for i in range(300)]), dtype=np.float32)
+    rows = hnsw_sweep(vectors, num_queries=20, top_k=3, m_values=[8], construction_ef_values=[50],
+                      search_ef_values=[5, 100])
+
+    assert [(r['m'], r['construction_ef'], r['search_ef']) for r in rows] == [(8, 50, 5), (8, 50, 100)]
+    assert rows[1]['recall'] >= rows[0]['recall']
+    assert rows[1]['recall'] > 0.9
+    assert rows[0]['build_s'] == rows[1]['build_s']
+    assert rows[0]['p99_ms'] >= rows[0]['p50_ms']
@@ -0,0 +1,98 @@
+"""Unit tests for the IVF-PQ index."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.ivfpq import IVFPQIndex, kmeans
+from docrag.flat_store import FlatVectorStore
+from docrag.vector_benchmark import SeededEmbeddings
+
+
+@pytest.fixture
+def vectors():
+    """Clustered unit vectors."""
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((8, 32)).astype(np.float32)
+    data = centres[rng.integers(0, 8, 2000)] + 0.3 * rng.standard_normal((2000, 32)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+class TestKMeans:
+    """Test NumPy k-means."""
+
+    def test_separates_clusters(self):
+        """Test well-separated clusters are recovered."""
+        rng = np.random.default_rng(1)
+        data = np.concatenate([
+            rng.normal(-10, 0.1, (50, 2)),
+            rng.normal(10, 0.1, (50, 2))
+        ]).astype(np.float32)
+        centroids = kmeans(data, 2)
+        assert sorted(np.round(centroids[:, 0]).tolist()) == [-10, 10]
+
+    def test_k_capped_at_points(self):
+        """Test k larger than the data is capped."""
+        assert kmeans(np.eye(3, dtype=np.float32), 10).shape == (3, 3)
+
+
+class TestIVFPQIndex:
+    """Test IVF-PQ training and search."""
+
+    def test_lists_partition_all_vectors(self, vectors):
+        """Test every vector lands in exactly one list."""
+        index = IVFPQIndex.train(vectors, nlist=16, m=8)
+        assert index.offsets[-1] == len(vectors)
+        assert sorted(index.ids.tolist()) == list(range(len(vectors)))
+        assert index.codes.shape == (len(vectors), 8)
+        assert index.codes.dtype == np.uint8
+
+    def test_full_probe_with_rerank_is_exact(self, vectors):
+        """Test probing all lists and re-ranking everything matches brute force."""
+        index = IVFPQIndex.train(vectors, nlist=16, m=8)
+        query = vectors[5]
+        ids, scores = index.search(query, vectors, k=5, nprobe=16, rerank_factor=len(vectors))
+        expected = np.argsort(-(vectors @ query), kind='stable')[:5]
+        assert ids.tolist() == expected.tolist()
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+    def test_recall_improves_with_nprobe(self, vectors):
+        """Test more probes never reduce recall."""
+        index = IVFPQIndex.train(vectors, nlist=32, m=8)
+        queries = vectors[:20]
+        exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :10]
+
+        def recall(nprobe):
+            hits = 0
+            for query, expected in zip(queries, exact):
+                ids, _ = index.search(query, vectors, k=10, nprobe=nprobe)
+                hits += len(set(ids.tolist()) & set(expected.tolist()))
+            return hits / exact.size
+
+        assert recall(1) <= recall(8) <= recall(32)
+        assert recall(32) > 0.9
+
+    def test_save_and_load(self, vectors, tmp_path):
+        """Test index survives a save/load roundtrip."""
+        IVFPQIndex.train(vectors, nlist=4, m=4).save(tmp_path)
+        loaded = IVFPQIndex.load(tmp_path)
+        assert loaded.nlist == 4
+        assert IVFPQIndex.load(tmp_path / "missing") is None
+
+
+class TestFlatStoreWithIVFPQ:
+    """Test the flat store with an IVF-PQ index."""
+
+    def test_search_uses_index(self, tmp_path):
+        """Test ANN search returns the exact match and honours nprobe."""
+        documents = [Document(page_content=f"chunk {i}", metadata={'chunk_id': i}) for i in range(500)]
+        store = FlatVectorStore.from_documents(
+            documents, SeededEmbeddings(dimensions=32), path=tmp_path / "db",
+            ann='ivfpq', nlist=8, pq_m=8
+        )
+        assert store._snapshot().ann is not None
+
+        results = store.similarity_search("chunk 42", k=3, nprobe=8)
+        assert results[0].metadata['chunk_id'] == 42
+
+        retriever = store.as_retriever(search_kwargs={"k": 2, "nprobe": 2})
+        assert len(retriever.invoke("chunk 7")) <= 2
@@ -0,0 +1,145 @@
+"""Unit tests for the BM25 lexical index."""
+
+import pytest
+from langchain_core.documents import Document
+from docrag.lexical_index import (
+    BM25Index,
+    tokenize,
+    reciprocal_rank_fusion,
+    reciprocal_rank_scores,
+    hybrid_scores,
+    save_chunks,
+    load_chunks
+)
+
+
+@pytest.fixture
+def chunks():
+    """Sample chunks with identifier-heavy content."""
+    texts = [
+        "Use ProgressIndicator.show_spinner for indeterminate progress.",
+        "Set retrieval.top_k in config.yaml to control the number of results.",
+        "The API returns VALIDATION_ERROR (422) for invalid input data.",
+        "Deployment uses Docker and systemd services.",
+    ]
+    return [
+        Document(page_content=text, metadata={'source': f'doc{i}.md', 'chunk_id': i})
+        for i, text in enumerate(texts)
+    ]
+
+
+class TestTokenize:
+    """Test lexical tokenization."""
+
+    def test_compound_identifier_kept_whole(self):
+        """Test dotted identifiers produce full and partial tokens."""
+        tokens = tokenize("ProgressIndicator.show_spinner")
+        assert "progressindicator.show_spinner" in tokens
+        assert "spinner" in tokens
+        assert "progress" in tokens
+        assert "indicator" in tokens
+
+    def test_plain_words_lowercased(self):
+        """Test plain words are lowercased without duplicates."""
+        assert tokenize("Hello World") == ["hello", "world"]
+
+    def test_unicode_words(self):
+        """Test non-ASCII words are tokenized."""
+        assert "документация" in tokenize("Документация проекта")
+
+
+class TestBM25Index:
+    """Test BM25 index build and search."""
+
+    def test_identifier_query_ranks_exact_chunk_first(self, chunks):
+        """Test identifier queries find the chunk that mentions them."""
+        index = BM25Index.build(chunks)
+        results = index.search("ProgressIndicator.show_spinner", k=2)
+        assert results
+        assert results[0][0].metadata['chunk_id'] == 0
+
+    def test_error_code_query(self, chunks):
+        """Test error code lookup."""
+        index = BM25Index.build(chunks)
+        results = index.search("VALIDATION_ERROR", k=1)
+        assert results[0][0].metadata['chunk_id'] == 2
+
+    def test_no_match_returns_empty(self, chunks):
+        """Test queries without matching terms return nothing."""
+        index = BM25Index.build(chunks)
+        assert index.search("kubernetes", k=3) == []
+
+    def test_candidate_ids_restrict_results(self, chunks):
+        """Test scoring can be restricted to a candidate set."""
+        index = BM25Index.build(chunks)
+        assert index.search("config.yaml", k=3, candidate_ids=[0, 2]) == []
+
+    def test_save_and_load_roundtrip(self, chunks, tmp_path):
+        """Test index survives a save/load roundtrip."""
+        save_chunks(tmp_path, chunks)
+        BM25Index.build(chunks).save(tmp_path)
+
+        loaded = BM25Index.load(tmp_path)
+        assert len(load_chunks(tmp_path)) == len(chunks)
+        assert loaded.search("retrieval.top_k", k=1)[0][0].metadata['chunk_id'] == 1
+
+    def test_matching_ids_use_cached_columns(self, chunks, tmp_path):
+        """Test metadata filters are evaluated against cached columns."""
+        save_chunks(tmp_path, chunks)
+        for index in (BM25Index.build(chunks), BM25Index.build(load_chunks(tmp_path))):
+            assert index.matching_ids({'chunk_id': {'$in': [0, 2]}}).tolist() == [0, 2]
+            column = index.column('chunk_id')
+            assert index.matching_ids({'chunk_id': {'$ne': 0}}).tolist() == [1, 2, 3]
+            assert index.column('chunk_id') is column
+
+    def test_chunk_store_decodes_on_access(self, chunks, tmp_path):
+        """Test saved chunks are memory-mapped and decoded one at a time."""
+        chunks.append(Document(page_content="Ünïcode — текст", metadata={'chunk_id': 3}))
+        (tmp_path / "chunks.json").write_text("[]")
+        save_chunks(tmp_path, chunks)
+
+        store = load_chunks(tmp_path)
+        assert not (tmp_path / "chunks.json").exists()
+        assert len(store) == len(chunks)
+        assert store[-1].page_content == "Ünïcode — текст"
+        assert store.get_metadata(1) == chunks[1].metadata
+        assert [doc.page_content for doc in store] == [doc.page_content for doc in chunks]
+        with pytest.raises(IndexError):
+            store[len(chunks)]
+
+        save_chunks(tmp_path, [])
+        assert len(load_chunks(tmp_path)) == 0
+
+
+class TestReciprocalRankFusion:
+    """Test reciprocal rank fusion."""
+
+    def test_documents_in_both_lists_rank_first(self, chunks):
+        """Test a document ranked by both retrievers wins."""
+        fused = reciprocal_rank_fusion([
+            [chunks[0], chunks[1]],
+            [chunks[2], chunks[1]]
+        ])
+        assert fused[0].metadata['chunk_id'] == 1
+        assert len(fused) == 3
+
+    def test_limit(self, chunks):
+        """Test fused results are limited."""
+        fused = reciprocal_rank_fusion([chunks, list(reversed(chunks))], limit=2)
+        assert len(fused) == 2
+
+    def test_scores(self, chunks):
+        """Test fused scores are returned best first."""
+        fused = reciprocal_rank_scores([[chunks[0], chunks[1]], [chunks[1]]], k=60)
+        assert fused[0] == (chunks[1], pytest.approx(1 / 62 + 1 / 61))
+        assert fused[1] == (chunks[0], pytest.approx(1 / 61))
+
+    def test_hybrid_scores_vector_only(self, chunks):
+        """Test hybrid fusion can drop documents vector search did not return."""
+        vector_hits = [(chunks[1], 0.9)]
+        lexical_hits = [(chunks[0], 5.0), (chunks[2], 4.0), (chunks[1], 3.0)]
+        fused = hybrid_scores(vector_hits, lexical_hits, limit=2)
+        assert [doc.metadata['chunk_id'] for doc, _ in fused] == [1, 0]
+
+        fused = hybrid_scores(vector_hits, lexical_hits, limit=2, vector_only=True)
+        assert fused == [(chunks[1], pytest.approx(1 / 61 + 1 / 63))]
@@ -0,0 +1,76 @@
+"""Unit tests for the MCP load generator."""
+
+import asyncio
+import os
+
+import pytest
+from mcp import types
+from docrag.loadgen import load_test, open_session, parse_mix, prepare_indexed_workspace, run_load
+
+
+class EchoSession:
+    """Client session stand-in answering after a fixed delay."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        await asyncio.sleep(self.delay)
+        text = "ERROR: Vector database not found" if name == 'broken' else "ok"
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+def test_parse_mix():
+    """Test tool=weight parsing and validation."""
+    assert parse_mix("search_docs=3, answer_question=1") == {'search_docs': 3.0, 'answer_question': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("search_docs")
+    with pytest.raises(ValueError):
+        parse_mix("search_docs=0")
+
+
+def test_network_transports_need_url():
+    """Test http and sse sessions are refused without a server URL."""
+    async def connect(transport):
+        async with open_session(transport=transport):
+            pass
+
+    for transport in ('http', 'sse'):
+        with pytest.raises(ValueError, match="URL is required"):
+            asyncio.run(connect(transport))
+
+
+def test_closed_loop_counts_errors_per_tool():
+    """Test every call is recorded and ERROR: replies count as errors."""
+    session = EchoSession()
+    report = asyncio.run(run_load(
+        session, {'search_docs': 1, 'broken': 1}, ["q1", "q2"], concurrency=3, duration=5, max_calls=20
+    ))
+    assert report['calls'] == 20 == len(session.calls)
+    assert report['errors'] == report['tools']['broken']['calls'] > 0
+    assert report['tools']['broken']['error_rate'] == 1.0
+    assert report['tools']['search_docs']['p50_ms'] >= 10
+    assert ('search_docs', {'question': 'q1'}) in session.calls
+
+
+def test_open_loop_follows_rate():
+    """Test a target rate schedules calls at fixed intervals."""
+    session = EchoSession(delay=0.001)
+    report = asyncio.run(run_load(session, {'list_indexed_docs': 1}, ["q"], rate=50, duration=0.4))
+    assert 18 <= report['calls'] <= 21
+    assert report['rate'] == 50
+
+
+def test_stdio_server_under_load(tmp_path):
+    """Test a real stdio server built from a generated corpus answers a mix of calls."""
+    workspace, questions = prepare_indexed_workspace(tmp_path, corpus_files=15, num_questions=5)
+    with open(os.devnull, 'w') as errlog:
+        report = asyncio.run(load_test(
+            cwd=workspace, errlog=errlog, mix={'search_docs': 2, 'list_indexed_docs': 1},
+            questions=questions, concurrency=2, duration=60, max_calls=6
+        ))
+    assert report['calls'] == 6
+    assert report['errors'] == 0, report['error_samples']
+    assert report['rss']['peak_mb'] > 0
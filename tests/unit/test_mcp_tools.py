@@ -0,0 +1,104 @@
+"""Unit tests for the MCP tool handlers, called through MCPServer.run_tool."""
+
+import asyncio
+
+import pytest
+from docrag.mcp_server import MCPServer
+
+
+CODE_FILES = {
+    "src/settings.py": (
+        "class Settings:\n"
+        "    \"\"\"Explains setting overrides.\"\"\"\n"
+        "\n"
+        "    def load_setting(self, name):\n"
+        "        return name\n"
+    ),
+    "src/Loader.java": (
+        "public class Loader {\n"
+        "    String loadSetting(String name) {\n"
+        "        return name;\n"
+        "    }\n"
+        "}\n"
+    )
+}
+
+
+@pytest.fixture
+def server(fake_indexed_project):
+    """Server over the 10 fake chunks plus a Python and a Java file."""
+    return MCPServer(fake_indexed_project(files=CODE_FILES))
+
+
+def call(server, tool, **arguments):
+    text, _ = asyncio.run(server.run_tool(tool, arguments))
+    return text
+
+
+def sources(text):
+    return [line[len("SOURCE: "):] for line in text.splitlines() if line.startswith("SOURCE: ")]
+
+
+class TestSearchDocs:
+    """Test search modes and filters of search_docs."""
+
+    def test_lexical(self, server):
+        """Test lexical mode ranks by BM25 alone."""
+        text = call(server, "search_docs", question="setting 7", mode="lexical", max_results=3)
+        assert "(bm25)" in text and "similarity" not in text
+        assert sources(text)[0] == "doc7.md"
+
+    def test_hybrid(self, server):
+        """Test hybrid mode fuses both rankings and shows the vector similarity."""
+        text = call(server, "search_docs", question="Section 4 explains setting 4.", mode="hybrid", max_results=3)
+        assert text.count("--- Result") == 3
+        assert sources(text)[0] == "doc4.md"
+        assert "(rrf, similarity 1.000)" in text
+
+    @pytest.mark.parametrize("mode", ["vector", "lexical", "hybrid"])
+    @pytest.mark.parametrize("filters, expected", [
+        ({'file_types': ["py"]}, ["src/settings.py"]),
+        ({'path_prefix': "src/"}, ["src/Loader.java", "src/settings.py"]),
+        ({'path_glob': "*.java"}, ["src/Loader.java"]),
+        ({'path_glob': "docs/*"}, [])
+    ])
+    def test_filters(self, server, mode, filters, expected):
+        """Test file_types, path_prefix and path_glob restrict every mode."""
+        text = call(server, "search_docs", question="setting", mode=mode, max_results=10, **filters)
+        if expected:
+            assert sorted(sources(text)) == expected
+        else:
+            assert text.startswith("SEARCH: No relevant documents")
+
+
+class TestGrepDocs:
+    """Test grep_docs over the trigram index."""
+
+    def test_regex_and_fixed_string(self, server):
+        """Test only trigram candidates are scanned and literal patterns are escaped."""
+        text = call(server, "grep_docs", pattern=r"def load_\w+")
+        assert "GREP: Found 1 match(es) for 'def load_\\w+' (scanned 1 of 12 chunks)" in text
+        assert "src/settings.py (chunk 11): def load_setting(self, name):" in text
+
+        assert "doc3.md (chunk 3): Section 3" in call(server, "grep_docs", pattern="setting 3.", fixed_string=True)
+        assert call(server, "grep_docs", pattern="SECTION 9", ignore_case=True).count("doc9.md") == 1
+        assert call(server, "grep_docs", pattern="setting 3x").startswith("GREP: No matches")
+
+    def test_invalid_pattern(self, server):
+        """Test an invalid regular expression is reported as an error."""
+        assert call(server, "grep_docs", pattern="(unclosed").startswith("ERROR: Invalid regular expression")
+
+
+class TestFindSymbol:
+    """Test find_symbol over the symbol index."""
+
+    def test_lookup(self, server):
+        """Test definitions are found by name, qualified name, prefix and kind."""
+        assert "class Settings  src/settings.py:1" in call(server, "find_symbol", name="Settings")
+        assert "Settings.load_setting  src/settings.py:4" in call(server, "find_symbol", name="Settings.load_setting")
+
+        text = call(server, "find_symbol", name="load", prefix=True)
+        assert "Loader.loadSetting  src/Loader.java:2" in text
+        assert "Settings.load_setting" in text
+
+        assert call(server, "find_symbol", name="Settings", kind="function").startswith("SYMBOL: No definitions")
@@ -0,0 +1,87 @@
+"""Unit tests for MCP server metrics and the server_stats tool."""
+
+import asyncio
+import json
+
+from docrag.metrics import Histogram, ServerMetrics, prometheus_text
+from docrag.mcp_server import MCPServer
+from docrag.instrumentation import CallRecord
+
+
+def test_histogram_and_prometheus_text():
+    """Test bucket percentiles and cumulative exposition buckets."""
+    histogram = Histogram(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.05, 5.0):
+        histogram.observe(seconds)
+    assert histogram.quantile(0.5) == 0.1
+    summary = histogram.to_dict()
+    assert summary['p99_ms'] is None
+    assert summary['buckets'] == [['0.01', 1], ['0.1', 2], ['+Inf', 1]]
+
+    metrics = ServerMetrics(slow_call_ms=100)
+    record = CallRecord("search_docs", {})
+    record.duration, record.phases = 0.2, {'embed': 0.15}
+    record.add_tokens({'tokens_before': 120, 'tokens_after': 70, 'tokens_saved': 50})
+    metrics.observe_call(record, error=True)
+    metrics.count_cache('qa_chain', hit=False)
+    text = prometheus_text(metrics.snapshot(caches={'local_index': {'hits': 3, 'misses': 1}}))
+    assert 'docrag_tool_errors_total{tool="search_docs"} 1' in text
+    assert 'docrag_tool_slow_calls_total{tool="search_docs"} 1' in text
+    assert 'docrag_tool_duration_seconds_bucket{tool="search_docs",le="+Inf"} 1' in text
+    assert 'docrag_tool_duration_seconds_bucket{tool="search_docs",le="0.1"} 0' in text
+    assert 'docrag_phase_duration_seconds_count{tool="search_docs",phase="embed"} 1' in text
+    assert 'docrag_context_tokens_total{tool="search_docs",kind="saved"} 50' in text
+    assert 'docrag_cache_requests_total{cache="local_index",result="hit"} 3' in text
+    assert 'docrag_in_flight_requests 0' in text
+
+
+def test_unknown_tools_and_label_escaping():
+    """Test client-chosen tool names cannot add labels or break the exposition format."""
+    metrics = ServerMetrics(tools=['search_docs'])
+    for tool in ('search_docs', 'x"}\nfake_metric 1', 'other'):
+        record = CallRecord(tool, {})
+        record.duration = 0.01
+        metrics.observe_call(record, error=False)
+    assert sorted(metrics.snapshot()['tools']) == ['search_docs', 'unknown']
+    text = prometheus_text(metrics.snapshot())
+    assert 'docrag_tool_calls_total{tool="unknown"} 2' in text
+    assert not any(line.startswith('fake_metric') for line in text.splitlines())
+
+    metrics.count_cache('a"b\\c\nd', hit=True)
+    text = prometheus_text(metrics.snapshot())
+    assert 'docrag_cache_requests_total{cache="a\\"b\\\\c\\nd",result="hit"} 1' in text
+
+
+def test_server_stats_tool(fake_indexed_project):
+    """Test tool calls feed server_stats and the Prometheus textfile."""
+    tmp_path = fake_indexed_project(metrics_textfile="metrics/docrag.prom", metrics_interval_s=0)
+    server = MCPServer(tmp_path)
+
+    async def calls():
+        for i in range(3):
+            await server.run_tool("search_docs", {"question": f"setting {i}"})
+        await server.run_tool("answer_question", {"question": "setting 1"})
+        await server.run_tool("answer_question", {"question": "setting 2"})
+        await server.run_tool("grep_docs", {"pattern": "("})
+        await server.run_tool("no_such_tool", {})
+        text, _ = await server.run_tool("server_stats", {})
+        stats, _ = await server.run_tool("server_stats", {"format": "json"})
+        return text, json.loads(stats)
+
+    text, stats = asyncio.run(calls())
+    assert text.startswith("STATS: ") and "search_docs" in text and "qa_chain" in text
+
+    assert stats['in_flight'] == 1
+    assert stats['index']['generation'] == 1
+    search = stats['tools']['search_docs']
+    assert search['calls'] == 3 and search['errors'] == 0
+    assert {'staleness', 'embed', 'search'} <= set(search['phases'])
+    assert stats['tools']['answer_question']['phases']['llm']['count'] == 2
+    assert stats['tools']['grep_docs']['errors'] == 1
+    assert stats['tools']['unknown']['errors'] == 1
+    assert stats['caches']['qa_chain'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+    assert stats['caches']['local_index']['hits'] > 0
+
+    prom = (tmp_path / "metrics" / "docrag.prom").read_text()
+    assert 'docrag_tool_calls_total{tool="server_stats"} 2' in prom
+    assert 'docrag_index_generation 1' in prom
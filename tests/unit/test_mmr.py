@@ -0,0 +1,61 @@
+"""Unit tests for MMR diversification."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.mmr import mmr_select
+from docrag.vector_benchmark import SeededEmbeddings
+from docrag.vector_db import VectorDBManager
+
+
+def test_mmr_skips_near_duplicates():
+    """Test a near-copy of the first pick loses to a distinct candidate."""
+    query = [1.0, 0.0, 0.0]
+    vectors = np.array([[0.9, 0.1, 0.0], [0.9, 0.11, 0.0], [0.7, 0.0, 0.7]])
+    assert mmr_select(query, vectors, 2, lambda_mult=0.5) == [0, 2]
+    assert mmr_select(query, vectors, 2, lambda_mult=1.0) == [0, 1]
+
+    # The query equals a stored chunk, so its copies tie with every other candidate
+    vectors = np.array([[1.0, 0.0, 0.0], [1.0, 0.0, 1e-4], [0.6, 0.8, 0.0]])
+    assert mmr_select(query, vectors, 2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_bounds():
+    """Test k larger than the candidate list and empty input."""
+    vectors = np.eye(3)
+    assert sorted(mmr_select([1.0, 0.0, 0.0], vectors, 10)) == [0, 1, 2]
+    assert mmr_select([1.0, 0.0], np.empty((0, 2)), 3) == []
+
+
+@pytest.mark.parametrize("backend,sharding", [("flat", "none"), ("chroma", "none"), ("flat", "hash")])
+def test_manager_mmr_diversifies(tmp_path, monkeypatch, backend, sharding):
+    """Test MMR search and retriever drop duplicated chunks."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'retrieval': {'search_type': 'mmr', 'lambda_mult': 0.5, 'top_k': 3},
+        'vector_store': {'backend': backend, 'sharding': sharding, 'shards': 2}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+
+    # Three identical copies of the best match, as overlapping chunks would be
+    chunks = [
+        Document(page_content="chunk 5", metadata={'source': str(tmp_path / f"copy{i}.md"), 'copy': i})
+        for i in range(3)
+    ] + [
+        Document(page_content=f"chunk {i}", metadata={'source': str(tmp_path / f"f{i}.md")})
+        for i in range(20) if i != 5
+    ]
+    manager.create_database(chunks, show_progress=False)
+
+    plain = manager.search("chunk 5", k=3, search_type='similarity')
+    assert [doc.page_content for doc, _ in plain] == ["chunk 5"] * 3
+
+    diverse = manager.search("chunk 5", k=3)
+    assert [doc.page_content for doc, _ in diverse].count("chunk 5") == 1
+    assert diverse[0][1] == pytest.approx(1.0, abs=1e-3)
+
+    docs = manager.get_retriever().invoke("chunk 5")
+    assert len(docs) == 3
+    assert [doc.page_content for doc in docs].count("chunk 5") == 1
@@ -0,0 +1,91 @@
+"""Unit tests for built-in profiling."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from docrag.instrumentation import phase
+from docrag.mcp_server import MCPServer
+from docrag.profiling import StackSampler, parse_profile_env, profile_run
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_collapsed_output():
+    """Test busy threads are sampled as collapsed stacks and waiting threads skipped."""
+    stop = threading.Event()
+    busy = threading.Thread(target=_spin, args=(stop,), name="busy")
+    idle = threading.Thread(target=stop.wait, name="idle")
+    busy.start()
+    idle.start()
+    sampler = StackSampler(interval_ms=1)
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop()
+    stop.set()
+    busy.join()
+    idle.join()
+
+    lines = sampler.collapsed().splitlines()
+    stacks = dict(line.rsplit(' ', 1) for line in lines)
+    assert all(count.isdigit() for count in stacks.values())
+    assert any(stack.startswith("thread:busy;") and stack.endswith(":_spin") for stack in stacks)
+    assert not any(stack.startswith("thread:idle;") for stack in stacks)
+    assert not any("docrag-profiler" in stack for stack in stacks)
+    assert sampler.top_functions()['inclusive']
+
+
+def test_memory_stages_and_retention(tmp_path):
+    """Test per-stage memory reports, nested stages and pruning of old runs."""
+    for _ in range(3):
+        with profile_run(tmp_path, 'index', memory=True, keep=2) as run:
+            with phase('scan'):
+                data = [str(i) * 10 for i in range(20000)]
+            with phase('write'):
+                with phase('embed'):
+                    data += [str(i) for i in range(1000)]
+
+    profiles = tmp_path / ".docrag" / "profiles"
+    run_ids = {path.name.split('.', 1)[0] for path in profiles.iterdir()}
+    assert len(run_ids) == 2 and run.run_id in run_ids
+    memory = (profiles / f"{run.run_id}.memory.txt").read_text()
+    stages = [line.split()[0] for line in memory.splitlines()[3:5]]
+    assert stages == ['scan', 'write']
+    assert "embed" not in memory
+    assert (profiles / f"{run.run_id}.collapsed").exists()
+
+    assert parse_profile_env('') is None
+    assert parse_profile_env('off') is None
+    assert parse_profile_env('1,memory,min_ms=250,keep=5') == {
+        'memory': True, 'min_ms': 250.0, 'interval_ms': 5.0, 'keep': 5, 'max_mb': 100.0
+    }
+    for value in ('cprofile', 'keep=0', 'fast'):
+        with pytest.raises(ValueError):
+            parse_profile_env(value)
+
+
+def test_tool_calls_are_profiled(fake_indexed_project, monkeypatch, capsys):
+    """Test DOCRAG_PROFILE profiles tool calls taking at least min_ms."""
+    tmp_path = fake_indexed_project()
+    profiles = tmp_path / ".docrag" / "profiles"
+
+    monkeypatch.setenv('DOCRAG_PROFILE', 'sample,memory,min_ms=60000')
+    server = MCPServer(tmp_path)
+    asyncio.run(server.run_tool('search_docs', {'question': 'setting 3'}))
+    assert not profiles.exists()
+
+    monkeypatch.setenv('DOCRAG_PROFILE', 'sample,memory')
+    server = MCPServer(tmp_path)
+    asyncio.run(server.run_tool('search_docs', {'question': 'setting 3'}))
+    names = sorted(path.name for path in profiles.iterdir())
+    assert [name.split('.', 1)[1] for name in names] == ['collapsed', 'memory.txt', 'txt']
+    assert names[0].split('.')[0].endswith('-search_docs')
+    memory = (profiles / names[1]).read_text()
+    assert "staleness" in memory and "search" in memory
+    assert "PROFILE: search_docs took" in capsys.readouterr().err
+    assert server._profiling is False
@@ -0,0 +1,87 @@
+"""Unit tests for quantized embedding storage."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.quantization import QuantizedVectors, recall_report
+from docrag.flat_store import FlatVectorStore
+from docrag.vector_benchmark import SeededEmbeddings
+
+
+@pytest.fixture
+def vectors():
+    """Clustered unit vectors."""
+    embedding = SeededEmbeddings(dimensions=64, topics=8)
+    return np.array(embedding.embed_documents([f"v{i}" for i in range(1000)]), dtype=np.float32)
+
+
+class TestQuantizedVectors:
+    """Test int8 and binary encodings."""
+
+    def test_int8_encoding(self, vectors):
+        """Test int8 codes dequantize close to the original vectors."""
+        quantized = QuantizedVectors.encode(vectors, 'int8')
+        assert quantized.codes.dtype == np.int8
+        assert quantized.bytes_per_vector == 64
+        restored = quantized.codes.astype(np.float32) * quantized.scales
+        assert np.abs(restored - vectors).max() < 0.01
+
+    def test_binary_encoding(self, vectors):
+        """Test sign bits are packed 8 per byte."""
+        quantized = QuantizedVectors.encode(vectors, 'binary')
+        assert quantized.codes.shape == (1000, 8)
+        assert np.unpackbits(quantized.codes[0]).tolist() == (vectors[0] > 0).astype(int).tolist()
+
+    def test_binary_first_pass_ranks_by_hamming(self):
+        """Test the binary first pass prefers vectors with matching signs."""
+        data = np.array([[1, 1, 1, 1], [1, 1, -1, -1], [-1, -1, -1, -1]], dtype=np.float32) / 2
+        quantized = QuantizedVectors.encode(data, 'binary')
+        assert quantized.first_pass(data[0], 1).tolist() == [0]
+        assert sorted(quantized.first_pass(data[0], 2).tolist()) == [0, 1]
+
+    @pytest.mark.parametrize("kind", ["int8", "binary"])
+    def test_rescoring_returns_exact_scores(self, vectors, kind):
+        """Test rescored results carry full-precision similarities."""
+        quantized = QuantizedVectors.encode(vectors, kind)
+        ids, scores = quantized.search(vectors[3], vectors, k=5, rescore_factor=50)
+        assert ids[0] == 3
+        assert scores.tolist() == pytest.approx((vectors[ids] @ vectors[3]).tolist())
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_save_and_load(self, vectors, tmp_path):
+        """Test codes survive a save/load roundtrip."""
+        QuantizedVectors.encode(vectors, 'int8').save(tmp_path)
+        loaded = QuantizedVectors.load(tmp_path)
+        assert loaded.kind == 'int8'
+        assert loaded.scales.shape == (64,)
+        assert QuantizedVectors.load(tmp_path / "missing") is None
+
+
+class TestRecallReport:
+    """Test the recall-versus-float32 report."""
+
+    def test_report_rows(self, vectors):
+        """Test report includes a float32 baseline and sensible recalls."""
+        rows = recall_report(vectors, num_queries=30, k=5, rescore_factors=[1, 10])
+        assert rows[0]['kind'] == 'float32'
+        assert rows[0]['recall'] == 1.0
+
+        by_key = {(r['kind'], r['rescore_factor']): r for r in rows[1:]}
+        assert set(by_key) == {('int8', 1), ('int8', 10), ('binary', 1), ('binary', 10)}
+        assert by_key[('int8', 10)]['recall'] > 0.95
+        assert by_key[('binary', 10)]['recall'] >= by_key[('binary', 1)]['recall']
+        assert by_key[('binary', 1)]['bytes_per_vector'] == 8
+
+
+class TestFlatStoreWithQuantization:
+    """Test the flat store with quantized codes."""
+
+    @pytest.mark.parametrize("kind", ["int8", "binary"])
+    def test_search_uses_codes(self, tmp_path, kind):
+        """Test quantized stores find the exact match."""
+        documents = [Document(page_content=f"chunk {i}", metadata={'chunk_id': i}) for i in range(200)]
+        store = FlatVectorStore.from_documents(
+            documents, SeededEmbeddings(dimensions=64), path=tmp_path / "db", quantization=kind
+        )
+        assert store._snapshot().quantized.kind == kind
+        assert store.similarity_search("chunk 17", k=1)[0].metadata['chunk_id'] == 17
@@ -0,0 +1,95 @@
+"""Unit tests for query log capture and replay."""
+
+import asyncio
+import json
+
+from docrag.config_manager import ConfigManager
+from docrag.mcp_server import MCPServer
+from docrag.instrumentation import CallRecord
+from docrag.query_log import QUERY_LOG_FILE, QueryLog, latency_diff, read_query_log, replay_log
+
+
+def test_tool_calls_are_logged_with_phases(fake_indexed_project, capsys):
+    """Test each call is logged with phase timings, chunk IDs and a slow flag."""
+    tmp_path = fake_indexed_project(query_log=True, slow_call_ms=0)
+    server = MCPServer(tmp_path)
+
+    async def calls():
+        await server.run_tool("search_docs", {"question": "setting 3", "mode": "vector"})
+        await server.run_tool("answer_question", {"question": "setting 4", "include_sources": False})
+        await server.run_tool("search_docs", {"question": ""})
+
+    asyncio.run(calls())
+    search, answer, failed = read_query_log(tmp_path / ".docrag" / QUERY_LOG_FILE)
+
+    assert search['tool'] == "search_docs" and search['arguments']['mode'] == "vector"
+    assert {'staleness', 'embed', 'search'} <= set(search['phases_ms'])
+    assert search['phases_ms']['search'] <= search['duration_ms']
+    assert len(search['chunk_ids']) == 3 and search['result_chars'] > 0
+    assert {'search', 'llm'} <= set(answer['phases_ms']) and answer['chunk_ids']
+    assert failed['error'] and not search['error']
+    assert search['slow'] and "SLOW: search_docs took" in capsys.readouterr().err
+
+
+def test_compression_savings_are_logged_without_tracing(fake_indexed_project):
+    """Test tokens saved by context compression reach the query log and server_stats."""
+    tmp_path = fake_indexed_project(query_log=True)
+    config_manager = ConfigManager(tmp_path)
+    config = config_manager.load_config()
+    config.retrieval.compression_ratio = 0.5
+    config_manager.save_config(config)
+    server = MCPServer(tmp_path)
+    assert server.tracer is None
+
+    asyncio.run(server.run_tool("answer_question", {"question": "setting 4", "include_sources": False}))
+    entry, = read_query_log(tmp_path / ".docrag" / QUERY_LOG_FILE)
+
+    tokens = entry['tokens']
+    assert tokens['tokens_before'] > 0
+    assert tokens['tokens_saved'] == tokens['tokens_before'] - tokens['tokens_after']
+    assert server.metrics.snapshot()['tools']['answer_question']['tokens'] == tokens
+    stats, _ = asyncio.run(server.run_tool("server_stats", {}))
+    assert f"answer_question: {tokens['tokens_saved']} of {tokens['tokens_before']} tokens saved" in stats
+
+
+def test_query_log_rotates(tmp_path):
+    """Test the log rotates at its size limit and rotated files are read back in order."""
+    log = QueryLog(tmp_path / QUERY_LOG_FILE, max_mb=0.001, backups=2)
+    for i in range(40):
+        record = CallRecord("search_docs", {"question": f"question {i} " + "x" * 40})
+        record.started += i
+        log.write(record, "SEARCH: ok")
+    log.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [QUERY_LOG_FILE, f"{QUERY_LOG_FILE}.1", f"{QUERY_LOG_FILE}.2"]
+    entries = read_query_log(tmp_path / QUERY_LOG_FILE)
+    questions = [int(entry['arguments']['question'].split()[1]) for entry in entries]
+    assert questions == sorted(questions) and questions[-1] == 39
+    assert len(entries) < 40
+
+
+def test_replay_reports_latency_diff(fake_indexed_project):
+    """Test a captured log replays against the index without touching it or the log."""
+    tmp_path = fake_indexed_project(query_log=True)
+    server = MCPServer(tmp_path)
+
+    async def calls():
+        for i in range(3):
+            await server.run_tool("search_docs", {"question": f"setting {i}"})
+        await server.run_tool("reindex_docs", {"force": True, "check_only": True})
+
+    asyncio.run(calls())
+    log_path = tmp_path / ".docrag" / QUERY_LOG_FILE
+    server.query_log.close()
+    logged = log_path.read_text()
+
+    results = replay_log(tmp_path, speed=50)
+    assert [result['tool'] for result in results] == ["search_docs"] * 3 + ["reindex_docs"]
+    assert not any(result['error'] for result in results)
+    assert log_path.read_text() == logged
+
+    rows = {row['tool']: row for row in latency_diff(results)}
+    assert rows['search_docs']['calls'] == 3
+    assert rows['search_docs']['replay_p50_ms'] > 0
+    assert 'search' in rows['search_docs']['phases']
+    json.dumps(results)
@@ -0,0 +1,123 @@
+"""Unit tests for metadata filter pushdown."""
+
+import posixpath
+from pathlib import Path
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.document_processor import DocumentProcessor
+from docrag.flat_store import FlatVectorStore
+from docrag.lexical_index import CHUNKS_FILE
+from docrag.search_filters import build_where, evaluate_where, matching_indices, normalize_file_types
+from docrag.vector_benchmark import SeededEmbeddings
+from docrag.vector_db import VectorDBManager, PATHS_FILE
+
+
+PATHS = ["README.md", "docs/guide.md", "docs/api/ref.md", "docs/api/util.py", "src/app.py"]
+
+
+def _metadatas():
+    return [
+        {'rel_path': p, 'rel_dir': posixpath.dirname(p), 'file_type': Path(p).suffix}
+        for p in PATHS
+    ]
+
+
+def _matches(where):
+    return [PATHS[i] for i in matching_indices(_metadatas(), where)]
+
+
+class TestBuildWhere:
+    """Test filter arguments become where clauses."""
+
+    def test_no_filters(self):
+        """Test no arguments means no filter."""
+        assert build_where(PATHS) is None
+
+    def test_file_types(self):
+        """Test extensions are normalized and matched."""
+        assert normalize_file_types(["MD", ".py", " "]) == [".md", ".py"]
+        assert build_where(PATHS, file_types=["md"]) == {'file_type': '.md'}
+        assert _matches(build_where(PATHS, file_types=["md", "py"])) == PATHS
+
+    def test_path_prefix(self):
+        """Test prefixes cover whole directories and partial file names."""
+        assert build_where(PATHS, path_prefix="docs/api/") == {'rel_dir': 'docs/api'}
+        assert _matches(build_where(PATHS, path_prefix="./docs/")) == PATHS[1:4]
+        assert _matches(build_where(PATHS, path_prefix="docs/api/re")) == ["docs/api/ref.md"]
+        assert _matches(build_where(PATHS, path_prefix="doc")) == PATHS[1:4]
+
+    def test_path_glob_and_combination(self):
+        """Test globs and combined filters."""
+        assert _matches(build_where(PATHS, path_glob="*.py")) == ["docs/api/util.py", "src/app.py"]
+        where = build_where(PATHS, file_types=["py"], path_prefix="docs")
+        assert '$and' in where
+        assert _matches(where) == ["docs/api/util.py"]
+
+    def test_no_match_is_impossible(self):
+        """Test a filter matching no indexed file matches nothing."""
+        where = build_where(PATHS, path_glob="*.rst")
+        assert where == {'rel_path': {'$eq': ''}}
+        assert _matches(where) == []
+
+
+def test_evaluate_where_operators():
+    """Test supported operators and missing fields."""
+    values = {'a': np.array([1, 2, None], dtype=object)}
+    assert evaluate_where({'a': {'$ne': 2}}, values.get).tolist() == [True, False, True]
+    assert evaluate_where({'a': {'$nin': [1]}}, values.get).tolist() == [False, True, True]
+    assert evaluate_where({'$or': [{'a': 1}, {'a': 2}]}, values.get).tolist() == [True, True, False]
+    with pytest.raises(ValueError):
+        evaluate_where({'a': {'$gt': 1}}, values.get)
+
+
+def test_flat_store_filters_inside_search(tmp_path):
+    """Test filtered search returns k matches, not a filtered top-k."""
+    embedding = SeededEmbeddings(dimensions=16)
+    documents = [
+        Document(page_content=f"chunk {i}", metadata={'file_type': '.py' if i % 10 == 0 else '.md', 'chunk_id': i})
+        for i in range(100)
+    ]
+    store = FlatVectorStore.from_documents(documents, embedding, path=tmp_path / "db")
+
+    results = store.similarity_search("chunk 55", k=5, filter={'file_type': '.py'})
+    assert len(results) == 5
+    assert all(doc.metadata['chunk_id'] % 10 == 0 for doc in results)
+    assert store.similarity_search("chunk 55", k=5, filter={'rel_path': {'$eq': ''}}) == []
+
+
+@pytest.mark.parametrize("backend", ["flat", "chroma"])
+def test_manager_path_filters(tmp_path, monkeypatch, backend):
+    """Test path filters are resolved against the index and pushed down."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'vector_store': {'backend': backend}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+
+    documents = [
+        Document(page_content=f"text {i}", metadata={'source': str(tmp_path / path), 'file_type': Path(path).suffix})
+        for i, path in enumerate(PATHS)
+    ]
+    DocumentProcessor({}).add_path_metadata(documents, tmp_path)
+    manager.create_database(documents, show_progress=False)
+
+    where = manager.build_search_filter(path_prefix="docs/api")
+    results = manager.get_retriever(top_k=5, where=where).invoke("text 0")
+    assert sorted(doc.metadata['rel_path'] for doc in results) == ["docs/api/ref.md", "docs/api/util.py"]
+
+    where = manager.build_search_filter(file_types=["py"], path_glob="src/*")
+    assert [doc.page_content for doc in manager.get_retriever(top_k=5, where=where).invoke("text 0")] == ["text 4"]
+
+    # Path filters read only the list of indexed paths, not the chunks
+    (manager.index_dir / CHUNKS_FILE).unlink()
+    assert manager.build_search_filter(path_glob="src/*") == {'rel_path': 'src/app.py'}
+
+    # An index from before paths.json cannot resolve paths
+    (manager.index_dir / PATHS_FILE).unlink()
+    with pytest.raises(ValueError, match="docrag reindex"):
+        manager.build_search_filter(path_prefix="docs/api")
+    assert manager.build_search_filter(file_types=["py"]) is not None
@@ -0,0 +1,118 @@
+"""Unit tests for sharded vector storage."""
+
+from pathlib import Path
+
+import pytest
+from langchain_core.documents import Document
+from docrag.sharding import (
+    ShardedVectorStore, assign_shard, group_by_shard, in_directories, shard_name, ROOT_SHARD
+)
+from docrag.flat_store import FlatVectorStore
+from docrag.vector_benchmark import SeededEmbeddings
+from docrag.vector_db import VectorDBManager
+
+
+ROOT = Path("/project")
+
+
+def _chunk(path: str, text: str = "text") -> Document:
+    return Document(page_content=text, metadata={'source': str(ROOT / path), 'source_file': Path(path).name})
+
+
+class TestShardAssignment:
+    """Test chunk to shard routing."""
+
+    def test_shard_names(self):
+        """Test directory names become valid collection-name fragments."""
+        assert shard_name("docs/") == "docs"
+        assert shard_name("./src/api") == "src-api"
+        assert shard_name(".") == ROOT_SHARD
+
+    def test_directory_mode_prefers_most_specific(self):
+        """Test nested configured directories get their own shard."""
+        directories = ["docs/", "docs/api/", "README.md"]
+        assert assign_shard(_chunk("docs/guide.md").metadata, ROOT, directories, 'directory') == "docs"
+        assert assign_shard(_chunk("docs/api/ref.md").metadata, ROOT, directories, 'directory') == "docs-api"
+        assert assign_shard(_chunk("README.md").metadata, ROOT, directories, 'directory') == "README.md"
+        assert assign_shard(_chunk("other/x.md").metadata, ROOT, directories, 'directory') == ROOT_SHARD
+
+    def test_hash_mode_is_stable(self):
+        """Test hash buckets depend only on the relative path."""
+        shard = assign_shard(_chunk("src/a.py").metadata, ROOT, [], 'hash', shards=4)
+        assert shard.startswith("hash-")
+        assert assign_shard(_chunk("src/a.py").metadata, ROOT, [], 'hash', shards=4) == shard
+        groups = group_by_shard([_chunk(f"src/{i}.py") for i in range(40)], ROOT, [], 'hash', shards=4)
+        assert len(groups) == 4
+
+    def test_in_directories(self):
+        """Test directory filter matches whole path components."""
+        metadata = _chunk("docs/api/ref.md").metadata
+        assert in_directories(metadata, ROOT, ["docs"])
+        assert in_directories(metadata, ROOT, ["./docs/api/"])
+        assert not in_directories(metadata, ROOT, ["doc"])
+        assert not in_directories(metadata, ROOT, ["src"])
+
+
+class TestShardedVectorStore:
+    """Test fan-out search across shard stores."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        embedding = SeededEmbeddings(dimensions=16)
+        shards = {
+            'docs': FlatVectorStore.from_documents(
+                [_chunk(f"docs/d{i}.md", f"doc {i}") for i in range(10)], embedding, path=tmp_path / "docs"
+            ),
+            'src': FlatVectorStore.from_documents(
+                [_chunk(f"src/s{i}.py", f"src {i}") for i in range(10)], embedding, path=tmp_path / "src"
+            )
+        }
+        return ShardedVectorStore(shards, embedding, directories={'docs': 'docs', 'src': 'src'}, project_root=ROOT)
+
+    def test_merges_across_shards(self, store):
+        """Test the best match is found whichever shard holds it."""
+        assert store.similarity_search("src 4", k=1)[0].page_content == "src 4"
+        assert store.similarity_search("doc 7", k=1)[0].page_content == "doc 7"
+        scores = [score for _, score in store.similarity_search_with_score("doc 7", k=5)]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_directories_skip_shards(self, store):
+        """Test a directory filter only searches matching shards."""
+        assert store.select_shards(["docs"]) == (['docs'], False)
+        assert store.select_shards(["docs/sub"]) == (['docs'], True)
+        results = store.similarity_search("src 4", k=3, directories=["docs"])
+        assert results and all(doc.page_content.startswith("doc") for doc in results)
+
+
+@pytest.mark.parametrize("backend", ["flat", "chroma"])
+def test_manager_rebuilds_single_shard(tmp_path, monkeypatch, backend):
+    """Test a sharded database can be searched and one shard rebuilt alone."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'indexing': {'directories': ['docs/', 'src/']},
+        'vector_store': {'backend': backend, 'sharding': 'directory'}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+
+    def chunk(path, text):
+        return Document(page_content=text, metadata={'source': str(tmp_path / path), 'source_file': Path(path).name})
+
+    manager.create_database(
+        [chunk(f"docs/d{i}.md", f"doc {i}") for i in range(5)] + [chunk(f"src/s{i}.py", f"src {i}") for i in range(5)],
+        show_progress=False
+    )
+    assert set(manager.get_vectorstore().shards) == {'docs', 'src'}
+    assert manager.get_retriever(top_k=1).invoke("src 3")[0].page_content == "src 3"
+    assert len(manager.list_documents()) == 10
+
+    manager.rebuild_shard('docs', [chunk("docs/new.md", "new doc")], show_progress=False)
+    assert sorted(manager.list_documents()) == ['new.md'] + [f's{i}.py' for i in range(5)]
+    assert len(manager.get_indexed_chunks()) == 6
+
+    retriever = manager.get_retriever(top_k=3, directories=['docs'])
+    assert [doc.page_content for doc in retriever.invoke("src 3")] == ["new doc"]
+
+    with pytest.raises(ValueError):
+        manager.rebuild_shard('docs', [chunk("src/x.py", "x")], show_progress=False)
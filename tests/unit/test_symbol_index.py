@@ -0,0 +1,156 @@
+"""Unit tests for the code symbol index."""
+
+from langchain_core.documents import Document
+from docrag.symbol_index import SymbolIndex, extract_symbols
+
+
+PYTHON_SOURCE = '''"""Module."""
+
+class ProgressIndicator:
+    """Progress output."""
+
+    def show_spinner(self, message):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def show_progress():
+    pass
+'''
+
+GO_SOURCE = '''package main
+
+type Server struct {
+    name string
+}
+
+func (s *Server) Run(addr string) error {
+    return nil
+}
+
+func main() {
+}
+'''
+
+JS_SOURCE = '''export class Client {
+  constructor(url) {
+    this.url = url;
+  }
+
+  async fetchDocs(query) {
+    if (query) {
+      return [];
+    }
+  }
+}
+
+const buildUrl = (base) => base + "/api";
+'''
+
+JAVA_SOURCE = '''class Foo {
+    int bar(int x) {
+        return helper(x);
+    }
+
+    void baz() {
+        if (ready) {
+            throw new IllegalStateException("busy");
+        }
+        else if (done) {
+        }
+    }
+
+    public static String qux() {
+        return new String("qux");
+    }
+}
+'''
+
+
+class TestExtractSymbols:
+    """Test definition extraction per language."""
+
+    def test_python_classes_and_methods(self):
+        """Test Python methods are attributed to their class."""
+        symbols = extract_symbols(PYTHON_SOURCE, '.py')
+        found = {(s['name'], s['kind'], s['container'], s['line']) for s in symbols}
+        assert ('ProgressIndicator', 'class', None, 3) in found
+        assert ('show_spinner', 'method', 'ProgressIndicator', 6) in found
+        assert ('stop', 'method', 'ProgressIndicator', 9) in found
+        assert ('show_progress', 'function', None, 13) in found
+
+    def test_python_syntax_error_fallback(self):
+        """Test unparsable Python still yields definitions."""
+        symbols = extract_symbols("class Broken:\n    def run(self):\n        x = (\n", '.py')
+        assert [(s['name'], s['kind']) for s in symbols] == [('Broken', 'class'), ('run', 'method')]
+
+    def test_go_receiver_methods(self):
+        """Test Go methods use the receiver type as container."""
+        symbols = extract_symbols(GO_SOURCE, '.go')
+        found = {(s['name'], s['kind'], s['container']) for s in symbols}
+        assert ('Server', 'struct', None) in found
+        assert ('Run', 'method', 'Server') in found
+        assert ('main', 'function', None) in found
+
+    def test_js_class_methods_skip_control_flow(self):
+        """Test JS class methods are found and control statements ignored."""
+        symbols = extract_symbols(JS_SOURCE, '.js')
+        names = {(s['name'], s['kind'], s['container']) for s in symbols}
+        assert ('Client', 'class', None) in names
+        assert ('fetchDocs', 'method', 'Client') in names
+        assert ('buildUrl', 'function', None) in names
+        assert not any(s['name'] == 'if' for s in symbols)
+
+    def test_java_methods_without_modifiers(self):
+        """Test package-private Java methods are found and statements ignored."""
+        symbols = extract_symbols(JAVA_SOURCE, '.java')
+        assert [(s['name'], s['kind'], s['container'], s['line']) for s in symbols] == [
+            ('Foo', 'class', None, 1),
+            ('bar', 'method', 'Foo', 2),
+            ('baz', 'method', 'Foo', 6),
+            ('qux', 'method', 'Foo', 14),
+        ]
+
+    def test_unknown_file_type(self):
+        """Test non-code files produce no symbols."""
+        assert extract_symbols("class Foo:", '.md') == []
+
+
+class TestSymbolIndex:
+    """Test symbol table build and lookup."""
+
+    def _build(self, tmp_path):
+        source = tmp_path / "progress.py"
+        source.write_text(PYTHON_SOURCE)
+        chunks = [
+            Document(page_content=PYTHON_SOURCE[:60], metadata={'source': str(source), 'file_type': '.py'}),
+            Document(page_content=PYTHON_SOURCE[60:], metadata={'source': str(source), 'file_type': '.py'}),
+            Document(page_content="# Readme", metadata={'source': str(tmp_path / "README.md"), 'file_type': '.md'}),
+        ]
+        return SymbolIndex.build(chunks, tmp_path)
+
+    def test_exact_lookup_is_case_insensitive(self, tmp_path):
+        """Test exact name lookup."""
+        results = self._build(tmp_path).lookup("SHOW_SPINNER")
+        assert len(results) == 1
+        assert results[0]['path'] == "progress.py"
+        assert results[0]['line'] == 6
+
+    def test_qualified_lookup(self, tmp_path):
+        """Test Class.method lookup."""
+        results = self._build(tmp_path).lookup("ProgressIndicator.stop")
+        assert [r['name'] for r in results] == ['stop']
+
+    def test_prefix_and_kind_filter(self, tmp_path):
+        """Test prefix matching with kind filter."""
+        index = self._build(tmp_path)
+        assert {r['name'] for r in index.lookup("show_", prefix=True)} == {'show_spinner', 'show_progress'}
+        assert [r['name'] for r in index.lookup("show_", prefix=True, kind='function')] == ['show_progress']
+
+    def test_save_and_load(self, tmp_path):
+        """Test index survives a save/load roundtrip."""
+        self._build(tmp_path).save(tmp_path)
+        loaded = SymbolIndex.load(tmp_path)
+        assert loaded.lookup("ProgressIndicator")[0]['kind'] == 'class'
@@ -0,0 +1,155 @@
+"""Unit tests for span tracing."""
+
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from docrag.config_manager import ConfigManager, DocRAGConfig
+from docrag.document_processor import DocumentProcessor
+from docrag.instrumentation import phase
+from docrag.mcp_server import MCPServer
+from docrag.tracing import (
+    JsonlSpanExporter, OtlpSpanExporter, Tracer, activate, format_trace_summary, read_traces,
+    span, summarize_traces, trace_run
+)
+from docrag.vector_db import VectorDBManager
+
+
+def test_index_run_and_tool_call_spans(tmp_path, fake_llm_config):
+    """Test pipeline phases and tool calls become nested spans with attributes."""
+    config = DocRAGConfig.from_template('general')
+    for key, value in fake_llm_config.items():
+        setattr(config.llm, key, value)
+    config.tracing.enabled = True
+    config.retrieval.compression_ratio = 0.5
+    ConfigManager(tmp_path).save_config(config)
+    (tmp_path / "docs").mkdir()
+    for i in range(3):
+        (tmp_path / "docs" / f"guide{i}.md").write_text(f"# Guide {i}\n\nSetting {i} controls retries.\n")
+
+    with trace_run(tmp_path, 'index'):
+        chunks, _ = DocumentProcessor(config.to_dict()).process(tmp_path)
+        VectorDBManager(config.to_dict(), tmp_path).create_database(chunks, show_progress=False)
+
+    server = MCPServer(tmp_path)
+    asyncio.run(server.run_tool("answer_question", {"question": "setting 1", "include_sources": False}))
+    server.tracer.shutdown()
+
+    spans = read_traces(tmp_path / ".docrag")
+    by_id = {entry['span_id']: entry for entry in spans}
+
+    def parent(entry):
+        return by_id[entry['parent_id']]['name']
+
+    named = {entry['name']: entry for entry in spans}
+    assert named['index']['parent_id'] is None
+    assert {name: parent(named[name]) for name in ['scan', 'load', 'chunk', 'write', 'local_indexes']} == dict.fromkeys(
+        ['scan', 'load', 'chunk', 'write', 'local_indexes'], 'index'
+    )
+    assert named['scan']['attributes']['files'] == 3
+    assert named['chunk']['attributes']['chunks'] == len(chunks)
+    embeds = [entry for entry in spans if entry['name'] == 'embed']
+    assert parent(embeds[0]) == 'write' and embeds[0]['attributes']['texts'] == len(chunks)
+
+    call = named['answer_question']
+    assert call['kind'] == 'server' and call['parent_id'] is None and call['status'] == 'ok'
+    assert call['attributes']['reindex_running'] is False and call['attributes']['result_chars'] > 0
+    assert parent(named['search']) == 'answer_question' and parent(embeds[-1]) == 'search'
+    assert parent(named['prompt_build']) == 'answer_question'
+    prompt_build = named['prompt_build']['attributes']
+    assert prompt_build['context_tokens'] > 0
+    assert prompt_build['tokens_saved'] == prompt_build['tokens_before'] - prompt_build['tokens_after'] >= 0
+    assert named['llm']['attributes']['prompt_tokens'] > 0 and named['llm']['attributes']['completion_tokens'] > 0
+    assert len({entry['trace_id'] for entry in spans}) == 2
+
+
+def test_each_process_writes_its_own_file(tmp_path, monkeypatch):
+    """Test processes never share a rotating file and old files are pruned."""
+    for pid in (101, 102, 103):
+        monkeypatch.setattr(os, 'getpid', lambda: pid)
+        tracer = Tracer(JsonlSpanExporter(tmp_path))
+        with activate(tracer):
+            with span('index', pid=pid):
+                pass
+        tracer.shutdown()
+        os.utime(tracer.exporter.path, (pid, pid))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "traces-101.jsonl", "traces-102.jsonl", "traces-103.jsonl"
+    ]
+    assert [entry['attributes']['pid'] for entry in read_traces(tmp_path)] == [101, 102, 103]
+
+    # A budget (max_mb * (backups + 1)) of two and a half files drops the oldest
+    size = (tmp_path / "traces-101.jsonl").stat().st_size
+    monkeypatch.setattr(os, 'getpid', lambda: 104)
+    JsonlSpanExporter(tmp_path, max_mb=size * 1.25 / 1024 / 1024, backups=1).shutdown()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "traces-102.jsonl", "traces-103.jsonl", "traces-104.jsonl"
+    ]
+
+
+def test_otlp_export_to_local_collector():
+    """Test spans are posted as OTLP/HTTP JSON with parent links and typed attributes."""
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.path, json.loads(self.rfile.read(int(self.headers['Content-Length'])))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    collector = ThreadingHTTPServer(('127.0.0.1', 0), Collector)
+    threading.Thread(target=collector.serve_forever, daemon=True).start()
+    try:
+        tracer = Tracer(OtlpSpanExporter(f"http://127.0.0.1:{collector.server_port}"), "docrag-test")
+        with activate(tracer):
+            with span('index', files=3) as root:
+                with phase('chunk', documents=3):
+                    pass
+                root.mark_error("ERROR: write failed")
+        tracer.shutdown()
+    finally:
+        collector.shutdown()
+
+    (path, payload), = received
+    assert path == "/v1/traces"
+    resource_spans = payload['resourceSpans'][0]
+    assert {'key': 'service.name', 'value': {'stringValue': 'docrag-test'}} in resource_spans['resource']['attributes']
+    chunk, index = resource_spans['scopeSpans'][0]['spans']
+    assert chunk['name'] == 'chunk' and chunk['parentSpanId'] == index['spanId']
+    assert chunk['traceId'] == index['traceId'] and len(index['traceId']) == 32
+    assert 'parentSpanId' not in index and index['status']['code'] == 2
+    assert index['attributes'] == [{'key': 'files', 'value': {'intValue': '3'}}]
+    assert int(index['endTimeUnixNano']) >= int(chunk['endTimeUnixNano'])
+
+
+def test_slow_calls_are_matched_with_index_runs():
+    """Test the summary lists slow calls with overlapping index runs of any process."""
+    def entry(name, span_id, start, duration_ms, kind='internal', parent_id=None, pid=1, **attributes):
+        return {
+            'trace_id': f"t-{parent_id or span_id}", 'span_id': span_id, 'parent_id': parent_id,
+            'name': name, 'kind': kind, 'start': start, 'duration_ms': duration_ms,
+            'status': 'ok', 'attributes': attributes, 'pid': pid
+        }
+
+    spans = [
+        entry('reindex', 'r1', 100.0, 10000.0, pid=7),
+        entry('search_docs', 'c1', 105.0, 3000.0, kind='server', concurrent_calls=2),
+        entry('search', 's1', 105.1, 2800.0, parent_id='c1'),
+        entry('search_docs', 'c2', 120.0, 2500.0, kind='server'),
+        entry('search_docs', 'c3', 121.0, 40.0, kind='server'),
+    ]
+    summary = summarize_traces(spans, slow_ms=2000)
+
+    assert summary['spans']['search_docs']['count'] == 3
+    first, second = summary['slow_calls']
+    assert first['duration_ms'] == 3000.0 and first['children'] == {'search': 2800.0}
+    assert [(run['name'], run['pid'], run['same_trace']) for run in first['overlapping_index_runs']] == [('reindex', 7, False)]
+    assert second['overlapping_index_runs'] == []
+    text = format_trace_summary(summary, 2000)
+    assert "overlapped reindex (pid 7, 10.0s)" in text and "2 other call(s) in flight" in text
@@ -0,0 +1,113 @@
+"""Unit tests for the trigram index and grep search."""
+
+import re
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from docrag.trigram_index import TrigramIndex, required_literals
+
+
+@pytest.fixture
+def chunks():
+    """Sample chunks with known line positions."""
+    return [
+        Document(
+            page_content="# Config\nretrieval:\n  top_k: 3\n",
+            metadata={'source': '/p/config.md', 'chunk_id': 0, 'start_line': 1}
+        ),
+        Document(
+            page_content="def show_spinner(message):\n    pass\n",
+            metadata={'source': '/p/errors.py', 'chunk_id': 1, 'start_line': 10}
+        ),
+        Document(
+            page_content="Errors use VALIDATION_ERROR code.\n",
+            metadata={'source': '/p/api.md', 'chunk_id': 2, 'start_line': 40}
+        ),
+    ]
+
+
+class TestRequiredLiterals:
+    """Test literal extraction from regular expressions."""
+
+    def test_plain_text(self):
+        """Test plain regex is a single literal."""
+        assert required_literals("top_k") == ["top_k"]
+
+    def test_wildcards_split_literals(self):
+        """Test wildcards split the pattern into separate literals."""
+        assert required_literals(r"def \w+_spinner") == ["def ", "_spinner"]
+
+    def test_alternation_yields_nothing(self):
+        """Test alternation is not used for narrowing."""
+        assert required_literals("foo|bar") == []
+
+    def test_optional_repeat_breaks_run(self):
+        """Test optional parts are not required."""
+        assert required_literals("colou?r") == ["colo", "r"]
+
+    def test_fixed_string(self):
+        """Test fixed strings are used verbatim."""
+        assert required_literals("a.b(", fixed_string=True) == ["a.b("]
+
+
+class TestTrigramIndex:
+    """Test trigram candidate filtering and grep."""
+
+    def test_candidates_narrowed(self, chunks):
+        """Test trigrams narrow candidates to chunks containing the literal."""
+        index = TrigramIndex.build(chunks)
+        assert index.candidates(["VALIDATION"]) == [2]
+        assert index.candidates(["missing"]) == []
+        assert index.candidates(["ab"]) is None
+
+    def test_grep_reports_absolute_lines(self, chunks):
+        """Test grep reports file line numbers from chunk start lines."""
+        index = TrigramIndex.build(chunks)
+        matches, scanned = index.grep(chunks, r"top_k:\s*\d+")
+        assert scanned == 1
+        assert len(matches) == 1
+        assert matches[0]['source'] == '/p/config.md'
+        assert matches[0]['line'] == 3
+        assert matches[0]['text'] == "  top_k: 3"
+
+    def test_grep_ignore_case(self, chunks):
+        """Test case-insensitive grep."""
+        index = TrigramIndex.build(chunks)
+        matches, _ = index.grep(chunks, "validation_error", ignore_case=True)
+        assert [m['line'] for m in matches] == [40]
+        assert index.grep(chunks, "validation_error")[0] == []
+
+    def test_grep_fixed_string(self, chunks):
+        """Test fixed-string grep escapes regex metacharacters."""
+        index = TrigramIndex.build(chunks)
+        matches, _ = index.grep(chunks, "show_spinner(", fixed_string=True)
+        assert matches[0]['line'] == 10
+
+    def test_grep_invalid_regex(self, chunks):
+        """Test invalid regex raises re.error."""
+        index = TrigramIndex.build(chunks)
+        with pytest.raises(re.error):
+            index.grep(chunks, "(unclosed")
+
+    def test_save_and_load(self, chunks, tmp_path):
+        """Test index survives a save/load roundtrip."""
+        (tmp_path / "trigrams.json").write_text("{}")
+        TrigramIndex.build(chunks).save(tmp_path)
+        loaded = TrigramIndex.load(tmp_path)
+        assert loaded.num_docs == 3
+        assert loaded.candidates(["spinner"]) == [1]
+        assert isinstance(loaded.postings, np.memmap) and loaded.postings.dtype == np.uint32
+        assert not (tmp_path / "trigrams.json").exists()
+
+    def test_non_ascii_and_empty(self, chunks, tmp_path):
+        """Test trigrams beyond the BMP and an index without any trigrams."""
+        docs = chunks + [Document(page_content="Größe 😀😀 ok", metadata={})]
+        index = TrigramIndex.build(docs)
+        assert index.candidates(["GRÖSSE"]) == []
+        assert index.candidates(["größe"]) == [3]
+        assert index.candidates(["😀😀 "]) == [3]
+
+        TrigramIndex.build([Document(page_content="ab")]).save(tmp_path)
+        empty = TrigramIndex.load(tmp_path)
+        assert empty.candidates(["abc"]) == []
+        assert empty.candidates(["ab"]) is None
@@ -0,0 +1,121 @@
+"""Unit tests for scored vector search and adaptive k."""
+
+import asyncio
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from docrag.mcp_server import MCPServer
+from docrag.sharding import relevance_score_fn
+from docrag.vector_benchmark import SeededEmbeddings
+from docrag.vector_db import VectorDBManager, adaptive_cutoff
+
+
+@pytest.mark.parametrize("backend", ["flat", "chroma"])
+def test_search_honors_k_and_min_score(tmp_path, monkeypatch, backend):
+    """Test k reaches the store and scores are relevance, best first."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'retrieval': {'top_k': 3},
+        'vector_store': {'backend': backend}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+    manager.create_database(
+        [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(20)],
+        show_progress=False
+    )
+
+    assert len(manager.search("chunk 7")) == 3
+    hits = manager.search("chunk 7", k=10)
+    assert len(hits) == 10
+    assert hits[0][0].page_content == "chunk 7"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-3)
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+
+    threshold = scores[4]
+    assert [doc for doc, _ in manager.search("chunk 7", k=10, min_score=threshold)] == [doc for doc, _ in hits[:5]]
+    assert manager.search("chunk 7", k=0) == []
+
+
+def test_scores_are_cosine_on_every_backend(tmp_path, monkeypatch):
+    """Test flat stores, ChromaDB and pre-cosine (L2) collections report the same scale."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    docs = [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(20)]
+    scores = {}
+    for backend in ("flat", "chroma"):
+        manager = VectorDBManager({'vector_store': {'backend': backend}}, tmp_path / backend)
+        manager.embeddings = SeededEmbeddings(dimensions=16)
+        manager.create_database(docs, show_progress=False)
+        scores[backend] = [score for _, score in manager.search("chunk 7", k=10)]
+
+    legacy = Chroma.from_documents(docs, SeededEmbeddings(dimensions=16), persist_directory=str(tmp_path / "l2"))
+    relevance = relevance_score_fn(legacy)
+    scores['l2'] = [relevance(d) for _, d in legacy.similarity_search_with_score("chunk 7", k=10)]
+
+    assert scores['chroma'] == pytest.approx(scores['flat'], abs=1e-3)
+    assert scores['l2'] == pytest.approx(scores['flat'], abs=1e-3)
+    assert min(scores['flat']) < 0.5
+
+
+class TestAdaptiveCutoff:
+    """Test score-based result counts."""
+
+    def test_cuts_at_score_gap(self):
+        """Test a clear winner is sent alone."""
+        assert adaptive_cutoff([0.9, 0.5, 0.48, 0.47, 0.46]) == 1
+        assert adaptive_cutoff([0.9, 0.88, 0.87, 0.5, 0.4]) == 3
+
+    def test_relevance_mass(self):
+        """Test evenly falling scores keep most of the relevance."""
+        assert adaptive_cutoff([0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5, 0.45]) == 5
+        assert adaptive_cutoff([0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5, 0.45], relevance_mass=1.0) == 7
+
+    def test_bounds(self):
+        """Test min_k and max_k always hold."""
+        assert adaptive_cutoff([0.6] * 12, max_k=8) == 8
+        assert adaptive_cutoff([0.9, 0.2, 0.1], min_k=2) == 2
+        assert adaptive_cutoff([0.9], min_k=3) == 1
+        assert adaptive_cutoff([]) == 0
+
+
+def test_adaptive_retriever(tmp_path, monkeypatch):
+    """Test the adaptive retriever returns between min_k and max_k chunks."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    config = {
+        'llm': {'provider': 'openai', 'embedding_model': 'text-embedding-3-small'},
+        'retrieval': {'adaptive_k': True, 'min_k': 2, 'max_k': 6},
+        'vector_store': {'backend': 'flat'}
+    }
+    manager = VectorDBManager(config, tmp_path)
+    manager.embeddings = SeededEmbeddings(dimensions=16)
+    manager.create_database(
+        [Document(page_content=f"chunk {i}", metadata={'source': 'a.md'}) for i in range(20)],
+        show_progress=False
+    )
+
+    docs = manager.get_adaptive_retriever().invoke("chunk 3")
+    assert 2 <= len(docs) <= 6
+    assert docs[0].page_content == "chunk 3"
+
+
+def test_hybrid_min_score_keeps_only_vector_matches(fake_indexed_project):
+    """Test min_score bounds hybrid results by similarity and is rejected in lexical mode."""
+    server = MCPServer(fake_indexed_project())
+    question = "Section 3 explains setting 3."
+
+    async def search(**arguments):
+        text, _ = await server.run_tool("search_docs", {"question": question, "max_results": 5, **arguments})
+        return text
+
+    unfiltered = asyncio.run(search(mode="hybrid"))
+    assert unfiltered.count("--- Result") == 5
+    assert "SCORE: 0.033 (rrf, similarity 1.000)" in unfiltered
+
+    filtered = asyncio.run(search(mode="hybrid", min_score=0.99))
+    assert filtered.count("--- Result") == 1
+    assert "SOURCE: doc3.md" in filtered and "similarity 1.000" in filtered
+
+    assert asyncio.run(search(mode="lexical", min_score=0.5)).startswith("ERROR: min_score")